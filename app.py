@@ -10,6 +10,8 @@ import json
 import hashlib
 import io
 import re
+import asyncio
+import time
 import logging
 from datetime import datetime
 from typing import Optional, Dict, List, Any
@@ -29,98 +31,160 @@ eora_memory_system = None
 recall_engine = None
 aura_memory_system = None
 db_manager = None
+async_db_mgr = None
 
-from fastapi import FastAPI, Request, HTTPException, File, UploadFile, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi import FastAPI, Request, HTTPException, File, UploadFile, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import HTTPConnection
+from starlette.datastructures import Headers
 
 # EORA 고급 기능 모듈 임포트
 sys.path.append('src')
 
+# 시작 프로파일 (임포트/초기화 단계별 소요 시간, 하위 시스템 준비 상태)
+from startup_profile import DISABLED, FAILED, PENDING, READY, STARTING, get_startup_profile
+startup_profile = get_startup_profile()
+
 # 토큰 계산기 임포트
-try:
-    from token_calculator import get_token_calculator
-    TOKEN_CALCULATOR_AVAILABLE = True
-    print("✅ 토큰 계산기 모듈 로드 성공")
-except ImportError as e:
-    print(f"⚠️ 토큰 계산기 모듈 로드 실패: {e}")
-    TOKEN_CALCULATOR_AVAILABLE = False
+with startup_profile.step("import token_calculator"):
+    try:
+        from token_calculator import get_token_calculator
+        TOKEN_CALCULATOR_AVAILABLE = True
+        print("✅ 토큰 계산기 모듈 로드 성공")
+    except ImportError as e:
+        print(f"⚠️ 토큰 계산기 모듈 로드 실패: {e}")
+        TOKEN_CALCULATOR_AVAILABLE = False
 
 # 성능 최적화 모듈 임포트
-try:
-    from performance_optimizer import performance_monitor, cached_response, initialize_optimizer, get_performance_stats
-    PERFORMANCE_OPTIMIZATION_AVAILABLE = True
-    print("✅ 성능 최적화 모듈 로드 성공")
-except ImportError as e:
-    print(f"⚠️ 성능 최적화 모듈 로드 실패: {e}")
-    # 기본 데코레이터 정의
-    def performance_monitor(func):
-        return func
-    def cached_response(ttl=300):
-        def decorator(func):
-            return func
-        return decorator
-    async def initialize_optimizer():
-        pass
-    def get_performance_stats():
-        return {}
-    PERFORMANCE_OPTIMIZATION_AVAILABLE = False
-
-try:
-    from eora_advanced_chat_system import process_advanced_message
-    from aura_system.recall_engine import RecallEngine
-    from eora_memory_system import get_eora_memory_system
-    from database import mongo_client, verify_connection, db_mgr
-    
-    # 전역 변수 설정
-    db_manager = db_mgr
-    
-    # EORA 메모리 시스템 초기화 - 지연 초기화 패턴 사용
-    print("🔗 EORA 메모리 시스템 지연 초기화 시작...")
-    eora_memory_system = get_eora_memory_system()
-    print("✅ EORA 메모리 시스템 지연 초기화 완료")
-    
-    # Aura 메모리 시스템 초기화 시도
+with startup_profile.step("import performance_optimizer"):
     try:
-        from aura_memory_system import EORAMemorySystem
-        aura_memory_system = EORAMemorySystem()
-        print("✅ Aura 메모리 시스템 초기화 완료")
-    except ImportError as aura_error:
-        print(f"⚠️ Aura 메모리 시스템 로드 실패: {aura_error}")
-        aura_memory_system = None
+        from performance_optimizer import performance_monitor, cached_response, initialize_optimizer, get_performance_stats
+        PERFORMANCE_OPTIMIZATION_AVAILABLE = True
+        print("✅ 성능 최적화 모듈 로드 성공")
+    except ImportError as e:
+        print(f"⚠️ 성능 최적화 모듈 로드 실패: {e}")
+        # 기본 데코레이터 정의
+        def performance_monitor(func):
+            return func
+        def cached_response(ttl=300):
+            def decorator(func):
+                return func
+            return decorator
+        async def initialize_optimizer():
+            pass
+        def get_performance_stats():
+            return {}
+        PERFORMANCE_OPTIMIZATION_AVAILABLE = False
+
+# EORA 고급 기능 - 서버 시작 후 백그라운드에서 초기화 (initialize_advanced_systems)
+# 초기화가 끝나기 전에는 아래 기본값으로 동작합니다 (/ready 로 준비 여부 확인).
+ADVANCED_FEATURES_AVAILABLE = False
+advanced_systems_ready = False
+mongo_client = None
+db_mgr = None
+
+def verify_connection(force: bool = False):
+    return False
+
+def get_recall_strategy_stats():
+    return {}
+
+def get_embedding_batcher_stats():
+    return {}
+
+startup_profile.set_state("advanced_systems", PENDING)
+
+def initialize_advanced_systems() -> bool:
+    """
+    EORA 고급 기능 모듈 임포트 및 메모리 시스템/회상 엔진 초기화
+    
+    MongoDB 연결과 인덱스 생성이 포함되어 느릴 수 있으므로 서버 시작 후
+    워커 스레드에서 실행합니다 (start_background_subsystems).
+    """
+    global process_advanced_message, RecallEngine, get_recall_strategy_stats, get_embedding_batcher_stats
+    global mongo_client, verify_connection, db_mgr, db_manager, async_db_mgr
+    global eora_memory_system, aura_memory_system, recall_engine
+    global ADVANCED_FEATURES_AVAILABLE, advanced_systems_ready
     
-    # 회상 엔진 초기화 (memory_manager와 함께)
-    if hasattr(eora_memory_system, 'memory_manager') and eora_memory_system.memory_manager:
+    startup_profile.set_state("advanced_systems", STARTING)
+    try:
+        with startup_profile.step("import eora_advanced_chat_system"):
+            from eora_advanced_chat_system import process_advanced_message
+        with startup_profile.step("import aura_system.recall_engine"):
+            from aura_system.recall_engine import RecallEngine, get_recall_strategy_stats
+            from aura_system.embedding_batcher import get_embedding_batcher_stats
+        with startup_profile.step("import eora_memory_system"):
+            from eora_memory_system import get_eora_memory_system
+        with startup_profile.step("import database"):
+            from database import mongo_client, verify_connection, db_mgr, AsyncDatabaseManager
+        
+        # 전역 변수 설정
+        db_manager = db_mgr
+        # 채팅 경로용 비동기 DB 관리자 (pymongo 호출을 DB 스레드 풀에서 실행)
+        async_db_mgr = AsyncDatabaseManager(db_mgr) if db_mgr else None
+        
+        # EORA 메모리 시스템 초기화 - 지연 초기화 패턴 사용
+        print("🔗 EORA 메모리 시스템 지연 초기화 시작...")
+        with startup_profile.step("init eora_memory_system"):
+            eora_memory_system = get_eora_memory_system()
+        print("✅ EORA 메모리 시스템 지연 초기화 완료")
+        
+        # Aura 메모리 시스템 초기화 시도
         try:
-            recall_engine = RecallEngine(eora_memory_system.memory_manager)
-            
-            # memory_manager 타입 확인
-            manager_type = type(eora_memory_system.memory_manager).__name__
-            if manager_type == "LightweightMemoryManager":
-                print("✅ RecallEngine 초기화 완료 (Railway 경량 memory_manager)")
-            else:
-                print(f"✅ RecallEngine 초기화 완료 ({manager_type} 연결)")
+            with startup_profile.step("init aura_memory_system"):
+                from aura_memory_system import EORAMemorySystem
+                aura_memory_system = EORAMemorySystem()
+            print("✅ Aura 메모리 시스템 초기화 완료")
+        except ImportError as aura_error:
+            print(f"⚠️ Aura 메모리 시스템 로드 실패: {aura_error}")
+            aura_memory_system = None
+        
+        # 회상 엔진 초기화 (memory_manager와 함께)
+        if hasattr(eora_memory_system, 'memory_manager') and eora_memory_system.memory_manager:
+            try:
+                with startup_profile.step("init recall_engine"):
+                    recall_engine = RecallEngine(eora_memory_system.memory_manager)
                 
-        except Exception as e:
+                # memory_manager 타입 확인
+                manager_type = type(eora_memory_system.memory_manager).__name__
+                if manager_type == "LightweightMemoryManager":
+                    print("✅ RecallEngine 초기화 완료 (Railway 경량 memory_manager)")
+                else:
+                    print(f"✅ RecallEngine 초기화 완료 ({manager_type} 연결)")
+                    
+            except Exception as e:
+                recall_engine = None
+                print(f"⚠️ RecallEngine 초기화 실패: {e}")
+        else:
             recall_engine = None
-            print(f"⚠️ RecallEngine 초기화 실패: {e}")
-    else:
+            print("⚠️ memory_manager 없음 - RecallEngine 비활성화")
+        
+        ADVANCED_FEATURES_AVAILABLE = True
+        print("✅ EORA 고급 기능 모듈 로드 성공")
+        print("✅ EORAMemorySystem 초기화 완료")
+    except ImportError as e:
+        print(f"⚠️ EORA 고급 기능 모듈 로드 실패: {e}")
+        eora_memory_system = None
         recall_engine = None
-        print("⚠️ memory_manager 없음 - RecallEngine 비활성화")
-    
-    ADVANCED_FEATURES_AVAILABLE = True
-    print("✅ EORA 고급 기능 모듈 로드 성공")
-    print("✅ EORAMemorySystem 초기화 완료")
-except ImportError as e:
-    print(f"⚠️ EORA 고급 기능 모듈 로드 실패: {e}")
-    eora_memory_system = None
-    recall_engine = None
-    aura_memory_system = None
-    db_manager = None
-    ADVANCED_FEATURES_AVAILABLE = False
+        aura_memory_system = None
+        db_manager = None
+        async_db_mgr = None
+        ADVANCED_FEATURES_AVAILABLE = False
+        startup_profile.set_state("advanced_systems", DISABLED, str(e))
+        return False
+    
+    # 시스템 상태 확인
+    with startup_profile.step("check advanced_systems_status"):
+        advanced_systems_ready = check_advanced_systems_status()
+    with startup_profile.step("init admin points (MongoDB)"):
+        initialize_admin_points_in_mongodb()
+    startup_profile.set_state("advanced_systems", READY if advanced_systems_ready else FAILED,
+                              None if advanced_systems_ready else "MongoDB 연결 안됨")
+    return advanced_systems_ready
 
 # 환경변수 로딩 및 Railway 환경 최적화
 from dotenv import load_dotenv
@@ -247,8 +311,10 @@ def initialize_openai():
         return False
 
 # 환경변수 로드 및 OpenAI 초기화
-railway_env_loaded = load_environment_variables()
-OPENAI_AVAILABLE = initialize_openai()
+with startup_profile.step("load environment variables"):
+    railway_env_loaded = load_environment_variables()
+with startup_profile.step("init openai client"):
+    OPENAI_AVAILABLE = initialize_openai()
 
 print("=" * 50)
 print("🌍 환경 설정 완료")
@@ -339,7 +405,52 @@ print("=" * 50)
 # 앱 초기화
 app = FastAPI(title="EORA AI Fixed Server")
 
-# 미들웨어 설정
+class SharedStatePrefetchMiddleware:
+    """
+    공유 상태 모드: 요청 처리 전에 로그인 사용자의 users_db/points_db 항목을 DB 실행기에서 미리 읽어 둠
+    (get_current_user의 users_db 조회가 이벤트 루프에서 백엔드를 기다리지 않도록, 세션 미들웨어 안쪽에서 실행)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket") and isinstance(users_db, SharedStateMap):
+            connection = HTTPConnection(scope)
+            emails = {connection.cookies.get("user_email"), (scope.get("session") or {}).get("user_email")}
+            for email in emails - {None}:
+                await users_db.prefetch(email)
+                await points_db.prefetch(email)
+        await self.app(scope, receive, send)
+
+# 학습 파일 업로드 경로 (폼을 읽기 전에 Content-Length로 크기 상한 확인)
+LEARN_UPLOAD_PATHS = ("/api/admin/learn-file", "/api/admin/enhanced-learn-file")
+
+class UploadSizeLimitMiddleware:
+    """
+    학습 업로드 요청의 Content-Length가 크기 상한을 넘으면 본문을 받기 전에 413으로 거절
+    (File(...) 파라미터는 핸들러 실행 전에 폼 전체를 스풀하므로 핸들러에서 확인하면 늦음)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in LEARN_UPLOAD_PATHS:
+            manager = get_ingestion_job_manager()
+            if manager.upload_too_large(Headers(scope=scope).get("content-length")):
+                manager.reject()
+                response = JSONResponse(
+                    status_code=413,
+                    content={"success": False, "message": UPLOAD_TOO_LARGE_MESSAGE}
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+# 미들웨어 설정 (나중에 추가한 미들웨어가 바깥쪽)
+app.add_middleware(UploadSizeLimitMiddleware)
+app.add_middleware(SharedStatePrefetchMiddleware)
 app.add_middleware(SessionMiddleware, secret_key="eora-secret-key-2024")
 app.add_middleware(
     CORSMiddleware,
@@ -399,6 +510,21 @@ async def health_check():
             "error": str(e)
         }
 
+@app.get("/ready")
+async def readiness_check():
+    """준비 상태 확인 - 백그라운드 하위 시스템 초기화가 끝나야 200 (진행 중이면 503)"""
+    ready = startup_profile.is_ready()
+    report = startup_profile.report(slowest=0)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "timestamp": datetime.now().isoformat(),
+            "startup_ms": report["total_ms"],
+            "subsystems": report["subsystems"]
+        }
+    )
+
 # 데이터 파일 경로
 DATA_DIR = "data"
 USERS_FILE = os.path.join(DATA_DIR, "users.json")
@@ -409,38 +535,115 @@ POINTS_FILE = os.path.join(DATA_DIR, "points.json")
 # 데이터 디렉토리 생성
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# 변경분 단위 저널 저장소 (전체 파일 재작성 대신 append-only 기록)
+from json_journal import get_journal_store, compact_all as compact_all_journals
+from db_executor import get_db_executor_stats
+from write_behind import get_write_behind_queue
+from embedding_cache import get_cache_stats as get_embedding_cache_stats
+from recall_cache import (
+    add_generation_listener, apply_remote_generation_bump, bump_memory_generation, get_recall_cache_stats, user_scope
+)
+from shared_state import SharedStateMap, get_shared_state, get_shared_state_stats
+from session_index import (ALL_GROUP, IndexedDict, SortedGroupIndex, decode_cursor, encode_cursor, page_size,
+                           points_sort_key, session_owner, session_sort_key)
+from prompt_assembler import TOKEN_COUNT_FIELD, count_text_tokens, get_prompt_assembler, get_prompt_assembler_stats
+from stage_metrics import (
+    begin_request_trace, end_request_trace, get_recent_traces, get_stage_summary, observe_request, record_stage,
+    render_metrics, stage, timed
+)
+from ws_connections import CLOSE_POLICY_VIOLATION, ConnectionManager
+from ingestion_jobs import (
+    UPLOAD_TOO_LARGE_MESSAGE, UploadTooLarge, get_ingestion_job_manager, iter_file_text, iter_text_chunks,
+    run_chunk_pipeline
+)
+
 # ==================== 유틸리티 함수 ====================
 
 def load_json_data(file_path, default=None):
-    """JSON 파일에서 데이터 로드"""
-    if default is None:
-        default = {}
-    
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"⚠️ {file_path} 로드 오류: {e}")
-    return default
-
-def save_json_data(file_path, data):
-    """JSON 파일에 데이터 저장"""
-    try:
-        # 디렉토리가 없으면 생성
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
-        return True
-    except Exception as e:
-        print(f"⚠️ {file_path} 저장 오류: {e}")
-        return False
+    """JSON 파일에서 데이터 로드 (스냅샷 + 저널 재생)"""
+    return get_journal_store(file_path).load(default)
 
-# 메모리 내 데이터베이스 - 파일에서 로드
-users_db = load_json_data(USERS_FILE)
-sessions_db = load_json_data(SESSIONS_FILE)
-messages_db = load_json_data(MESSAGES_FILE)
-points_db = load_json_data(POINTS_FILE)
+def open_state_map(namespace, file_path, default=None, indexes=()):
+    """
+    메모리 데이터베이스 열기
+    
+    공유 상태 모드(EORA_SHARED_STATE)이면 백엔드를 원본으로 하는 SharedStateMap을,
+    아니면 JSON 파일에서 로드한 dict를 반환합니다 (색인이 있으면 IndexedDict).
+    """
+    shared_state = get_shared_state()
+    if shared_state is not None:
+        return shared_state.open_map(namespace, lambda: load_json_data(file_path, default), indexes)
+    data = load_json_data(file_path, default)
+    return IndexedDict(data, indexes) if indexes else data
+
+def save_json_data(file_path, data, key=None):
+    """
+    JSON 데이터 저장
+    
+    key가 주어지면 data[key] 한 건만 저널에 추가하고 (O(1)),
+    없으면 전체 데이터를 스냅샷으로 압축 저장합니다.
+    """
+    if isinstance(data, SharedStateMap):
+        # 공유 상태 모드: 백엔드가 원본 (여러 워커가 같은 저널 파일을 쓰지 않도록 파일 저장 생략)
+        return data.persist_all() if key is None else data.persist(key)
+    store = get_journal_store(file_path)
+    if key is None:
+        return store.snapshot(data)
+    if key in data:
+        return store.set(data, key)
+    return store.delete(data, key)
+
+async def prefetch_session_state(session_id):
+    """공유 상태 모드: 세션/메시지 항목을 DB 실행기에서 미리 읽어 둠 (이후 조회는 이벤트 루프에서 백엔드를 읽지 않음)"""
+    for data in (sessions_db, messages_db):
+        if isinstance(data, SharedStateMap):
+            await data.prefetch(session_id)
+
+def append_json_data(file_path, data, key, item):
+    """data[key] 리스트에 추가된 항목 하나를 저널에 기록"""
+    if isinstance(data, SharedStateMap):
+        return data.persist_append(key, item)
+    return get_journal_store(file_path).append(data, key, item)
+
+@app.on_event("shutdown")
+async def flush_write_behind_queue():
+    """종료 시 write-behind 큐에 남은 저장 작업을 모두 기록"""
+    queue = get_write_behind_queue()
+    pending = queue.get_stats()["depth"]
+    flushed = await queue.stop()
+    print(f"💾 종료 전 write-behind 큐 기록 {'완료' if flushed else '시간 초과'}: {pending}건")
+
+@app.on_event("shutdown")
+async def stop_ingestion_jobs():
+    """종료 시 실행 중인 학습 작업 취소 (임시 파일 정리)"""
+    await get_ingestion_job_manager().stop()
+
+@app.on_event("shutdown")
+async def compact_json_journals():
+    """종료 시 저널을 스냅샷으로 압축"""
+    if get_shared_state() is not None:
+        return  # 공유 상태 모드에서는 저널 파일을 쓰지 않음
+    compacted = compact_all_journals()
+    print(f"📜 종료 전 저널 압축 완료: {compacted}개 파일")
+
+# 회상 캐시 세대 변경을 다른 워커에 전달하는 공유 상태 네임스페이스
+RECALL_GENERATION_NAMESPACE = "__recall_generation__"
+
+@app.on_event("startup")
+async def start_shared_state_listener():
+    """공유 상태 모드: 다른 워커의 변경 알림 수신 + 회상 캐시 세대 전파"""
+    shared_state = get_shared_state()
+    if shared_state is None:
+        return
+    shared_state.subscribe(RECALL_GENERATION_NAMESPACE, apply_remote_generation_bump)
+    add_generation_listener(lambda scope: shared_state.publish(RECALL_GENERATION_NAMESPACE, scope))
+    shared_state.start(asyncio.get_running_loop())
+
+@app.on_event("shutdown")
+async def stop_shared_state_listener():
+    shared_state = get_shared_state()
+    if shared_state is not None:
+        shared_state.stop()
 
 # ==================== EORA 고급 시스템 초기화 ====================
 
@@ -471,8 +674,44 @@ def check_advanced_systems_status():
     
     return memory_system_ok and connection_ok
 
-# 시스템 상태 확인
-advanced_systems_ready = check_advanced_systems_status()
+# 시스템 상태 확인은 initialize_advanced_systems()에서 수행
+
+async def start_advanced_systems_in_background():
+    """고급 시스템을 워커 스레드에서 초기화 (실패해도 서버는 JSON 모드로 계속 동작)"""
+    try:
+        await asyncio.to_thread(initialize_advanced_systems)
+    except Exception as e:
+        print(f"❌ EORA 고급 시스템 초기화 실패: {e}")
+        startup_profile.set_state("advanced_systems", FAILED, str(e))
+    finally:
+        startup_profile.mark_finished()
+        startup_profile.print_summary()
+
+# 백그라운드 초기화 태스크 (start_background_subsystems에서 생성)
+advanced_systems_task: Optional[asyncio.Task] = None
+
+# 서버 시작 시 초기화 완료까지 기다릴지 여부 (기본: 백그라운드)
+BLOCKING_STARTUP = os.getenv("EORA_BLOCKING_STARTUP", "0") == "1"
+# 초기화 중 들어온 채팅 요청이 메모리 시스템을 기다리는 최대 시간 (초)
+SUBSYSTEM_WAIT_SECONDS = float(os.getenv("EORA_SUBSYSTEM_WAIT_SECONDS", "10"))
+
+@app.on_event("startup")
+async def start_background_subsystems():
+    """무거운 하위 시스템(MongoDB, 메모리 시스템, 회상 엔진)은 서버가 뜬 뒤 초기화"""
+    global advanced_systems_task
+    advanced_systems_task = asyncio.ensure_future(start_advanced_systems_in_background())
+    if BLOCKING_STARTUP:
+        await advanced_systems_task
+
+async def wait_for_advanced_systems(timeout: float = SUBSYSTEM_WAIT_SECONDS) -> bool:
+    """초기화 중이면 최대 timeout초 기다린 뒤 고급 기능 사용 가능 여부를 반환"""
+    task = advanced_systems_task
+    if task is not None and not task.done():
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ EORA 고급 시스템 초기화 대기 시간 초과 ({timeout:.0f}초)")
+    return ADVANCED_FEATURES_AVAILABLE
 
 # ==================== EORA 고급 응답 생성 ====================
 
@@ -533,6 +772,87 @@ async def generate_advanced_response(message: str, user_id: str, session_id: str
         print(f"❌ 고급 응답 생성 전체 오류: {e}")
         return f"시스템 오류가 발생했습니다: {str(e)}"
 
+def build_chat_messages(system_prompt: str, message: str, history: List[Dict], memories: List[Dict] = None,
+                        model: str = "gpt-4o", max_tokens: int = 2048) -> List[Dict]:
+    """시스템 프롬프트, 회상 기억, 최근 대화로 모델별 토큰 예산 안의 OpenAI 메시지 목록을 구성합니다"""
+    messages, budget_info = get_prompt_assembler(model, max_tokens).assemble(system_prompt, message, history, memories)
+    print(f"🧮 프롬프트 조립: {budget_info['prompt_tokens']}/{budget_info['budget']} 토큰 "
+          f"(기억 {budget_info['memories']}개, 대화 {budget_info['history']}개)")
+    return messages
+
+def calculate_token_usage(messages: List[Dict], ai_response: str, response: Any = None) -> Optional[Dict[str, int]]:
+    """API 응답의 usage를 사용하고, 없으면 TokenCalculator로 추정합니다"""
+    if not TOKEN_CALCULATOR_AVAILABLE:
+        return None
+    
+    try:
+        token_calc = get_token_calculator("gpt-4o")
+        token_usage = token_calc.extract_usage_from_response(response) if response is not None else None
+        if not token_usage:
+            # API 응답에서 토큰 정보가 없으면 추정
+            total_prompt = "\n".join([msg["content"] for msg in messages])
+            prompt_tokens = token_calc.count_tokens(total_prompt)
+            completion_tokens = token_calc.count_tokens(ai_response)
+            token_usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        return token_usage
+    except Exception as token_error:
+        print(f"⚠️ 토큰 계산 오류: {token_error}")
+        return None
+
+async def stream_openai_response(message: str, history: List[Dict], memories: List[Dict], result: Dict[str, Any]):
+    """
+    OpenAI 스트리밍 응답 - 델타 텍스트를 순서대로 yield합니다.
+    
+    result에는 진행 중 생성된 조각(parts)과 메시지 목록이 기록되며,
+    스트림이 끝나면 response/token_usage가 채워집니다.
+    """
+    if not OPENAI_AVAILABLE or not openai_client:
+        raise Exception("OpenAI 클라이언트가 초기화되지 않았습니다")
+    
+    with stage("prompt_build"):
+        system_prompt = await load_ai1_system_prompt()
+        messages = build_chat_messages(system_prompt, message, history, memories)
+    result["messages"] = messages
+    result["parts"] = []
+    
+    llm_started = time.perf_counter()
+    stream = await openai_client.chat.completions.create(
+        model="gpt-4o",
+        messages=messages,
+        temperature=0.7,
+        max_tokens=2048,
+        timeout=30.0,
+        stream=True,
+        stream_options={"include_usage": True}  # 마지막 청크에 usage 포함
+    )
+    
+    usage_chunk = None
+    first_token = True
+    async for chunk in stream:
+        if getattr(chunk, "usage", None):
+            usage_chunk = chunk
+        if chunk.choices:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if first_token:
+                    record_stage("llm.first_token", time.perf_counter() - llm_started)
+                    first_token = False
+                result["parts"].append(delta)
+                yield delta
+    record_stage("llm", time.perf_counter() - llm_started)
+    
+    ai_response = "".join(result["parts"])
+    result["response"] = ai_response
+    result["token_usage"] = calculate_token_usage(messages, ai_response, usage_chunk)
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 형식으로 직렬화"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
 async def generate_openai_response(message: str, history: List[Dict], memories: List[Dict] = None) -> Dict[str, Any]:
     """OpenAI API를 사용한 응답 생성 (성능 최적화 + AI1 프롬프트 적용)"""
     global openai_client
@@ -569,46 +889,9 @@ async def generate_openai_response(message: str, history: List[Dict], memories:
             }
         
         # 🎯 AI1 프롬프트 동적 로드
-        system_prompt = await load_ai1_system_prompt()
-        
-        messages = [
-            {"role": "system", "content": system_prompt}
-        ]
-        
-        # 회상된 기억 추가 (정확히 3개로 제한)
-        if memories:
-            top_memories = memories[:3]  # 정확히 3개만 선택
-            memory_contexts = []
-            
-            for i, memory in enumerate(top_memories, 1):
-                content = memory.get('content', '')
-                recall_type = memory.get('recall_type', '일반')
-                
-                # 각 회상 유형별 태그 추가
-                if recall_type == "eora_enhancement":
-                    memory_contexts.append(f"🧠 EORA 고급 기능:\n{content}")
-                elif recall_type in ["keyword", "embedding", "emotion", "belief", "context", "temporal", "association", "pattern"]:
-                    memory_contexts.append(f"🔍 {recall_type} 회상 #{i}:\n{content[:200]}...")
-                else:
-                    memory_contexts.append(f"💭 관련 기억 #{i}:\n{content[:200]}...")
-            
-            if memory_contexts:
-                combined_context = "\n\n".join(memory_contexts)
-                messages.append({
-                    "role": "system", 
-                    "content": f"관련 기억 및 맥락 (총 {len(top_memories)}개):\n\n{combined_context}"
-                })
-        
-        # 최근 대화 기록 추가 (최대 4개로 단축하여 성능 향상)
-        for msg in history[-4:]:
-            if msg.get('role') in ['user', 'assistant']:
-                messages.append({
-                    "role": msg['role'],
-                    "content": msg['content']
-                })
-        
-        # 현재 메시지 추가
-        messages.append({"role": "user", "content": message})
+        with stage("prompt_build"):
+            system_prompt = await load_ai1_system_prompt()
+            messages = build_chat_messages(system_prompt, message, history, memories)
         
         # OpenAI API 호출 전 키 검증 및 클라이언트 재초기화
         try:
@@ -643,13 +926,13 @@ async def generate_openai_response(message: str, history: List[Dict], memories:
             
             print(f"🔑 API 호출 직전 클라이언트 확인: {str(openai_client)[:50]}...")
             
-            response = await openai_client.chat.completions.create(
+            response = await timed("llm", openai_client.chat.completions.create(
                 model="gpt-4o",
                 messages=messages,
                 temperature=0.7,
                 max_tokens=2048,
                 timeout=30.0  # 응답 시간 늘림
-            )
+            ))
             
             print("✅ OpenAI API 호출 성공!")
             
@@ -672,13 +955,13 @@ async def generate_openai_response(message: str, history: List[Dict], memories:
                     
                     print(f"🔧 재시도용 클라이언트 생성: {current_key[:15]}...")
                     
-                    response = await openai_client.chat.completions.create(
+                    response = await timed("llm.retry", openai_client.chat.completions.create(
                         model="gpt-4o",
                         messages=messages,
                         temperature=0.7,
                         max_tokens=2048,
                         timeout=30.0
-                    )
+                    ))
                     
                     print("✅ 재시도 API 호출 성공!")
                     
@@ -691,23 +974,7 @@ async def generate_openai_response(message: str, history: List[Dict], memories:
         ai_response = response.choices[0].message.content
         
         # 토큰 사용량 계산
-        token_usage = None
-        if TOKEN_CALCULATOR_AVAILABLE:
-            try:
-                token_calc = get_token_calculator("gpt-4o")
-                token_usage = token_calc.extract_usage_from_response(response)
-                if not token_usage:
-                    # API 응답에서 토큰 정보가 없으면 추정
-                    total_prompt = "\n".join([msg["content"] for msg in messages])
-                    prompt_tokens = token_calc.count_tokens(total_prompt)
-                    completion_tokens = token_calc.count_tokens(ai_response)
-                    token_usage = {
-                        "prompt_tokens": prompt_tokens,
-                        "completion_tokens": completion_tokens,
-                        "total_tokens": prompt_tokens + completion_tokens
-                    }
-            except Exception as token_error:
-                print(f"⚠️ 토큰 계산 오류: {token_error}")
+        token_usage = calculate_token_usage(messages, ai_response, response)
         
         return {
             "response": ai_response,
@@ -810,8 +1077,14 @@ async def load_ai1_system_prompt() -> str:
 
 @performance_monitor
 async def save_conversation_to_memory(user_message: str, ai_response: str, user_id: str, session_id: str):
-    """대화를 EORA 메모리 시스템과 MongoDB에 장기 저장하여 학습 및 회상에 활용"""
+    """
+    대화를 EORA 메모리 시스템과 MongoDB에 장기 저장하여 학습 및 회상에 활용
+    
+    문서는 write-behind 큐에 등록되어 다른 요청의 문서와 함께 insert_many로 기록됩니다.
+    """
     try:
+        await wait_for_advanced_systems()
+        write_behind = get_write_behind_queue()
         # MongoDB에 메모리 저장
         memory_id = f"memory_{int(datetime.now().timestamp() * 1000)}"
         
@@ -838,16 +1111,16 @@ async def save_conversation_to_memory(user_message: str, ai_response: str, user_
                 }
                 
                 if memories_collection is not None:
-                    result = memories_collection.insert_one(memory_data)
-                    print(f"💾 메모리 저장소 저장: {memory_id}")
+                    await write_behind.insert(memories_collection, memory_data)
+                    print(f"💾 메모리 저장소 저장 예약: {memory_id}")
                 
             except Exception as mongo_error:
                 print(f"⚠️ MongoDB 메모리 저장 실패: {mongo_error}")
         
         # EORA 메모리 시스템에도 저장 (고급 기능용)
-        if eora_memory_system:
+        if eora_memory_system and eora_memory_system.is_connected():
             # 사용자 메시지 저장
-            await eora_memory_system.store_memory(
+            user_memory = eora_memory_system.build_memory_document(
                 content=user_message,
                 memory_type="user_message",
                 user_id=user_id,
@@ -858,9 +1131,11 @@ async def save_conversation_to_memory(user_message: str, ai_response: str, user_
                     "memory_id": memory_id
                 }
             )
+            # 삽입된 문서만 감정/주제 집계에 반영 (insert_many 실패분 제외)
+            await write_behind.insert(eora_memory_system.memories, user_memory, eora_memory_system.record_rollups)
             
             # AI 응답 저장
-            await eora_memory_system.store_memory(
+            ai_memory = eora_memory_system.build_memory_document(
                 content=ai_response,
                 memory_type="ai_response",
                 user_id=user_id,
@@ -872,8 +1147,11 @@ async def save_conversation_to_memory(user_message: str, ai_response: str, user_
                     "memory_id": memory_id
                 }
             )
+            await write_behind.insert(eora_memory_system.memories, ai_memory, eora_memory_system.record_rollups)
+            # 저장 배치가 반영된 뒤 이 사용자의 회상 캐시 무효화
+            await write_behind.call(bump_memory_generation, user_scope(user_id))
         
-        print(f"💾 대화 메모리 저장 완료: {user_id}")
+        print(f"💾 대화 메모리 저장 예약 완료: {user_id}")
         
     except Exception as e:
         print(f"⚠️ 메모리 저장 실패: {e}")
@@ -881,7 +1159,11 @@ async def save_conversation_to_memory(user_message: str, ai_response: str, user_
 # ==================== 학습 관련 헬퍼 함수 ====================
 
 async def extract_text_from_file(content: bytes, file_extension: str, filename: str) -> str:
-    """파일에서 텍스트를 추출합니다"""
+    """파일에서 텍스트를 추출합니다 (압축 해제/XML 파싱은 스레드에서 실행)"""
+    return await asyncio.to_thread(extract_text_from_bytes, content, file_extension, filename)
+
+def extract_text_from_bytes(content: bytes, file_extension: str, filename: str) -> str:
+    """파일에서 텍스트를 추출합니다 (동기 버전, 학습 작업자 스레드에서도 사용)"""
     try:
         if file_extension == '.txt':
             # 텍스트 파일
@@ -1013,39 +1295,7 @@ def split_text_into_chunks(text: str, chunk_size: int = 1000, overlap: int = 200
     """텍스트를 지정된 크기의 청크로 분할합니다"""
     if len(text) <= chunk_size:
         return [text]
-    
-    chunks = []
-    start = 0
-    
-    while start < len(text):
-        end = start + chunk_size
-        
-        # 문장이나 문단 경계에서 자르기 시도
-        if end < len(text):
-            # 문장 끝 찾기
-            for boundary in ['. ', '.\n', '? ', '! ', '.\t']:
-                boundary_pos = text.rfind(boundary, start, end)
-                if boundary_pos > start:
-                    end = boundary_pos + len(boundary)
-                    break
-            else:
-                # 단어 경계 찾기
-                space_pos = text.rfind(' ', start, end)
-                if space_pos > start:
-                    end = space_pos
-        
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        
-        # 다음 시작점 설정 (오버랩 고려)
-        start = max(start + 1, end - overlap)
-        
-        # 무한 루프 방지
-        if start >= len(text):
-            break
-    
-    return chunks
+    return list(iter_text_chunks([text], chunk_size, overlap))
 
 def parse_dialog_turns(dialog_text: str) -> List[Dict[str, str]]:
     """대화 텍스트를 턴별로 분석합니다"""
@@ -1115,33 +1365,6 @@ def parse_dialog_turns(dialog_text: str) -> List[Dict[str, str]]:
 
 # ==================== 유틸리티 함수 ====================
 
-def load_json_data(file_path, default=None):
-    """JSON 파일에서 데이터 로드"""
-    if default is None:
-        default = {}
-    
-    if os.path.exists(file_path):
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"⚠️ {file_path} 로드 오류: {e}")
-    return default
-
-def save_json_data(file_path, data):
-    """JSON 파일에 데이터 저장"""
-    try:
-        # 디렉토리가 없으면 생성
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"💾 {file_path} 저장 완료")
-        return True
-    except Exception as e:
-        print(f"❌ {file_path} 저장 오류: {e}")
-        return False
-
 def get_current_user(request: Request):
     """현재 로그인한 사용자 정보 조회"""
     # 쿠키에서 사용자 이메일 확인
@@ -1190,22 +1413,32 @@ def format_api_response(response_text: str, response_type: str = "chat"):
 # 관리자 계정 생성
 admin_password_hash = hashlib.sha256("admin123".encode()).hexdigest()
 
-users_db = load_json_data(USERS_FILE, {
-    "admin@eora.ai": {
-        "email": "admin@eora.ai",
-        "password": admin_password_hash,
-        "name": "관리자",
-        "role": "admin",
-        "is_admin": True,
-        "created_at": datetime.now().isoformat()
-    }
-})
+# 메모리 색인: 사용자 목록(가입 순), 사용자별 세션(생성 순), 포인트 계정(포인트 순) - 목록 API의 커서 페이지 조회용
+users_index = SortedGroupIndex(lambda user_data: ALL_GROUP, lambda user_data: user_data.get("created_at", ""))
+sessions_by_user = SortedGroupIndex(session_owner, session_sort_key)
+points_index = SortedGroupIndex(lambda points_info: ALL_GROUP, points_sort_key)
+
+with startup_profile.step("load json databases"):
+    users_db = open_state_map("users", USERS_FILE, {
+        "admin@eora.ai": {
+            "email": "admin@eora.ai",
+            "password": admin_password_hash,
+            "name": "관리자",
+            "role": "admin",
+            "is_admin": True,
+            "created_at": datetime.now().isoformat()
+        }
+    }, [users_index])
+
+    sessions_db = open_state_map("sessions", SESSIONS_FILE, {}, [sessions_by_user])
+    messages_db = open_state_map("messages", MESSAGES_FILE, {})
 
-sessions_db = load_json_data(SESSIONS_FILE, {})
-messages_db = load_json_data(MESSAGES_FILE, {})
+    # 관리자 포인트 초기화 (포인트 시스템이 있는 경우)
+    points_db = open_state_map("points", POINTS_FILE, {}, [points_index])
 
-# 관리자 포인트 초기화 (포인트 시스템이 있는 경우)
-points_db = load_json_data(POINTS_FILE, {})
+    # 공유 상태 모드: 학습 작업 진행 상황을 다른 워커에서도 조회할 수 있게 공유
+    if get_shared_state() is not None:
+        get_ingestion_job_manager().share_with(get_shared_state().open_map("ingestion_jobs", dict))
 
 # 관리자 계정에 충분한 포인트 할당 (항상 실행)
 admin_email = "admin@eora.ai"
@@ -1225,21 +1458,27 @@ points_db[admin_email] = {
 }
 print(f"👑 관리자 계정 포인트 강제 초기화: {admin_email} - 999,999,999 포인트")
 
-# MongoDB에도 관리자 포인트 강제 초기화
-if mongo_client and verify_connection() and db_mgr:
-    try:
-        # 항상 관리자 포인트를 재설정
-        db_mgr.initialize_user_points(admin_email, 999999999)
-        print(f"👑 MongoDB 관리자 포인트 강제 초기화 성공: {admin_email}")
-    except Exception as admin_init_error:
-        print(f"⚠️ MongoDB 관리자 포인트 초기화 실패: {admin_init_error}")
-        # 실패해도 로컬 DB는 업데이트됨
+def initialize_admin_points_in_mongodb():
+    """MongoDB에도 관리자 포인트 강제 초기화 (고급 시스템 초기화 후 호출)"""
+    if mongo_client and verify_connection() and db_mgr:
+        try:
+            # 항상 관리자 포인트를 재설정
+            db_mgr.initialize_user_points(admin_email, 999999999)
+            print(f"👑 MongoDB 관리자 포인트 강제 초기화 성공: {admin_email}")
+        except Exception as admin_init_error:
+            print(f"⚠️ MongoDB 관리자 포인트 초기화 실패: {admin_init_error}")
+            # 실패해도 로컬 DB는 업데이트됨
 
 # 초기 데이터 저장
-save_json_data(USERS_FILE, users_db)
-save_json_data(SESSIONS_FILE, sessions_db)
-save_json_data(MESSAGES_FILE, messages_db)
-save_json_data(POINTS_FILE, points_db)
+with startup_profile.step("save json databases"):
+    if isinstance(points_db, SharedStateMap):
+        # 공유 상태 모드: 시작 시 바뀐 관리자 포인트만 기록 (전체 저장은 다른 워커가 전체를 다시 읽게 함)
+        save_json_data(POINTS_FILE, points_db, admin_email)
+    else:
+        save_json_data(USERS_FILE, users_db)
+        save_json_data(SESSIONS_FILE, sessions_db)
+        save_json_data(MESSAGES_FILE, messages_db)
+        save_json_data(POINTS_FILE, points_db)
 
 print(f"📂 데이터 로딩 완료:")
 print(f"   - 사용자 수: {len(users_db)}")
@@ -1506,7 +1745,7 @@ async def auth_register(request: Request):
         
         # 사용자 정보 저장 (이메일을 키로 사용)
         users_db[email] = user_data
-        save_json_data(USERS_FILE, users_db)
+        save_json_data(USERS_FILE, users_db, email)
         
         # 포인트 시스템 초기화 (100,000 포인트 지급)
         initial_points = 100000
@@ -1542,7 +1781,7 @@ async def auth_register(request: Request):
         }
         
         # 포인트 데이터 저장
-        save_json_data(POINTS_FILE, points_db)
+        save_json_data(POINTS_FILE, points_db, email)
         
         # 개별 사용자 세션 저장소 초기화
         user_sessions_key = f"sessions_{user_id}"
@@ -1683,24 +1922,32 @@ async def get_sessions(request: Request):
             content={"success": False, "error": "로그인이 필요합니다."}
         )
     
-    # 사용자의 세션만 필터링
-    user_sessions = []
-    for session_id, session in sessions_db.items():
-        if session.get("user_email") == user["email"]:
-            # 메시지 수 계산
-            message_count = len(messages_db.get(session_id, []))
-            session_data = session.copy()
-            session_data["message_count"] = message_count
-            user_sessions.append(session_data)
+    # 사용자별 세션 색인에서 최신순 한 페이지 조회 (?limit=50&cursor=<next_cursor>)
+    limit = page_size(request.query_params.get("limit"))
+    cursor = request.query_params.get("cursor")
+    try:
+        session_ids, next_cursor = sessions_by_user.page(user["email"], limit, cursor)
+    except ValueError:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": "잘못된 커서입니다."}
+        )
     
-    # 최신 순으로 정렬
-    user_sessions.sort(key=lambda x: x.get("created_at", ""), reverse=True)
+    user_sessions = []
+    for session_id in session_ids:
+        # 메시지 수는 세션 메시지 목록 길이 (O(1))
+        session_data = sessions_db[session_id].copy()
+        session_data["message_count"] = len(messages_db.get(session_id, []))
+        user_sessions.append(session_data)
     
-    print(f"📂 {user['email']}의 세션: {len(user_sessions)}개")
+    total = sessions_by_user.count(user["email"])
+    print(f"📂 {user['email']}의 세션: {len(user_sessions)}/{total}개")
     
     return JSONResponse({
         "success": True,
-        "sessions": user_sessions
+        "sessions": user_sessions,
+        "next_cursor": next_cursor,
+        "total": total
     })
 
 @app.post("/api/sessions")
@@ -1756,8 +2003,8 @@ async def create_session(request: Request):
         messages_db[session_id] = []
         
         # JSON 파일 저장
-        save_json_data(SESSIONS_FILE, sessions_db)
-        save_json_data(MESSAGES_FILE, messages_db)
+        save_json_data(SESSIONS_FILE, sessions_db, session_id)
+        save_json_data(MESSAGES_FILE, messages_db, session_id)
         
         print(f"🆕 새 세션 생성 완료: {user['email']} -> {session_id}")
         
@@ -1818,8 +2065,8 @@ async def delete_session(session_id: str, request: Request):
         del messages_db[session_id]
     
     # 저장
-    save_json_data(SESSIONS_FILE, sessions_db)
-    save_json_data(MESSAGES_FILE, messages_db)
+    save_json_data(SESSIONS_FILE, sessions_db, session_id)
+    save_json_data(MESSAGES_FILE, messages_db, session_id)
     
     print(f"🗑️ 세션 삭제: {user['email']} -> {session_id}")
     
@@ -1838,6 +2085,7 @@ async def get_messages(session_id: str, request: Request):
         )
     
     # 세션이 없으면 빈 메시지 반환
+    await prefetch_session_state(session_id)
     if session_id not in sessions_db:
         print(f"⚠️ 세션이 없음: {session_id}")
         return JSONResponse({
@@ -1885,6 +2133,7 @@ async def save_message(request: Request):
             )
         
         # 세션이 없으면 자동 생성
+        await prefetch_session_state(session_id)
         if session_id not in sessions_db:
             sessions_db[session_id] = {
                 "id": session_id,
@@ -1919,8 +2168,8 @@ async def save_message(request: Request):
         sessions_db[session_id]["message_count"] = len(messages_db[session_id])
         
         # 저장
-        save_json_data(MESSAGES_FILE, messages_db)
-        save_json_data(SESSIONS_FILE, sessions_db)
+        append_json_data(MESSAGES_FILE, messages_db, session_id, message)
+        save_json_data(SESSIONS_FILE, sessions_db, session_id)
         
         print(f"💾 메시지 저장: {session_id} -> {role} ({len(content)}자)")
         
@@ -1938,411 +2187,489 @@ async def save_message(request: Request):
 
 # ==================== 채팅 API ====================
 
-@app.post("/api/chat")
-@performance_monitor
-async def chat(request: Request):
-    """채팅 응답 생성 - MongoDB 장기 저장 포함"""
-    user = get_current_user(request)
-    if not user:
-        return JSONResponse(
-            status_code=401,
-            content={"success": False, "error": "로그인이 필요합니다."}
-        )
+def openai_unavailable_response() -> JSONResponse:
+    """OpenAI API를 사용할 수 없을 때의 응답 (자동응답 완전 차단)"""
+    error_msg = "OpenAI API가 사용 불가능합니다."
+    if detect_railway_environment():
+        error_msg += " Railway Variables에서 OPENAI_API_KEY를 설정해주세요."
+    else:
+        error_msg += " .env 파일에서 OPENAI_API_KEY를 설정해주세요."
     
-    try:
-        # OpenAI API 사용 가능성 체크 (자동응답 완전 차단)
-        if not OPENAI_AVAILABLE or not openai_client:
-            error_msg = "OpenAI API가 사용 불가능합니다."
-            if detect_railway_environment():
-                error_msg += " Railway Variables에서 OPENAI_API_KEY를 설정해주세요."
-            else:
-                error_msg += " .env 파일에서 OPENAI_API_KEY를 설정해주세요."
-            
-            return JSONResponse(
-                status_code=503,
-                content={
-                    "success": False, 
-                    "error": error_msg,
-                    "need_api_key": True
-                }
-            )
-        
-        data = await request.json()
-        session_id = data.get("session_id")
-        message = data.get("message")
-        
-        if not session_id or not message:
-            return JSONResponse(
-                status_code=400,
-                content={"success": False, "error": "세션 ID와 메시지가 필요합니다."}
-            )
-        
-        # 세션이 없으면 자동 생성 (MongoDB 우선)
-        if session_id not in sessions_db:
-            new_session = {
-                "id": session_id,
-                "session_id": session_id,
-                "user_id": user["email"],
-                "user_email": user["email"],
-                "name": f"대화 {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
-                "message_count": 0
-            }
-            
-            # MongoDB에 세션 저장
-            if mongo_client and verify_connection() and db_mgr:
-                try:
-                    db_mgr.create_session(user["email"], new_session["name"])
-                    print(f"🆕 MongoDB에 새 세션 생성: {session_id}")
-                except Exception as create_error:
-                    print(f"⚠️ MongoDB 세션 생성 실패: {create_error}")
-            
-            # 메모리에도 저장 (호환성)
-            sessions_db[session_id] = new_session
-            messages_db[session_id] = []
-            save_json_data(SESSIONS_FILE, sessions_db)
-            print(f"🆕 채팅 시 새 세션 자동 생성: {session_id}")
-        
-        # 사용자 메시지 준비
-        user_message = {
-            "role": "user",
-            "content": message,
-            "timestamp": datetime.now().isoformat()
+    return JSONResponse(
+        status_code=503,
+        content={
+            "success": False, 
+            "error": error_msg,
+            "need_api_key": True
+        }
+    )
+
+async def prepare_chat_turn(user: Dict, session_id: str, message: str) -> Dict[str, Any]:
+    """
+    채팅 턴 준비 - 세션 자동 생성, 사용자 메시지 기록, 포인트 사전 확인
+    
+    Returns:
+        실패 시 {"error_response": JSONResponse}, 성공 시 턴 컨텍스트
+    """
+    # 백그라운드 초기화 중이면 MongoDB 연결(세션 생성·포인트 확인)이 준비될 때까지 대기
+    await wait_for_advanced_systems()
+
+    # 세션이 없으면 자동 생성 (MongoDB 우선)
+    await prefetch_session_state(session_id)
+    if session_id not in sessions_db:
+        new_session = {
+            "id": session_id,
+            "session_id": session_id,
+            "user_id": user["email"],
+            "user_email": user["email"],
+            "name": f"대화 {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+            "created_at": datetime.now().isoformat(),
+            "updated_at": datetime.now().isoformat(),
+            "message_count": 0
         }
         
-        # 메모리에 임시 저장 (호환성)
-        if session_id not in messages_db:
-            messages_db[session_id] = []
-        messages_db[session_id].append(user_message)
-        
-        # ===== 포인트 확인 및 사전 차감 =====
-        is_admin = user.get("is_admin", False) or user.get("role") == "admin"
-        points_deducted = 0
+        # MongoDB에 세션 저장
+        if mongo_client and verify_connection() and db_mgr:
+            try:
+                await async_db_mgr.create_session(user["email"], new_session["name"])
+                print(f"🆕 MongoDB에 새 세션 생성: {session_id}")
+            except Exception as create_error:
+                print(f"⚠️ MongoDB 세션 생성 실패: {create_error}")
         
-        print(f"🔍 사용자 권한 확인: {user['email']} - is_admin: {is_admin}")
+        # 메모리에도 저장 (호환성)
+        sessions_db[session_id] = new_session
+        messages_db[session_id] = []
+        save_json_data(SESSIONS_FILE, sessions_db, session_id)
+        save_json_data(MESSAGES_FILE, messages_db, session_id)
+        print(f"🆕 채팅 시 새 세션 자동 생성: {session_id}")
+    
+    # 사용자 메시지 준비
+    user_message = {
+        "role": "user",
+        "content": message,
+        "timestamp": datetime.now().isoformat(),
+        TOKEN_COUNT_FIELD: count_text_tokens(message)
+    }
+    
+    # 메모리에 임시 저장 (호환성)
+    if session_id not in messages_db:
+        messages_db[session_id] = []
+    messages_db[session_id].append(user_message)
+    
+    # ===== 포인트 확인 및 사전 차감 =====
+    is_admin = user.get("is_admin", False) or user.get("role") == "admin"
+    points_system_available = False
+    
+    print(f"🔍 사용자 권한 확인: {user['email']} - is_admin: {is_admin}")
+    
+    if not is_admin:  # 관리자는 포인트 제한 없음
+        current_points = 0
+        new_user_bonus_given = False
         
-        if not is_admin:  # 관리자는 포인트 제한 없음
-            current_points = 0
-            points_system_available = False
-            new_user_bonus_given = False
-            
-            # MongoDB 포인트 시스템 확인
-            if mongo_client and verify_connection() and db_mgr:
-                try:
-                    current_points = db_mgr.get_user_points(user["email"])
-                    points_system_available = True
-                    print(f"💰 MongoDB 포인트 조회 성공: {user['email']} - {current_points:,}포인트")
-                    
-                    # 신규 사용자 (포인트가 없는 경우) 기본 포인트 지급
-                    if current_points == 0:
-                        print(f"🆕 신규 사용자 감지: {user['email']}")
-                        try:
-                            welcome_points = 50000  # 신규 사용자 5만 포인트
-                            success = db_mgr.initialize_user_points(user["email"], welcome_points)
-                            if success:
-                                current_points = welcome_points
-                                new_user_bonus_given = True
-                                print(f"🎁 신규 사용자 웰컴 포인트 지급: {user['email']} - {welcome_points:,}포인트")
-                            else:
-                                print(f"❌ 신규 사용자 포인트 지급 실패: {user['email']}")
-                        except Exception as welcome_error:
-                            print(f"⚠️ 웰컴 포인트 지급 오류: {welcome_error}")
-                            
-                except Exception as db_error:
-                    print(f"❌ MongoDB 포인트 조회 실패: {db_error}")
-                    # MongoDB 연결 실패 시 서비스 불가
-                    return JSONResponse(
-                        status_code=503,  # Service Unavailable
-                        content={
-                            "success": False,
-                            "error": "포인트 시스템 일시 장애입니다. 잠시 후 다시 시도해주세요.",
-                            "service_unavailable": True,
-                            "retry_after": "몇 분 후"
-                        }
-                    )
-            else:
+        # MongoDB 포인트 시스템 확인
+        if mongo_client and verify_connection() and db_mgr:
+            try:
+                current_points = await async_db_mgr.get_user_points(user["email"])
+                points_system_available = True
+                print(f"💰 MongoDB 포인트 조회 성공: {user['email']} - {current_points:,}포인트")
+                
+                # 신규 사용자 (포인트가 없는 경우) 기본 포인트 지급
+                if current_points == 0:
+                    print(f"🆕 신규 사용자 감지: {user['email']}")
+                    try:
+                        welcome_points = 50000  # 신규 사용자 5만 포인트
+                        success = await async_db_mgr.initialize_user_points(user["email"], welcome_points)
+                        if success:
+                            current_points = welcome_points
+                            new_user_bonus_given = True
+                            print(f"🎁 신규 사용자 웰컴 포인트 지급: {user['email']} - {welcome_points:,}포인트")
+                        else:
+                            print(f"❌ 신규 사용자 포인트 지급 실패: {user['email']}")
+                    except Exception as welcome_error:
+                        print(f"⚠️ 웰컴 포인트 지급 오류: {welcome_error}")
+                        
+            except Exception as db_error:
+                print(f"❌ MongoDB 포인트 조회 실패: {db_error}")
                 # MongoDB 연결 실패 시 서비스 불가
-                print("❌ MongoDB 연결 실패 - 포인트 시스템 사용 불가")
-                return JSONResponse(
+                return {"error_response": JSONResponse(
                     status_code=503,  # Service Unavailable
                     content={
                         "success": False,
-                        "error": "포인트 시스템이 일시적으로 사용할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                        "error": "포인트 시스템 일시 장애입니다. 잠시 후 다시 시도해주세요.",
                         "service_unavailable": True,
-                        "need_api_key": False,
                         "retry_after": "몇 분 후"
                     }
-                )
+                )}
+        else:
+            # MongoDB 연결 실패 시 서비스 불가
+            print("❌ MongoDB 연결 실패 - 포인트 시스템 사용 불가")
+            return {"error_response": JSONResponse(
+                status_code=503,  # Service Unavailable
+                content={
+                    "success": False,
+                    "error": "포인트 시스템이 일시적으로 사용할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                    "service_unavailable": True,
+                    "need_api_key": False,
+                    "retry_after": "몇 분 후"
+                }
+            )}
+        
+        # 포인트 부족 검사 (엄격한 정책)
+        if current_points <= 0:
+            return {"error_response": JSONResponse(
+                status_code=402,  # Payment Required
+                content={
+                    "success": False,
+                    "error": "포인트가 모두 소진되었습니다.",
+                    "message": "채팅을 계속하려면 포인트를 충전해주세요.",
+                    "current_points": current_points,
+                    "required_points": 10,
+                    "point_exhausted": True,
+                    "charging_guide": "상단 메뉴의 '포인트' 페이지에서 충전 가능합니다."
+                }
+            )}
+        
+        # 추정 토큰 비용 확인
+        if TOKEN_CALCULATOR_AVAILABLE:
+            token_calc = get_token_calculator("gpt-4o")
+            estimated_usage = token_calc.estimate_tokens_before_request(message)
+            estimated_cost = token_calc.calculate_points_cost(estimated_usage)
             
-            # 포인트 부족 검사 (엄격한 정책)
-            if current_points <= 0:
-                return JSONResponse(
+            if current_points < estimated_cost:
+                return {"error_response": JSONResponse(
                     status_code=402,  # Payment Required
                     content={
                         "success": False,
-                        "error": "포인트가 모두 소진되었습니다.",
-                        "message": "채팅을 계속하려면 포인트를 충전해주세요.",
+                        "error": f"포인트가 부족합니다.",
+                        "message": f"이 메시지 처리에 약 {estimated_cost:,}포인트가 필요하지만, 현재 {current_points:,}포인트만 보유하고 있습니다.",
                         "current_points": current_points,
-                        "required_points": 10,
-                        "point_exhausted": True,
-                        "charging_guide": "상단 메뉴의 '포인트' 페이지에서 충전 가능합니다."
+                        "required_points": estimated_cost,
+                        "insufficient_points": True,
+                        "charging_guide": "상단 메뉴의 '포인트' 페이지에서 충전하거나, 더 짧은 메시지를 보내보세요."
                     }
-                )
-            
-            # 추정 토큰 비용 확인
-            if TOKEN_CALCULATOR_AVAILABLE:
-                token_calc = get_token_calculator("gpt-4o")
-                estimated_usage = token_calc.estimate_tokens_before_request(message)
-                estimated_cost = token_calc.calculate_points_cost(estimated_usage)
-                
-                if current_points < estimated_cost:
-                    return JSONResponse(
-                        status_code=402,  # Payment Required
-                        content={
-                            "success": False,
-                            "error": f"포인트가 부족합니다.",
-                            "message": f"이 메시지 처리에 약 {estimated_cost:,}포인트가 필요하지만, 현재 {current_points:,}포인트만 보유하고 있습니다.",
-                            "current_points": current_points,
-                            "required_points": estimated_cost,
-                            "insufficient_points": True,
-                            "charging_guide": "상단 메뉴의 '포인트' 페이지에서 충전하거나, 더 짧은 메시지를 보내보세요."
-                        }
-                    )
-                
-                print(f"💰 포인트 충분: {user['email']} - 현재: {current_points:,}, 예상 차감: {estimated_cost:,}")
-            else:
-                # 토큰 계산기 없는 경우 기본 10포인트 확인
-                if current_points < 10:
-                    return JSONResponse(
-                        status_code=402,  # Payment Required
-                        content={
-                            "success": False,
-                            "error": "포인트가 부족합니다.",
-                            "message": f"채팅을 위해 최소 10포인트가 필요하지만, 현재 {current_points:,}포인트만 보유하고 있습니다.",
-                            "current_points": current_points,
-                            "required_points": 10,
-                            "insufficient_points": True,
-                            "charging_guide": "상단 메뉴의 '포인트' 페이지에서 충전해주세요."
-                        }
-                    )
-                    
-                print(f"💰 기본 포인트 확인 통과: {user['email']} - {current_points:,}포인트")
+                )}
             
-            # 신규 사용자 환영 메시지
-            if new_user_bonus_given:
-                print(f"🎉 신규 사용자 환영: {user['email']} - 5만 포인트 지급 완료")
+            print(f"💰 포인트 충분: {user['email']} - 현재: {current_points:,}, 예상 차감: {estimated_cost:,}")
         else:
-            # 관리자인 경우 로그 출력
-            print(f"👑 관리자 사용: {user['email']} - 포인트 제한 없음")
+            # 토큰 계산기 없는 경우 기본 10포인트 확인
+            if current_points < 10:
+                return {"error_response": JSONResponse(
+                    status_code=402,  # Payment Required
+                    content={
+                        "success": False,
+                        "error": "포인트가 부족합니다.",
+                        "message": f"채팅을 위해 최소 10포인트가 필요하지만, 현재 {current_points:,}포인트만 보유하고 있습니다.",
+                        "current_points": current_points,
+                        "required_points": 10,
+                        "insufficient_points": True,
+                        "charging_guide": "상단 메뉴의 '포인트' 페이지에서 충전해주세요."
+                    }
+                )}
+                
+            print(f"💰 기본 포인트 확인 통과: {user['email']} - {current_points:,}포인트")
         
-        # AI 응답 생성 - 토큰 정보 수집을 위해 직접 OpenAI 호출
+        # 신규 사용자 환영 메시지
+        if new_user_bonus_given:
+            print(f"🎉 신규 사용자 환영: {user['email']} - 5만 포인트 지급 완료")
+    else:
+        # 관리자인 경우 로그 출력
+        print(f"👑 관리자 사용: {user['email']} - 포인트 제한 없음")
+    
+    return {
+        "is_admin": is_admin,
+        "points_system_available": points_system_available,
+        "user_message": user_message
+    }
+
+async def recall_for_chat(user: Dict, message: str) -> List[Dict]:
+    """EORA 8종 회상 시스템으로 응답에 사용할 기억을 회상합니다"""
+    recalled_memories = []
+    if await wait_for_advanced_systems() and eora_memory_system:
         try:
-            # EORA 회상 시스템 활용
-            recalled_memories = []
-            if ADVANCED_FEATURES_AVAILABLE and eora_memory_system:
-                try:
-                    print("🧠 EORA 8종 회상 시스템 시작...")
-                    recalled_memories = await eora_memory_system.enhanced_recall(
-                        query=message,
-                        user_id=user["email"],
-                        limit=5
-                    )
-                    print(f"🧠 8종 회상 시스템 결과: {len(recalled_memories)}개 기억 회상")
-                    
-                    # 회상된 내용 상세 로그 (디버깅용)
-                    shared_count = sum(1 for m in recalled_memories if m.get("is_shared", False))
-                    personal_count = len(recalled_memories) - shared_count
-                    print(f"   📚 공유 학습 내용: {shared_count}개")
-                    print(f"   👤 개인 대화 기록: {personal_count}개")
-                    
-                    for i, memory in enumerate(recalled_memories[:3]):  # 처음 3개만 표시
-                        content_preview = memory.get("content", "")[:50].replace("\n", " ") + "..."
-                        memory_type = "공유학습" if memory.get("is_shared", False) else "개인대화"
-                        print(f"   {i+1}. [{memory_type}] {content_preview}")
-                except Exception as recall_error:
-                    print(f"⚠️ 회상 시스템 오류: {recall_error}")
-            
-            # 토큰 정보를 얻기 위해 generate_openai_response 직접 호출
-            response_result = await generate_openai_response(
-                message=message,
-                history=messages_db.get(session_id, []),
-                memories=recalled_memories
+            print("🧠 EORA 8종 회상 시스템 시작...")
+            recalled_memories = await eora_memory_system.enhanced_recall(
+                query=message,
+                user_id=user["email"],
+                limit=5
             )
+            print(f"🧠 8종 회상 시스템 결과: {len(recalled_memories)}개 기억 회상")
             
-            ai_response = response_result.get("response", "")
-            token_usage = response_result.get("token_usage")
+            # 회상된 내용 상세 로그 (디버깅용)
+            shared_count = sum(1 for m in recalled_memories if m.get("is_shared", False))
+            personal_count = len(recalled_memories) - shared_count
+            print(f"   📚 공유 학습 내용: {shared_count}개")
+            print(f"   👤 개인 대화 기록: {personal_count}개")
             
-        except Exception as response_error:
-            print(f"❌ AI 응답 생성 오류: {response_error}")
-            ai_response = f"응답 생성 중 오류가 발생했습니다: {str(response_error)}"
-            token_usage = None
-        
-        # AI 응답 메시지 준비
-        ai_message = {
-            "role": "assistant",
-            "content": ai_response,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        # 메모리에 AI 응답 저장 (호환성)
-        messages_db[session_id].append(ai_message)
-        
-        # ===== 포인트 차감 처리 (엄격한 정책) =====
-        if not is_admin:
-            if token_usage and points_system_available and db_mgr:
-                try:
-                    if TOKEN_CALCULATOR_AVAILABLE:
-                        token_calc = get_token_calculator("gpt-4o")
-                        points_cost = token_calc.calculate_points_cost(token_usage)
-                        
-                        print(f"💰 포인트 차감 시도: {user['email']} - {points_cost:,}포인트 (토큰: {token_usage.get('total_tokens', 0)})")
-                        
-                        # 포인트 차감 실행
-                        success = db_mgr.deduct_points(
-                            user["email"], 
-                            points_cost, 
-                            f"GPT 채팅 사용 (토큰: {token_usage.get('total_tokens', 0)})"
-                        )
+            for i, memory in enumerate(recalled_memories[:3]):  # 처음 3개만 표시
+                content_preview = memory.get("content", "")[:50].replace("\n", " ") + "..."
+                memory_type = "공유학습" if memory.get("is_shared", False) else "개인대화"
+                print(f"   {i+1}. [{memory_type}] {content_preview}")
+        except Exception as recall_error:
+            print(f"⚠️ 회상 시스템 오류: {recall_error}")
+    return recalled_memories
+
+async def finalize_chat_turn(user: Dict, session_id: str, message: str, ai_response: str,
+                             token_usage: Optional[Dict[str, int]], turn: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    채팅 턴 마무리 - AI 응답 기록, 포인트 차감, MongoDB/메모리/JSON 저장
+    
+    포인트 차감만 응답 전에 완료하고, MongoDB/메모리 저장은 write-behind 큐에 등록합니다.
+    
+    Returns:
+        {"points_deducted": int, "current_points": int}
+    """
+    is_admin = turn["is_admin"]
+    points_system_available = turn["points_system_available"]
+    points_deducted = 0
+    
+    # AI 응답 메시지 준비
+    ai_message = {
+        "role": "assistant",
+        "content": ai_response,
+        "timestamp": datetime.now().isoformat(),
+        # 응답 토큰 수는 API usage의 completion_tokens를 그대로 사용
+        TOKEN_COUNT_FIELD: (token_usage or {}).get("completion_tokens") or count_text_tokens(ai_response)
+    }
+    
+    # 메모리에 AI 응답 저장 (호환성)
+    messages_db[session_id].append(ai_message)
+    
+    # ===== 포인트 차감 처리 (엄격한 정책) =====
+    points_started = time.perf_counter()
+    remaining_points = None
+    if not is_admin:
+        if token_usage and points_system_available and db_mgr:
+            try:
+                if TOKEN_CALCULATOR_AVAILABLE:
+                    token_calc = get_token_calculator("gpt-4o")
+                    points_cost = token_calc.calculate_points_cost(token_usage)
+                    
+                    print(f"💰 포인트 차감 시도: {user['email']} - {points_cost:,}포인트 (토큰: {token_usage.get('total_tokens', 0)})")
+                    
+                    # 포인트 차감 실행 (조건부 원자적 차감, 차감 후 잔액 반환)
+                    remaining_points = await async_db_mgr.try_deduct_points(
+                        user["email"], 
+                        points_cost, 
+                        f"GPT 채팅 사용 (토큰: {token_usage.get('total_tokens', 0)})"
+                    )
+                    
+                    if remaining_points is not None:
+                        points_deducted = points_cost
+                        print(f"✅ 포인트 차감 성공: {user['email']} -{points_cost:,}포인트")
+                        print(f"💰 차감 후 잔액: {user['email']} - {remaining_points:,}포인트")
                         
-                        if success:
-                            points_deducted = points_cost
-                            print(f"✅ 포인트 차감 성공: {user['email']} -{points_cost:,}포인트")
-                            
-                            # 차감 후 잔액 확인
-                            try:
-                                remaining_points = db_mgr.get_user_points(user["email"])
-                                print(f"💰 차감 후 잔액: {user['email']} - {remaining_points:,}포인트")
-                                
-                                # 잔액이 적으면 경고
-                                if remaining_points < 1000:
-                                    print(f"⚠️ 포인트 부족 경고: {user['email']} - 잔액 {remaining_points:,}포인트")
-                                    
-                            except Exception as balance_error:
-                                print(f"⚠️ 잔액 확인 실패: {balance_error}")
-                        else:
-                            print(f"❌ 포인트 차감 실패: {user['email']} - DB 업데이트 오류")
-                            points_deducted = 0
+                        # 잔액이 적으면 경고
+                        if remaining_points < 1000:
+                            print(f"⚠️ 포인트 부족 경고: {user['email']} - 잔액 {remaining_points:,}포인트")
+                    else:
+                        print(f"❌ 포인트 차감 실패: {user['email']} - DB 업데이트 오류")
+                        points_deducted = 0
+                else:
+                    # 토큰 계산기 없는 경우 기본 1포인트 차감
+                    print(f"💰 기본 포인트 차감 시도: {user['email']} - 1포인트")
+                    remaining_points = await async_db_mgr.try_deduct_points(
+                        user["email"], 
+                        1, 
+                        "GPT 채팅 사용 (기본 차감)"
+                    )
+                    
+                    if remaining_points is not None:
+                        points_deducted = 1
+                        print(f"✅ 기본 포인트 차감 성공: {user['email']} -1포인트")
                     else:
-                        # 토큰 계산기 없는 경우 기본 1포인트 차감
-                        print(f"💰 기본 포인트 차감 시도: {user['email']} - 1포인트")
-                        success = db_mgr.deduct_points(
-                            user["email"], 
-                            1, 
-                            "GPT 채팅 사용 (기본 차감)"
-                        )
+                        print(f"❌ 기본 포인트 차감 실패: {user['email']}")
+                        points_deducted = 0
                         
-                        if success:
-                            points_deducted = 1
-                            print(f"✅ 기본 포인트 차감 성공: {user['email']} -1포인트")
-                        else:
-                            print(f"❌ 기본 포인트 차감 실패: {user['email']}")
-                            points_deducted = 0
-                            
-                except Exception as points_error:
-                    print(f"❌ 포인트 처리 오류: {points_error}")
-                    points_deducted = 0
-            else:
-                print(f"⚠️ 포인트 시스템 사용 불가: {user['email']} - 차감 건너뜀")
+            except Exception as points_error:
+                print(f"❌ 포인트 처리 오류: {points_error}")
                 points_deducted = 0
-        
-        # ===== MongoDB에 장기 저장 =====
+        else:
+            print(f"⚠️ 포인트 시스템 사용 불가: {user['email']} - 차감 건너뜀")
+            points_deducted = 0
+    record_stage("points_deduction", time.perf_counter() - points_started)
+    
+    # 세션의 메시지 카운트 업데이트
+    sessions_db[session_id]["message_count"] = len(messages_db[session_id])
+    
+    session_updates = {
+        "updated_at": datetime.now().isoformat(),
+        "last_activity": datetime.now().isoformat(),
+        "last_message": message[:50] + "..." if len(message) > 50 else message
+    }
+    
+    # 첫 번째 메시지인 경우 세션 제목을 사용자 메시지로 설정
+    current_message_count = len(messages_db[session_id])
+    if current_message_count == 2:  # 사용자 메시지 + AI 응답 = 2개일 때가 첫 대화
+        # 사용자 메시지를 세션 제목으로 설정 (최대 50자)
+        new_title = message[:50] + "..." if len(message) > 50 else message
+        sessions_db[session_id]["name"] = new_title
+        session_updates["session_name"] = new_title
+        session_updates["name"] = new_title
+        print(f"📝 세션 제목 업데이트: {session_id} -> '{new_title}'")
+    
+    # ===== MongoDB에 장기 저장 (write-behind 큐, 응답 후 일괄 기록) =====
+    persistence_started = time.perf_counter()
+    try:
+        if mongo_client and verify_connection() and db_mgr and db_mgr.is_connected():
+            write_behind = get_write_behind_queue()
+            # 사용자 메시지와 AI 응답을 MongoDB에 저장
+            await write_behind.insert(
+                db_mgr.chat_logs_collection,
+                db_mgr.build_message_document(session_id, message, ai_response, user["email"])
+            )
+            # 세션 업데이트 (제목 변경 포함 한 번에)
+            await write_behind.update(
+                db_mgr.sessions_collection,
+                {"session_id": session_id},
+                {"$set": session_updates}
+            )
+        else:
+            print("⚠️ MongoDB 연결 없음 - JSON 파일로만 저장")
+    except Exception as mongo_error:
+        print(f"⚠️ MongoDB 저장 실패: {mongo_error}")
+    
+    # EORA 메모리 시스템에 대화 저장 (학습 및 회상용)
+    await save_conversation_to_memory(
+        user_message=message,
+        ai_response=ai_response,
+        user_id=user["email"],
+        session_id=session_id
+    )
+    
+    # JSON 파일 저장 (호환성 및 백업)
+    append_json_data(MESSAGES_FILE, messages_db, session_id, turn["user_message"])
+    append_json_data(MESSAGES_FILE, messages_db, session_id, ai_message)
+    save_json_data(SESSIONS_FILE, sessions_db, session_id)
+    record_stage("persistence", time.perf_counter() - persistence_started)
+    
+    print(f"💬 채팅: {session_id} -> {len(messages_db[session_id])}개 메시지")
+    
+    # 현재 포인트 조회 (응답에 포함, 차감 시 받은 잔액이 있으면 재조회하지 않음)
+    current_points = 0
+    if remaining_points is not None:
+        current_points = remaining_points
+    elif mongo_client and verify_connection() and db_mgr:
         try:
-            if mongo_client and verify_connection() and db_mgr:
-                # 사용자 메시지와 AI 응답을 MongoDB에 저장
-                db_mgr.save_message(session_id, message, ai_response, user["email"])
-                print(f"✅ MongoDB에 대화 저장 완료: {session_id}")
-                
-                # 세션 업데이트
-                db_mgr.update_session(session_id, {
-                    "updated_at": datetime.now().isoformat(),
-                    "last_activity": datetime.now().isoformat(),
-                    "last_message": message[:50] + "..." if len(message) > 50 else message
-                })
-            else:
-                print("⚠️ MongoDB 연결 없음 - JSON 파일로만 저장")
-        except Exception as mongo_error:
-            print(f"⚠️ MongoDB 저장 실패: {mongo_error}")
-        
-        # EORA 메모리 시스템에 대화 저장 (학습 및 회상용)
-        await save_conversation_to_memory(
-            user_message=message,
-            ai_response=ai_response,
-            user_id=user["email"],
-            session_id=session_id
-        )
-        
-        # 세션의 메시지 카운트 업데이트
-        sessions_db[session_id]["message_count"] = len(messages_db[session_id])
+            current_points = await async_db_mgr.get_user_points(user["email"])
+        except Exception:
+            pass
+    
+    return {"points_deducted": points_deducted, "current_points": current_points}
+
+def build_chat_response_data(ai_response: str, session_id: str, points_result: Dict[str, Any],
+                             token_usage: Optional[Dict[str, int]], is_admin: bool) -> Dict[str, Any]:
+    """마크다운 처리된 채팅 응답 데이터를 구성합니다"""
+    try:
+        formatted_response = format_api_response(ai_response, "chat")
+        response_data = {
+            "success": True,
+            "response": ai_response,
+            "formatted_response": formatted_response["formatted_content"],
+            "has_markdown": formatted_response["has_markdown"],
+            "session_id": session_id,
+            "metadata": formatted_response["metadata"],
+            "points_info": {
+                "points_deducted": points_result["points_deducted"],
+                "current_points": points_result["current_points"],
+                "token_usage": token_usage
+            }
+        }
         
-        # 첫 번째 메시지인 경우 세션 제목을 사용자 메시지로 설정
-        current_message_count = len(messages_db[session_id])
-        if current_message_count == 2:  # 사용자 메시지 + AI 응답 = 2개일 때가 첫 대화
-            # 사용자 메시지를 세션 제목으로 설정 (최대 50자)
-            new_title = message[:50] + "..." if len(message) > 50 else message
-            sessions_db[session_id]["name"] = new_title
+        # 관리자가 아닌 경우만 포인트 정보 포함
+        if is_admin:
+            response_data["points_info"]["is_admin"] = True
             
-            # MongoDB에도 세션 제목 업데이트
-            try:
-                if mongo_client and verify_connection() and db_mgr:
-                    db_mgr.update_session(session_id, {
-                        "session_name": new_title,
-                        "name": new_title,
-                        "updated_at": datetime.now().isoformat()
-                    })
-                    print(f"📝 세션 제목 업데이트: {session_id} -> '{new_title}'")
-            except Exception as title_error:
-                print(f"⚠️ 세션 제목 업데이트 실패: {title_error}")
+        return response_data
+    except Exception as markdown_error:
+        print(f"⚠️ 마크다운 처리 실패: {markdown_error}")
+        return {
+            "success": True,
+            "response": ai_response,
+            "session_id": session_id,
+            "points_info": {
+                "points_deducted": points_result["points_deducted"],
+                "current_points": points_result["current_points"],
+                "token_usage": token_usage,
+                "is_admin": is_admin
+            }
+        }
+
+def timings_requested(request: Request) -> bool:
+    """?timings=1 또는 X-EORA-Timings: 1 헤더로 단계별 소요 시간 분해를 요청했는지"""
+    return request.query_params.get("timings") == "1" or request.headers.get("x-eora-timings") == "1"
+
+@app.post("/api/chat")
+@performance_monitor
+async def chat(request: Request):
+    """채팅 응답 생성 - MongoDB 장기 저장 포함 (요청 시 단계별 소요 시간 포함)"""
+    want_timings = timings_requested(request)
+    trace = begin_request_trace("chat", force=want_timings)
+    try:
+        return await handle_chat(request, trace if want_timings else None)
+    finally:
+        end_request_trace(trace)
+
+async def handle_chat(request: Request, trace=None):
+    """채팅 요청 처리 (trace가 있고 관리자이면 응답에 단계별 소요 시간을 붙임)"""
+    with stage("auth"):
+        user = get_current_user(request)
+    if not user:
+        return JSONResponse(
+            status_code=401,
+            content={"success": False, "error": "로그인이 필요합니다."}
+        )
+    
+    try:
+        # OpenAI API 사용 가능성 체크 (자동응답 완전 차단)
+        if not OPENAI_AVAILABLE or not openai_client:
+            return openai_unavailable_response()
         
-        # JSON 파일 저장 (호환성 및 백업)
-        save_json_data(MESSAGES_FILE, messages_db)
-        save_json_data(SESSIONS_FILE, sessions_db)
+        data = await request.json()
+        session_id = data.get("session_id")
+        message = data.get("message")
         
-        print(f"💬 채팅: {session_id} -> {len(messages_db[session_id])}개 메시지")
+        if not session_id or not message:
+            return JSONResponse(
+                status_code=400,
+                content={"success": False, "error": "세션 ID와 메시지가 필요합니다."}
+            )
         
-        # 현재 포인트 조회 (응답에 포함)
-        current_points = 0
-        if mongo_client and verify_connection() and db_mgr:
-            try:
-                current_points = db_mgr.get_user_points(user["email"])
-            except Exception:
-                pass
+        with stage("points_check"):
+            turn = await prepare_chat_turn(user, session_id, message)
+        if "error_response" in turn:
+            return turn["error_response"]
         
-        # 마크다운 처리된 응답 반환
+        # AI 응답 생성 - 토큰 정보 수집을 위해 직접 OpenAI 호출
         try:
-            formatted_response = format_api_response(ai_response, "chat")
-            response_data = {
-                "success": True,
-                "response": ai_response,
-                "formatted_response": formatted_response["formatted_content"],
-                "has_markdown": formatted_response["has_markdown"],
-                "session_id": session_id,
-                "metadata": formatted_response["metadata"],
-                "points_info": {
-                    "points_deducted": points_deducted,
-                    "current_points": current_points,
-                    "token_usage": token_usage
-                }
-            }
+            # EORA 회상 시스템 활용
+            with stage("recall"):
+                recalled_memories = await recall_for_chat(user, message)
             
-            # 관리자가 아닌 경우만 포인트 정보 포함
-            if is_admin:
-                response_data["points_info"]["is_admin"] = True
-                
-            return JSONResponse(response_data)
-        except Exception as markdown_error:
-            print(f"⚠️ 마크다운 처리 실패: {markdown_error}")
-            return JSONResponse({
-                "success": True,
-                "response": ai_response,
-                "session_id": session_id,
-                "points_info": {
-                    "points_deducted": points_deducted,
-                    "current_points": current_points,
-                    "token_usage": token_usage,
-                    "is_admin": is_admin
-                }
-            })
+            # 토큰 정보를 얻기 위해 generate_openai_response 직접 호출
+            response_result = await generate_openai_response(
+                message=message,
+                history=messages_db.get(session_id, []),
+                memories=recalled_memories
+            )
+            
+            ai_response = response_result.get("response", "")
+            token_usage = response_result.get("token_usage")
+            
+        except Exception as response_error:
+            print(f"❌ AI 응답 생성 오류: {response_error}")
+            ai_response = f"응답 생성 중 오류가 발생했습니다: {str(response_error)}"
+            token_usage = None
+        
+        points_result = await finalize_chat_turn(user, session_id, message, ai_response, token_usage, turn)
+        
+        # 마크다운 처리된 응답 반환
+        with stage("markdown"):
+            response_data = build_chat_response_data(
+                ai_response, session_id, points_result, token_usage, turn["is_admin"]
+            )
+        if trace is not None and turn["is_admin"]:
+            response_data["timings"] = trace.to_dict()
+        return JSONResponse(response_data)
         
     except Exception as e:
         print(f"❌ 채팅 오류: {e}")
@@ -2351,6 +2678,114 @@ async def chat(request: Request):
             content={"success": False, "error": str(e)}
         )
 
+async def stream_chat_turn(user: Dict, session_id: str, message: str, turn: Dict[str, Any]):
+    """
+    준비된 채팅 턴을 스트리밍으로 실행 (SSE와 WebSocket 공용)
+    
+    회상 -> LLM 스트리밍 -> 정산/저장 순서로 진행하며 (event, data)를 yield 합니다.
+        delta - 생성된 텍스트 조각 {"content": str}
+        error - 응답 생성 오류 {"error": str}
+        done  - 최종 응답과 포인트 정보 (/api/chat 응답과 동일한 형식)
+    
+    소비자가 중간에 멈추면(aclose) 생성된 부분까지 백그라운드에서 정산합니다.
+    """
+    result: Dict[str, Any] = {}
+    finalized = False
+    try:
+        with stage("recall"):
+            recalled_memories = await recall_for_chat(user, message)
+        
+        try:
+            async for delta in stream_openai_response(
+                message=message,
+                history=messages_db.get(session_id, []),
+                memories=recalled_memories,
+                result=result
+            ):
+                yield "delta", {"content": delta}
+            ai_response = result.get("response", "")
+            token_usage = result.get("token_usage")
+        except Exception as response_error:
+            print(f"❌ AI 스트리밍 응답 오류: {response_error}")
+            yield "error", {"error": str(response_error)}
+            partial = "".join(result.get("parts", []))
+            ai_response = partial or f"응답 생성 중 오류가 발생했습니다: {str(response_error)}"
+            # 일부라도 생성되었으면 그만큼의 토큰은 정산
+            token_usage = calculate_token_usage(result["messages"], partial) if partial and result.get("messages") else None
+        
+        finalized = True
+        points_result = await finalize_chat_turn(user, session_id, message, ai_response, token_usage, turn)
+        with stage("markdown"):
+            response_data = build_chat_response_data(
+                ai_response, session_id, points_result, token_usage, turn["is_admin"]
+            )
+        yield "done", response_data
+    finally:
+        if not finalized:
+            # 클라이언트 연결 종료 - 생성된 부분까지 백그라운드에서 정산/저장
+            partial = "".join(result.get("parts", []))
+            if partial:
+                print(f"⚠️ 스트리밍 중 연결 종료: {session_id} - 부분 응답 {len(partial)}자 저장")
+                token_usage = calculate_token_usage(result["messages"], partial) if result.get("messages") else None
+                asyncio.ensure_future(
+                    finalize_chat_turn(user, session_id, message, partial, token_usage, turn)
+                )
+            elif messages_db.get(session_id) and messages_db[session_id][-1] is turn["user_message"]:
+                # 응답이 전혀 없으면 사용자 메시지 임시 기록 제거
+                messages_db[session_id].pop()
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: Request):
+    """
+    스트리밍 채팅 응답 (Server-Sent Events, 이벤트는 stream_chat_turn 참고)
+    
+    포인트 차감과 저장은 스트림이 끝난 뒤 한 번만 수행하며,
+    클라이언트가 중간에 연결을 끊어도 생성된 부분까지 정산합니다.
+    """
+    with stage("auth"):
+        user = get_current_user(request)
+    if not user:
+        return JSONResponse(
+            status_code=401,
+            content={"success": False, "error": "로그인이 필요합니다."}
+        )
+    
+    if not OPENAI_AVAILABLE or not openai_client:
+        return openai_unavailable_response()
+    
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    session_id = data.get("session_id")
+    message = data.get("message")
+    
+    if not session_id or not message:
+        return JSONResponse(
+            status_code=400,
+            content={"success": False, "error": "세션 ID와 메시지가 필요합니다."}
+        )
+    
+    # 포인트 부족 등은 스트림 시작 전에 일반 JSON 응답으로 반환
+    with stage("points_check"):
+        turn = await prepare_chat_turn(user, session_id, message)
+    if "error_response" in turn:
+        return turn["error_response"]
+    
+    async def event_stream():
+        events = stream_chat_turn(user, session_id, message, turn)
+        try:
+            async for event, payload in events:
+                yield format_sse(event, payload)
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ==================== 기타 API ====================
 
 @app.post("/api/set-language")
@@ -2535,7 +2970,7 @@ async def user_stats(request: Request):
     
     try:
         # 사용자의 세션과 메시지 수 계산
-        user_sessions = [s for s in sessions_db.values() if s.get("user_email") == user["email"]]
+        user_sessions = [sessions_db[session_id] for session_id in sessions_by_user.keys(user["email"])]
         sessions_count = len(user_sessions)
         
         # 포인트 데이터 가져오기
@@ -2592,7 +3027,7 @@ async def user_activity(request: Request):
         today = datetime.now().date()
         
         # 사용자의 세션 중 오늘 생성된 것들 찾기
-        user_sessions = [s for s in sessions_db.values() if s.get("user_email") == user["email"]]
+        user_sessions = [sessions_db[session_id] for session_id in sessions_by_user.keys(user["email"])]
         
         today_sessions = []
         for session in user_sessions:
@@ -2900,413 +3335,215 @@ async def create_prompt(request: Request):
 
 # ==================== 학습 관련 API ====================
 
-@app.post("/api/admin/enhanced-learn-file")
-async def enhanced_learn_file(request: Request, file: UploadFile = File(...)):
-    """향상된 문서 파일 학습 API - EnhancedLearningSystem 사용 (로그 포함)"""
+# 문서 학습에서 지원하는 파일 형식
+LEARN_FILE_EXTENSIONS = ['.txt', '.md', '.py', '.docx', '.pdf', '.xlsx', '.xls']
+
+async def submit_learning_job(request: Request, file: UploadFile, kind: str, run_job) -> JSONResponse:
+    """
+    업로드 파일을 임시 파일로 스풀하고 학습 작업을 등록합니다 (학습 API 공통).
+    
+    run_job(job, path, user, file_extension)은 백그라운드 작업자에서 실행되며
+    진행 상황은 /api/admin/learn-jobs/{job_id}로 조회합니다.
+    """
     user = get_current_user(request)
     if not user or not user.get("is_admin"):
-        return JSONResponse({
-            "success": False, 
-            "message": "관리자 권한이 필요합니다.",
-            "logs": ["❌ 관리자 권한이 필요합니다."]
-        })
-    
-    # 로그 수집을 위한 배열
-    detailed_logs = []
+        return JSONResponse({"success": False, "message": "관리자 권한이 필요합니다."})
     
-    def add_log(message):
-        """로그 메시지를 콘솔과 배열에 동시에 추가"""
-        print(message)
-        detailed_logs.append(message)
+    file_extension = os.path.splitext(file.filename or "")[1].lower()
+    if file_extension not in LEARN_FILE_EXTENSIONS:
+        return JSONResponse({"success": False, "message": f"지원하지 않는 파일 형식: {file_extension}"})
     
-    add_log("=" * 60)
-    add_log("📚 Enhanced Learning 시작")
-    add_log("=" * 60)
+    manager = get_ingestion_job_manager()
+    if not manager.can_accept():
+        manager.reject()
+        return JSONResponse({"success": False, "message": "대기 중인 학습 작업이 많습니다. 잠시 후 다시 시도해주세요."})
     
     try:
-        # 1단계: Enhanced Learning System 초기화
-        add_log(f"🔍 1단계: Enhanced Learning System 초기화")
-        add_log(f"   👤 요청자: {user.get('email')}")
-        add_log(f"   📄 파일명: {file.filename}")
-        add_log(f"   📝 MIME 타입: {file.content_type}")
-        
-        try:
-            from enhanced_learning_system import get_enhanced_learning_system
-            from mongodb_config import get_optimized_database
-        except ImportError as import_error:
-            add_log(f"   ❌ 모듈 import 실패: {import_error}")
-            return JSONResponse({
-                "success": False,
-                "message": f"시스템 모듈 로드 실패: {import_error}",
-                "logs": detailed_logs
-            })
-        
-        mongo_db = get_optimized_database()
-        if mongo_db is None:
-            add_log(f"   ❌ 데이터베이스 연결 실패")
-            return JSONResponse({
-                "success": False, 
-                "message": "데이터베이스 연결 실패",
-                "logs": detailed_logs
-            })
-        
-        try:
-            learning_system = get_enhanced_learning_system(mongo_db)
-            # 시스템 상태 확인
-            if learning_system is None:
-                add_log(f"   ❌ Enhanced Learning System 생성 실패")
-                return JSONResponse({
-                    "success": False,
-                    "message": "Enhanced Learning System 초기화 실패",
-                    "logs": detailed_logs
-                })
-            
-            if learning_system.db is None:
-                add_log(f"   ⚠️ DB 연결이 설정되지 않았지만 시스템은 초기화됨")
-            
-            add_log(f"   ✅ Enhanced Learning System 초기화 완료")
-        except Exception as system_error:
-            add_log(f"   ❌ Enhanced Learning System 초기화 예외: {system_error}")
-            return JSONResponse({
-                "success": False,
-                "message": f"Enhanced Learning System 초기화 오류: {system_error}",
-                "logs": detailed_logs
-            })
-        
-        # 2단계: 파일 읽기
-        add_log(f"🔍 2단계: 파일 내용 읽기")
-        file_content = await file.read()
-        file_size = len(file_content)
-        add_log(f"   📊 파일 크기: {file_size:,} bytes ({file_size/1024:.1f} KB)")
-        
-        if file_size > 10 * 1024 * 1024:  # 10MB 제한
-            add_log(f"   ❌ 파일 크기 초과 (최대 10MB)")
-            return JSONResponse({
-                "success": False, 
-                "message": "파일 크기가 너무 큽니다. (최대 10MB)",
-                "logs": detailed_logs
-            })
-        
-        text_content = ""
-        
-        # 3단계: 파일 형식 확인
-        add_log(f"🔍 3단계: 파일 형식 검증")
-        file_extension = os.path.splitext(file.filename)[1].lower()
-        allowed_extensions = ['.txt', '.md', '.py', '.docx', '.pdf', '.xlsx', '.xls']
-        
-        if file_extension not in allowed_extensions:
-            add_log(f"   ❌ 지원하지 않는 파일 형식: {file_extension}")
-            return JSONResponse({
-                "success": False,
-                "message": f"지원하지 않는 파일 형식: {file_extension}",
-                "logs": detailed_logs
-            })
-        
-        add_log(f"   ✅ 지원되는 파일 형식: {file_extension}")
-        
-        # 4단계: 텍스트 추출
-        add_log(f"🔍 4단계: 텍스트 추출 및 전처리")
-        text_content = await extract_text_from_file(file_content, file_extension, file.filename)
-        
-        if not text_content or len(text_content.strip()) < 10:
-            add_log(f"   ❌ 텍스트 추출 실패 또는 내용 부족")
-            return JSONResponse({
-                "success": False,
-                "message": "파일에서 텍스트를 추출할 수 없거나 내용이 부족합니다.",
-                "logs": detailed_logs
-            })
-        
-        text_length = len(text_content)
-        add_log(f"   ✅ 텍스트 추출 완료: {text_length:,} 문자")
-        add_log(f"   📝 추출된 텍스트 미리보기: {text_content[:100]}...")
-        
-        # 5단계: Enhanced Learning System으로 학습
-        add_log(f"🔍 5단계: Enhanced Learning System으로 학습 시작")
-        add_log(f"   📚 관리자 학습 모드: 전체 회원 공유")
-        
-        try:
-            result = await learning_system.learn_document(
-                content=text_content,
-                filename=file.filename,
-                category="관리자_업로드",
-                user_id=user["email"],  # 실제 업로더 정보
-                is_admin_learning=True  # 관리자 학습으로 전체 회원 공유
-            )
-            
-            add_log(f"   🔍 학습 결과: {result}")
-            
-            if result and result.get("success"):
-                add_log(f"   ✅ 학습 완료!")
-                add_log(f"   📊 총 청크 수: {result.get('total_chunks', 0)}")
-                add_log(f"   💾 저장된 메모리: {result.get('saved_memories', 0)}")
-                add_log(f"   🏷️ 카테고리: {result.get('category', '관리자_업로드')}")
-                add_log("=" * 60)
-                add_log("🎉 Enhanced Learning 완료!")
-                add_log("=" * 60)
-                
-                return JSONResponse({
-                    "success": True,
-                    "message": f"'{file.filename}' 학습 완료",
-                    "filename": file.filename,
-                    "total_chunks": result.get("total_chunks", 0),
-                    "saved_memories": result.get("saved_memories", 0),
-                    "category": result.get("category", "관리자_업로드"),
-                    "timestamp": datetime.now().isoformat(),
-                    "details": {
-                        "text_length": len(text_content),
-                        "file_size": len(file_content)
-                    },
-                    "logs": detailed_logs  # 로그 추가!
-                })
-            else:
-                error_details = result.get('error', '알 수 없는 오류') if result else '학습 시스템 응답 없음'
-                add_log(f"   ❌ 학습 실패: {error_details}")
-                return JSONResponse({
-                    "success": False,
-                    "message": f"학습 실패: {error_details}",
-                    "details": {
-                        "filename": file.filename,
-                        "file_extension": file_extension,
-                        "text_length": len(text_content) if text_content else 0
-                    },
-                    "logs": detailed_logs  # 로그 추가!
-                })
-        except Exception as learn_error:
-            add_log(f"   ❌ 학습 처리 중 예외: {str(learn_error)}")
-            return JSONResponse({
-                "success": False,
-                "message": f"학습 처리 중 오류: {str(learn_error)}",
-                "details": {
-                    "filename": file.filename,
-                    "file_extension": file_extension,
-                    "error_type": type(learn_error).__name__
-                },
-                "logs": detailed_logs  # 로그 추가!
-            })
-            
-    except Exception as e:
-        add_log(f"❌ 전체 오류: {str(e)}")
-        return JSONResponse({
-            "success": False,
-            "message": f"파일 학습 중 오류 발생: {str(e)}",
-            "logs": detailed_logs  # 로그 추가!
-        })
+        spooled = await manager.spool_upload(file, suffix=file_extension)
+    except UploadTooLarge as e:
+        manager.reject()
+        return JSONResponse({"success": False, "message": str(e)})
+    
+    job = manager.submit(
+        kind, file.filename, user.get("email"), spooled["path"], spooled["size"],
+        lambda job, path: run_job(job, path, user, file_extension)
+    )
+    print(f"📚 학습 작업 등록: {job.job_id} ({file.filename}, {spooled['size']:,} bytes, 요청자: {user.get('email')})")
+    return JSONResponse({
+        "success": True,
+        "message": f"'{file.filename}' 학습 작업이 등록되었습니다.",
+        "job_id": job.job_id,
+        "status_url": f"/api/admin/learn-jobs/{job.job_id}",
+        "filename": file.filename,
+        "file_size": spooled["size"]
+    })
 
-@app.post("/api/admin/learn-file")
-async def learn_file(request: Request, file: UploadFile = File(...)):
-    """문서 파일 학습 API - 상세 로그 포함"""
+async def run_enhanced_learn_job(job, path: str, user: Dict, file_extension: str) -> Dict:
+    """Enhanced Learning 작업: 500~1000자 청크를 배치로 임베딩하여 insert_many로 저장"""
+    from enhanced_learning_system import get_enhanced_learning_system
+    from mongodb_config import get_optimized_database
+    
+    job.set_stage("connecting")
+    mongo_db = await asyncio.to_thread(get_optimized_database)
+    if mongo_db is None:
+        job.log("   ❌ 데이터베이스 연결 실패")
+        return {"success": False, "message": "데이터베이스 연결 실패"}
+    learning_system = get_enhanced_learning_system(mongo_db)
+    if learning_system is None:
+        job.log("   ❌ Enhanced Learning System 생성 실패")
+        return {"success": False, "message": "Enhanced Learning System 초기화 실패"}
+    
+    category = "관리자_업로드"
+    session_id = learning_system.make_session_id(job.filename)
+    job.log(f"   📚 관리자 학습 모드: 전체 회원 공유 (세션: {session_id})")
+    
+    async def store_batch(start: int, chunks: List[str], embeddings: List[Optional[bytes]]) -> int:
+        result = await learning_system.save_chunk_batch(
+            chunks, start, job.filename, category,
+            user_id=user["email"],  # 실제 업로더 정보
+            is_admin_learning=True,  # 관리자 학습으로 전체 회원 공유
+            session_id=session_id,
+            embeddings=embeddings
+        )
+        job.chunks_duplicate += result["duplicates"]
+        return len(result["saved_ids"])
+    
+    chunks = learning_system.iter_chunks(
+        iter_file_text(path, file_extension, job.filename, extract_text_from_bytes, job)
+    )
+    total_chunks = await run_chunk_pipeline(job, chunks, store_batch)
+    
+    if total_chunks == 0:
+        job.log("   ❌ 텍스트 추출 실패 또는 내용 부족")
+        return {"success": False, "message": "파일에서 텍스트를 추출할 수 없거나 내용이 부족합니다."}
+    
+    job.log(f"🎉 Enhanced Learning 완료: 청크 {total_chunks}개, 저장 {job.chunks_saved}개, 중복 {job.chunks_duplicate}개")
+    learned = job.chunks_saved + job.chunks_duplicate
+    return {
+        "success": learned > 0,
+        "message": f"'{job.filename}' 학습 완료" if learned else "학습 실패: 저장된 청크가 없습니다",
+        "filename": job.filename,
+        "total_chunks": total_chunks,
+        "saved_memories": job.chunks_saved,
+        "duplicates": job.chunks_duplicate,
+        "category": category,
+        "timestamp": datetime.now().isoformat(),
+        "details": {
+            "text_length": job.text_length,
+            "file_size": job.file_size,
+            "session_id": session_id
+        }
+    }
+
+async def run_learn_file_job(job, path: str, user: Dict, file_extension: str) -> Dict:
+    """문서 학습 작업: 1000자(200자 중첩) 청크를 배치로 임베딩하여 EORA 메모리에 insert_many로 저장"""
     global eora_memory_system  # 전역 변수 선언
     
-    user = get_current_user(request)
-    if not user or not user.get("is_admin"):
-        return JSONResponse({"success": False, "message": "관리자 권한이 필요합니다."})
+    if eora_memory_system is None:
+        job.log("   🔄 메모리 시스템 재초기화 시도...")
+        try:
+            from eora_memory_system import get_eora_memory_system
+            eora_memory_system = get_eora_memory_system()
+        except Exception as reinit_error:
+            job.log(f"   ❌ 메모리 시스템 재초기화 실패: {reinit_error}")
+    memory_system = eora_memory_system
+    if memory_system is None or not memory_system.is_connected():
+        job.log("   ❌ EORA 메모리 시스템에 연결할 수 없습니다")
+        return {"success": False, "message": "EORA 메모리 시스템에 연결할 수 없습니다."}
     
-    # 로그 수집을 위한 배열
-    detailed_logs = []
+    # 관리자인 경우 공유 저장, 일반 사용자인 경우 개인 저장
+    is_admin = user.get("is_admin", False)
+    storage_user_id = "admin_shared" if is_admin else user["email"]
+    base_metadata = {
+        "filename": job.filename,
+        "file_extension": file_extension,
+        "source": "file_learning",
+        "admin_shared": is_admin,  # 관리자 공유 플래그
+        "shared_to_all": is_admin,  # 전체 공유 플래그
+        "uploaded_by_admin": is_admin,
+        "uploader_email": user.get("email"),
+        "upload_type": "admin_document" if is_admin else "personal_document",
+        "ingest_job_id": job.job_id  # 작업 종료 시 total_chunks 갱신용
+    }
     
-    def add_log(message):
-        """로그 메시지를 콘솔과 배열에 동시에 추가"""
-        print(message)
-        detailed_logs.append(message)
+    async def store_batch(start: int, chunks: List[str], embeddings: List[Optional[bytes]]) -> int:
+        timestamp = datetime.now().isoformat()
+        metadatas = [
+            {**base_metadata, "chunk_index": start + i, "timestamp": timestamp}
+            for i in range(len(chunks))
+        ]
+        result = await memory_system.store_memories_batch(
+            chunks, memory_type="document_chunk", user_id=storage_user_id,
+            metadatas=metadatas, embeddings=embeddings
+        )
+        if not result.get("success"):
+            job.log(f"   ❌ EORA 메모리 시스템 저장 실패: {result.get('error', 'unknown error')}")
+        job.chunks_duplicate += result.get("duplicates", 0)
+        return result.get("saved", 0)
     
-    add_log("=" * 60)
-    add_log("📚 문서 학습 시작")
-    add_log("=" * 60)
+    chunks = iter_text_chunks(
+        iter_file_text(path, file_extension, job.filename, extract_text_from_bytes, job),
+        chunk_size=1000, overlap=200
+    )
+    total_chunks = await run_chunk_pipeline(job, chunks, store_batch)
+    
+    if total_chunks == 0:
+        job.log("   ❌ 텍스트 추출 실패 또는 내용 부족")
+        return {"success": False, "message": "파일에서 텍스트를 추출할 수 없거나 내용이 부족합니다."}
     
+    job.set_stage("finalizing")
     try:
-        # 1단계: 파일 정보 확인
-        add_log(f"🔍 1단계: 파일 정보 확인")
-        add_log(f"   📄 파일명: {file.filename}")
-        add_log(f"   📝 MIME 타입: {file.content_type}")
-        add_log(f"   👤 요청자: {user.get('email')}")
-        
-        # 2단계: 파일 형식 검증
-        add_log(f"🔍 2단계: 파일 형식 검증")
-        allowed_extensions = ['.txt', '.md', '.docx', '.py', '.pdf', '.xlsx', '.xls']
-        file_extension = os.path.splitext(file.filename)[1].lower()
-        
-        if file_extension not in allowed_extensions:
-            add_log(f"   ❌ 지원하지 않는 파일 형식: {file_extension}")
-            return JSONResponse({
-                "success": False, 
-                "message": f"지원하지 않는 파일 형식: {file_extension}",
-                "logs": detailed_logs
-            })
-        
-        add_log(f"   ✅ 지원되는 파일 형식: {file_extension}")
-        
-        # 3단계: 파일 내용 읽기
-        add_log(f"🔍 3단계: 파일 내용 읽기")
-        content = await file.read()
-        file_size = len(content)
-        add_log(f"   📊 파일 크기: {file_size:,} bytes ({file_size/1024:.1f} KB)")
-        
-        if file_size > 10 * 1024 * 1024:  # 10MB 제한
-            add_log(f"   ❌ 파일 크기 초과 (최대 10MB)")
-            return JSONResponse({
-                "success": False, 
-                "message": "파일 크기가 너무 큽니다. (최대 10MB)",
-                "logs": detailed_logs
-            })
-        
-        # 4단계: 텍스트 추출
-        add_log(f"🔍 4단계: 텍스트 추출 및 전처리")
-        extracted_text = await extract_text_from_file(content, file_extension, file.filename)
-        
-        if not extracted_text or len(extracted_text.strip()) < 10:
-            add_log(f"   ❌ 텍스트 추출 실패 또는 내용 부족")
-            return JSONResponse({
-                "success": False, 
-                "message": "파일에서 텍스트를 추출할 수 없거나 내용이 부족합니다.",
-                "logs": detailed_logs
-            })
-        
-        text_length = len(extracted_text)
-        add_log(f"   ✅ 텍스트 추출 완료: {text_length:,} 문자")
-        add_log(f"   📝 추출된 텍스트 미리보기: {extracted_text[:100]}...")
-        
-        # 5단계: 청크 분할
-        add_log(f"🔍 5단계: 텍스트 청크 분할")
-        chunks = split_text_into_chunks(extracted_text, chunk_size=1000, overlap=200)
-        add_log(f"   📦 생성된 청크 수: {len(chunks)}개")
-        
-        for i, chunk in enumerate(chunks[:3]):  # 처음 3개 청크 미리보기
-            add_log(f"   📄 청크 {i+1}: {len(chunk)}문자 - {chunk[:50]}...")
-        
-        if len(chunks) > 3:
-            add_log(f"   📄 ... (총 {len(chunks)}개 청크)")
-        
-        # 6단계: 임베딩 생성 및 저장
-        add_log(f"🔍 6단계: 임베딩 생성 및 메모리 저장")
-        successful_chunks = 0
-        failed_chunks = 0
-        
-        for i, chunk in enumerate(chunks):
-            try:
-                add_log(f"   🔄 청크 {i+1}/{len(chunks)} 처리 중...")
-                
-                # EORA 메모리 시스템에 저장
-                add_log(f"   🔍 메모리 시스템 확인: {eora_memory_system is not None}")
-                if eora_memory_system:
-                    add_log(f"   🔍 MongoDB 연결 상태: {eora_memory_system.is_connected()}")
-                    try:
-                        # 관리자인 경우 공유 저장, 일반 사용자인 경우 개인 저장
-                        storage_user_id = "admin_shared" if user.get("is_admin", False) else user["email"]
-                        
-                        storage_result = await eora_memory_system.store_memory(
-                            content=chunk,
-                            memory_type="document_chunk",
-                            user_id=storage_user_id,  # 관리자는 공유, 일반사용자는 개인
-                            metadata={
-                                "filename": file.filename,
-                                "file_extension": file_extension,
-                                "chunk_index": i,
-                                "total_chunks": len(chunks),
-                                "source": "file_learning",
-                                "timestamp": datetime.now().isoformat(),
-                                "admin_shared": user.get("is_admin", False),  # 관리자 공유 플래그
-                                "shared_to_all": user.get("is_admin", False),  # 전체 공유 플래그
-                                "uploaded_by_admin": user.get("is_admin", False),
-                                "uploader_email": user.get("email"),
-                                "upload_type": "admin_document" if user.get("is_admin", False) else "personal_document"
-                            }
-                        )
-                        
-                        add_log(f"   🔍 저장 결과 타입: {type(storage_result)}")
-                        add_log(f"   🔍 저장 결과 내용: {storage_result}")
-                        
-                        # 저장 결과 확인 (안전한 처리)
-                        if isinstance(storage_result, dict) and storage_result.get("success"):
-                            add_log(f"   💾 EORA 메모리 시스템 저장 성공: {storage_result.get('memory_id', 'unknown')}")
-                        else:
-                            error_msg = storage_result.get('error', 'unknown error') if isinstance(storage_result, dict) else str(storage_result)
-                            add_log(f"   ❌ EORA 메모리 시스템 저장 실패: {error_msg}")
-                            
-                            # 연결 상태 재확인
-                            if eora_memory_system.is_connected():
-                                add_log(f"   🔍 MongoDB 연결은 정상이지만 저장 실패")
-                            else:
-                                add_log(f"   🔍 MongoDB 연결이 끊어짐")
-                                
-                    except Exception as storage_error:
-                        add_log(f"   ❌ EORA 메모리 시스템 저장 예외: {storage_error}")
-                        import traceback
-                        add_log(f"   🔍 예외 상세: {traceback.format_exc()}")
-                else:
-                    add_log(f"   ⚠️ EORA 메모리 시스템 비활성화")
-                    add_log(f"   🔍 ADVANCED_FEATURES_AVAILABLE: {ADVANCED_FEATURES_AVAILABLE}")
-                    
-                    # 메모리 시스템 재초기화 시도
-                    try:
-                        add_log(f"   🔄 메모리 시스템 재초기화 시도...")
-                        from eora_memory_system import get_eora_memory_system
-                        temp_system = get_eora_memory_system()
-                        if temp_system and temp_system.is_connected():
-                            add_log(f"   ✅ 임시 메모리 시스템 연결 성공")
-                            # 전역 변수 업데이트
-                            eora_memory_system = temp_system
-                            add_log(f"   ✅ 전역 메모리 시스템 업데이트 완료")
-                        else:
-                            add_log(f"   ❌ 임시 메모리 시스템 연결 실패")
-                    except Exception as reinit_error:
-                        add_log(f"   ❌ 메모리 시스템 재초기화 실패: {reinit_error}")
-                
-                # 간단한 메모리 저장 (fallback)
-                if not hasattr(learn_file, '_document_memories'):
-                    learn_file._document_memories = []
-                
-                learn_file._document_memories.append({
-                    "content": chunk,
-                    "filename": file.filename,
-                    "chunk_index": i,
-                    "user_id": user.get("email"),
-                    "timestamp": datetime.now().isoformat()
-                })
-                
-                successful_chunks += 1
-                add_log(f"   ✅ 청크 {i+1} 저장 완료")
-                
-            except Exception as chunk_error:
-                failed_chunks += 1
-                add_log(f"   ❌ 청크 {i+1} 저장 실패: {chunk_error}")
-        
-        # 7단계: 결과 요약
-        add_log(f"🔍 7단계: 학습 결과 요약")
-        add_log(f"   ✅ 성공적으로 학습된 청크: {successful_chunks}개")
-        add_log(f"   ❌ 실패한 청크: {failed_chunks}개")
-        add_log(f"   📊 성공률: {(successful_chunks/len(chunks)*100):.1f}%")
-        
-        # 8단계: 완료
-        add_log("=" * 60)
-        add_log("🎉 문서 학습 완료!")
-        add_log("=" * 60)
-        
-        response_data = {
-            "success": True,
-            "message": "문서 학습이 완료되었습니다.",
-            "chunks": successful_chunks,
-            "failed": failed_chunks,
-            "filename": file.filename,
-            "text_length": text_length,
-            "logs": detailed_logs,
-            "debug": {
-                "log_count": len(detailed_logs),
-                "has_logs": len(detailed_logs) > 0,
-                "timestamp": datetime.now().isoformat()
-            }
+        await memory_system.finalize_ingestion(job.job_id, total_chunks)
+    except Exception as finalize_error:
+        job.log(f"   ⚠️ 전체 청크 수 갱신 실패: {finalize_error}")
+    
+    job.log(f"🎉 문서 학습 완료: 성공 {job.chunks_saved}개, 중복 {job.chunks_duplicate}개, 실패 {job.chunks_failed}개 "
+            f"(성공률 {(job.chunks_saved + job.chunks_duplicate) / total_chunks * 100:.1f}%)")
+    learned = job.chunks_saved + job.chunks_duplicate
+    return {
+        "success": learned > 0,
+        "message": "문서 학습이 완료되었습니다." if learned else "학습 실패: 저장된 청크가 없습니다",
+        "chunks": job.chunks_saved,
+        "duplicates": job.chunks_duplicate,
+        "failed": job.chunks_failed,
+        "total_chunks": total_chunks,
+        "saved_memories": job.chunks_saved,
+        "filename": job.filename,
+        "text_length": job.text_length,
+        "details": {
+            "text_length": job.text_length,
+            "file_size": job.file_size
         }
-        
-        add_log(f"🔍 API 응답 데이터 준비 완료: 로그 {len(detailed_logs)}개")
-        return JSONResponse(response_data)
-        
-    except Exception as e:
-        add_log(f"❌ 문서 학습 중 오류 발생: {e}")
-        add_log("=" * 60)
-        return JSONResponse({
-            "success": False, 
-            "message": f"학습 중 오류가 발생했습니다: {str(e)}",
-            "logs": detailed_logs
-        })
+    }
+
+@app.post("/api/admin/enhanced-learn-file")
+async def enhanced_learn_file(request: Request, file: UploadFile = File(...)):
+    """향상된 문서 파일 학습 API - EnhancedLearningSystem 사용 (백그라운드 작업으로 처리)"""
+    return await submit_learning_job(request, file, "enhanced_learn_file", run_enhanced_learn_job)
+
+@app.post("/api/admin/learn-file")
+async def learn_file(request: Request, file: UploadFile = File(...)):
+    """문서 파일 학습 API - EORA 메모리 시스템에 저장 (백그라운드 작업으로 처리)"""
+    return await submit_learning_job(request, file, "learn_file", run_learn_file_job)
+
+@app.get("/api/admin/learn-jobs")
+async def list_learn_jobs(request: Request, limit: int = 20):
+    """최근 학습 작업 목록 API"""
+    user = get_current_user(request)
+    if not user or not user.get("is_admin"):
+        return {"success": False, "message": "관리자 권한이 필요합니다."}
+    return {"success": True, "jobs": await get_ingestion_job_manager().list_jobs(limit=max(1, min(limit, 100)))}
+
+@app.get("/api/admin/learn-jobs/{job_id}")
+async def get_learn_job(request: Request, job_id: str):
+    """학습 작업 진행 상황 API (단계, 읽은 바이트, 저장된 청크 수, 최근 로그)"""
+    user = get_current_user(request)
+    if not user or not user.get("is_admin"):
+        return {"success": False, "message": "관리자 권한이 필요합니다."}
+    job = await get_ingestion_job_manager().describe(job_id)
+    if job is None:
+        return {"success": False, "message": "학습 작업을 찾을 수 없습니다."}
+    return {"success": True, "job": job}
 
 @app.post("/api/admin/learn-dialog-file")
 async def learn_dialog_file(request: Request, file: UploadFile = File(...)):
@@ -3485,9 +3722,16 @@ async def get_admin_users(request: Request):
         return {"success": False, "message": "관리자 권한이 필요합니다."}
     
     try:
-        # 사용자 목록 반환
+        # 가입 최신순 한 페이지 (?limit=50&cursor=<next_cursor>)
+        limit = page_size(request.query_params.get("limit"))
+        try:
+            emails, next_cursor = users_index.page(ALL_GROUP, limit, request.query_params.get("cursor"))
+        except ValueError:
+            return {"success": False, "message": "잘못된 커서입니다."}
+        
         users_list = []
-        for email, user_data in users_db.items():
+        for email in emails:
+            user_data = users_db[email]
             users_list.append({
                 "user_id": email,
                 "email": email,
@@ -3499,7 +3743,12 @@ async def get_admin_users(request: Request):
                 "status": "활성"
             })
         
-        return {"success": True, "users": users_list}
+        return {
+            "success": True,
+            "users": users_list,
+            "next_cursor": next_cursor,
+            "total": users_index.count(ALL_GROUP)
+        }
     except Exception as e:
         return {"success": False, "message": f"사용자 목록 조회 실패: {e}"}
 
@@ -3569,7 +3818,19 @@ async def get_admin_resources(request: Request):
                 "disk_used": disk.used,
                 "disk_total": disk.total,
                 "python_version": sys.version
-            }
+            },
+            "db_executor": get_db_executor_stats(),
+            "write_behind": get_write_behind_queue().get_stats(),
+            "recall_strategies": get_recall_strategy_stats() if ADVANCED_FEATURES_AVAILABLE else {},
+            "embedding_batchers": get_embedding_batcher_stats() if ADVANCED_FEATURES_AVAILABLE else {},
+            "embedding_cache": get_embedding_cache_stats(),
+            "ingestion_jobs": get_ingestion_job_manager().get_stats(),
+            "recall_cache": get_recall_cache_stats(),
+            "shared_state": get_shared_state_stats(),
+            "websockets": manager.get_stats(),
+            "prompt_assembler": get_prompt_assembler_stats(),
+            "content_dedup": eora_memory_system.deduplicator.get_stats() if eora_memory_system and eora_memory_system.is_connected() else {},
+            "emotion_rollup": eora_memory_system.emotion_rollup.get_stats() if eora_memory_system and eora_memory_system.is_connected() else {}
         }
     except Exception as e:
         return {
@@ -3586,6 +3847,53 @@ async def get_admin_resources(request: Request):
             }
         }
 
+@app.get("/api/admin/startup")
+async def get_admin_startup_profile(request: Request):
+    """서버 시작 프로파일 - 임포트/초기화 단계별 소요 시간 (관리자)"""
+    user = get_current_user(request)
+    if not user or not user.get("is_admin"):
+        return {"success": False, "message": "관리자 권한이 필요합니다."}
+    
+    return {"success": True, "startup": startup_profile.report()}
+
+@app.post("/api/admin/memory-maintenance")
+async def run_admin_memory_maintenance(request: Request):
+    """기억 망각/강화 유지보수 실행 - 나이 버킷이 바뀐 메모리만 갱신 (관리자, user_id 지정 시 해당 사용자만)"""
+    user = get_current_user(request)
+    if not user or not user.get("is_admin"):
+        return {"success": False, "message": "관리자 권한이 필요합니다."}
+    
+    if not eora_memory_system or not eora_memory_system.is_connected():
+        return {"success": False, "message": "메모리 시스템이 연결되어 있지 않습니다."}
+    
+    try:
+        data = await request.json()
+    except Exception:
+        data = {}
+    report = await eora_memory_system.run_memory_maintenance(data.get("user_id"))
+    return {"success": "error" not in report, "report": report}
+
+@app.get("/api/admin/timings")
+async def get_admin_timings(request: Request, limit: int = 20):
+    """채팅 단계별 소요 시간 요약 및 최근 요청 분해 (관리자)"""
+    user = get_current_user(request)
+    if not user or not user.get("is_admin"):
+        return {"success": False, "message": "관리자 권한이 필요합니다."}
+    
+    return {
+        "success": True,
+        "summary": get_stage_summary(),
+        "recent": get_recent_traces(page_size(limit, 20))
+    }
+
+@app.get("/metrics")
+async def metrics(request: Request):
+    """Prometheus 메트릭 (EORA_METRICS_TOKEN이 설정되면 Bearer 토큰 필요)"""
+    metrics_token = os.getenv("EORA_METRICS_TOKEN")
+    if metrics_token and request.headers.get("authorization") != f"Bearer {metrics_token}":
+        return PlainTextResponse("unauthorized\n", status_code=401)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # ==================== 포인트 시스템 API ====================
 
 @app.get("/api/user/points")
@@ -3691,8 +3999,8 @@ async def get_user_points(request: Request):
         })
 
 @app.get("/api/user/points/history")
-async def get_points_history(request: Request):
-    """사용자의 포인트 거래 내역 조회"""
+async def get_points_history(request: Request, limit: int = Query(50, ge=1, le=200), cursor: Optional[str] = None):
+    """사용자의 포인트 거래 내역 조회 (커서 기반 페이지네이션: ?limit=50&cursor=<next_cursor>)"""
     user = get_current_user(request)
     if not user:
         return JSONResponse(
@@ -3701,18 +4009,20 @@ async def get_points_history(request: Request):
         )
     
     try:
-        # MongoDB에서 포인트 내역 조회
+        # MongoDB 포인트 원장에서 내역 조회
         if mongo_client and verify_connection() and db_mgr:
-            history = db_mgr.get_points_history(user["email"])
+            page = await async_db_mgr.get_points_history(user["email"], limit, cursor)
             return JSONResponse({
                 "success": True,
-                "history": history,
+                "history": page["transactions"],
+                "next_cursor": page["next_cursor"],
                 "user_id": user["email"]
             })
         else:
             return JSONResponse({
                 "success": True,
                 "history": [],
+                "next_cursor": None,
                 "user_id": user["email"]
             })
     except Exception as e:
@@ -3828,9 +4138,9 @@ async def admin_points_stats(request: Request):
             content={"success": False, "error": "포인트 통계 조회 중 오류가 발생했습니다."}
         )
 
-@app.get("/api/admin/points/users")
-async def admin_points_users(request: Request):
-    """관리자용 사용자 포인트 목록 API - 메모리 DB와 MongoDB 통합"""
+@app.get("/api/admin/points/ledger")
+async def admin_points_ledger(request: Request):
+    """관리자용 포인트 원장 조회 API (?user_id=&limit=&cursor=)"""
     user = get_current_user(request)
     if not user or not user.get("is_admin"):
         return JSONResponse(
@@ -3839,95 +4149,164 @@ async def admin_points_users(request: Request):
         )
     
     try:
-        users_list = []
-        processed_emails = set()
-        
-        # 1. 메모리 DB에서 사용자 정보 수집 (신규 사용자 포함)
-        for email, user_data in users_db.items():
-            if email in processed_emails:
-                continue
-            processed_emails.add(email)
-            
-            # 포인트 정보 가져오기 (메모리 DB 우선)
-            points_info = points_db.get(email, {})
-            current_points = points_info.get("current_points", 0)
-            total_earned = points_info.get("total_earned", 0)
-            total_spent = points_info.get("total_spent", 0)
-            last_updated = points_info.get("last_updated", "")
-            
-            users_list.append({
-                "user_id": user_data.get("user_id", email),
-                "email": email,
-                "name": user_data.get("name", "Unknown"),
-                "current_points": current_points,
-                "total_earned": total_earned,
-                "total_spent": total_spent,
-                "last_updated": last_updated,
-                "created_at": user_data.get("created_at", ""),
-                "is_admin": user_data.get("is_admin", False),
-                "source": "memory_db"
+        if not mongo_client or not verify_connection() or not db_mgr:
+            return JSONResponse({
+                "success": False,
+                "error": "데이터베이스 연결이 필요합니다."
             })
         
-        # 2. MongoDB에서 추가 포인트 정보 수집 (메모리 DB에 없는 사용자들)
-        if mongo_client and verify_connection() and db_mgr and db_mgr.points_collection is not None:
-            try:
-                points_data = list(db_mgr.points_collection.find({}))
-                
-                for point_data in points_data:
-                    user_id = point_data.get("user_id", "")
-                    if user_id and user_id not in processed_emails:
-                        processed_emails.add(user_id)
-                        
-                        # datetime 객체를 문자열로 변환
-                        created_at = point_data.get("created_at", "")
-                        if hasattr(created_at, 'isoformat'):
-                            created_at = created_at.isoformat()
-                        
-                        updated_at = point_data.get("updated_at", "")
-                        if hasattr(updated_at, 'isoformat'):
-                            updated_at = updated_at.isoformat()
-                        
-                        users_list.append({
-                            "user_id": user_id,
-                            "email": user_id,
-                            "name": user_id.split("@")[0] if "@" in user_id else user_id,
-                            "current_points": point_data.get("points", 0),
-                            "total_earned": point_data.get("total_earned", 0),
-                            "total_spent": point_data.get("total_spent", 0),
-                            "last_updated": updated_at,
-                            "created_at": created_at,
-                            "is_admin": False,
-                            "source": "mongodb"
-                        })
-            except Exception as mongo_error:
-                print(f"⚠️ MongoDB 포인트 데이터 조회 오류: {mongo_error}")
-        
-        # 포인트순으로 정렬 (높은 순)
-        users_list.sort(key=lambda x: x.get("current_points", 0), reverse=True)
+        target_user = request.query_params.get("user_id") or None
+        limit = int(request.query_params.get("limit", 50))
+        cursor = request.query_params.get("cursor")
         
-        # 통계 계산
-        total_users = len(users_list)
-        total_points = sum(user.get("current_points", 0) for user in users_list)
-        active_users = len([user for user in users_list if user.get("current_points", 0) > 0])
+        page = await async_db_mgr.get_ledger_page(target_user, limit, cursor)
+        return JSONResponse({
+            "success": True,
+            "transactions": page["transactions"],
+            "next_cursor": page["next_cursor"]
+        })
         
-        print(f"📊 관리자 포인트 사용자 목록: 총 {total_users}명, 활성 {active_users}명, 총 포인트 {total_points:,}")
+    except Exception as e:
+        print(f"❌ 포인트 원장 조회 오류: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"success": False, "error": "포인트 원장 조회 중 오류가 발생했습니다."}
+        )
+
+# 관리자 포인트 사용자 목록 커서 단계: 포인트 계정(포인트 많은 순) -> 포인트 문서가 없는 가입 사용자
+POINTS_PHASE_ACCOUNTS = "accounts"
+POINTS_PHASE_USERS = "users"
+# 2단계에서 포인트 계정 여부를 한 번에 확인하는 가입 사용자 수
+POINTS_USERS_SCAN_CHUNK = 200
+
+def points_user_row(email, current_points, total_earned, total_spent, last_updated, created_at, source):
+    """관리자 포인트 사용자 목록의 한 행 (가입 정보가 없으면 이메일로 이름 표시)"""
+    user_data = users_db.get(email) or {}
+    return {
+        "user_id": user_data.get("user_id", email),
+        "email": email,
+        "name": user_data.get("name") or (email.split("@")[0] if "@" in email else email),
+        "current_points": current_points,
+        "total_earned": total_earned,
+        "total_spent": total_spent,
+        "last_updated": last_updated,
+        "created_at": created_at or user_data.get("created_at", ""),
+        "is_admin": user_data.get("is_admin", False),
+        "source": source
+    }
+
+@app.get("/api/admin/points/users")
+async def admin_points_users(request: Request):
+    """관리자용 사용자 포인트 목록 API - 메모리 DB와 MongoDB 통합"""
+    user = get_current_user(request)
+    if not user or not user.get("is_admin"):
+        return JSONResponse(
+            status_code=403,
+            content={"success": False, "error": "관리자 권한이 필요합니다."}
+        )
+    
+    try:
+        # 포인트 계정(포인트 많은 순) 다음에 포인트 문서가 없는 가입 사용자(가입 최신순, 0포인트)를
+        # 커서 기반으로 페이지 조회 (?limit=50&cursor=<next_cursor>, 통계는 첫 페이지에만)
+        limit = page_size(request.query_params.get("limit"))
+        cursor = request.query_params.get("cursor")
+        try:
+            phase, inner_cursor = decode_cursor(cursor) if cursor else (POINTS_PHASE_ACCOUNTS, None)
+            if phase not in (POINTS_PHASE_ACCOUNTS, POINTS_PHASE_USERS):
+                raise ValueError(cursor)
+            if inner_cursor is not None:
+                decode_cursor(inner_cursor)
+        except ValueError:
+            return JSONResponse(
+                status_code=400,
+                content={"success": False, "error": "잘못된 커서입니다."}
+            )
         
-        # 디버깅: 사용자 목록 로그
-        print(f"🔍 디버깅 - 메모리 DB 사용자 수: {len(users_db)}")
-        print(f"🔍 디버깅 - 포인트 DB 사용자 수: {len(points_db)}")
-        for i, user in enumerate(users_list[:5]):  # 처음 5명만 로그
-            print(f"  User {i+1}: {user.get('email', 'NO_EMAIL')} | {user.get('name', 'NO_NAME')} | {user.get('current_points', 0)} pts")
+        use_mongo = bool(mongo_client and verify_connection() and db_mgr and db_mgr.points_collection is not None)
+        users_list = []
+        next_cursor = None
+        
+        # 1. 포인트 계정 (MongoDB 또는 메모리 DB의 포인트 색인)
+        if phase == POINTS_PHASE_ACCOUNTS:
+            if use_mongo:
+                page = await async_db_mgr.get_points_users_page(limit, inner_cursor)
+                inner_next = page["next_cursor"]
+                for account in page["accounts"]:
+                    user_id = account.get("user_id", "")
+                    users_list.append(points_user_row(
+                        user_id, account.get("points", 0), account.get("total_earned", 0),
+                        account.get("total_spent", 0), account.get("updated_at", ""),
+                        account.get("created_at", ""), "mongodb"
+                    ))
+            else:
+                emails, inner_next = points_index.page(ALL_GROUP, limit, inner_cursor)
+                for email in emails:
+                    points_info = points_db.get(email) or {}
+                    users_list.append(points_user_row(
+                        email, points_info.get("current_points", 0), points_info.get("total_earned", 0),
+                        points_info.get("total_spent", 0), points_info.get("last_updated", ""),
+                        None, "memory_db"
+                    ))
+            if inner_next:
+                next_cursor = encode_cursor((POINTS_PHASE_ACCOUNTS, inner_next))
+            else:
+                phase, inner_cursor = POINTS_PHASE_USERS, None
+        
+        # 2. 포인트 문서가 없는 가입 사용자 (사용자 색인 순서, 계정이 있는 사용자는 1단계에서 나옴)
+        if phase == POINTS_PHASE_USERS:
+            if len(users_list) >= limit:
+                # 1단계가 이 페이지에서 끝남 - 다음 페이지는 2단계 처음부터
+                next_cursor = encode_cursor((POINTS_PHASE_USERS, None))
+            while len(users_list) < limit:
+                chunk, chunk_next = users_index.page(ALL_GROUP, POINTS_USERS_SCAN_CHUNK, inner_cursor)
+                if use_mongo:
+                    with_account = set(await async_db_mgr.get_point_account_ids(chunk))
+                else:
+                    with_account = {email for email in chunk if email in points_db}
+                consumed = 0
+                for email in chunk:
+                    consumed += 1
+                    if email not in with_account:
+                        users_list.append(points_user_row(email, 0, 0, 0, "", None, "memory_db"))
+                        if len(users_list) >= limit:
+                            break
+                inner_cursor = users_index.cursor_of(chunk[consumed - 1]) if consumed < len(chunk) else chunk_next
+                next_cursor = encode_cursor((POINTS_PHASE_USERS, inner_cursor)) if inner_cursor else None
+                if inner_cursor is None:
+                    break
         
-        return JSONResponse({
+        response = {
             "success": True,
             "users": users_list,
-            "stats": {
+            "next_cursor": next_cursor
+        }
+        
+        if not cursor:
+            # 통계: 포인트 계정 + 포인트 문서가 없는 가입 사용자 전체
+            if use_mongo:
+                summary = await async_db_mgr.get_points_summary()
+                registered = list(users_db)
+                with_account = await async_db_mgr.get_point_account_ids(registered)
+                summary["total_users"] += len(registered) - len(set(with_account))
+            else:
+                summary = {
+                    "total_users": len(points_db) + sum(1 for email in users_db if email not in points_db),
+                    "active_users": sum(1 for info in points_db.values() if info.get("current_points", 0) > 0),
+                    "total_points": sum(info.get("current_points", 0) for info in points_db.values())
+                }
+            
+            total_users = summary["total_users"]
+            total_points = summary["total_points"]
+            active_users = summary["active_users"]
+            response["stats"] = {
                 "total_users": total_users,
                 "active_users": active_users,
                 "total_points": total_points,
                 "average_points": round(total_points / total_users, 2) if total_users > 0 else 0
             }
-        })
+            print(f"📊 관리자 포인트 사용자 목록: 총 {total_users}명, 활성 {active_users}명, 총 포인트 {total_points:,}")
+        
+        return JSONResponse(response)
         
     except Exception as e:
         print(f"❌ 사용자 포인트 목록 오류: {e}")
@@ -4065,7 +4444,8 @@ async def get_memory_system_status(request: Request):
             status["connection_details"] = {
                 "mongo_uri": eora_memory_system.mongo_uri[:50] + "..." if eora_memory_system.mongo_uri else None,
                 "client_available": eora_memory_system.client is not None,
-                "db_name": eora_memory_system.db.name if eora_memory_system.db else None
+                "db_name": eora_memory_system.db.name if eora_memory_system.db else None,
+                "supervisor": eora_memory_system.supervisor.get_status()
             }
             
             # 실제 데이터 카운트 확인
@@ -4172,7 +4552,7 @@ async def force_memory_test(request: Request):
             if test_memory_id:
                 try:
                     from bson import ObjectId
-                    eora_memory_system.memories.delete_one({"_id": ObjectId(test_memory_id)})
+                    await eora_memory_system.delete_memories({"_id": ObjectId(test_memory_id)})
                     test_results["details"].append("🗑️ 테스트 데이터 정리 완료")
                 except:
                     test_results["details"].append("⚠️ 테스트 데이터 정리 실패")
@@ -4334,17 +4714,15 @@ async def test_multi_user_access(request: Request):
         try:
             if shared_memory_id:
                 from bson import ObjectId
-                eora_memory_system.memories.delete_one({"_id": ObjectId(shared_memory_id)})
-                cleanup_count += 1
+                cleanup_count += await eora_memory_system.delete_memories({"_id": ObjectId(shared_memory_id)})
             
             # 테스트 플래그가 있는 모든 데이터 삭제
-            result = eora_memory_system.memories.delete_many({
+            cleanup_count += await eora_memory_system.delete_memories({
                 "$or": [
                     {"metadata.test_multiuser": True},
                     {"metadata.test_personal": True}
                 ]
             })
-            cleanup_count += result.deleted_count
             
             test_results["details"].append(f"🗑️ 테스트 데이터 정리 완료 ({cleanup_count}개)")
         except Exception as cleanup_error:
@@ -4557,7 +4935,7 @@ if __name__ == "__main__":
     print("🔑 비밀번호: admin123")
     print("=" * 50)
     
-    # 🧠 EORA 고급 시스템 상태 표시
+    # 🧠 EORA 고급 시스템 상태 표시 (서버 시작 후 백그라운드에서 초기화, /ready 로 확인)
     print("🧠 EORA 고급 시스템 상태:")
     print(f"   - 고급 기능: {'✅ 활성화' if ADVANCED_FEATURES_AVAILABLE else '❌ 비활성화'}")
     print(f"   - EORAMemorySystem: {'✅ 준비됨' if eora_memory_system else '❌ 없음'}")
@@ -4569,73 +4947,115 @@ if __name__ == "__main__":
 
 # ==================== WebSocket 관리 ====================
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+# 세션/사용자별 연결 관리 (연결별 전송 큐 + 하트비트, ws_connections 참고)
+manager = ConnectionManager()
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+@app.on_event("shutdown")
+async def close_websocket_connections():
+    """종료 시 열린 WebSocket 연결 정리"""
+    await manager.close_all()
 
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+def ws_error_payload(response: JSONResponse) -> Dict[str, Any]:
+    """HTTP 오류 응답(JSONResponse)을 WebSocket error 메시지로 변환"""
+    try:
+        content = json.loads(response.body)
+    except Exception:
+        content = {}
+    return {
+        "type": "error",
+        "status": response.status_code,
+        "error": content.get("error") or content.get("message") or "요청을 처리할 수 없습니다.",
+        **{key: value for key, value in content.items() if key not in ("type", "error", "success")}
+    }
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
+async def run_websocket_chat_turn(connection, user: Dict, session_id: str, message: str):
+    """WebSocket 채팅 턴 하나 - /api/chat/stream 과 같은 파이프라인의 이벤트를 그대로 전달"""
+    trace = begin_request_trace("/ws chat")
+    started = time.perf_counter()
+    try:
+        with stage("points_check"):
+            turn = await prepare_chat_turn(user, session_id, message)
+        if "error_response" in turn:
+            await connection.send({**ws_error_payload(turn["error_response"]), "session_id": session_id})
+            return
+        
+        events = stream_chat_turn(user, session_id, message, turn)
         try:
-            await websocket.send_text(message)
-        except Exception as e:
-            print(f"WebSocket 메시지 전송 오류: {e}")
-            self.disconnect(websocket)
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                self.disconnect(connection)
-
-manager = ConnectionManager()
+            async for event, payload in events:
+                if not await connection.send({"type": event, "session_id": session_id, **payload}):
+                    # 전송 큐가 계속 가득 참 - 느린 클라이언트는 끊고 생성된 부분까지만 정산
+                    print(f"⚠️ WebSocket 전송 지연으로 연결 종료: {session_id}")
+                    await manager.disconnect(connection, reason="send queue full")
+                    break
+        finally:
+            await events.aclose()
+    except Exception as e:
+        print(f"❌ WebSocket 채팅 오류: {e}")
+        await connection.send({"type": "error", "session_id": session_id, "error": str(e)})
+    finally:
+        observe_request("/ws chat", time.perf_counter() - started)
+        end_request_trace(trace)
 
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    """WebSocket 엔드포인트 - 실시간 채팅 처리"""
-    await manager.connect(websocket)
+    """
+    WebSocket 엔드포인트 - 실시간 채팅 처리
+    
+    클라이언트 -> 서버:
+        {"type": "message", "content": str, "session_id": str (선택, 기본은 경로의 세션)}
+        {"type": "ping"} / {"type": "pong"}
+    서버 -> 클라이언트:
+        delta / error / done (stream_chat_turn 이벤트), busy, ping / pong
+    
+    연결당 한 번에 한 턴만 처리하며, 턴은 별도 태스크로 실행되어 수신(하트비트)을 막지 않습니다.
+    """
+    user = get_current_user(websocket)
+    if not user:
+        await websocket.close(code=CLOSE_POLICY_VIOLATION)
+        return
+    
+    connection = await manager.connect(websocket, session_id, user.get("email"))
     print(f"✅ WebSocket 연결 성공: {session_id}")
+    active_turn: Optional[asyncio.Task] = None
     
     try:
         while True:
+            data = await websocket.receive_text()
+            connection.touch()
             try:
-                data = await websocket.receive_text()
                 message_data = json.loads(data)
-                
-                message_type = message_data.get("type", "message")
-                
-                if message_type == "message":
-                    user_message = message_data.get("content", "")
-                    
-                    # 간단한 응답 (실제로는 EORA 시스템을 사용해야 함)
-                    response = f"메시지를 받았습니다: {user_message}"
-                    
-                    # 응답 전송
-                    await manager.send_personal_message(json.dumps({
-                        "type": "response",
-                        "content": response,
-                        "session_id": session_id,
-                        "timestamp": datetime.now().isoformat()
-                    }), websocket)
-                    
-            except WebSocketDisconnect:
-                manager.disconnect(websocket)
-                print(f"WebSocket 연결 종료: {session_id}")
-                break
-            except Exception as e:
-                print(f"WebSocket 처리 오류: {e}")
-                break
-                
+            except ValueError:
+                await connection.send({"type": "error", "error": "잘못된 메시지 형식입니다."})
+                continue
+            
+            message_type = message_data.get("type", "message")
+            
+            if message_type == "ping":
+                await connection.send({"type": "pong"})
+            elif message_type == "pong":
+                connection.touch(pong=True)
+            elif message_type == "message":
+                user_message = message_data.get("content", "")
+                turn_session_id = message_data.get("session_id") or session_id
+                if not user_message:
+                    await connection.send({"type": "error", "error": "메시지가 필요합니다."})
+                elif active_turn is not None and not active_turn.done():
+                    await connection.send({"type": "busy", "error": "이전 응답을 생성하는 중입니다."})
+                elif not OPENAI_AVAILABLE or not openai_client:
+                    await connection.send(ws_error_payload(openai_unavailable_response()))
+                else:
+                    active_turn = asyncio.ensure_future(
+                        run_websocket_chat_turn(connection, user, turn_session_id, user_message)
+                    )
+    except WebSocketDisconnect:
+        print(f"WebSocket 연결 종료: {session_id}")
     except Exception as e:
-        print(f"WebSocket 연결 오류: {e}")
-        manager.disconnect(websocket)
+        print(f"WebSocket 처리 오류: {e}")
+    finally:
+        if active_turn is not None and not active_turn.done():
+            # 생성 중이던 턴은 취소 - stream_chat_turn이 생성된 부분까지 정산
+            active_turn.cancel()
+        await manager.disconnect(connection)
 
 # ==================== 학습 기능 테스트 API ====================
 
@@ -0,0 +1,196 @@
+"""
+embedding_batcher.py
+- 임베딩 요청 마이크로 배치 처리
+- 짧은 시간(기본 5ms) 동안 들어온 동시 요청을 모아 한 번의 배치 API 호출로 처리
+- 처리 중인 동일 텍스트는 하나의 요청으로 합쳐 결과를 공유
+- 배치 호출이 실패하면 텍스트별로 다시 요청하여 실패한 텍스트의 요청자만 실패 처리
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 배치 수집 대기 시간 (ms)
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EORA_EMBEDDING_BATCH_WAIT_MS", "5"))
+# 배치당 최대 텍스트 수 (OpenAI 임베딩 API 입력 한도 이내)
+EMBEDDING_BATCH_MAX = int(os.getenv("EORA_EMBEDDING_BATCH_MAX", "100"))
+
+BatchFunc = Callable[[List[str]], Awaitable[List[Optional[Any]]]]
+
+
+class EmbeddingBatcher:
+    """동시 임베딩 요청을 모아 배치 함수 한 번으로 처리하는 서비스"""
+
+    def __init__(self, name: str, embed_batch: BatchFunc,
+                 max_batch_size: int = EMBEDDING_BATCH_MAX,
+                 max_wait_ms: float = EMBEDDING_BATCH_WAIT_MS):
+        """
+        초기화
+
+        Args:
+            name: 통계/로그용 이름 (보통 모델명)
+            embed_batch: 텍스트 목록을 받아 같은 순서의 임베딩 목록을 반환하는 코루틴 함수
+            max_batch_size: 배치당 최대 텍스트 수
+            max_wait_ms: 첫 요청 이후 배치를 모으는 최대 시간 (ms)
+        """
+        self.name = name
+        self.embed_batch = embed_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.stats = {
+            "requests": 0,
+            "deduplicated": 0,
+            "batches": 0,
+            "texts_sent": 0,
+            "errors": 0,
+            "retried": 0,
+            "item_errors": 0,
+            "max_batch": 0,
+            "total_batch_ms": 0.0
+        }
+
+    async def embed(self, text: str) -> Optional[Any]:
+        """텍스트 하나의 임베딩을 반환합니다 (동시 요청과 함께 배치 처리)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+        elif self._loop is not loop:
+            # 다른 이벤트 루프(별도 스레드 등)에서 호출되면 배치 없이 바로 처리
+            results = await self.embed_batch([text])
+            return results[0] if results else None
+
+        self.stats["requests"] += 1
+        future = self._inflight.get(text)
+        if future is not None:
+            self.stats["deduplicated"] += 1
+        else:
+            future = loop.create_future()
+            self._inflight[text] = future
+            self._pending.append(text)
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        # 한 요청자가 취소되어도 같은 텍스트를 기다리는 다른 요청자에게는 영향 없음
+        return await asyncio.shield(future)
+
+    async def embed_many(self, texts: List[str]) -> List[Optional[Any]]:
+        """여러 텍스트의 임베딩을 입력 순서대로 반환합니다."""
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[str]):
+        started = time.perf_counter()
+        # 단독으로 다시 요청할 텍스트 (입력 하나가 배치 전체를 실패시킬 수 있음)
+        retry: List[str] = []
+        try:
+            try:
+                results = await self.embed_batch(batch)
+                if results is None or len(results) != len(batch):
+                    raise RuntimeError(f"배치 결과 수 불일치: {len(batch)}개 요청, {len(results or [])}개 응답")
+                for text, result in zip(batch, results):
+                    if result is None and len(batch) > 1:
+                        # 오류를 None으로 돌려주는 배치 함수도 있으므로 빈 결과도 재시도
+                        retry.append(text)
+                        continue
+                    future = self._inflight.pop(text, None)
+                    if future is not None and not future.done():
+                        future.set_result(result)
+            except asyncio.CancelledError:
+                for text in batch:
+                    future = self._inflight.pop(text, None)
+                    if future is not None and not future.done():
+                        future.cancel()
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"❌ [{self.name}] 배치 임베딩 실패 ({len(batch)}개): {e}")
+                if len(batch) == 1:
+                    self._fail(batch[0], e)
+                else:
+                    retry = list(batch)
+            if retry:
+                # 하나씩 다시 요청하여 다시 실패한 텍스트의 요청자만 실패 처리
+                self.stats["retried"] += len(retry)
+                await asyncio.gather(*(self._run_single(text) for text in retry))
+        finally:
+            self.stats["batches"] += 1
+            self.stats["texts_sent"] += len(batch)
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+            self.stats["total_batch_ms"] += (time.perf_counter() - started) * 1000
+
+    async def _run_single(self, text: str):
+        """배치 실패 후 텍스트 하나를 단독으로 다시 요청합니다."""
+        try:
+            results = await self.embed_batch([text])
+            if not results:
+                raise RuntimeError("빈 임베딩 응답")
+        except asyncio.CancelledError:
+            future = self._inflight.pop(text, None)
+            if future is not None and not future.done():
+                future.cancel()
+            raise
+        except Exception as e:
+            self.stats["item_errors"] += 1
+            self._fail(text, e)
+            return
+        future = self._inflight.pop(text, None)
+        if future is not None and not future.done():
+            future.set_result(results[0])
+
+    def _fail(self, text: str, error: Exception):
+        future = self._inflight.pop(text, None)
+        if future is not None and not future.done():
+            future.set_exception(error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = self.stats["batches"]
+        return {
+            "name": self.name,
+            "pending": len(self._pending),
+            "inflight": len(self._inflight),
+            "requests": self.stats["requests"],
+            "deduplicated": self.stats["deduplicated"],
+            "batches": batches,
+            "texts_sent": self.stats["texts_sent"],
+            "avg_batch_size": round(self.stats["texts_sent"] / batches, 2) if batches else 0.0,
+            "max_batch": self.stats["max_batch"],
+            "avg_batch_ms": round(self.stats["total_batch_ms"] / batches, 2) if batches else 0.0,
+            "errors": self.stats["errors"],
+            "retried": self.stats["retried"],
+            "item_errors": self.stats["item_errors"]
+        }
+
+
+# 이름별 공유 배처
+_batchers: Dict[str, EmbeddingBatcher] = {}
+
+
+def get_embedding_batcher(name: str, embed_batch: BatchFunc) -> EmbeddingBatcher:
+    """이름(모델)별로 공유되는 배처를 반환합니다."""
+    batcher = _batchers.get(name)
+    if batcher is None:
+        batcher = EmbeddingBatcher(name, embed_batch)
+        _batchers[name] = batcher
+    return batcher
+
+
+def get_embedding_batcher_stats() -> Dict[str, Dict[str, Any]]:
+    """모든 배처의 통계를 반환합니다."""
+    return {name: batcher.get_stats() for name, batcher in _batchers.items()}
@@ -9,22 +9,47 @@ import asyncio
 from typing import List
 import logging
 
+from aura_system.embedding_batcher import get_embedding_batcher
+
+logger = logging.getLogger(__name__)
+
 # 상위 경로에서 모듈 불러오기 가능하도록 경로 확장
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "aura_system")))
 
+from embedding_cache import get_embedding_cache
+
 # 환경변수 로딩
 load_dotenv()
 
+# Embeddings(aura_system.embeddings)와 같은 모델/차원 키를 써서 캐시를 공유
+EMBEDDING_CACHE_MODEL = "text-embedding-3-small:1536"
+
 # OpenAI 클라이언트 초기화
 client = OpenAI(
     api_key=os.getenv("OPENAI_API_KEY", ""),
     # proxies 인수 제거 - httpx 0.28.1 호환성
 )
 
+async def _embed_batch(texts: List[str]) -> List[List[float]]:
+    """여러 텍스트를 한 번의 API 호출로 임베딩"""
+    # 동기 함수를 비동기로 실행
+    def create_embeddings():
+        try:
+            response = client.embeddings.create(
+                model="text-embedding-3-small",
+                input=texts
+            )
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        except Exception as e:
+            logger.error(f"⚠️ 임베딩 생성 실패: {str(e)}")
+            return [None] * len(texts)
+            
+    return await asyncio.to_thread(create_embeddings)
+
 # ✅ 임베딩 생성 함수
 async def embed_text(text: str) -> List[float]:
-    """텍스트 임베딩 생성
+    """텍스트 임베딩 생성 (동시 요청은 배치로 묶어 한 번에 호출)
     
     Args:
         text (str): 임베딩할 텍스트
@@ -33,19 +58,13 @@ async def embed_text(text: str) -> List[float]:
         List[float]: 임베딩 벡터
     """
     try:
-        # 동기 함수를 비동기로 실행
-        def create_embedding():
-            try:
-                response = client.embeddings.create(
-                    model="text-embedding-3-small",
-                    input=text
-                )
-                return response.data[0].embedding
-            except Exception as e:
-                logger.error(f"⚠️ 임베딩 생성 실패: {str(e)}")
-                return None
-                
-        return await asyncio.to_thread(create_embedding)
+        cached = await get_embedding_cache().aget(text, EMBEDDING_CACHE_MODEL)
+        if cached is not None:
+            return cached
+        embedding = await get_embedding_batcher("text-embedding-3-small", _embed_batch).embed(text)
+        if embedding:
+            await get_embedding_cache().aset(text, embedding, EMBEDDING_CACHE_MODEL)
+        return embedding
     except Exception as e:
         logger.error(f"⚠️ 임베딩 생성 실패: {str(e)}")
         return None
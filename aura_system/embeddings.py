@@ -9,6 +9,7 @@ from openai import AsyncOpenAI
 from redis.asyncio import Redis
 
 from .config import get_config
+from .embedding_batcher import EmbeddingBatcher
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +34,15 @@ class Embeddings:
             self.model = openai_config.get("embedding_model", "text-embedding-3-small")
             self.dimensions = openai_config.get("embedding_dimensions", 1536)
             self.batch_size = openai_config.get("embedding_batch_size", 100)
+            self._batcher = EmbeddingBatcher(
+                f"{self.model}:{self.dimensions}",
+                lambda texts: self.create_embeddings_batch(texts, use_cache=False),
+                max_batch_size=self.batch_size
+            )
+            # 다른 호출부와 공유하는 2단 임베딩 캐시 (모델 + 차원별 키)
+            from embedding_cache import get_embedding_cache
+            self._cache = get_embedding_cache()
+            self._cache_model = f"{self.model}:{self.dimensions}"
             logger.info("✅ 임베딩 컴포넌트 초기화 완료")
         except Exception as e:
             logger.error(f"❌ 초기화 실패: {str(e)}")
@@ -46,14 +56,10 @@ class Embeddings:
                 cached_embedding = await self._get_cached_embedding(text)
                 if cached_embedding is not None:
                     return cached_embedding
-            response = await self.client.embeddings.create(
-                model=self.model,
-                input=text,
-                dimensions=self.dimensions
-            )
-            if not response or not response.data:
+            # 동시에 들어온 요청과 묶어 create_embeddings_batch 한 번으로 처리
+            vector = await self._batcher.embed(text)
+            if vector is None:
                 return None
-            vector = np.array(response.data[0].embedding, dtype=np.float32)
             if use_cache:
                 await self._cache_embedding(text, vector)
             return vector
@@ -104,9 +110,9 @@ class Embeddings:
             
     async def _get_cached_embedding(self, text: str) -> Optional[np.ndarray]:
         try:
-            cached_data = await self.redis.get(f"embedding:{text}")
-            if cached_data:
-                return np.array(json.loads(cached_data), dtype=np.float32)
+            data = await self._cache.aget_bytes(text, self._cache_model)
+            if data is not None:
+                return np.frombuffer(data, dtype=np.float32)
             return None
         except Exception as e:
             logger.error(f"❌ 캐시된 임베딩 조회 실패: {str(e)}")
@@ -114,11 +120,7 @@ class Embeddings:
             
     async def _cache_embedding(self, text: str, vector: np.ndarray):
         try:
-            await self.redis.setex(
-                f"embedding:{text}",
-                3600,
-                json.dumps(vector.tolist())
-            )
+            await self._cache.aset(text, np.asarray(vector, dtype=np.float32), self._cache_model)
         except Exception as e:
             logger.error(f"❌ 임베딩 캐시 실패: {str(e)}")
             
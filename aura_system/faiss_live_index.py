@@ -0,0 +1,386 @@
+"""
+faiss_live_index.py
+- 실시간으로 유지되는 FAISS 인덱스 (IndexIDMap2 기반 추가/삭제)
+- 변경분은 WAL(write-ahead log)에 먼저 기록하고 주기적으로 스냅샷 저장
+- 시작 시 스냅샷 + WAL 재생으로 빠르게 복원
+- 백그라운드에서 MongoDB와 대조(reconciliation)하여 누락/삭제 보정
+- 여러 워커가 같은 스냅샷/WAL 파일을 공유하므로 파일 잠금(.lock)을 얻은 워커 하나만 기록하고,
+  나머지 워커는 읽기 전용으로 복원한 뒤 대조 작업으로 다른 워커가 추가한 벡터를 반영
+  (기록 워커가 종료되면 다음 대조 주기에 잠금을 넘겨받음)
+"""
+
+import os
+import json
+import base64
+import pickle
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import faiss
+from bson.objectid import ObjectId, InvalidId
+
+try:
+    import fcntl
+except ImportError:  # Windows - 단일 프로세스로 보고 항상 기록
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_KEY = "semantic_embedding"
+WAL_SUFFIX = ".wal"
+LOCK_SUFFIX = ".lock"
+# WAL 레코드가 이 개수를 넘으면 스냅샷 저장
+SNAPSHOT_EVERY = int(os.getenv("EORA_FAISS_SNAPSHOT_EVERY", "500"))
+# MongoDB 대조 주기 (초)
+RECONCILE_INTERVAL = float(os.getenv("EORA_FAISS_RECONCILE_INTERVAL", "600"))
+RECONCILE_BATCH_SIZE = 500
+
+
+def _encode_vector(vector: np.ndarray) -> str:
+    return base64.b64encode(vector.astype("float32").tobytes()).decode("ascii")
+
+
+def _decode_vector(data: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype="float32")
+
+
+class LiveFaissIndex:
+    """문서 ID(str) ↔ FAISS 라벨(int64) 매핑을 유지하는 증분 인덱스"""
+
+    def __init__(self, index_path: str, id_map_path: str, snapshot_every: int = SNAPSHOT_EVERY):
+        self.index_path = index_path
+        self.id_map_path = id_map_path
+        self.wal_path = index_path + WAL_SUFFIX
+        self.lock_path = index_path + LOCK_SUFFIX
+        # 스냅샷/WAL 기록 권한 (프로세스 간 파일 잠금을 얻은 워커만)
+        self.writer = fcntl is None
+        self._writer_fd: Optional[int] = None
+        self.snapshot_every = max(1, snapshot_every)
+        self.index = None
+        self.label_to_id: Dict[int, str] = {}
+        self.id_to_label: Dict[str, int] = {}
+        self.next_label = 0
+        self.pending_records = 0
+        self._snapshotting = False
+        self._lock = threading.RLock()
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self.stats = {
+            "added": 0,
+            "removed": 0,
+            "snapshots": 0,
+            "last_snapshot": None,
+            "last_reconcile": None,
+            "reconcile_added": 0,
+            "reconcile_removed": 0,
+            "load_ms": 0.0
+        }
+
+    # ==================== 로드 ====================
+
+    def _acquire_writer(self) -> bool:
+        """
+        스냅샷/WAL 기록 권한을 얻습니다 (프로세스가 살아 있는 동안 잠금 유지).
+        여러 워커가 같은 파일에 기록하면 WAL 회전/스냅샷이 다른 워커의 기록을 지우기 때문입니다.
+        """
+        if self.writer:
+            return True
+        try:
+            fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+        except OSError as e:
+            logger.warning(f"FAISS 기록 잠금 파일을 열 수 없습니다: {e}")
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._writer_fd = fd
+        self.writer = True
+        return True
+
+    def release(self):
+        """기록 권한을 반납합니다 (인스턴스를 버리기 전에 호출)."""
+        if self._writer_fd is not None:
+            os.close(self._writer_fd)
+            self._writer_fd = None
+            self.writer = fcntl is None
+
+    def promote(self) -> bool:
+        """
+        기록 워커가 종료되어 잠금이 풀렸으면 기록 권한을 넘겨받습니다.
+        남은 WAL을 반영하고, 이 워커의 인덱스 전체가 다음 스냅샷에 저장되도록 합니다.
+        """
+        if self.writer or not self._acquire_writer():
+            return False
+        with self._lock:
+            replayed = self._replay(self.wal_path + ".old") + self._replay(self.wal_path)
+            self.pending_records = max(1, replayed)
+        logger.info(f"FAISS 인덱스 기록 권한 획득 (WAL {replayed}건 반영)")
+        return True
+
+    def load(self):
+        """스냅샷과 WAL을 읽어 인덱스를 복원합니다 (기록 권한이 없으면 읽기 전용)."""
+        started = time.perf_counter()
+        self._acquire_writer()
+        with self._lock:
+            if os.path.exists(self.index_path) and os.path.exists(self.id_map_path):
+                index = faiss.read_index(self.index_path)
+                with open(self.id_map_path, "rb") as f:
+                    id_map = pickle.load(f)
+
+                if isinstance(id_map, list):
+                    # build_faiss_index.py가 만든 기존 형식: 위치 = 라벨
+                    self.index = self._to_id_map(index)
+                    self.label_to_id = {i: doc_id for i, doc_id in enumerate(id_map)}
+                    self.next_label = len(id_map)
+                else:
+                    self.index = index
+                    self.label_to_id = dict(id_map["labels"])
+                    self.next_label = id_map["next_label"]
+                self.id_to_label = {doc_id: label for label, doc_id in self.label_to_id.items()}
+            else:
+                logger.warning("FAISS 스냅샷이 없어 빈 인덱스로 시작합니다 (WAL/대조 작업으로 채워집니다).")
+
+            # 스냅샷 도중 종료된 경우 회전된 WAL부터 재생
+            replayed = self._replay(self.wal_path + ".old") + self._replay(self.wal_path)
+            self.pending_records = replayed
+        self.stats["load_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f"FAISS 인덱스 로드 완료: {self.ntotal}개 벡터, WAL {replayed}건 재생 ({self.stats['load_ms']}ms, "
+                    f"{'기록' if self.writer else '읽기 전용'})")
+
+    @staticmethod
+    def _to_id_map(index):
+        """위치 기반 인덱스를 ID 매핑 인덱스로 변환합니다."""
+        if isinstance(index, faiss.IndexIDMap2):
+            return index
+        id_index = faiss.IndexIDMap2(faiss.IndexFlatL2(index.d))
+        if index.ntotal:
+            vectors = index.reconstruct_n(0, index.ntotal)
+            id_index.add_with_ids(vectors, np.arange(index.ntotal, dtype="int64"))
+        return id_index
+
+    def _replay(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        count = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 비정상 종료로 잘린 마지막 줄
+                    continue
+                if record.get("op") == "add":
+                    self._apply_add(record["id"], _decode_vector(record["vector"]))
+                elif record.get("op") == "remove":
+                    self._apply_remove(record["id"])
+                count += 1
+        return count
+
+    # ==================== 조회 ====================
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal if self.index is not None else 0
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.id_to_label
+
+    def search(self, vector: Iterable[float], k: int) -> List[Tuple[str, float]]:
+        """
+        가까운 벡터 k개를 (문서 ID, 거리) 목록으로 반환합니다 (가까운 순).
+        추가/삭제/대조와 같은 잠금 안에서 검색하고 라벨을 문서 ID로 바꾸므로
+        검색 도중 인덱스가 바뀌거나 이미 제거된 라벨이 반환되지 않습니다.
+        """
+        query = np.asarray(vector, dtype="float32").reshape(1, -1)
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0 or query.shape[1] != self.index.d:
+                return []
+            distances, labels = self.index.search(query, min(k, self.index.ntotal))
+            return [
+                (self.label_to_id[label], float(dist))
+                for label, dist in zip(labels[0], distances[0])
+                if label != -1 and label in self.label_to_id
+            ]
+
+    # ==================== 추가/삭제 ====================
+
+    def add(self, doc_id: str, vector: Iterable[float]) -> bool:
+        """벡터를 WAL에 기록한 뒤 인덱스에 추가합니다 (이미 있으면 교체)."""
+        vec = np.asarray(vector, dtype="float32").reshape(-1)
+        if vec.size == 0:
+            return False
+        with self._lock:
+            if self.index is not None and vec.size != self.index.d:
+                logger.warning(f"FAISS 차원 불일치로 추가 건너뜀: {doc_id} ({vec.size} != {self.index.d})")
+                return False
+            self._log({"op": "add", "id": doc_id, "vector": _encode_vector(vec)})
+            self._apply_add(doc_id, vec)
+            self.stats["added"] += 1
+            self._maybe_snapshot()
+            return True
+
+    def remove(self, doc_id: str) -> bool:
+        """인덱스에서 문서 벡터를 제거합니다."""
+        with self._lock:
+            if doc_id not in self.id_to_label:
+                return False
+            self._log({"op": "remove", "id": doc_id})
+            self._apply_remove(doc_id)
+            self.stats["removed"] += 1
+            self._maybe_snapshot()
+            return True
+
+    def _apply_add(self, doc_id: str, vec: np.ndarray):
+        if self.index is None:
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatL2(vec.size))
+        if doc_id in self.id_to_label:
+            self._apply_remove(doc_id)
+        label = self.next_label
+        self.next_label += 1
+        self.index.add_with_ids(vec.reshape(1, -1), np.array([label], dtype="int64"))
+        self.label_to_id[label] = doc_id
+        self.id_to_label[doc_id] = label
+
+    def _apply_remove(self, doc_id: str):
+        label = self.id_to_label.pop(doc_id, None)
+        if label is None:
+            return
+        self.label_to_id.pop(label, None)
+        if self.index is not None:
+            self.index.remove_ids(np.array([label], dtype="int64"))
+
+    def _log(self, record: Dict[str, Any]):
+        if not self.writer:
+            return  # 읽기 전용 워커: 메모리에만 반영 (기록 워커가 대조 작업으로 저장)
+        with open(self.wal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        self.pending_records += 1
+
+    # ==================== 스냅샷 ====================
+
+    def _maybe_snapshot(self):
+        if self.pending_records >= self.snapshot_every and not self._snapshotting:
+            self._snapshotting = True
+            threading.Thread(target=self.snapshot, name="faiss-snapshot", daemon=True).start()
+
+    def _rotate_wal(self):
+        """현재 WAL을 .old로 옮깁니다 (이전 스냅샷 실패로 .old가 남아 있으면 이어 붙임)."""
+        if not os.path.exists(self.wal_path):
+            return
+        old_path = self.wal_path + ".old"
+        if os.path.exists(old_path):
+            with open(self.wal_path, "r", encoding="utf-8") as src, open(old_path, "a", encoding="utf-8") as dst:
+                dst.write(src.read())
+            os.remove(self.wal_path)
+        else:
+            os.replace(self.wal_path, old_path)
+
+    def snapshot(self) -> bool:
+        """
+        인덱스를 스냅샷으로 저장하고 반영된 WAL을 제거합니다.
+        잠금 안에서는 직렬화와 WAL 회전만 하고, 파일 쓰기는 잠금 밖에서 수행합니다.
+        """
+        with self._lock:
+            self._snapshotting = False
+            if not self.writer or self.index is None or self.pending_records == 0:
+                return False
+            data = faiss.serialize_index(self.index)
+            id_map = {"labels": dict(self.label_to_id), "next_label": self.next_label}
+            self._rotate_wal()
+            self.pending_records = 0
+
+        try:
+            index_tmp = self.index_path + ".tmp"
+            with open(index_tmp, "wb") as f:
+                f.write(data.tobytes())
+            map_tmp = self.id_map_path + ".tmp"
+            with open(map_tmp, "wb") as f:
+                pickle.dump(id_map, f)
+            os.replace(index_tmp, self.index_path)
+            os.replace(map_tmp, self.id_map_path)
+            if os.path.exists(self.wal_path + ".old"):
+                os.remove(self.wal_path + ".old")
+            self.stats["snapshots"] += 1
+            self.stats["last_snapshot"] = time.time()
+            return True
+        except Exception as e:
+            # 회전된 WAL(.old)은 남겨두어 다음 로드 시 재생됨
+            logger.error(f"FAISS 스냅샷 저장 실패: {e}", exc_info=True)
+            return False
+
+    # ==================== MongoDB 대조 ====================
+
+    def reconcile(self, collection) -> Dict[str, int]:
+        """
+        MongoDB의 임베딩 보유 문서와 인덱스를 대조하여
+        누락된 벡터는 추가하고 삭제된 문서의 벡터는 제거합니다.
+        """
+        # 조회 전에 인덱스 상태를 먼저 떠 두어야 조회 중 새로 저장된 문서를 잘못 제거하지 않음
+        with self._lock:
+            indexed_ids = set(self.id_to_label)
+        db_ids = {
+            str(doc["_id"])
+            for doc in collection.find({EMBEDDING_KEY: {"$exists": True}}, {"_id": 1})
+        }
+
+        missing = [doc_id for doc_id in db_ids - indexed_ids if doc_id not in self]
+        stale = indexed_ids - db_ids
+
+        added = 0
+        for start in range(0, len(missing), RECONCILE_BATCH_SIZE):
+            object_ids = []
+            for doc_id in missing[start:start + RECONCILE_BATCH_SIZE]:
+                try:
+                    object_ids.append(ObjectId(doc_id))
+                except (InvalidId, TypeError):
+                    continue
+            for doc in collection.find({"_id": {"$in": object_ids}}, {EMBEDDING_KEY: 1}):
+                emb = doc.get(EMBEDDING_KEY)
+                if isinstance(emb, list) and emb and self.add(str(doc["_id"]), emb):
+                    added += 1
+
+        removed = sum(1 for doc_id in stale if self.remove(doc_id))
+
+        self.stats["last_reconcile"] = time.time()
+        self.stats["reconcile_added"] += added
+        self.stats["reconcile_removed"] += removed
+        if added or removed:
+            logger.info(f"FAISS 대조 완료: 추가 {added}건, 제거 {removed}건")
+        return {"added": added, "removed": removed}
+
+    def start_reconciler(self, get_collection, interval: float = RECONCILE_INTERVAL):
+        """백그라운드 대조 작업을 시작합니다 (첫 실행은 즉시)."""
+        if self._reconcile_task and not self._reconcile_task.done():
+            return self._reconcile_task
+
+        async def _loop():
+            while True:
+                collection = get_collection()
+                if collection is not None:
+                    try:
+                        await asyncio.to_thread(self.promote)
+                        await asyncio.to_thread(self.reconcile, collection)
+                        await asyncio.to_thread(self.snapshot)
+                    except Exception as e:
+                        logger.error(f"FAISS 대조 작업 오류: {e}", exc_info=True)
+                await asyncio.sleep(interval)
+
+        self._reconcile_task = asyncio.ensure_future(_loop())
+        return self._reconcile_task
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "ntotal": self.ntotal,
+            "dimension": self.index.d if self.index is not None else None,
+            "pending_wal_records": self.pending_records,
+            "writer": self.writer,
+            **self.stats
+        }
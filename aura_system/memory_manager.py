@@ -29,6 +29,7 @@ import pickle
 from asyncio import CancelledError
 
 from aura_system.vector_store import FaissIndex, embed_text, embed_text_async
+from aura_system.faiss_live_index import LiveFaissIndex
 from aura_system.memory_structurer import MemoryAtom
 from aura_system.resonance_engine import calculate_resonance
 from aura_system.recall_formatter import format_recall
@@ -36,6 +37,9 @@ from aura_system.task_manager import get_event_loop, add_task, cleanup_pending_t
 from aura_system.resource_manager import ResourceManager
 from aura_system.config import get_config
 from utils.serialization import safe_serialize, safe_mongo_doc, safe_redis_value
+from keyword_index import KeywordIndex, annotate_document
+from content_dedup import ContentDeduplicator
+from recall_cache import AURA_SCOPE, bump_memory_generation
 from aura_system.insight_engine import analyze_cognitive_layer
 from aura_system.memory_chain import find_or_create_chain_id
 from aura_system.recall_engine import find_linked_memories
@@ -69,6 +73,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# memories 문서에서 키워드 역색인에 넣을 필드
+KEYWORD_FIELDS = ("content", "metadata.user_input", "metadata.gpt_response")
+
 def count_tokens(text: str) -> int:
     """텍스트의 토큰 수를 계산
     
@@ -514,8 +521,9 @@ logfile "{os.path.join(temp_dir, 'redis.log')}"
         self.config = get_config()
         self.resource_manager = ResourceManager()
         self.is_initialized = False
-        self.faiss_index = None
-        self.faiss_id_map = None
+        self.live_index = LiveFaissIndex(self._faiss_index_path, self._id_map_path)
+        self.keyword_index = None
+        self.deduplicator = None
         self._loop = get_event_loop()
         self._initialized = True # 초기화 시작 플래그
 
@@ -524,6 +532,14 @@ logfile "{os.path.join(temp_dir, 'redis.log')}"
         try:
             if self.resource_manager and self.resource_manager.memories is not None:
                 await asyncio.to_thread(self.resource_manager.memories.create_index, [("timestamp", -1)])
+                # 키워드 역색인 (search_terms 인덱스 + 기존 문서 백필은 백그라운드)
+                if self.keyword_index is None:
+                    self.keyword_index = KeywordIndex(self.resource_manager.memories, fields=KEYWORD_FIELDS)
+                    self.keyword_index.start_backfill()
+                # 내용 해시 유니크 인덱스 (중복 저장 방지, 기존 문서 백필은 백그라운드)
+                if self.deduplicator is None:
+                    self.deduplicator = ContentDeduplicator(self.resource_manager.memories, scope_fields=())
+                    self.deduplicator.start_backfill()
                 # 텍스트 인덱스는 이미 존재할 수 있으므로 에러 핸들링이 필요할 수 있습니다.
                 # await asyncio.to_thread(self.resource_manager.memories.create_index, [("content", "text")])
             else:
@@ -531,21 +547,32 @@ logfile "{os.path.join(temp_dir, 'redis.log')}"
         except Exception as e:
             logger.error(f"MongoDB 인덱스 생성 실패: {e}", exc_info=True)
 
+    @property
+    def faiss_index(self):
+        """검색용 FAISS 인덱스 (라벨 기반 IndexIDMap2, 비어 있으면 None)"""
+        return self.live_index.index
+
+    @property
+    def faiss_id_map(self) -> Dict[int, str]:
+        """FAISS 검색 결과 라벨 → MongoDB 문서 ID"""
+        return self.live_index.label_to_id
+
     async def _load_faiss_index(self):
-        """FAISS 인덱스를 로드합니다."""
+        """FAISS 인덱스를 스냅샷 + WAL로 복원하고 MongoDB 대조 작업을 시작합니다."""
         try:
-            if os.path.exists(self._faiss_index_path) and os.path.exists(self._id_map_path):
-                self.faiss_index = faiss.read_index(self._faiss_index_path)
-                with open(self._id_map_path, "rb") as f:
-                    self.faiss_id_map = pickle.load(f)
-            else:
-                logger.warning("FAISS 인덱스 파일이 없어 로드를 건너뜁니다. 필요 시 `build_faiss_index.py`를 실행하세요.")
-                self.faiss_index = None
-                self.faiss_id_map = []
+            await asyncio.to_thread(self.live_index.load)
         except Exception as e:
             logger.error(f"FAISS 인덱스 로드 실패: {e}", exc_info=True)
-            self.faiss_index = None
-            self.faiss_id_map = []
+            # 손상된 스냅샷은 버리고 대조 작업으로 다시 채움
+            self.live_index.release()
+            self.live_index = LiveFaissIndex(self._faiss_index_path, self._id_map_path)
+        add_task(self.live_index.start_reconciler(
+            lambda: self.resource_manager.memories if self.resource_manager else None
+        ))
+
+    def get_faiss_stats(self) -> Dict[str, Any]:
+        """실시간 FAISS 인덱스 상태를 반환합니다."""
+        return self.live_index.get_stats()
 
     async def initialize(self):
         """
@@ -600,10 +627,10 @@ logfile "{os.path.join(temp_dir, 'redis.log')}"
                 return False
             # 중복 저장 방지 (file_chunk 타입은 예외적으로 중복 허용)
             is_file_chunk = metadata and metadata.get('type') == 'file_chunk'
-            if not is_file_chunk:
-                def _db_call():
-                    return self.resource_manager.memories.find_one({"content": content})
-                existing = await asyncio.to_thread(_db_call)
+            dedup = self.deduplicator if not is_file_chunk else None
+            if dedup is not None:
+                # 정규화된 내용 해시로 유니크 인덱스 조회 (임베딩 생성 전에 확인)
+                existing = await asyncio.to_thread(dedup.find_existing, {"content": content})
                 if existing:
                     return False
             # content/metadata.content가 벡터(리스트)면 저장하지 않음
@@ -663,9 +690,23 @@ logfile "{os.path.join(temp_dir, 'redis.log')}"
                             doc['metadata']['semantic_embedding'] = doc['semantic_embedding']
                     if self.resource_manager.memories is None:
                         raise RuntimeError("MongoDB 'memories' 컬렉션이 초기화되지 않았습니다.")
-                    # MongoDB에 저장
-                    result = await asyncio.to_thread(self.resource_manager.memories.insert_one, doc)
-                    memory_id = str(result.inserted_id)
+                    annotate_document(doc, KEYWORD_FIELDS)
+                    # MongoDB에 저장 (중복 방지 대상은 내용 해시 upsert, 동시 저장된 같은 내용은 건너뜀)
+                    if dedup is not None:
+                        inserted_id, inserted = await asyncio.to_thread(dedup.upsert_one, doc)
+                        if not inserted:
+                            return False
+                        memory_id = str(inserted_id)
+                    else:
+                        result = await asyncio.to_thread(self.resource_manager.memories.insert_one, doc)
+                        memory_id = str(result.inserted_id)
+                    # aura 회상 캐시 무효화
+                    bump_memory_generation(AURA_SCOPE)
+                    # FAISS 인덱스에 즉시 반영 (WAL 기록 후 추가)
+                    try:
+                        await asyncio.to_thread(self.live_index.add, memory_id, embedding)
+                    except Exception as e:
+                        logger.warning(f"FAISS 인덱스 추가 실패 (대조 작업에서 보정): {e}")
                     # Redis에 저장할 문서 사본을 만들고, _id를 문자열로 변환
                     doc_for_redis = doc.copy()
                     doc_for_redis["_id"] = memory_id
@@ -728,23 +769,12 @@ logfile "{os.path.join(temp_dir, 'redis.log')}"
         if not query:
             return []
 
-        # 쿼리에서 키워드 추출 (공백 기준)
-        keywords = query.split()
-        if not keywords:
-            return []
-        
-        # 각 키워드를 포함하는 OR 조건의 정규식 생성
-        regex_pattern = "|".join([re.escape(k) for k in keywords])
-
         def _db_call():
-            """데이터베이스 조회를 위한 동기 함수"""
+            """키워드 역색인(BM25) 검색을 위한 동기 함수"""
             try:
-                # 수정된 쿼리: $regex와 $or를 함께 사용
-                cursor = self.resource_manager.memories.find(
-                    {"content": {"$regex": regex_pattern, "$options": "i"}},
-                    limit=top_k
-                )
-                results = [doc for doc in cursor]
+                if self.keyword_index is None:
+                    return []
+                results = self.keyword_index.search(query, limit=top_k)
                 for doc in results:
                     if '_id' in doc and isinstance(doc['_id'], ObjectId):
                         doc['_id'] = str(doc['_id'])
@@ -781,16 +811,14 @@ logfile "{os.path.join(temp_dir, 'redis.log')}"
             
             # 임계값 기반 필터링을 위해 top_k보다 많은 후보군 검색
             search_k = max(top_k * 3, 20)
-            if search_k > self.faiss_index.ntotal:
-                search_k = self.faiss_index.ntotal
-
-            distances, indices = self.faiss_index.search(np.array([query_vector]), search_k)
+            # 인덱스 잠금 안에서 검색 (대조/추가와 동시에 실행되므로 스레드에서)
+            hits = await asyncio.to_thread(self.live_index.search, query_vector, search_k)
             
             # 임계값 미만인 결과만 필터링하고, 거리와 함께 저장
             filtered_results = []
-            for i, dist in zip(indices[0], distances[0]):
-                if i != -1 and float(dist) < distance_threshold:
-                    filtered_results.append({"id": self.faiss_id_map[i], "dist": dist})
+            for doc_id, dist in hits:
+                if dist < distance_threshold:
+                    filtered_results.append({"id": doc_id, "dist": dist})
 
             # 상위 top_k개만 선택
             final_results = filtered_results[:top_k]
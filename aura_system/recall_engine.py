@@ -7,6 +7,7 @@ from bson.objectid import ObjectId, InvalidId
 import json
 import os
 import re
+import time
 from asyncio import CancelledError
 
 # 순환 참조 방지를 위해 typing.TYPE_CHECKING 사용
@@ -18,10 +19,65 @@ from aura_system.vector_store import embed_text_async
 # from aura_system.emotion_analyzer import analyze_emotion  # 순환 참조 방지를 위해 주석 처리
 from aura_system.resonance_engine import calculate_resonance
 from utils.serialization import safe_mongo_doc
+from stage_metrics import get_metrics_registry, record_stage
+from db_executor import run_db
 
 # 로거 정의
 logger = logging.getLogger(__name__)
 
+# 전략별 기본 시간 예산 (초) - 예산을 넘긴 전략은 취소되고 빈 결과로 처리
+DEFAULT_STRATEGY_TIMEOUT = float(os.getenv("EORA_RECALL_STRATEGY_TIMEOUT", "0.8"))
+STRATEGY_TIMEOUTS = {
+    "keywords": DEFAULT_STRATEGY_TIMEOUT,
+    "embedding": float(os.getenv("EORA_RECALL_EMBEDDING_TIMEOUT", "2.0")),  # 쿼리 임베딩 생성 포함
+    "sequence_chain": DEFAULT_STRATEGY_TIMEOUT,
+    "metadata": DEFAULT_STRATEGY_TIMEOUT,
+    "emotion": DEFAULT_STRATEGY_TIMEOUT,
+    "trigger": DEFAULT_STRATEGY_TIMEOUT,
+    "frequency_stats": DEFAULT_STRATEGY_TIMEOUT,
+    "belief": DEFAULT_STRATEGY_TIMEOUT
+}
+
+# 전략별 적중/지연 통계 (RecallEngine 인스턴스 간 공유)
+_strategy_stats: Dict[str, Dict[str, Any]] = {}
+
+def _record_strategy(name: str, elapsed_ms: float, hits: int = 0, timed_out: bool = False, failed: bool = False):
+    stats = _strategy_stats.setdefault(name, {
+        "calls": 0, "hits": 0, "results": 0, "timeouts": 0, "errors": 0,
+        "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0
+    })
+    stats["calls"] += 1
+    stats["hits"] += 1 if hits else 0
+    stats["results"] += hits
+    stats["timeouts"] += 1 if timed_out else 0
+    stats["errors"] += 1 if failed else 0
+    stats["total_ms"] += elapsed_ms
+    stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    stats["last_ms"] = elapsed_ms
+    # /metrics 히스토그램과 결과 카운터
+    record_stage(f"recall.engine.{name}", elapsed_ms / 1000)
+    outcome = "timeout" if timed_out else "error" if failed else "hit" if hits else "empty"
+    get_metrics_registry().inc("eora_recall_strategy_total", strategy=name, outcome=outcome)
+
+def get_recall_strategy_stats() -> Dict[str, Dict[str, Any]]:
+    """전략별 호출 수, 적중률, 타임아웃, 평균/최대 지연(ms)을 반환합니다."""
+    report = {}
+    for name, stats in _strategy_stats.items():
+        calls = stats["calls"]
+        report[name] = {
+            "calls": calls,
+            "hits": stats["hits"],
+            "hit_rate": round(stats["hits"] / calls, 3) if calls else 0.0,
+            "avg_results": round(stats["results"] / calls, 2) if calls else 0.0,
+            "timeouts": stats["timeouts"],
+            "errors": stats["errors"],
+            "timeout_ms": int(STRATEGY_TIMEOUTS.get(name, DEFAULT_STRATEGY_TIMEOUT) * 1000),
+            "avg_ms": round(stats["total_ms"] / calls, 2) if calls else 0.0,
+            "max_ms": round(stats["max_ms"], 2),
+            "last_ms": round(stats["last_ms"], 2)
+        }
+    return report
+
 class RecallEngine:
     def __init__(self, memory_manager: "MemoryManagerAsync"):
         """
@@ -126,20 +182,30 @@ class RecallEngine:
         6. 트리거 기반 회상
         7. 빈도 통계 기반 회상
         8. 신념 기반 회상 (새로 추가)
+        
+        같은 질문/조건은 aura 메모리 세대가 바뀌기 전까지 회상 캐시에서 반환합니다.
         """
+        from recall_cache import AURA_SCOPE, get_recall_cache
+        
+        context = context or {}
+        # 결과에 영향을 주는 문맥 값 (current_time은 30일 필터에만 쓰이므로 날짜 단위로)
+        variant = (limit, distance_threshold, (emotion or {}).get('label'), str(context.get('current_time', ''))[:10]) + tuple(
+            str(context.get(field)) for field in ('user_id', 'parent_id', 'session_id', 'time_tag', 'topic')
+        )
+        return await get_recall_cache().get_or_compute(
+            "engine", query,
+            lambda: self._recall_uncached(query, context, emotion, limit, distance_threshold),
+            scopes=(AURA_SCOPE,),
+            variant=variant
+        )
+
+    async def _recall_uncached(self, query: str, context: Dict[str, Any], emotion: Dict[str, Any],
+                               limit: int, distance_threshold: float) -> List[Dict[str, Any]]:
+        """recall의 실제 8종 회상 (캐시 미적중 시 실행)"""
         try:
-            # 임베딩 생성 (임베딩 기반 회상용)
-            if not hasattr(self, '_embedding_cache'):
-                self._embedding_cache = {}
-            emb_key = (query, str(context))
-            if emb_key in self._embedding_cache:
-                query_embedding = self._embedding_cache[emb_key]
-            else:
-                try:
-                    query_embedding = await embed_text_async(query)
-                except CancelledError:
-                    return []
-                self._embedding_cache[emb_key] = query_embedding
+            # 임베딩 생성 (임베딩 기반 회상용) - 다른 전략과 동시에 진행
+            embedding_task = asyncio.ensure_future(self._get_query_embedding(query))
+            embedding_deadline = time.perf_counter() + STRATEGY_TIMEOUTS["embedding"]
                 
             # context 정보 추출
             parent_id = context.get('parent_id') if context else None
@@ -148,18 +214,25 @@ class RecallEngine:
             emotion_label = emotion.get('label') if emotion else None
             user_id = context.get('user_id') if context else None
             
-            # 8가지 전략 병렬 실행 (정확도 향상)
+            async def _embedding_strategy():
+                # 임베딩 작업은 품질 평가에도 쓰이므로 전략이 취소되어도 유지
+                return await self.recall_by_embedding(await asyncio.shield(embedding_task), limit)
+            
+            # 8가지 전략 동시 실행 - 각 전략은 자체 시간 예산을 넘기면 취소됨
             results = await asyncio.gather(
-                self.recall_by_keywords(query, limit),
-                self.recall_by_embedding(query_embedding, limit),
-                self.recall_by_sequence_chain(parent_id, limit),
-                self.recall_by_metadata(session_id, time_tag, limit),
-                self.recall_by_emotion(emotion_label, limit),
-                self.detect_trigger_and_recall(query, limit),
-                self.recall_by_frequency_stats(user_id, limit),
-                self.recall_by_belief(query, limit)  # 8번째 전략 추가
+                self._run_strategy("keywords", self.recall_by_keywords(query, limit)),
+                self._run_strategy("embedding", _embedding_strategy()),
+                self._run_strategy("sequence_chain", self.recall_by_sequence_chain(parent_id, limit)),
+                self._run_strategy("metadata", self.recall_by_metadata(session_id, time_tag, limit)),
+                self._run_strategy("emotion", self.recall_by_emotion(emotion_label, limit)),
+                self._run_strategy("trigger", self.detect_trigger_and_recall(query, limit)),
+                self._run_strategy("frequency_stats", self.recall_by_frequency_stats(user_id, limit)),
+                self._run_strategy("belief", self.recall_by_belief(query, limit))  # 8번째 전략 추가
             )
             
+            # 임베딩 예산 안에 끝나지 않았거나 실패하면 None (벡터 점수 없이 다른 전략 결과만 사용)
+            query_embedding = await self._await_query_embedding(embedding_task, embedding_deadline)
+            
             # 결과 통합(중복 제거, 최신순) + 망각/계보/유형/자기-타인/반사/명상 등 필터링
             seen = set()
             merged = []
@@ -186,7 +259,7 @@ class RecallEngine:
                         seen.add(mem_id)
             
             # 회상 품질 평가 및 필터링 (정확도 향상)
-            if merged:
+            if merged and query_embedding is not None:
                 scored_memories = await self._evaluate_recall_quality(
                     merged, query_embedding, emotion_label, context, query
                 )
@@ -200,7 +273,7 @@ class RecallEngine:
                     merged = filtered_memories
             
             # 회상 실패 시 유사 회상 보완 (정확도 향상)
-            if not merged:
+            if not merged and query_embedding is not None:
                 # 유사 회상: 임베딩/키워드/감정 기반 recall_by_embedding 등 재시도
                 similar = await self.recall_by_embedding(query_embedding, limit)
                 merged = similar[:limit] if similar else []
@@ -231,6 +304,62 @@ class RecallEngine:
             logger.error(f"recall_engine 8전략 recall 오류: {e}", exc_info=True)
             return []
 
+    async def _get_query_embedding(self, query: str):
+        """쿼리 임베딩을 생성합니다 (embed_text_async의 공유 임베딩 캐시를 사용)."""
+        return await embed_text_async(query)
+
+    async def _await_query_embedding(self, embedding_task: "asyncio.Future", deadline: float):
+        """
+        쿼리 임베딩을 남은 임베딩 예산 안에서 기다립니다.
+        시간 초과나 오류면 None을 반환합니다 (회상 전체를 실패시키지 않음).
+        """
+        remaining = max(0.0, deadline - time.perf_counter())
+        try:
+            return await asyncio.wait_for(asyncio.shield(embedding_task), remaining)
+        except asyncio.TimeoutError:
+            embedding_task.cancel()
+            logger.warning(f"쿼리 임베딩 시간 초과 - 벡터 점수 없이 회상합니다 ({STRATEGY_TIMEOUTS['embedding']:.2f}s)")
+        except CancelledError:
+            embedding_task.cancel()
+            raise
+        except Exception as e:
+            logger.warning(f"쿼리 임베딩 실패 - 벡터 점수 없이 회상합니다: {e}")
+        return None
+
+    async def _run_strategy(self, name: str, coro) -> list:
+        """
+        회상 전략 하나를 시간 예산 안에서 실행하고 적중/지연 통계를 기록합니다.
+        예산을 넘기거나 오류가 나면 빈 결과를 반환하여 다른 전략에 영향을 주지 않습니다.
+        """
+        timeout = STRATEGY_TIMEOUTS.get(name, DEFAULT_STRATEGY_TIMEOUT)
+        started = time.perf_counter()
+        try:
+            results = await asyncio.wait_for(coro, timeout) or []
+            _record_strategy(name, (time.perf_counter() - started) * 1000, hits=len(results))
+            return results
+        except asyncio.TimeoutError:
+            _record_strategy(name, (time.perf_counter() - started) * 1000, timed_out=True)
+            logger.warning(f"회상 전략 시간 초과: {name} ({timeout:.2f}s)")
+            return []
+        except CancelledError:
+            raise
+        except Exception as e:
+            _record_strategy(name, (time.perf_counter() - started) * 1000, failed=True)
+            logger.error(f"회상 전략 오류: {name} - {e}")
+            return []
+
+    async def _find(self, query: Dict[str, Any], sort: List[Tuple[str, int]] = None, limit: int = 3,
+                    timeout: float = DEFAULT_STRATEGY_TIMEOUT) -> list:
+        """
+        memories 컬렉션 find()를 스레드에서 실행합니다 (이벤트 루프 비차단).
+        서버 측에서도 시간 예산을 넘기면 중단하도록 max_time_ms를 지정합니다.
+        """
+        memories = self.memory_manager.resource_manager.memories
+        def _db_call():
+            cursor = memories.find(query, sort=sort, limit=limit, max_time_ms=int(timeout * 1000))
+            return [doc for doc in cursor]
+        return await run_db(_db_call)
+
     async def _search_candidates(self, query_embedding: List[float], emotion: str, context: Dict[str, Any], distance_threshold: float) -> List[Dict[str, Any]]:
         """FAISS와 MongoDB를 사용하여 회상 후보를 검색합니다."""
         try:
@@ -240,16 +369,11 @@ class RecallEngine:
                 return []
             
             search_k = max(100, 20) # 후보를 충분히 많이 뽑음
-            if search_k > self.memory_manager.faiss_index.ntotal:
-                search_k = self.memory_manager.faiss_index.ntotal
-
-            distances, indices = self.memory_manager.faiss_index.search(np.array([query_embedding]), search_k)
+            # 인덱스 잠금 안에서 검색 (대조/추가와 동시에 실행되므로 실행기에서)
+            hits = await run_db(self.memory_manager.live_index.search, query_embedding, search_k)
 
             # 2. 임계값 기반 필터링 및 ID 추출
-            found_doc_ids = []
-            for i, dist in zip(indices[0], distances[0]):
-                if i != -1 and dist < distance_threshold:
-                    found_doc_ids.append(self.memory_manager.faiss_id_map[i])
+            found_doc_ids = [doc_id for doc_id, dist in hits if dist < distance_threshold]
 
             if not found_doc_ids:
                 return []
@@ -268,7 +392,7 @@ class RecallEngine:
                 cursor = self.memory_manager.resource_manager.memories.find({"_id": {"$in": valid_ids}})
                 return [safe_mongo_doc(doc) for doc in cursor]
 
-            initial_candidates = await asyncio.to_thread(_db_call)
+            initial_candidates = await run_db(_db_call)
 
             # 4. 감정 및 문맥 기반 추가 필터링
             emotion_filtered = [
@@ -652,13 +776,16 @@ class RecallEngine:
 
     # ① 키워드 기반 회상
     async def recall_by_keywords(self, user_input: str, limit: int = 3) -> list:
+        keyword_index = getattr(self.memory_manager, "keyword_index", None)
+        if keyword_index is not None:
+            # 키워드 역색인(BM25) 검색 - 인덱스를 타므로 컬렉션 전체 스캔 없음
+            return await run_db(keyword_index.search, user_input, None, limit)
         keywords = user_input.split()
         regex = "|".join([re.escape(k) for k in keywords if len(k) > 1])
         if not regex:
             return []
         query = {"content": {"$regex": regex, "$options": "i"}}
-        cursor = self.memory_manager.resource_manager.memories.find(query, sort=[("created_at", -1)], limit=limit)
-        return [doc for doc in cursor]
+        return await self._find(query, sort=[("created_at", -1)], limit=limit, timeout=STRATEGY_TIMEOUTS["keywords"])
 
     # ② 임베딩 기반 회상 (기존 함수 활용)
     async def recall_by_embedding(self, embedding_vector, limit: int = 3) -> list:
@@ -670,8 +797,7 @@ class RecallEngine:
         if not parent_id:
             return []
         query = {"metadata.parent_id": parent_id}
-        cursor = self.memory_manager.resource_manager.memories.find(query, sort=[("created_at", 1)], limit=limit)
-        return [doc for doc in cursor]
+        return await self._find(query, sort=[("created_at", 1)], limit=limit, timeout=STRATEGY_TIMEOUTS["sequence_chain"])
 
     # ④ 상황 기반 회상
     async def recall_by_metadata(self, session_id: str = None, time_tag: str = None, limit: int = 3) -> list:
@@ -682,23 +808,20 @@ class RecallEngine:
             query["metadata.time_tag"] = time_tag
         if not query:
             return []
-        cursor = self.memory_manager.resource_manager.memories.find(query, sort=[("created_at", -1)], limit=limit)
-        return [doc for doc in cursor]
+        return await self._find(query, sort=[("created_at", -1)], limit=limit, timeout=STRATEGY_TIMEOUTS["metadata"])
 
     # ⑤ 감정 기반 회상
     async def recall_by_emotion(self, emotion_label: str, limit: int = 3) -> list:
         if not emotion_label:
             return []
         query = {"metadata.emotion_label": emotion_label}
-        cursor = self.memory_manager.resource_manager.memories.find(query, sort=[("created_at", -1)], limit=limit)
-        return [doc for doc in cursor]
+        return await self._find(query, sort=[("created_at", -1)], limit=limit, timeout=STRATEGY_TIMEOUTS["emotion"])
 
     # ⑥ 의도 기반 회상 (트리거)
     async def detect_trigger_and_recall(self, user_input: str, limit: int = 3) -> list:
-        keywords, pattern = self.load_recall_triggers()
+        keywords, pattern = await run_db(self.load_recall_triggers)
         if self.check_triggers(user_input, keywords, pattern):
-            cursor = self.memory_manager.resource_manager.memories.find({}, sort=[("created_at", -1)], limit=limit)
-            return [doc for doc in cursor]
+            return await self._find({}, sort=[("created_at", -1)], limit=limit, timeout=STRATEGY_TIMEOUTS["trigger"])
         return []
 
     # ⑦ 빈도 기반 회상
@@ -711,7 +834,9 @@ class RecallEngine:
             {"$sort": {"count": -1}},
             {"$limit": limit}
         ]
-        results = list(self.memory_manager.resource_manager.memories.aggregate(pipeline))
+        memories = self.memory_manager.resource_manager.memories
+        max_time_ms = int(STRATEGY_TIMEOUTS["frequency_stats"] * 1000)
+        results = await run_db(lambda: list(memories.aggregate(pipeline, maxTimeMS=max_time_ms)))
         return [r["doc"] for r in results]
 
     # ⑧ 신념 기반 회상 (개선된 버전)
@@ -725,8 +850,7 @@ class RecallEngine:
             
             # 신념 태그가 포함된 메모리 검색 (정확도 향상)
             query = {"metadata.belief_tags": {"$in": belief_keywords}}
-            cursor = self.memory_manager.resource_manager.memories.find(query, sort=[("created_at", -1)], limit=limit)
-            results = [doc for doc in cursor]
+            results = await self._find(query, sort=[("created_at", -1)], limit=limit, timeout=STRATEGY_TIMEOUTS["belief"])
             
             # 신념 강도에 따른 추가 필터링
             if results:
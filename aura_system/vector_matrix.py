@@ -0,0 +1,156 @@
+"""
+vector_matrix.py
+- VectorStore 검색용 메모리 내 벡터 행렬
+- 정규화된 float32 연속 행렬 + 행렬곱 한 번으로 코사인 유사도 top-k 계산
+- store/update/delete와 동기화 (추가는 뒤에 붙이고, 삭제는 툼스톤 후 주기적 압축)
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# 툼스톤 비율이 이 값을 넘으면 압축
+COMPACT_RATIO = 0.25
+
+
+class VectorMatrixIndex:
+    """vector_id ↔ 행 번호를 유지하는 코사인 유사도 검색 행렬"""
+
+    def __init__(self, dimension: Optional[int] = None, initial_capacity: int = 1024):
+        """
+        초기화
+
+        Args:
+            dimension: 벡터 차원 (None이면 첫 벡터에서 결정)
+            initial_capacity: 초기 행 수 (부족하면 2배씩 확장)
+        """
+        self.dimension = dimension
+        self.initial_capacity = max(1, initial_capacity)
+        self._vectors: Optional[np.ndarray] = None
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._size = 0
+        self._deleted = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, vector_id: str) -> bool:
+        return vector_id in self._rows
+
+    # ==================== 변경 ====================
+
+    def upsert(self, vector_id: str, vector) -> bool:
+        """벡터를 추가하거나 교체합니다."""
+        vec = np.asarray(vector, dtype=np.float32).reshape(-1)
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = vec.size
+            if vec.size != self.dimension:
+                return False
+            if vector_id in self._rows:
+                self._tombstone(vector_id)
+            self._append(vector_id, self._normalize(vec))
+            self._maybe_compact()
+            return True
+
+    def remove(self, vector_id: str) -> bool:
+        """벡터를 삭제합니다."""
+        with self._lock:
+            if vector_id not in self._rows:
+                return False
+            self._tombstone(vector_id)
+            self._maybe_compact()
+            return True
+
+    def load(self, items: Iterable[Tuple[str, Iterable[float]]]) -> int:
+        """(vector_id, vector) 목록으로 행렬을 채웁니다."""
+        count = 0
+        for vector_id, vector in items:
+            if self.upsert(vector_id, vector):
+                count += 1
+        return count
+
+    @staticmethod
+    def _normalize(vec: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(vec)
+        # 노름이 0인 벡터는 유사도 0으로 취급 (기존 _calculate_similarity와 동일)
+        return vec / norm if norm > 0 else np.zeros_like(vec)
+
+    def _append(self, vector_id: str, vec: np.ndarray):
+        if self._vectors is None or self._size >= self._vectors.shape[0]:
+            capacity = self.initial_capacity if self._vectors is None else self._vectors.shape[0] * 2
+            grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+            if self._vectors is not None:
+                grown[:self._size] = self._vectors[:self._size]
+            # 새 배열로 교체 - 진행 중인 검색은 이전 배열을 그대로 사용
+            self._vectors = grown
+        self._vectors[self._size] = vec
+        self._ids.append(vector_id)
+        self._rows[vector_id] = self._size
+        self._size += 1
+
+    def _tombstone(self, vector_id: str):
+        row = self._rows.pop(vector_id)
+        self._vectors[row] = 0.0
+        self._ids[row] = None
+        self._deleted += 1
+
+    def _maybe_compact(self):
+        if self._deleted and self._deleted > self._size * COMPACT_RATIO:
+            live = [row for row, vector_id in enumerate(self._ids) if vector_id is not None]
+            capacity = max(self.initial_capacity, len(live) * 2)
+            vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+            vectors[:len(live)] = self._vectors[live]
+            # 배열과 ID 목록을 새로 만들어 교체 (검색 중인 스냅샷은 영향 없음)
+            self._ids = [self._ids[row] for row in live]
+            self._vectors = vectors
+            self._rows = {vector_id: row for row, vector_id in enumerate(self._ids)}
+            self._size = len(live)
+            self._deleted = 0
+
+    # ==================== 검색 ====================
+
+    def search(self, query_vector, limit: int = 10, threshold: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        코사인 유사도 상위 limit개를 반환합니다.
+
+        Args:
+            query_vector: 쿼리 벡터
+            limit: 최대 결과 수
+            threshold: 최소 유사도
+
+        Returns:
+            (vector_id, similarity) 목록 (유사도 내림차순)
+        """
+        with self._lock:
+            vectors, ids, size, deleted = self._vectors, self._ids, self._size, self._deleted
+        if vectors is None or size == 0 or limit <= 0:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        if query.size != self.dimension:
+            return []
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+
+        scores = vectors[:size] @ (query / norm)
+        candidates = np.flatnonzero(scores >= threshold)
+        # 삭제된 행(유사도 0)이 섞일 수 있으므로 그만큼 여유 있게 선택
+        k = limit + deleted
+        if candidates.size > k:
+            top = np.argpartition(scores[candidates], -k)[-k:]
+            candidates = candidates[top]
+        order = candidates[np.argsort(scores[candidates])[::-1]]
+
+        results = []
+        for row in order:
+            vector_id = ids[row]
+            if vector_id is not None:
+                results.append((vector_id, float(scores[row])))
+                if len(results) >= limit:
+                    break
+        return results
@@ -10,6 +10,7 @@ import sys
 import json
 import logging
 import asyncio
+import functools
 from typing import List, Dict, Any, Optional, Tuple, Union
 from openai import OpenAI, AsyncOpenAI
 import numpy as np
@@ -21,6 +22,8 @@ from .openai_client import get_openai_client
 import redis
 from aura_system.config import get_config
 from aura_system.embeddings import get_embeddings
+from aura_system.vector_matrix import VectorMatrixIndex
+from aura_system.embedding_batcher import get_embedding_batcher
 from redis.asyncio import Redis
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConnectionFailure, OperationFailure
@@ -130,19 +133,41 @@ def embed_text(text: str) -> np.ndarray:
         logger.error(f"❌ 임베딩 생성 실패: {str(e)}")
         raise
 
+_async_embedding_clients: Dict[str, AsyncOpenAI] = {}
+
+async def _embed_batch_ada(api_key: str, texts: List[str]) -> List[List[float]]:
+    """text-embedding-ada-002 배치 호출 (OPENAI_BASE_URL로 로컬 가짜 서버 지정 가능)"""
+    async_client = _async_embedding_clients.get(api_key)
+    if async_client is None:
+        async_client = AsyncOpenAI(api_key=api_key)
+        _async_embedding_clients[api_key] = async_client
+    response = await async_client.embeddings.create(
+        model="text-embedding-ada-002",
+        input=texts
+    )
+    return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
 async def embed_text_async(text: str, api_key: str = None) -> List[float]:
-    """텍스트 임베딩 생성"""
+    """텍스트 임베딩 생성 (공유 캐시 우선, 동시 요청은 배치로 묶어 한 번에 호출)"""
     try:
         api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OpenAI API 키가 필요합니다.")
         
-        async_client = AsyncOpenAI(api_key=api_key)
-        response = await async_client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
+        from embedding_cache import get_embedding_cache
+        cache = get_embedding_cache()
+        cached = await cache.aget(text, "text-embedding-ada-002")
+        if cached is not None:
+            return cached
+        
+        batcher = get_embedding_batcher(
+            f"text-embedding-ada-002:{api_key[-6:]}",
+            functools.partial(_embed_batch_ada, api_key)
         )
-        return response.data[0].embedding
+        embedding = await batcher.embed(text)
+        if embedding:
+            await cache.aset(text, embedding, "text-embedding-ada-002")
+        return embedding
     except CancelledError:
         logger.warning("embed_text_async에서 CancelledError 발생: 앱 종료 등으로 인한 자연스러운 현상")
         return None
@@ -174,7 +199,7 @@ def get_embedding(text: str) -> np.ndarray:
             raise
     
     try:
-        embedding_list = cached_embedding(text, _generate_embedding)
+        embedding_list = cached_embedding(text, _generate_embedding, "text-embedding-ada-002")
         return np.array(embedding_list) if embedding_list else np.array([])
     except Exception as e:
         logger.error(f"❌ 캐시된 임베딩 생성 실패: {str(e)}")
@@ -197,6 +222,7 @@ class VectorStore:
             self._redis_client = None
             self._mongo_client = None
             self._db = None
+            self._matrix = VectorMatrixIndex()
             self._initialized = True
             
     async def initialize(self):
@@ -226,6 +252,9 @@ class VectorStore:
             # 인덱스 생성
             await self._create_indexes()
             
+            # 검색용 메모리 내 벡터 행렬 적재
+            await self._load_matrix()
+            
             logger.info("✅ 벡터 저장소 초기화 완료")
             
         except Exception as e:
@@ -252,6 +281,19 @@ class VectorStore:
         except Exception as e:
             logger.error(f"❌ 인덱스 생성 실패: {str(e)}")
             
+    async def _load_matrix(self):
+        """vectors 컬렉션 전체를 한 번만 읽어 검색용 행렬을 구성합니다."""
+        try:
+            self._matrix = VectorMatrixIndex()
+            cursor = self._db.vectors.find({}, {"vector_id": 1, "vector": 1, "_id": 0})
+            count = 0
+            async for doc in cursor:
+                if doc.get("vector") and self._matrix.upsert(doc["vector_id"], doc["vector"]):
+                    count += 1
+            logger.info(f"✅ 벡터 행렬 적재 완료: {count}개")
+        except Exception as e:
+            logger.error(f"❌ 벡터 행렬 적재 실패: {str(e)}")
+            
     async def store_vector(
         self,
         vector_id: str,
@@ -273,6 +315,8 @@ class VectorStore:
             
             # MongoDB에 저장
             await self._db.vectors.insert_one(vector_data)
+            vector_data.pop("_id", None)
+            self._matrix.upsert(vector_id, vector)
             
             # Redis에 캐시
             await self._redis_client.setex(
@@ -340,6 +384,9 @@ class VectorStore:
             )
             
             if result.modified_count > 0:
+                if vector is not None:
+                    self._matrix.upsert(vector_id, vector)
+                    
                 # Redis 캐시 삭제
                 await self._redis_client.delete(f"vector:{vector_id}")
                 
@@ -358,6 +405,8 @@ class VectorStore:
             result = await self._db.vectors.delete_one({"vector_id": vector_id})
             
             if result.deleted_count > 0:
+                self._matrix.remove(vector_id)
+                
                 # Redis 캐시 삭제
                 await self._redis_client.delete(f"vector:{vector_id}")
                 
@@ -380,28 +429,22 @@ class VectorStore:
             if query_vector is None or not isinstance(query_vector, np.ndarray):
                 return []
                 
-            # 모든 벡터 조회
-            cursor = self._db.vectors.find({})
-            vectors = await cursor.to_list(length=None)
-            
-            # 유사도 계산 및 정렬
-            results = []
-            for vector_data in vectors:
-                similarity = self._calculate_similarity(
-                    query_vector,
-                    np.array(vector_data["vector"])
-                )
+            # 메모리 내 행렬에서 top-k 계산 (행렬곱은 GIL을 해제하므로 스레드에서 실행)
+            matches = await asyncio.to_thread(self._matrix.search, query_vector, limit, threshold)
+            if not matches:
+                return []
                 
-                if similarity >= threshold:
-                    results.append({
-                        **vector_data,
-                        "similarity": similarity
-                    })
-                    
-            # 유사도 기준 정렬
-            results.sort(key=lambda x: x["similarity"], reverse=True)
-            
-            return results[:limit]
+            # 선택된 벡터 문서만 조회
+            similarities = dict(matches)
+            cursor = self._db.vectors.find({"vector_id": {"$in": list(similarities)}})
+            docs = {doc["vector_id"]: doc async for doc in cursor}
+            
+            # 유사도 기준 정렬 (행렬 검색 순서 유지)
+            return [
+                {**docs[vector_id], "similarity": similarity}
+                for vector_id, similarity in matches
+                if vector_id in docs
+            ]
             
         except Exception as e:
             logger.error(f"❌ 벡터 검색 실패: {str(e)}")
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+채팅/회상 파이프라인 오프라인 벤치마크
+실제 OpenAI 대신 로컬 가짜 OpenAI 서버(fake_openai_server)를 띄우고, 합성 기억 코퍼스를
+MongoDB에 심은 뒤 실제 앱 경로의 지연 시간과 처리량을 측정합니다.
+
+측정 시나리오:
+    recall  - EORAMemorySystem.enhanced_recall (프로세스 내부)
+    engine  - aura_system RecallEngine.recall (프로세스 내부)
+    chat    - POST /api/chat (uvicorn으로 실행한 app)
+    learn   - POST /api/admin/learn-file + 작업 완료까지 폴링 (uvicorn으로 실행한 app)
+
+MongoDB:
+    (기본)            PATH의 mongod를 임시 디렉터리/포트로 실행하고 종료 시 삭제
+    --mongo-uri URI   기존 MongoDB 사용 (eora_memory 등 앱 DB에 source=benchmark 데이터를 넣고 종료 시 삭제)
+
+결과는 코퍼스 크기별/시나리오별 p50/p95/p99(ms), 평균, 처리량(req/s)을 JSON으로 출력하고,
+--baseline으로 저장된 결과와 비교하여 허용치를 넘는 회귀가 있으면 종료 코드 1을 반환합니다.
+
+사용 예:
+    python benchmark_chat_pipeline.py --sizes 10000 --scenarios recall,chat --requests 200 --concurrency 16
+    python benchmark_chat_pipeline.py --sizes 10000,100000 --output bench.json --save-baseline bench_baseline.json
+    python benchmark_chat_pipeline.py --sizes 10000 --baseline bench_baseline.json --tolerance 0.15
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from array import array
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from benchmark_keyword_search import NOUNS, make_sentence
+from fake_openai_server import FakeOpenAIConfig, FakeOpenAIServer, fake_embedding
+
+SCENARIOS = ("recall", "engine", "chat", "learn")
+BENCH_USER = "admin@eora.ai"  # 기본 관리자 계정 (포인트 무제한, 학습 권한)
+BENCH_SOURCE = "benchmark"
+# 가짜 키 (앱의 키 형식 검사: sk- 로 시작, 50자 초과)
+FAKE_API_KEY = "sk-benchmark-" + "0" * 48
+# 회귀 판정에 사용하는 지표 (지연은 증가, 처리량은 감소가 회귀)
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+THROUGHPUT_METRIC = "throughput_rps"
+
+
+# ==================== 측정 ====================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """최근접 순위 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, wall_sec: float) -> Dict[str, Any]:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50), 2),
+        "p95_ms": round(percentile(values, 95), 2),
+        "p99_ms": round(percentile(values, 99), 2),
+        "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+        "max_ms": round(values[-1], 2) if values else 0.0,
+        "throughput_rps": round(len(values) / wall_sec, 2) if wall_sec > 0 else 0.0,
+        "wall_sec": round(wall_sec, 2)
+    }
+
+
+async def run_load(name: str, operation: Callable[[int], Awaitable[Any]],
+                   requests: int, concurrency: int) -> Dict[str, Any]:
+    """operation(i)를 동시성 concurrency로 requests번 실행하고 지연 시간을 집계합니다."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+    first_error: Optional[str] = None
+
+    async def one(i: int):
+        nonlocal errors, first_error
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await operation(i)
+                latencies.append((time.perf_counter() - started) * 1000)
+            except Exception as e:
+                errors += 1
+                first_error = first_error or f"{type(e).__name__}: {e}"
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    result = summarize(latencies, errors, time.perf_counter() - started)
+    if first_error:
+        result["first_error"] = first_error
+    print(f"   ⏱️ {name:<7} n={result['count']:<5} err={errors:<3} p50={result['p50_ms']:>8.1f}ms "
+          f"p95={result['p95_ms']:>8.1f}ms p99={result['p99_ms']:>8.1f}ms {result['throughput_rps']:>7.1f} req/s")
+    return result
+
+
+# ==================== 환경 준비 ====================
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mongod() -> Dict[str, Any]:
+    """임시 dbpath/포트로 mongod 실행"""
+    binary = shutil.which("mongod")
+    if not binary:
+        raise SystemExit("❌ PATH에서 mongod를 찾을 수 없습니다. --mongo-uri로 기존 MongoDB를 지정하세요.")
+    dbpath = tempfile.mkdtemp(prefix="eora-bench-mongo-")
+    port = free_port()
+    process = subprocess.Popen(
+        [binary, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    uri = f"mongodb://127.0.0.1:{port}"
+    from pymongo import MongoClient
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            MongoClient(uri, serverSelectionTimeoutMS=500).admin.command("ping")
+            print(f"🍃 임시 mongod 실행: {uri} ({dbpath})")
+            return {"process": process, "dbpath": dbpath, "uri": uri}
+        except Exception:
+            time.sleep(0.3)
+    process.kill()
+    raise SystemExit("❌ mongod 시작 시간 초과")
+
+
+def stop_mongod(mongod: Optional[Dict[str, Any]]):
+    if not mongod:
+        return
+    mongod["process"].terminate()
+    try:
+        mongod["process"].wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        mongod["process"].kill()
+    shutil.rmtree(mongod["dbpath"], ignore_errors=True)
+
+
+def configure_environment(mongo_uri: str, openai_base_url: str, recall_cache: bool):
+    """이 프로세스와 앱 하위 프로세스가 공유하는 환경 변수"""
+    for name in ("RAILWAY_ENVIRONMENT", "RAILWAY_PROJECT_ID", "RAILWAY_SERVICE_ID", "RAILWAY_PUBLIC_DOMAIN"):
+        os.environ.pop(name, None)
+    os.environ["MONGODB_URI"] = mongo_uri
+    os.environ["OPENAI_API_KEY"] = FAKE_API_KEY
+    os.environ["OPENAI_BASE_URL"] = openai_base_url
+    if not recall_cache:
+        os.environ["EORA_RECALL_CACHE_TTL"] = "0"
+
+
+def clear_benchmark_data(mongo_uri: str):
+    """이전 실행에서 심은 벤치마크 데이터 삭제"""
+    from pymongo import MongoClient
+    client = MongoClient(mongo_uri, serverSelectionTimeoutMS=3000)
+    removed = 0
+    # eora_memory(EORA)와 aura_system DB(설정에 따라 이름이 다름)의 memories 컬렉션
+    for db_name in client.list_database_names():
+        if "memories" in client[db_name].list_collection_names():
+            removed += client[db_name]["memories"].delete_many({"metadata.source": BENCH_SOURCE}).deleted_count
+    removed += client["eora_memory"]["memories"].delete_many({"metadata.filename": {"$regex": "^bench_learn_"}}).deleted_count
+    if removed:
+        print(f"🧹 벤치마크 데이터 {removed:,}건 삭제")
+
+
+# ==================== 코퍼스 ====================
+
+def make_queries(seed: int, pool: int) -> List[str]:
+    rng = random.Random(seed + 1)
+    return [make_sentence(rng, words=rng.randint(3, 6)) for _ in range(pool)]
+
+
+async def seed_corpus(memory_system, size: int, seed: int, personal_ratio: float = 0.1, batch: int = 1000):
+    """합성 기억 size건 저장 (학습 청크 + 벤치마크 사용자 개인 대화)"""
+    from chunk_embeddings import CHUNK_EMBEDDING_DIM
+
+    rng = random.Random(seed)
+    personal = int(size * personal_ratio)
+    started = time.perf_counter()
+    for start in range(0, size, batch):
+        count = min(batch, size - start)
+        contents = [f"[{start + i}] " + make_sentence(rng, words=rng.randint(20, 60)) for i in range(count)]
+        is_personal = start < personal
+        metadatas = [{
+            "source": BENCH_SOURCE,
+            "filename": f"bench_{rng.choice(NOUNS)}_{(start + i) % 200}.txt",
+            "chunk_index": start + i,
+        } for i in range(count)]
+        if is_personal:
+            await memory_system.store_memories_batch(contents, "user_message", BENCH_USER, metadatas)
+        else:
+            embeddings = [array("f", fake_embedding(text, CHUNK_EMBEDDING_DIM)).tobytes() for text in contents]
+            await memory_system.store_memories_batch(contents, "document_chunk", "admin_shared", metadatas, embeddings)
+    print(f"🌱 코퍼스 {size:,}건 저장 ({time.perf_counter() - started:.1f}초, 개인 대화 {personal:,}건)")
+
+
+async def seed_aura(memory_manager, size: int, seed: int):
+    """aura_system 메모리 저장 (store_memory 경로, 임베딩 포함)"""
+    rng = random.Random(seed + 2)
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(16)
+
+    async def store(i: int):
+        async with semaphore:
+            await memory_manager.store_memory(
+                f"[{i}] " + make_sentence(rng, words=rng.randint(10, 30)),
+                {"source": BENCH_SOURCE, "user_id": BENCH_USER, "session_id": f"bench_{i % 20}"}
+            )
+
+    await asyncio.gather(*(store(i) for i in range(size)))
+    print(f"🌱 aura 메모리 {size:,}건 저장 ({time.perf_counter() - started:.1f}초)")
+
+
+# ==================== 앱 실행 ====================
+
+async def start_app(port: int, timeout: float = 120.0, workers: int = 1) -> subprocess.Popen:
+    """uvicorn으로 app을 실행하고 /health가 응답할 때까지 대기"""
+    import httpx
+
+    log_path = os.path.join(tempfile.gettempdir(), f"eora-bench-app-{port}.log")
+    log_file = open(log_path, "w", encoding="utf-8")
+    command = [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    if workers > 1:
+        command += ["--workers", str(workers)]
+    process = subprocess.Popen(
+        command,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=log_file, stderr=subprocess.STDOUT, env=os.environ.copy()
+    )
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise SystemExit(f"❌ 앱이 시작 중 종료되었습니다 (로그: {log_path})")
+            try:
+                if (await client.get("/health", timeout=2.0)).status_code == 200:
+                    print(f"🚀 앱 실행: http://127.0.0.1:{port} ({time.perf_counter() - started:.1f}초, 로그: {log_path})")
+                    return process
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    process.kill()
+    raise SystemExit(f"❌ 앱 시작 시간 초과 (로그: {log_path})")
+
+
+def stop_app(process: Optional[subprocess.Popen]):
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# ==================== 시나리오 ====================
+
+async def bench_recall(memory_system, queries: List[str], args) -> Dict[str, Any]:
+    async def operation(i: int):
+        await memory_system.enhanced_recall(queries[i % len(queries)], BENCH_USER, limit=5)
+    return await run_load("recall", operation, args.requests, args.concurrency)
+
+
+async def bench_engine(engine, queries: List[str], args) -> Dict[str, Any]:
+    async def operation(i: int):
+        await engine.recall(queries[i % len(queries)], context={"user_id": BENCH_USER}, limit=3)
+    return await run_load("engine", operation, args.requests, args.concurrency)
+
+
+async def bench_chat(client, queries: List[str], args) -> Dict[str, Any]:
+    async def operation(i: int):
+        # 가상 사용자(동시성 슬롯)마다 세션 하나
+        response = await client.post("/api/chat", json={
+            "session_id": f"session_bench_{i % args.concurrency}",
+            "message": queries[i % len(queries)]
+        })
+        data = response.json()
+        if response.status_code != 200 or not data.get("success"):
+            raise RuntimeError(f"HTTP {response.status_code}: {str(data)[:200]}")
+    return await run_load("chat", operation, args.requests, args.concurrency)
+
+
+async def bench_learn(client, args) -> Dict[str, Any]:
+    rng = random.Random(args.seed + 3)
+
+    async def operation(i: int):
+        text = "\n\n".join(make_sentence(rng, words=80) for _ in range(max(1, args.learn_kb * 1024 // 400)))
+        response = await client.post(
+            "/api/admin/learn-file",
+            files={"file": (f"bench_learn_{i}_{rng.random():.6f}.txt", text.encode("utf-8"), "text/plain")}
+        )
+        data = response.json()
+        if not data.get("success"):
+            raise RuntimeError(data.get("message"))
+        # 작업 완료까지 폴링 (등록 ~ 저장 완료의 전체 지연)
+        while True:
+            await asyncio.sleep(0.2)
+            job = (await client.get(data["status_url"])).json().get("job") or {}
+            if job.get("status") == "completed":
+                return
+            if job.get("status") == "failed" or not job:
+                raise RuntimeError(job.get("error") or "학습 작업을 찾을 수 없음")
+
+    return await run_load("learn", operation, args.learn_jobs, min(args.concurrency, 2))
+
+
+async def run_size(size: int, args, mongo_uri: str) -> Dict[str, Any]:
+    print(f"\n📦 코퍼스 크기 {size:,}")
+    clear_benchmark_data(mongo_uri)
+    scenarios = args.scenarios
+    queries = make_queries(args.seed, args.query_pool)
+    results: Dict[str, Any] = {}
+
+    if scenarios & {"recall", "chat", "learn"}:
+        from eora_memory_system import EORAMemorySystem
+        memory_system = EORAMemorySystem()
+        if not memory_system.is_connected():
+            raise SystemExit("❌ EORA 메모리 시스템이 MongoDB에 연결되지 않았습니다")
+        await seed_corpus(memory_system, size, args.seed)
+        # 청크 벡터 색인 적재 대기
+        deadline = time.time() + 120
+        while memory_system.chunk_vectors is None and time.time() < deadline:
+            await asyncio.sleep(0.5)
+        if "recall" in scenarios:
+            results["recall"] = await bench_recall(memory_system, queries, args)
+
+    if "engine" in scenarios:
+        from aura_system.memory_manager import get_memory_manager
+        from aura_system.recall_engine import RecallEngine
+        memory_manager = await get_memory_manager()
+        await seed_aura(memory_manager, min(size, args.engine_seed), args.seed)
+        results["engine"] = await bench_engine(RecallEngine(memory_manager), queries, args)
+
+    if scenarios & {"chat", "learn"}:
+        import httpx
+        port = free_port()
+        app_process = await start_app(port)
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120.0,
+                                         cookies={"user_email": BENCH_USER},
+                                         limits=httpx.Limits(max_connections=args.concurrency * 2)) as client:
+                if "chat" in scenarios:
+                    # 연결/지연 초기화 예열 (측정 제외)
+                    await client.post("/api/chat", json={"session_id": "session_bench_warmup", "message": queries[0]})
+                    results["chat"] = await bench_chat(client, queries, args)
+                if "learn" in scenarios:
+                    results["learn"] = await bench_learn(client, args)
+        finally:
+            stop_app(app_process)
+
+    if not args.keep_data:
+        clear_benchmark_data(mongo_uri)
+    return results
+
+
+# ==================== 기준선 비교 ====================
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """기준선 대비 변화율을 출력하고 허용치를 넘는 회귀 목록을 반환합니다."""
+    regressions = []
+    print(f"\n📐 기준선 비교 (허용치 ±{tolerance:.0%})")
+    for size, scenarios in report["results"].items():
+        for scenario, current in scenarios.items():
+            previous = baseline.get("results", {}).get(size, {}).get(scenario)
+            if not previous:
+                print(f"   {size:>7} {scenario:<7} 기준선 없음")
+                continue
+            changes = []
+            for metric in LATENCY_METRICS + (THROUGHPUT_METRIC,):
+                before, after = previous.get(metric), current.get(metric)
+                if not before or after is None:
+                    continue
+                change = (after - before) / before
+                worse = change > tolerance if metric in LATENCY_METRICS else change < -tolerance
+                changes.append(f"{metric}={after:g} ({change:+.1%}){' ❗' if worse else ''}")
+                if worse:
+                    regressions.append(f"{size}/{scenario}/{metric}: {before:g} -> {after:g} ({change:+.1%})")
+            print(f"   {size:>7} {scenario:<7} " + ", ".join(changes))
+    return regressions
+
+
+# ==================== 실행 ====================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="채팅/회상 파이프라인 오프라인 벤치마크")
+    parser.add_argument("--sizes", default="10000,100000", help="코퍼스 크기 목록 (쉼표 구분)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"실행할 시나리오 ({','.join(SCENARIOS)})")
+    parser.add_argument("--requests", type=int, default=200, help="시나리오별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--query-pool", type=int, default=100, help="서로 다른 질문 수 (반복되면 회상 캐시 적중)")
+    parser.add_argument("--no-recall-cache", action="store_true", help="회상 결과 캐시 비활성화 (TTL 0)")
+    parser.add_argument("--engine-seed", type=int, default=2000, help="RecallEngine용 aura 메모리 최대 저장 수")
+    parser.add_argument("--learn-jobs", type=int, default=5, help="learn-file 작업 수")
+    parser.add_argument("--learn-kb", type=int, default=256, help="learn-file 파일 크기 (KB)")
+    parser.add_argument("--seed", type=int, default=42, help="코퍼스/질문 난수 시드")
+    parser.add_argument("--chat-latency-ms", type=float, default=300.0, help="가짜 OpenAI 채팅 지연")
+    parser.add_argument("--token-latency-ms", type=float, default=5.0, help="가짜 OpenAI 스트리밍 조각 간 지연")
+    parser.add_argument("--embed-latency-ms", type=float, default=50.0, help="가짜 OpenAI 임베딩 요청 지연")
+    parser.add_argument("--mongo-uri", help="기존 MongoDB URI (없으면 임시 mongod 실행)")
+    parser.add_argument("--keep-data", action="store_true", help="종료 후 벤치마크 데이터 유지")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준선 JSON")
+    parser.add_argument("--save-baseline", help="이번 결과를 기준선으로 저장할 경로")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="회귀로 판정할 변화율")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    args.scenarios = {name.strip() for name in args.scenarios.split(",") if name.strip()}
+    unknown = args.scenarios - set(SCENARIOS)
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+    return args
+
+
+async def main() -> int:
+    args = parse_args()
+    fake_openai = FakeOpenAIServer(config=FakeOpenAIConfig(
+        chat_latency_ms=args.chat_latency_ms,
+        token_latency_ms=args.token_latency_ms,
+        embed_latency_ms=args.embed_latency_ms
+    )).start()
+    print(f"🧪 가짜 OpenAI 서버: {fake_openai.base_url}")
+
+    mongod = None if args.mongo_uri else start_mongod()
+    mongo_uri = args.mongo_uri or mongod["uri"]
+    if args.mongo_uri:
+        print(f"⚠️ 기존 MongoDB 사용: {mongo_uri} (source={BENCH_SOURCE} 데이터를 심고 종료 시 삭제)")
+    configure_environment(mongo_uri, fake_openai.base_url, not args.no_recall_cache)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            key: (sorted(value) if isinstance(value, set) else value)
+            for key, value in vars(args).items()
+            if key not in ("output", "baseline", "save_baseline", "mongo_uri")
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "results": {}
+    }
+    try:
+        for size in args.sizes:
+            report["results"][str(size)] = await run_size(size, args, mongo_uri)
+    finally:
+        fake_openai.stop()
+        stop_mongod(mongod)
+    report["fake_openai_requests"] = fake_openai.config.stats
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"\n💾 결과 저장: {args.output}")
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"💾 기준선 저장: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ 회귀 {len(regressions)}건:")
+            for line in regressions:
+                print(f"   - {line}")
+            return 1
+        print("\n✅ 기준선 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+키워드 회상 벤치마크
+기존 다중 필드 $regex 검색(recall_learned_content의 $or 조건)과
+키워드 역색인(KeywordIndex, BM25)의 검색 지연을 비교합니다.
+
+실행 중인 MongoDB가 필요하며, 별도 벤치마크 DB를 만든 뒤 종료 시 삭제합니다.
+
+사용 예:
+    python benchmark_keyword_search.py
+    python benchmark_keyword_search.py --sizes 100000,300000 --queries 30 --mongo-uri mongodb://localhost:27017
+"""
+
+import os
+import random
+import argparse
+import statistics
+import time
+
+from pymongo import MongoClient
+
+from keyword_index import KeywordIndex, annotate_document
+
+NOUNS = [
+    "회상", "기억", "감정", "신념", "학습", "데이터베이스", "인공지능", "의식", "직감", "대화",
+    "서울", "부산", "여행", "음식", "음악", "영화", "프로그래밍", "파이썬", "서버", "네트워크",
+    "건강", "운동", "수면", "독서", "철학", "역사", "경제", "투자", "가족", "친구",
+    "회사", "프로젝트", "일정", "회의", "보고서", "문서", "파일", "업로드", "검색", "성능"
+]
+JOSA = ["은", "는", "이", "가", "을", "를", "에서", "으로", "의", "와", ""]
+VERBS = ["했습니다", "합니다", "좋아요", "필요합니다", "궁금해요", "정리했다", "기록한다"]
+
+# 기존 recall_learned_content가 사용하던 $regex 필드
+REGEX_FIELDS = [
+    "content", "response", "message", "category", "topic", "filename", "source_file",
+    "metadata.filename", "source", "upload_type", "metadata.source", "metadata.upload_type",
+    "metadata.file_extension", "metadata.uploader_email"
+]
+
+
+def make_sentence(rng: random.Random, words: int = 30) -> str:
+    parts = []
+    for _ in range(words):
+        parts.append(rng.choice(NOUNS) + rng.choice(JOSA))
+        if rng.random() < 0.2:
+            parts.append(rng.choice(VERBS))
+    return " ".join(parts)
+
+
+def make_document(rng: random.Random, i: int):
+    return {
+        "user_id": f"user_{i % 50}",
+        "content": make_sentence(rng),
+        "memory_type": rng.choice(["document_chunk", "enhanced_learning", "conversation"]),
+        "topic": rng.choice(NOUNS),
+        "keywords": rng.sample(NOUNS, 3),
+        "filename": f"{rng.choice(NOUNS)}_{i % 200}.txt",
+        "metadata": {"filename": f"{rng.choice(NOUNS)}_{i % 200}.txt", "source": "benchmark"}
+    }
+
+
+def regex_query(query: str):
+    """기존 방식: 20개 가까운 대소문자 무시 $regex 조건의 $or"""
+    conditions = [{field: {"$regex": query, "$options": "i"}} for field in REGEX_FIELDS]
+    conditions += [
+        {"keywords": {"$elemMatch": {"$regex": query, "$options": "i"}}},
+        {"tags": {"$elemMatch": {"$regex": query, "$options": "i"}}},
+        {"keywords": {"$in": [query]}},
+        {"tags": {"$in": [query]}}
+    ]
+    return {"$or": conditions}
+
+
+def measure(func, queries):
+    """쿼리별 지연(ms)을 측정합니다."""
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        func(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "mean": statistics.fmean(timings)
+    }
+
+
+def run(client: MongoClient, db_name: str, size: int, num_queries: int, limit: int):
+    rng = random.Random(42)
+    collection = client[db_name][f"memories_{size}"]
+    collection.drop()
+
+    print(f"\n📊 {size:,}개 메모리")
+    started = time.perf_counter()
+    batch = []
+    for i in range(size):
+        batch.append(annotate_document(make_document(rng, i)))
+        if len(batch) >= 5000:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+    index = KeywordIndex(collection)
+    index.ensure_indexes()
+    collection.create_index([("timestamp", -1)])
+    print(f"   적재 + 색인: {(time.perf_counter() - started):.2f}s")
+
+    queries = [rng.choice(NOUNS) + rng.choice(JOSA) for _ in range(num_queries)]
+    # df/평균 길이 캐시를 미리 채워 정상 상태 지연을 측정
+    index.search(queries[0], limit=limit)
+
+    index_stats = measure(lambda q: index.search(q, limit=limit), queries)
+    print(f"   역색인(BM25): p50 {index_stats['p50']:.2f}ms | p95 {index_stats['p95']:.2f}ms | 평균 {index_stats['mean']:.2f}ms")
+
+    regex_queries = queries[:max(1, num_queries // 5)]
+    regex_stats = measure(
+        lambda q: list(collection.find(regex_query(q)).sort("timestamp", -1).limit(limit)),
+        regex_queries
+    )
+    print(f"   기존 $regex:  p50 {regex_stats['p50']:.2f}ms | p95 {regex_stats['p95']:.2f}ms | 평균 {regex_stats['mean']:.2f}ms")
+    print(f"   속도 향상: {regex_stats['p50'] / index_stats['p50']:.1f}배")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="키워드 회상 벤치마크 ($regex vs 역색인)")
+    parser.add_argument("--sizes", default="100000", help="메모리 수 목록 (쉼표 구분)")
+    parser.add_argument("--queries", type=int, default=20, help="측정할 쿼리 수")
+    parser.add_argument("--limit", type=int, default=5, help="결과 수")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="eora_keyword_benchmark", help="벤치마크용 임시 DB 이름")
+    parser.add_argument("--keep", action="store_true", help="종료 후 벤치마크 DB를 남김")
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongo_uri, serverSelectionTimeoutMS=5000)
+    client.admin.command("ping")
+    try:
+        for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+            run(client, args.db, size, args.queries, args.limit)
+    finally:
+        if not args.keep:
+            client.drop_database(args.db)
+
+
+if __name__ == "__main__":
+    main()
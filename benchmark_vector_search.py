@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+VectorStore.search_vectors 벤치마크
+기존 방식(전체 문서 순회 + 파이썬 루프 코사인 유사도)과
+메모리 내 벡터 행렬(VectorMatrixIndex)의 검색 지연을 비교합니다.
+
+MongoDB 전송 비용은 제외하고 순수 계산 비용만 측정합니다.
+
+사용 예:
+    python benchmark_vector_search.py
+    python benchmark_vector_search.py --sizes 10000,100000 --dim 1536 --queries 20
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from aura_system.vector_matrix import VectorMatrixIndex
+
+
+def legacy_search(rows, query_vector, limit, threshold):
+    """기존 search_vectors의 유사도 계산 루프 (문서 dict 목록 순회)"""
+    results = []
+    for vector_data in rows:
+        vector = np.array(vector_data["vector"])
+        dot_product = np.dot(query_vector, vector)
+        norm1 = np.linalg.norm(query_vector)
+        norm2 = np.linalg.norm(vector)
+        similarity = 0.0 if norm1 == 0 or norm2 == 0 else float(dot_product / (norm1 * norm2))
+        if similarity >= threshold:
+            results.append({**vector_data, "similarity": similarity})
+    results.sort(key=lambda x: x["similarity"], reverse=True)
+    return results[:limit]
+
+
+def measure(func, queries):
+    """쿼리별 지연(ms)을 측정합니다."""
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        func(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "mean": statistics.fmean(timings)
+    }
+
+
+def run(size, dim, num_queries, limit, threshold, legacy_max):
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((size, dim), dtype=np.float32)
+    queries = [rng.standard_normal(dim, dtype=np.float32) for _ in range(num_queries)]
+
+    print(f"\n📊 {size:,}개 벡터 (차원 {dim})")
+
+    started = time.perf_counter()
+    index = VectorMatrixIndex(dimension=dim, initial_capacity=size)
+    for i in range(size):
+        index.upsert(f"vec_{i}", vectors[i])
+    print(f"   행렬 적재: {(time.perf_counter() - started):.2f}s")
+
+    matrix_stats = measure(lambda q: index.search(q, limit, threshold), queries)
+    print(f"   행렬 검색:  p50 {matrix_stats['p50']:.2f}ms | p95 {matrix_stats['p95']:.2f}ms | 평균 {matrix_stats['mean']:.2f}ms")
+
+    if size <= legacy_max:
+        rows = [{"vector_id": f"vec_{i}", "vector": vectors[i].tolist()} for i in range(size)]
+        legacy_queries = queries[:max(1, num_queries // 5)]
+        legacy_stats = measure(lambda q: legacy_search(rows, q, limit, threshold), legacy_queries)
+        print(f"   기존 방식:  p50 {legacy_stats['p50']:.2f}ms | p95 {legacy_stats['p95']:.2f}ms | 평균 {legacy_stats['mean']:.2f}ms")
+        print(f"   속도 향상: {legacy_stats['p50'] / matrix_stats['p50']:.1f}배")
+
+        expected = [r["vector_id"] for r in legacy_search(rows, queries[0], limit, threshold)]
+        actual = [vector_id for vector_id, _ in index.search(queries[0], limit, threshold)]
+        print(f"   결과 일치: {'✅' if expected == actual else '❌'}")
+    else:
+        print(f"   기존 방식: 건너뜀 (--legacy-max {legacy_max:,} 초과)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VectorStore 벡터 검색 벤치마크")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="벡터 수 목록 (쉼표 구분)")
+    parser.add_argument("--dim", type=int, default=1536, help="벡터 차원 (1M x 1536 ≈ 6GB 메모리)")
+    parser.add_argument("--queries", type=int, default=20, help="측정할 쿼리 수")
+    parser.add_argument("--limit", type=int, default=10, help="top-k")
+    parser.add_argument("--threshold", type=float, default=0.0, help="최소 유사도")
+    parser.add_argument("--legacy-max", type=int, default=100000, help="기존 방식을 측정할 최대 벡터 수")
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        run(size, args.dim, args.queries, args.limit, args.threshold, args.legacy_max)
+
+
+if __name__ == "__main__":
+    main()
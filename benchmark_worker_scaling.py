@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+공유 상태 모드 워커 수 확장성 부하 테스트
+EORA_SHARED_STATE(mongo/redis)로 app을 uvicorn --workers N 으로 실행하고,
+워커 수별 처리량이 N에 비례하는지(확장 효율)와 워커 간 상태 일관성을 확인합니다.
+
+단계 (워커 수마다 새 공유 상태 저장소 사용):
+    1. 일관성 확인 - 사용자 가입 후 매번 새 연결(임의의 워커)로 로그인 확인, 세션 생성,
+       세션 목록에 방금 만든 세션이 보이는지 확인
+    2. 부하 - 여러 부하 생성 프로세스가 duration 동안 요청을 보내고 처리량/지연을 집계
+       sessions  GET /api/sessions (인증 + 세션 색인, OpenAI 호출 없음)
+       chat      POST /api/chat (가짜 OpenAI 서버, 회상/프롬프트/저장 포함)
+
+확장 효율 = 처리량(N) / (N × 처리량(1)). CPU 코어 수 이하의 N에서 --min-efficiency 미만이면
+종료 코드 1을 반환합니다. 부하 생성기와 가짜 OpenAI 서버도 CPU를 쓰므로
+N + 부하 생성 프로세스 수가 코어 수를 넘지 않게 설정해야 의미 있는 결과가 나옵니다.
+
+사용 예:
+    python benchmark_worker_scaling.py --workers 1,2,4 --backend mongo --duration 20
+    python benchmark_worker_scaling.py --workers 1,2,4,8 --backend redis --redis-url redis://127.0.0.1:6379/15 --scenarios sessions
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from benchmark_chat_pipeline import (
+    BENCH_USER, configure_environment, free_port, make_queries, percentile, start_app, start_mongod,
+    stop_app, stop_mongod
+)
+
+SCENARIOS = ("sessions", "chat")
+# 부하 생성 프로세스마다 보관하는 지연 시간 표본 수
+LATENCY_SAMPLE_LIMIT = 5000
+# 세션 하나에 보내는 채팅 수 (대화 기록이 계속 길어지지 않도록 교체)
+CHAT_TURNS_PER_SESSION = 10
+# 세션 목록 일관성 확인 시도 횟수와 첫 재시도 대기 시간 (초, 시도마다 2배)
+CONSISTENCY_ATTEMPTS = 5
+CONSISTENCY_BACKOFF = 0.1
+
+
+# ==================== 부하 생성 (하위 프로세스) ====================
+
+def load_client_process(base_url: str, scenario: str, duration: float, concurrency: int,
+                        client_id: int, queries: List[str]) -> Dict[str, Any]:
+    """부하 생성 프로세스 하나: duration 동안 concurrency개 요청을 계속 보냄"""
+    return asyncio.run(_load_client(base_url, scenario, duration, concurrency, client_id, queries))
+
+
+async def _load_client(base_url: str, scenario: str, duration: float, concurrency: int,
+                       client_id: int, queries: List[str]) -> Dict[str, Any]:
+    import httpx
+
+    rng = random.Random(client_id)
+    latencies: List[float] = []
+    completed = 0
+    errors = 0
+    first_error: Optional[str] = None
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, cookies={"user_email": BENCH_USER},
+                                 limits=httpx.Limits(max_connections=concurrency * 2)) as client:
+        async def slot(slot_id: int):
+            nonlocal completed, errors, first_error
+            turn = 0
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    if scenario == "chat":
+                        session_id = f"session_scale_{client_id}_{slot_id}_{turn // CHAT_TURNS_PER_SESSION}"
+                        response = await client.post("/api/chat", json={
+                            "session_id": session_id, "message": rng.choice(queries)
+                        })
+                    else:
+                        response = await client.get("/api/sessions", params={"limit": 20})
+                    data = response.json()
+                    if response.status_code != 200 or not data.get("success", True):
+                        raise RuntimeError(f"HTTP {response.status_code}: {str(data)[:200]}")
+                    completed += 1
+                    if len(latencies) < LATENCY_SAMPLE_LIMIT:
+                        latencies.append((time.perf_counter() - started) * 1000)
+                except Exception as e:
+                    errors += 1
+                    first_error = first_error or f"{type(e).__name__}: {e}"
+                turn += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(slot(i) for i in range(concurrency)))
+        wall_sec = time.perf_counter() - started
+
+    return {"completed": completed, "errors": errors, "first_error": first_error,
+            "latencies": latencies, "wall_sec": wall_sec}
+
+
+def run_load(base_url: str, scenario: str, args, queries: List[str]) -> Dict[str, Any]:
+    """부하 생성 프로세스들을 실행하고 결과를 합산"""
+    with ProcessPoolExecutor(max_workers=args.clients) as pool:
+        futures = [
+            pool.submit(load_client_process, base_url, scenario, args.duration, args.concurrency, i, queries)
+            for i in range(args.clients)
+        ]
+        parts = [future.result() for future in futures]
+
+    completed = sum(part["completed"] for part in parts)
+    errors = sum(part["errors"] for part in parts)
+    wall_sec = max(part["wall_sec"] for part in parts)
+    latencies = sorted(latency for part in parts for latency in part["latencies"])
+    result = {
+        "completed": completed,
+        "errors": errors,
+        "throughput_rps": round(completed / wall_sec, 2) if wall_sec > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "wall_sec": round(wall_sec, 2)
+    }
+    first_error = next((part["first_error"] for part in parts if part["first_error"]), None)
+    if first_error:
+        result["first_error"] = first_error
+    print(f"   ⏱️ {scenario:<8} n={completed:<7} err={errors:<4} p50={result['p50_ms']:>8.1f}ms "
+          f"p95={result['p95_ms']:>8.1f}ms {result['throughput_rps']:>8.1f} req/s")
+    return result
+
+
+# ==================== 일관성 확인 ====================
+
+async def check_consistency(base_url: str, users: int) -> Dict[str, Any]:
+    """
+    가입/로그인/세션 생성/목록 조회를 매번 새 연결로 보내 워커 간 상태가 맞는지 확인합니다.
+    (새 연결은 커널이 임의의 워커에 배정)
+    """
+    import httpx
+
+    failures: List[str] = []
+    retried = 0
+    run_id = uuid.uuid4().hex[:8]
+
+    async def fresh(method: str, path: str, email: Optional[str] = None, **kwargs):
+        cookies = {"user_email": email} if email else None
+        async with httpx.AsyncClient(base_url=base_url, timeout=30.0, cookies=cookies) as client:
+            return await client.request(method, path, **kwargs)
+
+    async def one(i: int):
+        email = f"scale_{run_id}_{i}@bench.eora.ai"
+        response = await fresh("POST", "/api/auth/register", json={
+            "email": email, "password": "bench1234", "name": f"bench {i}"
+        })
+        if response.status_code != 200:
+            failures.append(f"{email} 가입 실패: HTTP {response.status_code}")
+            return
+        created = await fresh("POST", "/api/sessions", email, json={"name": "scale check"})
+        session_id = (created.json().get("session") or {}).get("id") if created.status_code == 200 else None
+        if not session_id:
+            failures.append(f"{email} 세션 생성 실패 (로그인 인식 안 됨?): HTTP {created.status_code}")
+            return
+        # 다른 워커에 알림이 도착하기 전일 수 있으므로 간격을 늘려 가며 다시 확인하고 마지막 결과만 기록
+        nonlocal retried
+        delay = CONSISTENCY_BACKOFF
+        for attempt in range(CONSISTENCY_ATTEMPTS):
+            if attempt:
+                retried += 1
+                await asyncio.sleep(delay)
+                delay *= 2
+            listed = await fresh("GET", "/api/sessions", email)
+            ids = [session.get("id") for session in listed.json().get("sessions", [])] if listed.status_code == 200 else []
+            if session_id in ids:
+                return
+        failures.append(f"{email} 세션 목록에 {session_id} 없음 ({CONSISTENCY_ATTEMPTS}회 시도)")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(users)))
+    result = {"users": users, "failures": len(failures), "retries": retried,
+              "sec": round(time.perf_counter() - started, 2)}
+    if failures:
+        result["examples"] = failures[:5]
+    print(f"   🔎 일관성 확인: 사용자 {users}명, 실패 {len(failures)}건, 재시도 {retried}회")
+    return result
+
+
+# ==================== 실행 ====================
+
+async def wait_until_ready(base_url: str, workers: int, timeout: float = 180.0):
+    """모든 워커가 준비되도록 /ready 가 연속으로 200을 반환할 때까지 대기"""
+    import httpx
+
+    needed = workers * 4
+    streak = 0
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        async with httpx.AsyncClient(base_url=base_url, timeout=5.0) as client:
+            try:
+                streak = streak + 1 if (await client.get("/ready")).status_code == 200 else 0
+            except httpx.HTTPError:
+                streak = 0
+        if streak >= needed:
+            return
+        await asyncio.sleep(0.1 if streak else 0.5)
+    raise SystemExit("❌ 워커 준비 시간 초과 (/ready)")
+
+
+def configure_shared_state(args, workers: int, run_id: str):
+    """워커 수마다 새 공유 상태 저장소 (이전 실행의 데이터와 섞이지 않게)"""
+    os.environ["EORA_SHARED_STATE"] = args.backend
+    if args.backend == "redis":
+        os.environ["EORA_REDIS_URL"] = args.redis_url
+        os.environ["EORA_SHARED_STATE_PREFIX"] = f"eora:bench:{run_id}:{workers}"
+    else:
+        os.environ["DATABASE_NAME"] = f"eora_bench_scale_{run_id}_{workers}"
+
+
+def drop_shared_state(args, mongo_uri: str, workers: int, run_id: str):
+    if args.backend == "redis":
+        import redis
+        client = redis.Redis.from_url(args.redis_url)
+        keys = list(client.scan_iter(match=f"eora:bench:{run_id}:{workers}:*", count=1000))
+        if keys:
+            client.delete(*keys)
+    else:
+        from pymongo import MongoClient
+        MongoClient(mongo_uri, serverSelectionTimeoutMS=3000).drop_database(f"eora_bench_scale_{run_id}_{workers}")
+
+
+async def run_workers(workers: int, args, mongo_uri: str, run_id: str, queries: List[str]) -> Dict[str, Any]:
+    print(f"\n👷 워커 {workers}개")
+    configure_shared_state(args, workers, run_id)
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    app_process = await start_app(port, workers=workers)
+    try:
+        await wait_until_ready(base_url, workers)
+        result: Dict[str, Any] = {"consistency": await check_consistency(base_url, args.users)}
+        for scenario in args.scenarios:
+            # 예열 (연결/지연 초기화, 측정 제외)
+            await asyncio.to_thread(run_load, base_url, scenario,
+                                    argparse.Namespace(**{**vars(args), "duration": 2.0}), queries)
+            result[scenario] = await asyncio.to_thread(run_load, base_url, scenario, args, queries)
+        return result
+    finally:
+        stop_app(app_process)
+        if not args.keep_data:
+            drop_shared_state(args, mongo_uri, workers, run_id)
+
+
+def scaling_report(results: Dict[str, Dict[str, Any]], scenarios: List[str]) -> Dict[str, Dict[str, Any]]:
+    """시나리오별 워커 수 대비 처리량 확장 효율"""
+    report = {}
+    for scenario in scenarios:
+        base = results.get("1", {}).get(scenario, {}).get("throughput_rps")
+        report[scenario] = {}
+        for workers, result in results.items():
+            rps = result.get(scenario, {}).get("throughput_rps", 0.0)
+            report[scenario][workers] = {
+                "throughput_rps": rps,
+                "speedup": round(rps / base, 2) if base else None,
+                "efficiency": round(rps / (base * int(workers)), 2) if base else None
+            }
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="공유 상태 모드 워커 수 확장성 부하 테스트")
+    parser.add_argument("--workers", default="1,2,4", help="워커 수 목록 (쉼표 구분, 1 포함 권장)")
+    parser.add_argument("--backend", choices=("mongo", "redis"), default="mongo", help="공유 상태 백엔드")
+    parser.add_argument("--mongo-uri", help="기존 MongoDB URI (없으면 임시 mongod 실행)")
+    parser.add_argument("--redis-url", default="redis://127.0.0.1:6379/15", help="--backend redis 일 때 Redis URL")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"부하 시나리오 ({','.join(SCENARIOS)})")
+    parser.add_argument("--duration", type=float, default=20.0, help="시나리오별 측정 시간 (초)")
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) // 4), help="부하 생성 프로세스 수")
+    parser.add_argument("--concurrency", type=int, default=32, help="부하 생성 프로세스당 동시 요청 수")
+    parser.add_argument("--users", type=int, default=20, help="일관성 확인용 가입 사용자 수")
+    parser.add_argument("--chat-latency-ms", type=float, default=0.0, help="가짜 OpenAI 채팅 지연 (0이면 앱 CPU가 병목)")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="가짜 OpenAI 임베딩 지연")
+    parser.add_argument("--min-efficiency", type=float, default=0.7, help="코어 수 이하 워커에서 요구하는 최소 확장 효율")
+    parser.add_argument("--keep-data", action="store_true", help="종료 후 공유 상태 데이터 유지")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+    args.workers = sorted({int(n) for n in args.workers.split(",") if n.strip()})
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+    return args
+
+
+def start_fake_openai(args) -> subprocess.Popen:
+    """가짜 OpenAI 서버를 별도 프로세스로 실행 (부하 생성기와 CPU를 나눠 쓰지 않도록)"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "fake_openai_server.py", "--port", str(port),
+         "--chat-latency-ms", str(args.chat_latency_ms), "--token-latency-ms", "0",
+         "--embed-latency-ms", str(args.embed_latency_ms)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    process.base_url = f"http://127.0.0.1:{port}/v1"
+    time.sleep(1.0)
+    return process
+
+
+async def main() -> int:
+    args = parse_args()
+    cpu_count = os.cpu_count() or 1
+    if max(args.workers) + args.clients > cpu_count:
+        print(f"⚠️ 워커 {max(args.workers)} + 부하 생성 {args.clients} > CPU {cpu_count}: "
+              f"코어를 넘는 워커 수의 효율은 판정에서 제외합니다")
+
+    fake_openai = start_fake_openai(args)
+    mongod = None if args.mongo_uri else start_mongod()
+    mongo_uri = args.mongo_uri or mongod["uri"]
+    configure_environment(mongo_uri, fake_openai.base_url, recall_cache=True)
+
+    run_id = uuid.uuid4().hex[:8]
+    queries = make_queries(42, 200)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for workers in args.workers:
+            results[str(workers)] = await run_workers(workers, args, mongo_uri, run_id, queries)
+    finally:
+        stop_app(fake_openai)
+        stop_mongod(mongod)
+
+    scaling = scaling_report(results, args.scenarios)
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "mongo_uri")},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": cpu_count},
+        "results": results,
+        "scaling": scaling
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"\n💾 결과 저장: {args.output}")
+
+    print("\n📈 확장 효율 (처리량(N) / (N × 처리량(1)))")
+    problems = []
+    for scenario, rows in scaling.items():
+        for workers, row in rows.items():
+            print(f"   {scenario:<8} 워커 {workers:>2}: {row['throughput_rps']:>8.1f} req/s "
+                  f"x{row['speedup'] or 0:.2f} 효율 {row['efficiency'] or 0:.2f}")
+            judged = int(workers) + args.clients <= cpu_count
+            if judged and row["efficiency"] is not None and row["efficiency"] < args.min_efficiency:
+                problems.append(f"{scenario} 워커 {workers}: 효율 {row['efficiency']:.2f} < {args.min_efficiency}")
+    for workers, result in results.items():
+        if result["consistency"]["failures"]:
+            problems.append(f"워커 {workers}: 일관성 실패 {result['consistency']['failures']}건 "
+                            f"{result['consistency'].get('examples')}")
+
+    if problems:
+        print(f"\n❌ 문제 {len(problems)}건:")
+        for line in problems:
+            print(f"   - {line}")
+        return 1
+    print("\n✅ 워커 수에 비례하는 처리량, 워커 간 상태 일관성 확인")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
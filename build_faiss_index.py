@@ -35,6 +35,10 @@ if embeddings:
     faiss.write_index(index, index_file)
     with open(id_map_file, "wb") as f:
         pickle.dump(ids, f)
+    # 전체 재구축이 실시간 인덱스의 WAL을 대체함
+    for wal_file in (index_file + ".wal", index_file + ".wal.old"):
+        if os.path.exists(wal_file):
+            os.remove(wal_file)
     print(f"✅ 인덱스 생성 완료: {len(embeddings)}개 벡터 → {index_file}")
 else:
     print("❌ 유효한 벡터가 없습니다. faiss index 생성 실패.")
\ No newline at end of file
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+학습 문서 청크 임베딩
+학습 시점에 청크 임베딩을 배치로 생성하여 문서에 함께 저장합니다.
+
+- 작은 차원(기본 256)의 text-embedding-3-small 벡터를 float32 바이트로 저장 (청크당 1KB)
+- 공유 임베딩 캐시(embedding_cache)를 먼저 확인하고 없는 텍스트만 API로 요청
+- 한 번의 API 호출에 최대 100개 청크를 묶어서 요청
+"""
+
+import os
+import logging
+from array import array
+from typing import Any, Dict, List, Optional
+
+from embedding_cache import get_embedding_cache
+
+logger = logging.getLogger(__name__)
+
+CHUNK_EMBEDDING_MODEL = os.getenv("EORA_CHUNK_EMBEDDING_MODEL", "text-embedding-3-small")
+CHUNK_EMBEDDING_DIM = int(os.getenv("EORA_CHUNK_EMBEDDING_DIM", "256"))
+CHUNK_EMBEDDING_BATCH = int(os.getenv("EORA_EMBEDDING_BATCH_MAX", "100"))
+# 문서에 저장하는 필드 이름
+CHUNK_EMBEDDING_FIELD = "chunk_embedding"
+
+# 캐시 키용 모델명 (차원이 다르면 벡터도 다름)
+_CACHE_MODEL = f"{CHUNK_EMBEDDING_MODEL}:{CHUNK_EMBEDDING_DIM}"
+_client = None
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            return None
+        from openai import AsyncOpenAI
+        _client = AsyncOpenAI(api_key=api_key)
+    return _client
+
+
+async def embed_texts(texts: List[str]) -> List[Optional[bytes]]:
+    """
+    텍스트 목록의 임베딩을 float32 바이트로 반환합니다 (실패한 항목은 None).
+
+    Args:
+        texts: 임베딩할 텍스트 목록
+
+    Returns:
+        List[Optional[bytes]]: 입력 순서와 같은 임베딩 목록
+    """
+    cache = get_embedding_cache()
+    results: List[Optional[bytes]] = [None] * len(texts)
+    missing: Dict[str, List[int]] = {}
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            continue
+        cached = await cache.aget_bytes(text, _CACHE_MODEL)
+        if cached is not None:
+            results[i] = cached
+        else:
+            missing.setdefault(text, []).append(i)
+
+    client = _get_client() if missing else None
+    if client is None:
+        return results
+
+    pending = list(missing)
+    for start in range(0, len(pending), CHUNK_EMBEDDING_BATCH):
+        batch = pending[start:start + CHUNK_EMBEDDING_BATCH]
+        try:
+            response = await client.embeddings.create(
+                model=CHUNK_EMBEDDING_MODEL,
+                input=batch,
+                dimensions=CHUNK_EMBEDDING_DIM
+            )
+        except Exception as e:
+            logger.error(f"❌ 청크 임베딩 배치 생성 실패 ({len(batch)}개): {e}")
+            continue
+        for item in response.data:
+            text = batch[item.index]
+            data = array("f", item.embedding).tobytes()
+            await cache.aset(text, item.embedding, _CACHE_MODEL)
+            for i in missing[text]:
+                results[i] = data
+    return results
+
+
+async def embed_text(text: str) -> Optional[bytes]:
+    """텍스트 하나의 임베딩을 float32 바이트로 반환합니다."""
+    return (await embed_texts([text]))[0]
+
+
+def get_document_embedding(doc: Dict[str, Any]) -> Optional[bytes]:
+    """문서에 저장된 청크 임베딩을 반환합니다."""
+    data = doc.get(CHUNK_EMBEDDING_FIELD)
+    return bytes(data) if data else None
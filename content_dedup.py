@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+메모리 중복 저장 방지 (내용 해시 + SimHash)
+긴 본문 전체를 비교하는 find_one({"content": ...}) 대신 정규화한 내용의 해시를
+content_hash 필드에 저장하고 (범위 필드 + content_hash) 유니크 인덱스로 중복을 막습니다.
+
+- 저장은 upsert($setOnInsert)로 처리하여 이미 있는 내용이면 기존 문서를 그대로 둡니다.
+- 정규화: NFC, 대소문자 통일, 연속 공백 축약
+- 선택적으로 64비트 SimHash를 4개 밴드(16비트)로 나누어 저장하고, 밴드가 하나라도 같은
+  문서만 후보로 조회해 해밍 거리로 거의 같은 청크(재업로드된 문서 등)를 찾습니다.
+  (해밍 거리 3 이하인 두 해시는 4개 밴드 중 적어도 하나가 반드시 같음)
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from keyword_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# 거의 같은 내용으로 판단하는 SimHash 해밍 거리 (0이면 검사하지 않음)
+NEAR_DUP_MAX_DISTANCE = int(os.getenv("EORA_NEAR_DUP_MAX_DISTANCE", "3"))
+# SimHash를 계산할 최소 특징(토큰) 수 (짧은 글은 오탐이 많아 제외)
+NEAR_DUP_MIN_FEATURES = int(os.getenv("EORA_NEAR_DUP_MIN_FEATURES", "20"))
+# 배치당 조회할 최대 후보 수
+NEAR_DUP_CANDIDATE_LIMIT = int(os.getenv("EORA_NEAR_DUP_CANDIDATE_LIMIT", "5000"))
+# 기존 문서 해시 백필 배치 크기
+CONTENT_HASH_BACKFILL_BATCH = 500
+
+CONTENT_HASH_FIELD = "content_hash"
+SIMHASH_FIELD = "simhash"
+SIMHASH_BANDS_FIELD = "simhash_bands"
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_content(text: str) -> str:
+    """해시 비교용으로 내용을 정규화합니다."""
+    text = unicodedata.normalize("NFC", str(text or ""))
+    return _SPACE_RE.sub(" ", text).strip().casefold()
+
+
+def content_hash(text: str) -> str:
+    """정규화한 내용의 SHA-256 해시"""
+    return hashlib.sha256(normalize_content(text).encode("utf-8")).hexdigest()
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64비트 SimHash를 계산합니다 (특징이 너무 적으면 None).
+
+    특징은 검색 토큰과 인접 토큰 쌍(shingle)이며 등장 횟수를 가중치로 사용합니다.
+    """
+    tokens = tokenize(text)
+    features = Counter(tokens)
+    features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    if len(features) < NEAR_DUP_MIN_FEATURES:
+        return None
+    weights = [0] * SIMHASH_BITS
+    for feature, count in features.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if (h >> bit) & 1 else -count
+    value = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            value |= 1 << bit
+    return value
+
+
+def simhash_bands(value: int) -> List[str]:
+    """SimHash를 밴드 키 목록으로 나눕니다 (멀티키 인덱스용)."""
+    mask = (1 << _BAND_BITS) - 1
+    return [f"{i}:{(value >> (i * _BAND_BITS)) & mask:04x}" for i in range(SIMHASH_BANDS)]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin((a ^ b) & ((1 << SIMHASH_BITS) - 1)).count("1")
+
+
+def _to_int64(value: int) -> int:
+    """MongoDB int64로 저장할 수 있도록 부호 있는 정수로 변환"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _from_int64(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def _field_value(doc: Dict[str, Any], field: str) -> Any:
+    value: Any = doc
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class ContentDeduplicator:
+    """MongoDB 컬렉션의 내용 해시 기반 중복 방지기"""
+
+    def __init__(self, collection, scope_fields: Iterable[str] = ("user_id",),
+                 text_field: str = "content", backfill_filter: Optional[Dict[str, Any]] = None,
+                 near_duplicates: bool = False):
+        """
+        초기화
+
+        Args:
+            collection: pymongo 컬렉션
+            scope_fields: 중복 판단 범위 필드 (같은 사용자 안에서만 중복 등)
+            text_field: 해시할 내용 필드
+            backfill_filter: 해시를 채울 기존 문서 조건 (중복 방지 대상 메모리 타입 등)
+            near_duplicates: SimHash 필드를 함께 저장하고 거의 같은 내용을 검사할지 여부
+        """
+        self.collection = collection
+        self.scope_fields = tuple(scope_fields)
+        self.text_field = text_field
+        self.backfill_filter = backfill_filter or {}
+        self.near_duplicates = near_duplicates
+        self._backfill_thread: Optional[threading.Thread] = None
+        self.stats = {
+            "inserted": 0,
+            "duplicates": 0,
+            "near_duplicates": 0,
+            "failed": 0,
+            "backfilled": 0,
+            "total_upsert_ms": 0.0
+        }
+
+    # ==================== 색인 ====================
+
+    def annotate(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """저장 직전 문서에 content_hash(와 SimHash) 필드를 채웁니다."""
+        text = _field_value(doc, self.text_field) or ""
+        doc[CONTENT_HASH_FIELD] = content_hash(text)
+        if self.near_duplicates:
+            value = simhash(text)
+            if value is not None:
+                doc[SIMHASH_FIELD] = _to_int64(value)
+                doc[SIMHASH_BANDS_FIELD] = simhash_bands(value)
+        return doc
+
+    def _scope_filter(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: _field_value(doc, field) for field in self.scope_fields}
+
+    def ensure_indexes(self):
+        """(범위 필드 + content_hash) 유니크 인덱스와 SimHash 밴드 인덱스를 생성합니다."""
+        keys = [(field, 1) for field in self.scope_fields] + [(CONTENT_HASH_FIELD, 1)]
+        try:
+            # content_hash가 없는 기존 문서는 유니크 제약에서 제외
+            self.collection.create_index(
+                keys, unique=True, name="content_hash_unique",
+                partialFilterExpression={CONTENT_HASH_FIELD: {"$exists": True}}
+            )
+            if self.near_duplicates:
+                self.collection.create_index(
+                    [(field, 1) for field in self.scope_fields] + [(SIMHASH_BANDS_FIELD, 1)],
+                    sparse=True
+                )
+        except Exception as e:
+            logger.error(f"내용 해시 인덱스 생성 오류 ({self.collection.name}): {e}")
+
+    def backfill(self, batch_size: int = CONTENT_HASH_BACKFILL_BATCH) -> int:
+        """
+        content_hash가 없는 기존 문서를 채웁니다.
+
+        이미 같은 내용이 있는 문서는 유니크 인덱스에 막혀 해시 없이 남습니다.
+        """
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+
+        query = {**self.backfill_filter, CONTENT_HASH_FIELD: {"$exists": False}}
+        projection = {self.text_field: 1, **{field: 1 for field in self.scope_fields}}
+        total = 0
+        last_id = None
+        while True:
+            page = dict(query)
+            if last_id is not None:
+                page["_id"] = {"$gt": last_id}
+            docs = list(self.collection.find(page, projection).sort("_id", 1).limit(batch_size))
+            if not docs:
+                break
+            last_id = docs[-1]["_id"]
+            requests = []
+            for doc in docs:
+                fields = self.annotate({self.text_field: _field_value(doc, self.text_field) or ""})
+                fields.pop(self.text_field, None)
+                requests.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+            try:
+                result = self.collection.bulk_write(requests, ordered=False)
+                total += result.modified_count
+            except BulkWriteError as e:
+                total += e.details.get("nModified", 0)
+        self.stats["backfilled"] += total
+        if total:
+            logger.info(f"내용 해시 백필 완료 ({self.collection.name}): {total}건")
+        return total
+
+    def start_backfill(self):
+        """백그라운드 스레드에서 인덱스 생성과 백필을 실행합니다."""
+        if self._backfill_thread and self._backfill_thread.is_alive():
+            return
+
+        def _run():
+            try:
+                self.ensure_indexes()
+                self.backfill()
+            except Exception as e:
+                logger.error(f"내용 해시 백필 오류 ({self.collection.name}): {e}")
+
+        self._backfill_thread = threading.Thread(target=_run, name="content-hash-backfill", daemon=True)
+        self._backfill_thread.start()
+
+    # ==================== 조회/저장 ====================
+
+    def find_existing(self, doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """같은 범위에 같은 내용의 문서가 있으면 반환합니다 (유니크 인덱스 조회)."""
+        if CONTENT_HASH_FIELD not in doc:
+            self.annotate(doc)
+        return self.collection.find_one(
+            {**self._scope_filter(doc), CONTENT_HASH_FIELD: doc[CONTENT_HASH_FIELD]}, {"_id": 1}
+        )
+
+    def find_near_duplicates(self, docs: List[Dict[str, Any]]) -> Dict[int, Any]:
+        """
+        이미 저장된 문서(또는 같은 배치의 앞선 문서)와 거의 같은 문서를 찾습니다.
+
+        Returns:
+            Dict[int, Any]: 문서 순번 → 비슷한 기존 문서 _id (같은 배치면 None)
+        """
+        if not self.near_duplicates or NEAR_DUP_MAX_DISTANCE <= 0:
+            return {}
+        groups: Dict[Tuple, List[int]] = {}
+        for i, doc in enumerate(docs):
+            if SIMHASH_FIELD in doc:
+                groups.setdefault(tuple(self._scope_filter(doc).items()), []).append(i)
+
+        found: Dict[int, Any] = {}
+        for scope, indexes in groups.items():
+            bands = sorted({band for i in indexes for band in docs[i][SIMHASH_BANDS_FIELD]})
+            candidates = list(self.collection.find(
+                {**dict(scope), SIMHASH_BANDS_FIELD: {"$in": bands}},
+                {SIMHASH_FIELD: 1, SIMHASH_BANDS_FIELD: 1}
+            ).limit(NEAR_DUP_CANDIDATE_LIMIT))
+            seen: List[Tuple[int, Any]] = [(_from_int64(c[SIMHASH_FIELD]), c["_id"]) for c in candidates]
+            for i in indexes:
+                value = _from_int64(docs[i][SIMHASH_FIELD])
+                for other, other_id in seen:
+                    if hamming_distance(value, other) <= NEAR_DUP_MAX_DISTANCE:
+                        found[i] = other_id
+                        break
+                else:
+                    seen.append((value, None))
+        return found
+
+    def upsert_many(self, docs: List[Dict[str, Any]], skip_near_duplicates: bool = False) -> Dict[str, List[int]]:
+        """
+        문서를 upsert($setOnInsert)로 저장합니다. 같은 범위에 같은 내용이 있으면 건너뜁니다.
+
+        Args:
+            docs: 저장할 문서 (_id가 없으면 여기서 채움)
+            skip_near_duplicates: SimHash로 거의 같은 문서도 건너뛸지 여부
+
+        Returns:
+            Dict: {"inserted": [...], "duplicates": [...], "near_duplicates": [...], "failed": [...]} (문서 순번)
+        """
+        from bson import ObjectId
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+
+        started = time.perf_counter()
+        result = {"inserted": [], "duplicates": [], "near_duplicates": [], "failed": []}
+        for doc in docs:
+            if CONTENT_HASH_FIELD not in doc:
+                self.annotate(doc)
+            doc.setdefault("_id", ObjectId())
+
+        near = self.find_near_duplicates(docs) if skip_near_duplicates else {}
+        result["near_duplicates"] = sorted(near)
+        pending = [i for i in range(len(docs)) if i not in near]
+        if pending:
+            requests = [
+                UpdateOne(
+                    {**self._scope_filter(docs[i]), CONTENT_HASH_FIELD: docs[i][CONTENT_HASH_FIELD]},
+                    {"$setOnInsert": docs[i]},
+                    upsert=True
+                )
+                for i in pending
+            ]
+            upserted: Dict[int, Any] = {}
+            errors: Dict[int, int] = {}
+            try:
+                upserted = self.collection.bulk_write(requests, ordered=False).upserted_ids
+            except BulkWriteError as e:
+                upserted = {item["index"]: item["_id"] for item in e.details.get("upserted", [])}
+                errors = {error["index"]: error.get("code") for error in e.details.get("writeErrors", [])}
+            for position, i in enumerate(pending):
+                if position in upserted:
+                    result["inserted"].append(i)
+                elif position in errors and errors[position] != 11000:
+                    result["failed"].append(i)
+                else:
+                    # 일치하는 문서가 이미 있었거나, 동시 upsert가 유니크 인덱스에 막힘
+                    result["duplicates"].append(i)
+
+        self.stats["inserted"] += len(result["inserted"])
+        self.stats["duplicates"] += len(result["duplicates"])
+        self.stats["near_duplicates"] += len(result["near_duplicates"])
+        self.stats["failed"] += len(result["failed"])
+        self.stats["total_upsert_ms"] += (time.perf_counter() - started) * 1000
+        return result
+
+    def upsert_one(self, doc: Dict[str, Any]) -> Tuple[Any, bool]:
+        """
+        문서 하나를 upsert로 저장합니다.
+
+        Returns:
+            Tuple[Any, bool]: (문서 _id, 새로 저장되었는지 여부)
+        """
+        result = self.upsert_many([doc])
+        if result["failed"]:
+            raise RuntimeError("내용 해시 upsert 실패")
+        if result["inserted"]:
+            return doc["_id"], True
+        existing = self.find_existing(doc)
+        return (existing["_id"] if existing else None), False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"collection": self.collection.name, **self.stats}
@@ -18,6 +18,10 @@ import pymongo
 from bson import ObjectId
 from dotenv import load_dotenv
 
+from db_executor import AsyncExecutorProxy
+from session_index import decode_cursor, encode_cursor
+from mongo_supervisor import ConnectionSupervisor
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -77,6 +81,10 @@ memories_collection = None
 users_collection = None
 system_logs_collection = None
 points_collection = None
+points_ledger_collection = None
+
+# 연결 상태 감시기 (하트비트 기반 캐시, 요청마다 ping하지 않음)
+connection_supervisor = ConnectionSupervisor("database")
 
 def generate_session_id():
     """고유한 세션 ID를 생성합니다."""
@@ -112,7 +120,7 @@ def db_manager():
                 if self.sessions_collection is None:
                     return []
                 
-                sessions = list(self.sessions_collection.find({"user_id": user_id}))
+                sessions = list(self.sessions_collection.find({"user_id": user_id}).sort("updated_at", -1))
                 
                 # ObjectId와 datetime 직렬화
                 for session in sessions:
@@ -328,7 +336,7 @@ def db_manager():
 
 def init_mongodb_connection():
     """MongoDB 연결 및 컬렉션 초기화"""
-    global mongo_client, db, sessions_collection, chat_logs_collection, memories_collection, users_collection, system_logs_collection, points_collection
+    global mongo_client, db, sessions_collection, chat_logs_collection, memories_collection, users_collection, system_logs_collection, points_collection, points_ledger_collection
     
     # 연결이 이미 존재하면 재사용
     if mongo_client is not None:
@@ -400,6 +408,7 @@ def init_mongodb_connection():
                     "serverSelectionTimeoutMS": 10000,  # 10초
                     "connectTimeoutMS": 10000,           # 10초
                     "socketTimeoutMS": 20000,            # 20초
+                    "event_listeners": [connection_supervisor],  # 하트비트로 상태 갱신
                 }
                 
                 if is_railway:
@@ -425,11 +434,16 @@ def init_mongodb_connection():
         
         if not connected:
             logger.error("❌ 모든 MongoDB 연결 시도 실패")
+            # 실패한 클라이언트를 남겨두지 않아야 감시기가 재연결을 시도함
+            mongo_client = None
+            connection_supervisor.attach(None, healthy=False)
             return False
+        
+        connection_supervisor.attach(mongo_client)
             
                     # 데이터베이스 및 컬렉션 초기화
         try:
-            global sessions_collection, chat_logs_collection, memories_collection, users_collection, system_logs_collection, points_collection
+            global sessions_collection, chat_logs_collection, memories_collection, users_collection, system_logs_collection, points_collection, points_ledger_collection
             
             db = mongo_client[DATABASE_NAME]
             sessions_collection = db["sessions"]
@@ -438,11 +452,23 @@ def init_mongodb_connection():
             users_collection = db["users"]
             system_logs_collection = db["system_logs"]
             points_collection = db["points"]
+            points_ledger_collection = db["points_ledger"]
             
             # 인덱스 생성
             sessions_collection.create_index([("user_id", pymongo.ASCENDING)])
+            # 사용자별 최근 세션 목록 (user_id, updated_at 역순)
+            sessions_collection.create_index([("user_id", pymongo.ASCENDING), ("updated_at", pymongo.DESCENDING)])
             chat_logs_collection.create_index([("session_id", pymongo.ASCENDING)])
             memories_collection.create_index([("timestamp", pymongo.DESCENDING)])
+            # 포인트 원장: 사용자별 최신순 커서 페이지네이션용
+            points_ledger_collection.create_index([("user_id", pymongo.ASCENDING), ("_id", pymongo.DESCENDING)])
+            try:
+                # 사용자당 포인트 문서 1개 보장 (기존 중복 데이터가 있으면 건너뜀)
+                points_collection.create_index([("user_id", pymongo.ASCENDING)], unique=True)
+            except Exception as index_error:
+                logger.warning(f"⚠️ 포인트 user_id 고유 인덱스 생성 실패: {index_error}")
+            # 관리자 포인트 사용자 목록: 포인트 많은 순 커서 페이지네이션용
+            points_collection.create_index([("points", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)])
             
             logger.info("✅ 컬렉션 초기화 성공")
             return True
@@ -455,19 +481,42 @@ def init_mongodb_connection():
         logger.error(f"❌ MongoDB 연결 초기화 중 오류: {str(e)}")
         return False
 
-def verify_connection():
-    """데이터베이스 연결 상태를 확인합니다."""
+def verify_connection(force: bool = False):
+    """
+    데이터베이스 연결 상태를 확인합니다.
+    
+    기본적으로 감시기에 캐시된 상태를 반환하며 네트워크 호출이 없습니다.
+    force=True이면 실제 ping으로 확인합니다 (진단용).
+    """
     global mongo_client
     
     if mongo_client is None:
         return False
-        
-    try:
-        # 연결 확인
-        mongo_client.admin.command('ping')
+    
+    if force:
+        return connection_supervisor.probe()
+    return connection_supervisor.is_healthy()
+
+def is_healthy():
+    """캐시된 MongoDB 연결 상태 (요청 경로용, ping 없음)"""
+    return mongo_client is not None and connection_supervisor.is_healthy()
+
+def _reconnect_mongodb():
+    """감시기에서 호출하는 재연결 함수"""
+    if init_mongodb_connection() and mongo_client is not None:
+        # 재연결 시 관리자 인스턴스가 새 컬렉션을 사용하도록 함
+        if db_mgr is not None:
+            db_mgr._initialized = False
         return True
-    except:
-        return False
+    return False
+
+def start_connection_supervisor():
+    """백그라운드 연결 감시 및 재연결(지수 백오프)을 시작합니다."""
+    connection_supervisor.start(reconnect=_reconnect_mongodb)
+
+def get_connection_status():
+    """연결 감시 상태를 반환합니다."""
+    return connection_supervisor.get_status()
 
 # 자동 연결을 비활성화하고 지연 초기화 사용
 # init_mongodb_connection()  # 주석 처리
@@ -480,7 +529,8 @@ def ensure_connection():
     global is_connected
     if mongo_client is None:
         init_mongodb_connection()
-        is_connected = verify_connection()
+        start_connection_supervisor()
+    is_connected = is_healthy()
     return is_connected
 
 def get_cached_mongodb_connection():
@@ -502,16 +552,18 @@ class DatabaseManager:
         self.memories_collection = None
         self.users_collection = None
         self.points_collection = None
+        self.points_ledger_collection = None
         self._initialized = False
     
     def _ensure_initialized(self):
         """필요할 때만 MongoDB 연결 및 컬렉션 초기화"""
         if not self._initialized:
-            global mongo_client, db, sessions_collection, chat_logs_collection, memories_collection, users_collection, points_collection
+            global mongo_client, db, sessions_collection, chat_logs_collection, memories_collection, users_collection, points_collection, points_ledger_collection
             
-            # 연결이 없으면 초기화
+            # 연결이 없으면 초기화 (이후 재연결은 감시기가 백그라운드에서 담당)
             if mongo_client is None:
                 init_mongodb_connection()
+                start_connection_supervisor()
             
             self.mongo_client = mongo_client
             self.db = mongo_client[DATABASE_NAME] if mongo_client else None
@@ -520,12 +572,13 @@ class DatabaseManager:
             self.memories_collection = memories_collection
             self.users_collection = users_collection
             self.points_collection = points_collection
+            self.points_ledger_collection = points_ledger_collection
             self._initialized = True
     
     def is_connected(self):
-        """MongoDB 연결 상태 확인"""
+        """MongoDB 연결 상태 확인 (캐시된 상태, ping 없음)"""
         self._ensure_initialized()
-        return verify_connection()
+        return is_healthy()
     
     def create_session(self, user_id: str, session_name: str = None) -> str:
         """MongoDB에 새 세션을 생성합니다"""
@@ -560,6 +613,18 @@ class DatabaseManager:
             logger.error(f"❌ 세션 생성 오류: {str(e)}")
             raise e
     
+    @staticmethod
+    def build_message_document(session_id: str, user_message: str, ai_response: str, user_id: str = None) -> Dict[str, Any]:
+        """chat_logs 컬렉션에 저장할 대화 문서를 구성합니다"""
+        return {
+            "session_id": session_id,
+            "user_id": user_id,
+            "user_message": user_message,
+            "ai_response": ai_response,
+            "timestamp": datetime.now().isoformat(),
+            "created_at": datetime.now()
+        }
+    
     def save_message(self, session_id: str, user_message: str, ai_response: str, user_id: str = None):
         """MongoDB에 메시지를 저장합니다"""
         if not self.is_connected() or self.chat_logs_collection is None:
@@ -567,15 +632,7 @@ class DatabaseManager:
             return False
         
         try:
-            message_data = {
-                "session_id": session_id,
-                "user_id": user_id,
-                "user_message": user_message,
-                "ai_response": ai_response,
-                "timestamp": datetime.now().isoformat(),
-                "created_at": datetime.now()
-            }
-            
+            message_data = self.build_message_document(session_id, user_message, ai_response, user_id)
             self.chat_logs_collection.insert_one(message_data)
             logger.info(f"✅ 메시지 저장 성공: {session_id}")
             return True
@@ -602,6 +659,26 @@ class DatabaseManager:
     
     # ===== 포인트 시스템 관련 메서드 =====
     
+    def _record_transaction(self, user_id: str, tx_type: str, amount: int, description: str, balance_after: int = None):
+        """포인트 원장(points_ledger)에 거래 한 건을 기록합니다"""
+        if self.points_ledger_collection is None:
+            return
+        
+        try:
+            now = datetime.now()
+            self.points_ledger_collection.insert_one({
+                "user_id": user_id,
+                "type": tx_type,
+                "amount": amount,
+                "description": description,
+                "balance_after": balance_after,
+                "timestamp": now.isoformat(),
+                "created_at": now
+            })
+        except Exception as e:
+            # 잔액 변경은 이미 반영되었으므로 원장 기록 실패는 경고만 남김
+            logger.warning(f"⚠️ 포인트 원장 기록 실패: {user_id} {tx_type} {amount} ({str(e)})")
+    
     def initialize_user_points(self, user_id: str, initial_points: int = 100000):
         """새 사용자에게 초기 포인트를 부여합니다"""
         if not self.is_connected() or self.points_collection is None:
@@ -609,29 +686,26 @@ class DatabaseManager:
             return False
         
         try:
-            # 이미 포인트 데이터가 있는지 확인
-            existing_points = self.points_collection.find_one({"user_id": user_id})
-            if existing_points:
+            # 없을 때만 생성 (동시 요청에도 한 번만 지급되도록 upsert 사용)
+            now = datetime.now().isoformat()
+            result = self.points_collection.update_one(
+                {"user_id": user_id},
+                {"$setOnInsert": {
+                    "user_id": user_id,
+                    "points": initial_points,
+                    "total_earned": initial_points,
+                    "total_spent": 0,
+                    "created_at": now,
+                    "updated_at": now
+                }},
+                upsert=True
+            )
+            
+            if result.upserted_id is None:
                 logger.info(f"💰 사용자 {user_id}는 이미 포인트가 있습니다")
                 return True
             
-            # 새 포인트 데이터 생성
-            points_data = {
-                "user_id": user_id,
-                "points": initial_points,
-                "total_earned": initial_points,
-                "total_spent": 0,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
-                "transactions": [{
-                    "type": "initial",
-                    "amount": initial_points,
-                    "description": "회원가입 보너스",
-                    "timestamp": datetime.now().isoformat()
-                }]
-            }
-            
-            self.points_collection.insert_one(points_data)
+            self._record_transaction(user_id, "initial", initial_points, "회원가입 보너스", initial_points)
             logger.info(f"💰 사용자 {user_id}에게 초기 포인트 {initial_points} 지급")
             return True
             
@@ -645,7 +719,7 @@ class DatabaseManager:
             return 0
         
         try:
-            points_data = self.points_collection.find_one({"user_id": user_id})
+            points_data = self.points_collection.find_one({"user_id": user_id}, {"points": 1})
             if points_data:
                 return points_data.get("points", 0)
             else:
@@ -657,43 +731,49 @@ class DatabaseManager:
             logger.error(f"❌ 포인트 조회 오류: {str(e)}")
             return 0
     
-    def deduct_points(self, user_id: str, amount: int, description: str = "채팅 사용") -> bool:
-        """사용자의 포인트를 차감합니다"""
+    def try_deduct_points(self, user_id: str, amount: int, description: str = "채팅 사용") -> Optional[int]:
+        """
+        잔액이 충분할 때만 포인트를 원자적으로 차감합니다.
+        
+        Returns:
+            차감 후 잔액 (잔액 부족 또는 실패 시 None)
+        """
         if not self.is_connected() or self.points_collection is None:
-            return False
+            return None
         
         try:
-            current_points = self.get_user_points(user_id)
-            if current_points < amount:
-                logger.warning(f"⚠️ 포인트 부족: {user_id} (현재: {current_points}, 필요: {amount})")
-                return False
-            
-            new_points = current_points - amount
-            transaction = {
-                "type": "deduction",
-                "amount": -amount,
-                "description": description,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            self.points_collection.update_one(
-                {"user_id": user_id},
+            # 조회-계산-저장 대신 조건부 $inc 한 번으로 처리 (동시 차감 시 유실 없음)
+            updated = self.points_collection.find_one_and_update(
+                {"user_id": user_id, "points": {"$gte": amount}},
                 {
-                    "$set": {
-                        "points": new_points,
-                        "updated_at": datetime.now().isoformat()
-                    },
-                    "$inc": {"total_spent": amount},
-                    "$push": {"transactions": transaction}
-                }
+                    "$inc": {"points": -amount, "total_spent": amount},
+                    "$set": {"updated_at": datetime.now().isoformat()}
+                },
+                projection={"points": 1},
+                return_document=pymongo.ReturnDocument.AFTER
             )
             
+            if updated is None:
+                # 포인트 문서가 아직 없는 사용자는 초기화 후 한 번 더 시도
+                if self.points_collection.count_documents({"user_id": user_id}, limit=1) == 0:
+                    if self.initialize_user_points(user_id):
+                        return self.try_deduct_points(user_id, amount, description)
+                logger.warning(f"⚠️ 포인트 부족: {user_id} (필요: {amount})")
+                return None
+            
+            new_points = updated.get("points", 0)
+            self._record_transaction(user_id, "deduction", -amount, description, new_points)
+            
             logger.info(f"💰 포인트 차감: {user_id} -{amount} (잔액: {new_points})")
-            return True
+            return new_points
             
         except Exception as e:
             logger.error(f"❌ 포인트 차감 오류: {str(e)}")
-            return False
+            return None
+    
+    def deduct_points(self, user_id: str, amount: int, description: str = "채팅 사용") -> bool:
+        """사용자의 포인트를 차감합니다"""
+        return self.try_deduct_points(user_id, amount, description) is not None
     
     def add_points(self, user_id: str, amount: int, description: str = "포인트 지급") -> bool:
         """사용자에게 포인트를 추가합니다"""
@@ -701,28 +781,25 @@ class DatabaseManager:
             return False
         
         try:
-            current_points = self.get_user_points(user_id)
-            new_points = current_points + amount
-            
-            transaction = {
-                "type": "addition",
-                "amount": amount,
-                "description": description,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            self.points_collection.update_one(
+            updated = self.points_collection.find_one_and_update(
                 {"user_id": user_id},
                 {
-                    "$set": {
-                        "points": new_points,
-                        "updated_at": datetime.now().isoformat()
-                    },
-                    "$inc": {"total_earned": amount},
-                    "$push": {"transactions": transaction}
-                }
+                    "$inc": {"points": amount, "total_earned": amount},
+                    "$set": {"updated_at": datetime.now().isoformat()}
+                },
+                projection={"points": 1},
+                return_document=pymongo.ReturnDocument.AFTER
             )
             
+            if updated is None:
+                # 포인트 문서가 없으면 초기화 후 한 번 더 시도
+                if not self.initialize_user_points(user_id):
+                    return False
+                return self.add_points(user_id, amount, description)
+            
+            new_points = updated.get("points", 0)
+            self._record_transaction(user_id, "addition", amount, description, new_points)
+            
             logger.info(f"💰 포인트 추가: {user_id} +{amount} (잔액: {new_points})")
             return True
             
@@ -730,30 +807,211 @@ class DatabaseManager:
             logger.error(f"❌ 포인트 추가 오류: {str(e)}")
             return False
     
-    def get_points_history(self, user_id: str, limit: int = 50) -> List[Dict]:
-        """사용자의 포인트 거래 내역을 조회합니다"""
+    def get_ledger_page(self, user_id: str = None, limit: int = 50, cursor: str = None) -> Dict[str, Any]:
+        """
+        포인트 원장을 최신순으로 커서 기반 페이지 조회합니다.
+        
+        Args:
+            user_id: 사용자 필터 (None이면 전체 사용자)
+            limit: 페이지 크기 (최대 200)
+            cursor: 이전 페이지의 next_cursor (이 거래보다 오래된 항목부터 조회)
+            
+        Returns:
+            {"transactions": [...], "next_cursor": str 또는 None}
+        """
+        if not self.is_connected() or self.points_ledger_collection is None:
+            return {"transactions": [], "next_cursor": None}
+        
+        limit = max(1, min(int(limit), 200))
+        query = {}
+        if user_id:
+            query["user_id"] = user_id
+        if cursor:
+            try:
+                query["_id"] = {"$lt": ObjectId(cursor)}
+            except Exception:
+                logger.warning(f"⚠️ 잘못된 원장 커서: {cursor}")
+                return {"transactions": [], "next_cursor": None}
+        
+        try:
+            # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+            docs = list(self.points_ledger_collection.find(query).sort("_id", pymongo.DESCENDING).limit(limit + 1))
+            has_more = len(docs) > limit
+            docs = docs[:limit]
+            
+            transactions = []
+            for doc in docs:
+                transactions.append({
+                    "id": str(doc["_id"]),
+                    "user_id": doc.get("user_id"),
+                    "type": doc.get("type"),
+                    "amount": doc.get("amount", 0),
+                    "description": doc.get("description", ""),
+                    "balance_after": doc.get("balance_after"),
+                    "timestamp": doc.get("timestamp")
+                })
+            
+            return {
+                "transactions": transactions,
+                "next_cursor": transactions[-1]["id"] if has_more and transactions else None
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ 포인트 원장 조회 오류: {str(e)}")
+            return {"transactions": [], "next_cursor": None}
+    
+    def get_points_users_page(self, limit: int = 50, cursor: str = None) -> Dict[str, Any]:
+        """
+        포인트 계정을 포인트 많은 순(같으면 최신 생성순)으로 커서 기반 페이지 조회합니다.
+        
+        Args:
+            limit: 페이지 크기 (최대 200)
+            cursor: 이전 페이지의 next_cursor (이 계정 다음 순서부터 조회)
+            
+        Returns:
+            {"accounts": [...], "next_cursor": str 또는 None}
+        """
+        if not self.is_connected() or self.points_collection is None:
+            return {"accounts": [], "next_cursor": None}
+        
+        limit = max(1, min(int(limit), 200))
+        query = {}
+        if cursor:
+            try:
+                last_points, last_id = decode_cursor(cursor)
+                last_id = ObjectId(last_id)
+            except Exception:
+                logger.warning(f"⚠️ 잘못된 포인트 계정 커서: {cursor}")
+                return {"accounts": [], "next_cursor": None}
+            if last_points is None:
+                # 포인트가 없는 계정은 정렬상 맨 뒤
+                query = {"points": None, "_id": {"$lt": last_id}}
+            else:
+                query = {"$or": [
+                    {"points": {"$lt": last_points}},
+                    {"points": last_points, "_id": {"$lt": last_id}},
+                    {"points": None}
+                ]}
+        
+        try:
+            # 다음 페이지 존재 여부 확인을 위해 1개 더 조회 (내장 transactions 배열은 제외)
+            docs = list(self.points_collection.find(query, {"transactions": 0}).sort(
+                [("points", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]
+            ).limit(limit + 1))
+            has_more = len(docs) > limit
+            docs = docs[:limit]
+            
+            accounts = []
+            for doc in docs:
+                account = {key: (value.isoformat() if hasattr(value, "isoformat") else value)
+                           for key, value in doc.items() if key != "_id"}
+                account["id"] = str(doc["_id"])
+                accounts.append(account)
+            
+            next_cursor = None
+            if has_more and docs:
+                next_cursor = encode_cursor((docs[-1].get("points"), str(docs[-1]["_id"])))
+            return {"accounts": accounts, "next_cursor": next_cursor}
+            
+        except Exception as e:
+            logger.error(f"❌ 포인트 계정 조회 오류: {str(e)}")
+            return {"accounts": [], "next_cursor": None}
+    
+    def get_point_account_ids(self, user_ids: List[str]) -> List[str]:
+        """
+        주어진 사용자 중 포인트 계정(문서)이 있는 사용자 ID를 조회합니다 (user_id 색인, 1000명씩)
+        """
         if not self.is_connected() or self.points_collection is None:
             return []
         
+        found = []
         try:
-            points_data = self.points_collection.find_one({"user_id": user_id})
+            for start in range(0, len(user_ids), 1000):
+                found.extend(doc["user_id"] for doc in self.points_collection.find(
+                    {"user_id": {"$in": user_ids[start:start + 1000]}}, {"user_id": 1, "_id": 0}
+                ))
+        except Exception as e:
+            logger.error(f"❌ 포인트 계정 존재 확인 오류: {str(e)}")
+        return found
+    
+    def get_points_summary(self) -> Dict[str, int]:
+        """전체 포인트 계정 통계를 서버 측 집계로 계산합니다"""
+        empty = {"total_users": 0, "active_users": 0, "total_points": 0}
+        if not self.is_connected() or self.points_collection is None:
+            return empty
+        
+        try:
+            result = list(self.points_collection.aggregate([
+                {"$group": {
+                    "_id": None,
+                    "total_users": {"$sum": 1},
+                    "active_users": {"$sum": {"$cond": [{"$gt": ["$points", 0]}, 1, 0]}},
+                    "total_points": {"$sum": "$points"}
+                }}
+            ]))
+            if not result:
+                return empty
+            return {key: int(result[0].get(key) or 0) for key in empty}
+        except Exception as e:
+            logger.error(f"❌ 포인트 통계 집계 오류: {str(e)}")
+            return empty
+    
+    def get_points_history(self, user_id: str, limit: int = 50, cursor: str = None) -> Dict[str, Any]:
+        """
+        사용자의 포인트 거래 내역을 조회합니다 (최신순)
+        
+        Returns:
+            {"transactions": [...], "next_cursor": str 또는 None} (get_ledger_page와 같은 형식)
+        """
+        if not self.is_connected() or self.points_collection is None:
+            return {"transactions": [], "next_cursor": None}
+        
+        page = self.get_ledger_page(user_id, limit, cursor)
+        if page["transactions"] or cursor:
+            return page
+        
+        try:
+            # 원장 도입 이전 데이터: 포인트 문서에 내장된 transactions 배열의 마지막 부분만 조회
+            points_data = self.points_collection.find_one(
+                {"user_id": user_id},
+                {"transactions": {"$slice": -limit}}
+            )
             if points_data and "transactions" in points_data:
-                # 최신 거래 내역부터 반환
-                transactions = points_data["transactions"][-limit:]
+                transactions = points_data["transactions"]
                 transactions.reverse()
-                return transactions
-            return []
+                return {"transactions": transactions, "next_cursor": None}
+            return {"transactions": [], "next_cursor": None}
             
         except Exception as e:
             logger.error(f"❌ 포인트 내역 조회 오류: {str(e)}")
-            return []
+            return {"transactions": [], "next_cursor": None}
+
+class AsyncDatabaseManager(AsyncExecutorProxy):
+    """
+    DatabaseManager의 비동기 버전
+    동일한 메서드를 코루틴으로 제공하며, pymongo 호출은 DB 전용 스레드 풀에서 실행됩니다.
+    
+    사용 예:
+        points = await async_db_mgr.get_user_points(user_id)
+    """
+    
+    def __init__(self, manager: DatabaseManager = None):
+        super().__init__(manager or get_database_manager())
 
 # 전역 데이터베이스 관리자 인스턴스 (지연 초기화)
 db_mgr = None
+async_db_mgr = None
 
 def get_database_manager():
     """데이터베이스 관리자 인스턴스를 반환 (지연 초기화)"""
     global db_mgr
     if db_mgr is None:
         db_mgr = DatabaseManager()
-    return db_mgr 
\ No newline at end of file
+    return db_mgr
+
+def get_async_database_manager():
+    """비동기 데이터베이스 관리자 인스턴스를 반환 (지연 초기화)"""
+    global async_db_mgr
+    if async_db_mgr is None:
+        async_db_mgr = AsyncDatabaseManager(get_database_manager())
+    return async_db_mgr
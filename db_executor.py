@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MongoDB 동기 호출용 비동기 실행기
+pymongo 호출을 제한된 크기의 스레드 풀에서 실행하여
+async 핸들러 안에서 이벤트 루프가 멈추지 않도록 합니다.
+"""
+
+import os
+import time
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# 동시에 실행되는 DB 호출 수 상한 (pymongo 커넥션 풀 크기와 맞춤)
+DB_EXECUTOR_WORKERS = int(os.getenv("EORA_DB_EXECUTOR_WORKERS", "10"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# 처리량 측정용 통계 (워커 스레드와 여러 이벤트 루프에서 갱신하므로 _stats_lock으로 보호)
+_stats_lock = threading.Lock()
+_stats = {
+    "calls": 0,
+    "errors": 0,
+    "in_flight": 0,
+    "max_in_flight": 0,
+    "total_wait_ms": 0.0,
+    "total_run_ms": 0.0
+}
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """DB 전용 스레드 풀을 반환합니다 (지연 생성)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DB_EXECUTOR_WORKERS,
+                    thread_name_prefix="eora-db"
+                )
+    return _executor
+
+
+async def run_db(func: Callable, *args, **kwargs) -> Any:
+    """
+    동기 DB 함수를 스레드 풀에서 실행하고 결과를 기다립니다.
+
+    Args:
+        func: 실행할 동기 함수
+        *args, **kwargs: 함수 인자
+
+    Returns:
+        함수 반환값
+    """
+    loop = asyncio.get_running_loop()
+    submitted_at = time.perf_counter()
+
+    def _call():
+        started_at = time.perf_counter()
+        with _stats_lock:
+            _stats["total_wait_ms"] += (started_at - submitted_at) * 1000
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            with _stats_lock:
+                _stats["total_run_ms"] += elapsed_ms
+
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["in_flight"] += 1
+        _stats["max_in_flight"] = max(_stats["max_in_flight"], _stats["in_flight"])
+    try:
+        return await loop.run_in_executor(get_db_executor(), _call)
+    except Exception:
+        with _stats_lock:
+            _stats["errors"] += 1
+        raise
+    finally:
+        with _stats_lock:
+            _stats["in_flight"] -= 1
+
+
+def get_db_executor_stats() -> Dict[str, Any]:
+    """DB 실행기 통계를 반환합니다."""
+    with _stats_lock:
+        stats = dict(_stats)
+    calls = stats["calls"]
+    return {
+        "workers": DB_EXECUTOR_WORKERS,
+        "calls": calls,
+        "errors": stats["errors"],
+        "in_flight": stats["in_flight"],
+        "max_in_flight": stats["max_in_flight"],
+        "avg_wait_ms": round(stats["total_wait_ms"] / calls, 2) if calls else 0.0,
+        "avg_run_ms": round(stats["total_run_ms"] / calls, 2) if calls else 0.0
+    }
+
+
+class AsyncExecutorProxy:
+    """
+    동기 객체의 메서드를 같은 이름의 코루틴으로 노출하는 프록시
+    (예: proxy.get_user_points(uid) → await 가능)
+    """
+
+    def __init__(self, target: Any):
+        self._target = target
+
+    @property
+    def target(self) -> Any:
+        """감싸고 있는 동기 객체"""
+        return self._target
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr) or asyncio.iscoroutinefunction(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def _async_method(*args, **kwargs):
+            return await run_db(attr, *args, **kwargs)
+
+        return _async_method
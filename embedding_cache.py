@@ -1,80 +1,444 @@
 #!/usr/bin/env python3
 """
 임베딩 캐싱 시스템 - GPT 응답 속도 최적화
+
+모든 임베딩 호출 지점이 함께 쓰는 2단 캐시입니다.
+- 1단: 프로세스 내 LRU (항목 수 + 메모리 바이트 상한)
+- 2단: 영구 저장소 (Redis 또는 로컬 메모리 맵 파일)
+- 키: 모델명 + 텍스트 내용의 sha256 해시 (모델이 다르면 벡터도 다르므로 분리)
+- 값: float32 원시 바이트 (JSON 직렬화 없음)
+
+여러 워커 프로세스가 캐시를 공유하려면 Redis 백엔드를 권장합니다.
+로컬 파일은 추가 시 파일 잠금(fcntl) 아래에서 실제 파일 끝에 기록하고,
+조회 미스 때 다른 프로세스가 추가한 레코드를 색인에 반영합니다.
 """
 
+import os
+import mmap
+import time
+import struct
+import asyncio
 import hashlib
 import threading
-from typing import Dict, List, Optional
+from array import array
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
 from collections import OrderedDict
 import logging
 
+try:
+    import fcntl
+except ImportError:  # Windows - 프로세스 간 잠금 없음 (단일 프로세스에서만 파일 백엔드 사용)
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+# 모델을 지정하지 않은 기존 호출부의 기본 모델
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+# 1단 LRU 최대 항목 수
+EMBEDDING_CACHE_SIZE = int(os.getenv("EORA_EMBEDDING_CACHE_SIZE", "10000"))
+# 1단 LRU 최대 메모리 (MB)
+EMBEDDING_CACHE_MAX_MB = float(os.getenv("EORA_EMBEDDING_CACHE_MAX_MB", "64"))
+# 2단 백엔드: redis | file | none (기본: REDIS_URL이 있으면 redis, 없으면 file)
+EMBEDDING_CACHE_BACKEND = os.getenv(
+    "EORA_EMBEDDING_CACHE_BACKEND", "redis" if os.getenv("REDIS_URL") else "file"
+).lower()
+# 로컬 파일 백엔드 경로와 최대 크기 (MB)
+EMBEDDING_CACHE_DIR = os.getenv("EORA_EMBEDDING_CACHE_DIR", os.path.join("data", "embedding_cache"))
+EMBEDDING_CACHE_DISK_MAX_MB = float(os.getenv("EORA_EMBEDDING_CACHE_DISK_MAX_MB", "1024"))
+# Redis 백엔드 항목 유지 시간 (초, 기본 30일)
+EMBEDDING_CACHE_TTL = int(os.getenv("EORA_EMBEDDING_CACHE_TTL", str(30 * 24 * 3600)))
+# Redis 오류 후 재시도까지 대기 시간 (초)
+REDIS_RETRY_INTERVAL = 30.0
+
+
+def _to_bytes(embedding) -> bytes:
+    """리스트/넘파이 배열 임베딩을 float32 바이트로 변환"""
+    if hasattr(embedding, "dtype") and hasattr(embedding, "astype"):
+        return embedding.astype("<f4").tobytes()
+    return array("f", (float(x) for x in embedding)).tobytes()
+
+
+def _to_list(data: bytes) -> List[float]:
+    return array("f", data).tolist()
+
+
+@contextmanager
+def _file_lock(f):
+    """다른 프로세스와 공유하는 파일에 대한 배타 잠금 (해제 전에 버퍼를 비움)"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        f.flush()
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class RedisEmbeddingStore:
+    """Redis에 float32 바이트로 임베딩을 저장하는 영구 계층"""
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl: int = EMBEDDING_CACHE_TTL):
+        import redis
+        # 바이트 값을 그대로 받아야 하므로 decode_responses를 사용하지 않음
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.ttl = ttl
+        self.errors = 0
+        self._failed_at = 0.0
+
+    def _available(self) -> bool:
+        return time.monotonic() - self._failed_at >= REDIS_RETRY_INTERVAL
+
+    def _failed(self, e: Exception):
+        self.errors += 1
+        if self._available():
+            logger.warning(f"⚠️ Redis 임베딩 캐시 오류 ({REDIS_RETRY_INTERVAL:.0f}초간 건너뜀): {e}")
+        self._failed_at = time.monotonic()
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self._available():
+            return None
+        try:
+            return self.client.get(f"emb:{key}")
+        except Exception as e:
+            self._failed(e)
+            return None
+
+    def set(self, key: str, data: bytes):
+        if not self._available():
+            return
+        try:
+            self.client.set(f"emb:{key}", data, ex=self.ttl)
+        except Exception as e:
+            self._failed(e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "errors": self.errors, "available": self._available()}
+
+
+class MmapEmbeddingStore:
+    """
+    모델별 추가 전용 파일에 임베딩을 저장하고 mmap으로 읽는 영구 계층
+
+    파일 형식: 헤더(매직 4바이트 + 차원 uint32) 뒤에
+    [sha256 다이제스트 32바이트 + float32 벡터] 고정 길이 레코드가 이어집니다.
+    시작 시 다이제스트만 읽어 오프셋 색인을 만들고, 벡터는 필요할 때 mmap에서 읽습니다.
+    여러 프로세스가 같은 파일에 추가하므로 오프셋은 항상 잠금 아래의 실제 파일 끝에서 정하고,
+    색인에 없는 다이제스트는 그사이 추가된 레코드를 읽어 들인 뒤 다시 찾습니다.
+    """
+
+    name = "file"
+    MAGIC = b"EEMB"
+    HEADER = struct.Struct("<4sI")
+
+    def __init__(self, directory: str = EMBEDDING_CACHE_DIR, max_mb: float = EMBEDDING_CACHE_DISK_MAX_MB):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.errors = 0
+        self.full_skips = 0
+
+    def _path(self, model: str) -> str:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in model)
+        return os.path.join(self.directory, f"{safe}.f32")
+
+    def _open(self, model: str, dimension: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """모델 파일을 열어 색인을 만듭니다 (쓰기 시 없으면 생성)."""
+        entry = self._files.get(model)
+        if entry is not None:
+            return entry
+        path = self._path(model)
+        if not os.path.exists(path):
+            if dimension is None:
+                return None
+            os.makedirs(self.directory, exist_ok=True)
+            try:
+                with open(path, "xb") as f:
+                    f.write(self.HEADER.pack(self.MAGIC, dimension))
+            except FileExistsError:
+                pass
+
+        with open(path, "rb") as f:
+            magic, dim = self.HEADER.unpack(f.read(self.HEADER.size))
+        if magic != self.MAGIC:
+            raise ValueError(f"잘못된 임베딩 캐시 파일: {path}")
+        entry = {
+            "path": path,
+            "dimension": dim,
+            "record_size": 32 + dim * 4,
+            "offsets": {},
+            "mmap": None,
+            "mapped_size": 0,
+            "size": self.HEADER.size
+        }
+        self._scan(entry)
+        self._files[model] = entry
+        return entry
+
+    def _scan(self, entry: Dict[str, Any], file_size: Optional[int] = None):
+        """
+        색인 이후에 추가된 레코드(다른 프로세스가 추가한 것 포함)를 읽어
+        다이제스트 → 오프셋 색인에 반영합니다 (잘린 마지막 레코드는 무시).
+        """
+        if file_size is None:
+            file_size = os.path.getsize(entry["path"])
+        record_size = entry["record_size"]
+        start = entry["size"]
+        count = (file_size - start) // record_size
+        if count <= 0:
+            return
+        entry["size"] = start + count * record_size
+        self._remap(entry)
+        mm = entry["mmap"]
+        for i in range(count):
+            offset = start + i * record_size
+            entry["offsets"].setdefault(bytes(mm[offset:offset + 32]), offset + 32)
+
+    def _remap(self, entry: Dict[str, Any]):
+        if entry["mmap"] is not None:
+            entry["mmap"].close()
+        with open(entry["path"], "rb") as f:
+            entry["mmap"] = mmap.mmap(f.fileno(), entry["size"], access=mmap.ACCESS_READ)
+        entry["mapped_size"] = entry["size"]
+
+    def get(self, model: str, digest: bytes) -> Optional[bytes]:
+        with self._lock:
+            try:
+                entry = self._open(model)
+                if entry is None:
+                    return None
+                offset = entry["offsets"].get(digest)
+                if offset is None:
+                    # 다른 프로세스가 그사이 추가한 레코드가 있으면 색인에 반영한 뒤 다시 조회
+                    if os.path.getsize(entry["path"]) >= entry["size"] + entry["record_size"]:
+                        self._scan(entry)
+                        offset = entry["offsets"].get(digest)
+                    if offset is None:
+                        return None
+                if offset >= entry["mapped_size"]:
+                    self._remap(entry)
+                return bytes(entry["mmap"][offset:offset + entry["record_size"] - 32])
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️ 임베딩 파일 캐시 조회 오류: {e}")
+                return None
+
+    def set(self, model: str, digest: bytes, data: bytes):
+        with self._lock:
+            try:
+                entry = self._open(model, dimension=len(data) // 4)
+                record_size = entry["record_size"]
+                if digest in entry["offsets"] or len(data) != record_size - 32:
+                    return
+                with open(entry["path"], "ab") as f, _file_lock(f):
+                    # 오프셋은 메모리의 크기가 아니라 잠금 아래의 실제 파일 끝에서 정함
+                    end = f.seek(0, os.SEEK_END)
+                    aligned = self.HEADER.size + (end - self.HEADER.size) // record_size * record_size
+                    if aligned != end:
+                        # 비정상 종료로 잘린 레코드 제거
+                        f.truncate(aligned)
+                    self._scan(entry, aligned)
+                    if digest in entry["offsets"]:
+                        return
+                    if self._total_size() + record_size > self.max_bytes:
+                        self.full_skips += 1
+                        return
+                    f.write(digest + data)
+                entry["offsets"][digest] = aligned + 32
+                entry["size"] = aligned + record_size
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️ 임베딩 파일 캐시 저장 오류: {e}")
+
+    def _total_size(self) -> int:
+        return sum(entry["size"] for entry in self._files.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "entries": sum(len(entry["offsets"]) for entry in self._files.values()),
+                "bytes": self._total_size(),
+                "max_bytes": self.max_bytes,
+                "full_skips": self.full_skips,
+                "errors": self.errors
+            }
+
+
 class EmbeddingCache:
-    """임베딩 결과를 캐싱하여 중복 계산을 방지하는 클래스"""
-    
-    def __init__(self, max_size: int = 500):
+    """임베딩 결과를 캐싱하여 중복 계산을 방지하는 클래스 (LRU + 영구 저장소)"""
+
+    def __init__(self, max_size: int = EMBEDDING_CACHE_SIZE,
+                 max_mb: float = EMBEDDING_CACHE_MAX_MB,
+                 backend: Optional[str] = EMBEDDING_CACHE_BACKEND):
+        """
+        초기화
+
+        Args:
+            max_size: 1단 LRU 최대 항목 수
+            max_mb: 1단 LRU 최대 메모리 (MB)
+            backend: 2단 영구 저장소 (redis | file | none)
+        """
         self.max_size = max_size
-        self._cache: OrderedDict[str, List[float]] = OrderedDict()
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
         self._lock = threading.RLock()
-        
-    def _get_cache_key(self, text: str) -> str:
-        """텍스트에 대한 캐시 키 생성"""
-        return hashlib.md5(text.encode('utf-8')).hexdigest()
-    
-    def get(self, text: str) -> Optional[List[float]]:
-        """캐시에서 임베딩 조회"""
-        if not text or not text.strip():
-            return None
-            
-        cache_key = self._get_cache_key(text.strip())
-        
+        self._store = self._create_store(backend)
+        self._stats = {"memory_hits": 0, "store_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+    @staticmethod
+    def _create_store(backend: Optional[str]):
+        try:
+            if backend == "redis":
+                return RedisEmbeddingStore(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+            if backend == "file":
+                return MmapEmbeddingStore()
+        except Exception as e:
+            logger.warning(f"⚠️ 임베딩 영구 캐시({backend}) 사용 불가, 메모리 캐시만 사용: {e}")
+        return None
+
+    def _get_cache_key(self, text: str, model: str = DEFAULT_EMBEDDING_MODEL) -> str:
+        """모델 + 텍스트에 대한 캐시 키 생성 (임베딩은 입력 그대로 계산되므로 공백도 포함)"""
+        return f"{model}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    # ==================== 1단 (메모리 LRU) ====================
+
+    def _memory_get(self, cache_key: str) -> Optional[bytes]:
         with self._lock:
-            if cache_key in self._cache:
+            data = self._cache.get(cache_key)
+            if data is not None:
                 # LRU: 최근 사용된 것을 맨 뒤로 이동
-                embedding = self._cache.pop(cache_key)
-                self._cache[cache_key] = embedding
-                logger.debug(f"🔍 임베딩 캐시 히트: {text[:50]}...")
-                return embedding
-                
-        return None
-    
-    def set(self, text: str, embedding: List[float]) -> None:
-        """캐시에 임베딩 저장"""
-        if not text or not text.strip() or not embedding:
-            return
-            
-        cache_key = self._get_cache_key(text.strip())
-        
+                self._cache.move_to_end(cache_key)
+            return data
+
+    def _memory_set(self, cache_key: str, data: bytes):
         with self._lock:
             # 이미 존재하면 업데이트
-            if cache_key in self._cache:
-                self._cache.pop(cache_key)
-            
+            old = self._cache.pop(cache_key, None)
+            if old is not None:
+                self._bytes -= len(old)
+
             # 새로운 항목 추가
-            self._cache[cache_key] = embedding
-            
+            self._cache[cache_key] = data
+            self._bytes += len(data)
+
             # 크기 제한 초과 시 가장 오래된 항목 제거
-            while len(self._cache) > self.max_size:
-                oldest_key = next(iter(self._cache))
-                self._cache.pop(oldest_key)
-                logger.debug("📦 임베딩 캐시 크기 제한으로 인한 항목 제거")
-                
-            logger.debug(f"💾 임베딩 캐시 저장: {text[:50]}... (총 {len(self._cache)}개)")
-    
+            while self._cache and (len(self._cache) > self.max_size or self._bytes > self.max_bytes):
+                _, evicted = self._cache.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats["evictions"] += 1
+
+    # ==================== 2단 (영구 저장소) ====================
+
+    def _store_get(self, cache_key: str) -> Optional[bytes]:
+        if self._store is None:
+            return None
+        if isinstance(self._store, MmapEmbeddingStore):
+            model, digest = cache_key.rsplit(":", 1)
+            return self._store.get(model, bytes.fromhex(digest))
+        return self._store.get(cache_key)
+
+    def _store_set(self, cache_key: str, data: bytes):
+        if self._store is None:
+            return
+        if isinstance(self._store, MmapEmbeddingStore):
+            model, digest = cache_key.rsplit(":", 1)
+            self._store.set(model, bytes.fromhex(digest), data)
+        else:
+            self._store.set(cache_key, data)
+
+    # ==================== 조회/저장 ====================
+
+    def get_bytes(self, text: str, model: str = DEFAULT_EMBEDDING_MODEL) -> Optional[bytes]:
+        """캐시에서 임베딩을 float32 바이트로 조회 (메모리 → 영구 저장소 순)"""
+        if not text or not text.strip():
+            return None
+        cache_key = self._get_cache_key(text, model)
+        data = self._memory_get(cache_key)
+        if data is not None:
+            self._stats["memory_hits"] += 1
+            return data
+        return self._load_from_store(cache_key)
+
+    def _load_from_store(self, cache_key: str) -> Optional[bytes]:
+        data = self._store_get(cache_key)
+        if data is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["store_hits"] += 1
+        self._memory_set(cache_key, data)
+        return data
+
+    def get(self, text: str, model: str = DEFAULT_EMBEDDING_MODEL) -> Optional[List[float]]:
+        """캐시에서 임베딩 조회"""
+        data = self.get_bytes(text, model)
+        if data is None:
+            return None
+        logger.debug(f"🔍 임베딩 캐시 히트: {text[:50]}...")
+        return _to_list(data)
+
+    def set(self, text: str, embedding, model: str = DEFAULT_EMBEDDING_MODEL) -> None:
+        """캐시에 임베딩 저장 (리스트 또는 넘파이 배열)"""
+        if not text or not text.strip() or embedding is None or len(embedding) == 0:
+            return
+        cache_key = self._get_cache_key(text, model)
+        data = _to_bytes(embedding)
+        self._memory_set(cache_key, data)
+        self._store_set(cache_key, data)
+        self._stats["sets"] += 1
+
+    async def aget_bytes(self, text: str, model: str = DEFAULT_EMBEDDING_MODEL) -> Optional[bytes]:
+        """비동기 조회 - 메모리 미스일 때만 영구 저장소 조회를 스레드에서 수행"""
+        if not text or not text.strip():
+            return None
+        cache_key = self._get_cache_key(text, model)
+        data = self._memory_get(cache_key)
+        if data is not None:
+            self._stats["memory_hits"] += 1
+            return data
+        if self._store is None:
+            self._stats["misses"] += 1
+            return None
+        return await asyncio.to_thread(self._load_from_store, cache_key)
+
+    async def aget(self, text: str, model: str = DEFAULT_EMBEDDING_MODEL) -> Optional[List[float]]:
+        """비동기 임베딩 조회"""
+        data = await self.aget_bytes(text, model)
+        return _to_list(data) if data is not None else None
+
+    async def aset(self, text: str, embedding, model: str = DEFAULT_EMBEDDING_MODEL) -> None:
+        """비동기 임베딩 저장 - 영구 저장소 쓰기는 스레드에서 수행"""
+        if self._store is None:
+            self.set(text, embedding, model)
+        else:
+            await asyncio.to_thread(self.set, text, embedding, model)
+
     def clear(self) -> None:
-        """캐시 초기화"""
+        """메모리 캐시 초기화 (영구 저장소는 유지)"""
         with self._lock:
             self._cache.clear()
+            self._bytes = 0
             logger.info("🧹 임베딩 캐시 초기화 완료")
-    
-    def stats(self) -> Dict[str, int]:
+
+    def stats(self) -> Dict[str, Any]:
         """캐시 통계 반환"""
         with self._lock:
+            lookups = self._stats["memory_hits"] + self._stats["store_hits"] + self._stats["misses"]
+            hits = self._stats["memory_hits"] + self._stats["store_hits"]
             return {
                 "size": len(self._cache),
-                "max_size": self.max_size
+                "max_size": self.max_size,
+                "memory_bytes": self._bytes,
+                "max_memory_bytes": self.max_bytes,
+                **self._stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_hit_rate": round(self._stats["memory_hits"] / lookups, 4) if lookups else 0.0,
+                "store": self._store.stats() if self._store is not None else None
             }
 
 # 전역 임베딩 캐시 인스턴스
@@ -84,38 +448,39 @@ _cache_lock = threading.Lock()
 def get_embedding_cache() -> EmbeddingCache:
     """전역 임베딩 캐시 인스턴스 반환 (지연 초기화)"""
     global _global_cache
-    
+
     if _global_cache is None:
         with _cache_lock:
             if _global_cache is None:
-                _global_cache = EmbeddingCache(max_size=500)
+                _global_cache = EmbeddingCache()
                 logger.info("🚀 전역 임베딩 캐시 초기화 완료")
-    
+
     return _global_cache
 
-def cached_embedding(text: str, embedding_func) -> List[float]:
+def cached_embedding(text: str, embedding_func, model: str = DEFAULT_EMBEDDING_MODEL) -> List[float]:
     """
     캐시를 사용하는 임베딩 생성 함수
-    
+
     Args:
         text (str): 임베딩을 생성할 텍스트
         embedding_func: 실제 임베딩 생성 함수
-        
+        model (str): 임베딩 모델명 (캐시 키에 포함)
+
     Returns:
         List[float]: 임베딩 벡터
     """
     cache = get_embedding_cache()
-    
+
     # 캐시에서 조회
-    cached_result = cache.get(text)
+    cached_result = cache.get(text, model)
     if cached_result is not None:
         return cached_result
-    
+
     # 캐시에 없으면 새로 생성
     try:
         embedding = embedding_func(text)
         if embedding:
-            cache.set(text, embedding)
+            cache.set(text, embedding, model)
         return embedding
     except Exception as e:
         logger.error(f"❌ 임베딩 생성 실패: {e}")
@@ -127,7 +492,7 @@ def clear_embedding_cache() -> None:
     if _global_cache:
         _global_cache.clear()
 
-def get_cache_stats() -> Dict[str, int]:
+def get_cache_stats() -> Dict[str, Any]:
     """캐시 통계 반환"""
     cache = get_embedding_cache()
-    return cache.stats()
\ No newline at end of file
+    return cache.stats()
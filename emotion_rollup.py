@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+감정/주제 시계열 사전 집계 (rollup)
+통계나 감정 타임라인을 볼 때마다 사용자의 전체 기억을 $group 하거나 파이썬으로 읽어
+리샘플링하는 대신, (사용자, 차원, 단위, 버킷 시작, 값) 별 개수를 별도 컬렉션에 유지합니다.
+
+- 단위: day / week(월요일 시작) / month
+- 차원: 기본은 emotion(emotion_label)과 topic(topic)
+- 증분: 기억 저장 직후 record(docs)로 $inc upsert (bulk_write 1회), 삭제 시 record(docs, -1)
+- 백필: 기존 기억은 백그라운드에서 _id 순서로 한 번만 집계합니다.
+  · 워터마크(가장 먼저 시작한 프로세스의 시작 시각 ObjectId)보다 작은 _id만 백필하고,
+    그 이후 저장분은 증분으로 집계하여 이중 집계를 막습니다.
+  · 진행 위치와 임대(lease)를 상태 컬렉션에 기록하여 여러 워커 중 하나만 실행하고,
+    중단되면 다음 실행이 이어서 처리합니다.
+- 조회는 버킷 수에 비례 (O(buckets)) 하며, 백필이 끝나기 전에는 is_ready()가 False 입니다.
+  is_ready()는 I/O 없이 캐시된 값을 반환하고, 백필 스레드가 끝날 때까지 주기적으로
+  임대를 다시 시도하며 (다른 워커가 백필 중이면) 완료 여부를 갱신합니다.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 백필 배치 크기와 임대 시간 (초)
+ROLLUP_BACKFILL_BATCH = int(os.getenv("EORA_ROLLUP_BACKFILL_BATCH", "1000"))
+ROLLUP_LEASE_SECONDS = int(os.getenv("EORA_ROLLUP_LEASE_SECONDS", "300"))
+# 다른 워커가 백필 중일 때 완료 여부를 다시 확인하는 주기 (초)
+ROLLUP_READY_POLL_SECONDS = float(os.getenv("EORA_ROLLUP_READY_POLL_SECONDS", "30"))
+
+ROLLUP_COLLECTION = "emotion_rollups"
+ROLLUP_UNITS = ("day", "week", "month")
+# 합계 조회에 사용하는 단위 (버킷 수가 가장 적음)
+TOTAL_UNIT = "month"
+
+DEFAULT_DIMENSIONS = {"emotion": "emotion_label", "topic": "topic"}
+
+BACKFILL_DONE = "done"
+BACKFILL_RUNNING = "running"
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """datetime 또는 ISO 문자열 -> naive UTC datetime (해석할 수 없으면 None)"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def bucket_start(ts: datetime, unit: str) -> datetime:
+    """시각이 속한 버킷의 시작 시각"""
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == "day":
+        return day
+    if unit == "week":
+        return day - timedelta(days=day.weekday())
+    if unit == "month":
+        return day.replace(day=1)
+    raise ValueError(f"지원하지 않는 단위: {unit}")
+
+
+class EmotionRollup:
+    """기억 컬렉션 하나에 대한 (사용자, 차원, 단위, 버킷, 값) 개수 집계"""
+
+    def __init__(self, source, rollups, state_collection,
+                 user_field: Optional[str] = "user_id",
+                 time_field: str = "timestamp",
+                 dimensions: Optional[Dict[str, str]] = None,
+                 batch_size: int = ROLLUP_BACKFILL_BATCH):
+        self.source = source
+        self.rollups = rollups
+        self.state_collection = state_collection
+        self.user_field = user_field
+        self.time_field = time_field
+        self.dimensions = dict(dimensions or DEFAULT_DIMENSIONS)
+        self.batch_size = batch_size
+        self.name = f"emotion_rollup:{source.database.name}.{source.name}"
+        # 이 시각 이후 저장되는 기억은 증분으로 집계됨
+        self.started_at = datetime.now(timezone.utc)
+        self._ready = False
+        self._indexes_ready = False
+        self._watermark_registered = False
+        self._backfill_thread: Optional[threading.Thread] = None
+        self.stats = {"recorded": 0, "removed": 0, "backfilled": 0, "record_errors": 0, "fallbacks": 0}
+
+    def ensure_indexes(self):
+        if self._indexes_ready:
+            return
+        self.rollups.create_index(
+            [("user_id", 1), ("dimension", 1), ("unit", 1), ("bucket", 1), ("value", 1)],
+            unique=True
+        )
+        # 전체 사용자 타임라인 조회용
+        self.rollups.create_index([("dimension", 1), ("unit", 1), ("bucket", 1)])
+        self._indexes_ready = True
+
+    # ==================== 증분 집계 ====================
+
+    @property
+    def projection(self) -> Dict[str, int]:
+        fields = [self.time_field, *self.dimensions.values()]
+        if self.user_field:
+            fields.append(self.user_field)
+        return {field: 1 for field in fields}
+
+    def _keys(self, doc: Dict[str, Any]) -> Iterable[Tuple]:
+        ts = parse_timestamp(doc.get(self.time_field))
+        if ts is None:
+            return []
+        user = doc.get(self.user_field) if self.user_field else None
+        return [
+            (user, dimension, unit, bucket_start(ts, unit), doc.get(field))
+            for dimension, field in self.dimensions.items()
+            for unit in ROLLUP_UNITS
+        ]
+
+    def _apply(self, counts: Counter) -> int:
+        """개수 증감을 반영하고, 줄어든 키는 같은 bulk_write에서 0 이하가 되면 삭제 (고유 색인 키로만)"""
+        from pymongo import DeleteOne, UpdateOne
+
+        requests = []
+        decremented = False
+        for (user, dimension, unit, bucket, value), amount in counts.items():
+            if not amount:
+                continue
+            key = {"user_id": user, "dimension": dimension, "unit": unit, "bucket": bucket, "value": value}
+            requests.append(UpdateOne(key, {"$inc": {"count": amount}}, upsert=True))
+            if amount < 0:
+                requests.append(DeleteOne({**key, "count": {"$lte": 0}}))
+                decremented = True
+        if requests:
+            # 삭제는 바로 앞의 감소 뒤에 실행되어야 하므로 감소가 있으면 순서대로 실행
+            self.rollups.bulk_write(requests, ordered=decremented)
+        return len(requests)
+
+    def record(self, docs: Iterable[Dict[str, Any]], sign: int = 1) -> int:
+        """
+        저장(sign=1)/삭제(sign=-1)된 기억을 집계에 반영합니다.
+
+        집계 실패는 기억 저장을 막지 않도록 로그만 남깁니다 (다음 백필로 복구되지 않으므로 통계에 기록).
+        """
+        docs = list(docs)
+        if sign < 0:
+            docs = self._counted(docs)
+        counts: Counter = Counter()
+        for doc in docs:
+            for key in self._keys(doc):
+                counts[key] += sign
+        try:
+            self.ensure_indexes()
+            if sign > 0:
+                self._register_watermark()
+            self._apply(counts)
+        except Exception as e:
+            self.stats["record_errors"] += 1
+            logger.error(f"감정 집계 반영 오류 ({self.name}): {e}")
+            return 0
+        self.stats["recorded" if sign > 0 else "removed"] += len(docs)
+        return len(docs)
+
+    # ==================== 백필 ====================
+
+    def _state(self) -> Dict[str, Any]:
+        return self.state_collection.find_one({"_id": self.name}) or {}
+
+    def _counted(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """삭제되는 기억 중 이미 집계에 들어간 것만 (백필이 아직 지나가지 않은 구간은 제외)"""
+        if self.refresh_ready():
+            return docs
+        state = self._state()
+        watermark, last_id = state.get("watermark"), state.get("last_id")
+        if watermark is None:
+            return docs
+        return [
+            doc for doc in docs
+            if doc.get("_id") is None or doc["_id"] >= watermark or (last_id is not None and doc["_id"] <= last_id)
+        ]
+
+    def _register_watermark(self):
+        """
+        백필 전이면 워터마크를 이 프로세스의 시작 시각까지 낮춤 (가장 먼저 증분 집계를 시작한 프로세스 기준)
+        백필이 이미 끝났으면 upsert가 같은 _id로 새 문서를 만들려다 DuplicateKeyError가 납니다.
+        """
+        if self._watermark_registered or self._ready:
+            return
+        from bson import ObjectId
+        from pymongo.errors import DuplicateKeyError
+
+        try:
+            self.state_collection.update_one(
+                {"_id": self.name, "status": {"$ne": BACKFILL_DONE}},
+                {"$min": {"watermark": ObjectId.from_datetime(self.started_at)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            self._ready = True
+        self._watermark_registered = True
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """백필 임대 획득 (이미 끝났거나 다른 워커가 실행 중이면 None)"""
+        from pymongo import ReturnDocument
+
+        self._register_watermark()
+        if self._ready:
+            return None
+        now = datetime.utcnow()
+        return self.state_collection.find_one_and_update(
+            {
+                "_id": self.name,
+                "status": {"$ne": BACKFILL_DONE},
+                "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]
+            },
+            {"$set": {"status": BACKFILL_RUNNING, "lease_until": now + timedelta(seconds=ROLLUP_LEASE_SECONDS)}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    def backfill(self) -> int:
+        """워터마크 이전 기억을 집계합니다 (끝났거나 다른 워커가 실행 중이면 0)."""
+        if self.refresh_ready():
+            return 0
+        self.ensure_indexes()
+        state = self._claim()
+        if state is None:
+            return 0
+
+        started = time.perf_counter()
+        watermark, last_id = state["watermark"], state.get("last_id")
+        total = state.get("backfilled", 0)
+        while True:
+            id_range = {"$lt": watermark} if last_id is None else {"$gt": last_id, "$lt": watermark}
+            docs = list(self.source.find({"_id": id_range}, self.projection).sort("_id", 1).limit(self.batch_size))
+            if not docs:
+                break
+            counts: Counter = Counter()
+            for doc in docs:
+                for key in self._keys(doc):
+                    counts[key] += 1
+            self._apply(counts)
+            last_id = docs[-1]["_id"]
+            total += len(docs)
+            self.stats["backfilled"] += len(docs)
+            self.state_collection.update_one({"_id": self.name}, {"$set": {
+                "last_id": last_id,
+                "backfilled": total,
+                "lease_until": datetime.utcnow() + timedelta(seconds=ROLLUP_LEASE_SECONDS)
+            }})
+
+        self.state_collection.update_one({"_id": self.name}, {"$set": {
+            "status": BACKFILL_DONE, "finished_at": datetime.utcnow(), "lease_until": None
+        }})
+        self._ready = True
+        logger.info(f"감정 집계 백필 완료 ({self.name}): {total}건, {time.perf_counter() - started:.1f}초")
+        return total
+
+    def start_backfill(self):
+        """
+        백그라운드 스레드에서 인덱스 생성과 백필을 실행합니다.
+        다른 워커가 백필 중이면 끝날 때까지 주기적으로 완료 여부를 확인하고 임대를 다시 시도합니다.
+        """
+        if self._backfill_thread and self._backfill_thread.is_alive():
+            return
+
+        def _run():
+            while not self._ready:
+                try:
+                    self.backfill()
+                except Exception as e:
+                    logger.error(f"감정 집계 백필 오류 ({self.name}): {e}")
+                if not self._ready:
+                    time.sleep(ROLLUP_READY_POLL_SECONDS)
+
+        self._backfill_thread = threading.Thread(target=_run, name="emotion-rollup-backfill", daemon=True)
+        self._backfill_thread.start()
+
+    def refresh_ready(self) -> bool:
+        """상태 컬렉션에서 백필 완료 여부를 다시 읽습니다 (동기 I/O - 백필 스레드/DB 실행기에서 호출)."""
+        if not self._ready:
+            self._ready = self._state().get("status") == BACKFILL_DONE
+        return self._ready
+
+    def is_ready(self) -> bool:
+        """백필이 끝나 집계만으로 정확한 값을 낼 수 있는지 (캐시된 값, I/O 없음)"""
+        return self._ready
+
+    # ==================== 조회 (O(buckets)) ====================
+
+    def totals(self, user: Any, dimension: str = "emotion") -> List[Dict[str, Any]]:
+        """사용자의 값별 전체 개수 [{"_id": 값, "count": n}] (많은 순)"""
+        return list(self.rollups.aggregate([
+            {"$match": {"user_id": user, "dimension": dimension, "unit": TOTAL_UNIT, "count": {"$gt": 0}}},
+            {"$group": {"_id": "$value", "count": {"$sum": "$count"}}},
+            {"$sort": {"count": -1}}
+        ]))
+
+    def timeline(self, unit: str = "week", dimension: str = "emotion", user: Any = None, all_users: bool = False,
+                 since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """버킷별 값별 개수 [{"bucket", "value", "count"}] (버킷 순)"""
+        match: Dict[str, Any] = {"dimension": dimension, "unit": unit, "count": {"$gt": 0}}
+        if not all_users:
+            match["user_id"] = user
+        if since is not None:
+            match["bucket"] = {"$gte": bucket_start(since, unit)}
+        return [
+            {"bucket": row["_id"]["bucket"], "value": row["_id"]["value"], "count": row["count"]}
+            for row in self.rollups.aggregate([
+                {"$match": match},
+                {"$group": {"_id": {"bucket": "$bucket", "value": "$value"}, "count": {"$sum": "$count"}}},
+                {"$sort": {"_id.bucket": 1}}
+            ])
+        ]
+
+    def values(self, dimension: str = "emotion", user: Any = None, all_users: bool = False) -> List[Any]:
+        """집계에 등장한 값 목록"""
+        match: Dict[str, Any] = {"dimension": dimension, "unit": TOTAL_UNIT, "count": {"$gt": 0}}
+        if not all_users:
+            match["user_id"] = user
+        return self.rollups.distinct("value", match)
+
+    def recent_window(self, values: List[Any], limit: int, dimension: str = "emotion", user: Any = None,
+                      all_users: bool = False) -> Tuple[int, Optional[datetime]]:
+        """
+        해당 값들의 최근 기억 limit개를 덮는 가장 오래된 월 버킷 시작 시각
+
+        Returns:
+            (전체 개수, 시작 시각) - 전체가 limit 이하이면 시작 시각은 None (범위 제한 불필요)
+        """
+        match: Dict[str, Any] = {"dimension": dimension, "unit": TOTAL_UNIT, "value": {"$in": values}, "count": {"$gt": 0}}
+        if not all_users:
+            match["user_id"] = user
+        buckets = list(self.rollups.aggregate([
+            {"$match": match},
+            {"$group": {"_id": "$bucket", "count": {"$sum": "$count"}}},
+            {"$sort": {"_id": -1}}
+        ]))
+        total = sum(row["count"] for row in buckets)
+        covered = 0
+        for row in buckets:
+            covered += row["count"]
+            if covered >= limit and covered < total:
+                return total, row["_id"]
+        return total, None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "ready": self._ready, **self.stats}
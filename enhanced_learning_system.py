@@ -10,13 +10,25 @@
 import logging
 import re
 import json
+import hashlib
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from pymongo import MongoClient
 from bson import ObjectId
 
+from db_executor import run_db
+from keyword_index import annotate_document
+from chunk_embeddings import CHUNK_EMBEDDING_FIELD, embed_texts
+from content_dedup import ContentDeduplicator
+from recall_cache import SHARED_SCOPE, bump_memory_generation, user_scope
+
 logger = logging.getLogger(__name__)
 
+# 문장 구분 기호
+SENTENCE_SPLIT = re.compile(r'[.!?。！？]')
+# insert_many 한 번에 저장하는 청크 수
+SAVE_BATCH_SIZE = 100
+
 class EnhancedLearningSystem:
     """강화된 학습 시스템"""
     
@@ -35,6 +47,7 @@ class EnhancedLearningSystem:
             except Exception as e:
                 logger.warning(f"데이터베이스 설정 실패: {e}")
                 self.db = None
+        self.deduplicator = None
         
         # 카테고리별 키워드 정의
         self.category_keywords = {
@@ -119,15 +132,28 @@ class EnhancedLearningSystem:
     def _split_into_chunks(self, content: str, min_size: int = 500, max_size: int = 1000) -> List[str]:
         """텍스트를 500~1000자 청크로 분할"""
         logger.info(f"✂️ 청크 분할 시작: {min_size}~{max_size}자")
-        
-        # 문장 단위로 분할
-        sentences = re.split(r'[.!?。！？]', content)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        chunks = []
+        return list(self.iter_chunks([content], min_size, max_size))
+    
+    def iter_chunks(self, blocks: Iterable[str], min_size: int = 500, max_size: int = 1000) -> Iterator[str]:
+        """텍스트 블록을 받아 500~1000자 청크를 순서대로 생성 (대용량 파일 스트리밍용)"""
         current_chunk = ""
+        count = 0
+        pending = ""
+        
+        def sentences_of(blocks):
+            nonlocal pending
+            for block in blocks:
+                # 문장 단위로 분할 (마지막 조각은 다음 블록과 이어질 수 있으므로 보류)
+                parts = SENTENCE_SPLIT.split(pending + block)
+                pending = parts.pop()
+                for part in parts:
+                    yield part
+            yield pending
         
-        for sentence in sentences:
+        for sentence in sentences_of(blocks):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
             sentence_with_period = sentence + "."
             
             # 최소 크기보다 작으면 계속 추가
@@ -136,8 +162,9 @@ class EnhancedLearningSystem:
             # 최대 크기를 초과하면 현재 청크 저장하고 새 청크 시작
             elif len(current_chunk + sentence_with_period) > max_size:
                 if current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                    logger.info(f"✅ 청크 {len(chunks)} 생성: {len(current_chunk)}자")
+                    count += 1
+                    logger.debug(f"✅ 청크 {count} 생성: {len(current_chunk)}자")
+                    yield current_chunk.strip()
                 current_chunk = sentence_with_period
             # 적절한 크기면 현재 청크에 추가
             else:
@@ -145,108 +172,147 @@ class EnhancedLearningSystem:
         
         # 마지막 청크 처리
         if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-            logger.info(f"✅ 마지막 청크 {len(chunks)} 생성: {len(current_chunk)}자")
+            count += 1
+            logger.debug(f"✅ 마지막 청크 {count} 생성: {len(current_chunk)}자")
+            yield current_chunk.strip()
+    
+    @staticmethod
+    def make_session_id(filename: str) -> str:
+        """파일 학습 세션 ID 생성 (보안을 위해 파일명 해싱 사용)"""
+        filename_hash = hashlib.md5(filename.encode()).hexdigest()[:8]
+        return f"enhanced_learning_{filename_hash}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    def _build_memory_doc(self, chunk: str, index: int, filename: str, category: str, user_id: str,
+                          is_admin_learning: bool, session_id: str, total_chunks: Optional[int] = None) -> Dict[str, Any]:
+        """청크 하나의 메모리 문서 구성 (전체 청크 수를 모르면 순번만 표시)"""
+        position = f"{index+1}/{total_chunks}" if total_chunks else f"{index+1}"
+        tags = [category, "학습자료", "강화학습", filename.split('.')[0]]
+        return {
+            # 관리자 학습: 모든 회원이 접근 가능한 공유 데이터 / 개인 학습: 개인 전용 데이터
+            "user_id": "admin_shared" if is_admin_learning else user_id,
+            "session_id": session_id,
+            "message": f"[{category} 학습자료 {position}] {filename}",
+            "response": chunk,
+            "content": chunk,  # EORAMemorySystem 호환성을 위해 추가
+            "timestamp": datetime.now().isoformat(),
+            "memory_type": "enhanced_learning",
+            "category": category,
+            "importance": 0.9,
+            "tags": tags,
+            "keywords": list(tags),  # EORAMemorySystem 호환성을 위해 추가
+            "source_file": filename,
+            "filename": filename,  # EORAMemorySystem 호환성을 위해 추가
+            "chunk_index": index,
+            "chunk_size": len(chunk),
+            "source": "enhanced_learning",  # 구분을 위한 소스 표시
+            "admin_shared": is_admin_learning,  # 관리자 공유 플래그
+            "shared_to_all": is_admin_learning,  # 전체 회원 공유 플래그
+            "uploaded_by": user_id,  # 실제 업로더 정보
+            "upload_type": "admin_document" if is_admin_learning else "personal_document"
+        }
+    
+    def _ensure_db(self) -> bool:
+        """DB 연결 확인 및 재연결 시도"""
+        if self.db is not None:
+            return True
+        logger.error("❌ DB 연결이 설정되지 않음")
+        # 데이터베이스 재연결 시도
+        try:
+            from mongodb_config import get_optimized_database
+            new_db = get_optimized_database()
+            if new_db is None:
+                logger.error("❌ DB 재연결 실패")
+                return False
+            
+            # Database 객체인지 확인
+            if hasattr(new_db, 'list_collection_names'):
+                self.db = new_db
+                logger.info("✅ DB 재연결 성공")
+                return True
+            logger.error("❌ 재연결된 객체가 Database 타입이 아님")
+            return False
+        except Exception as e:
+            logger.error(f"❌ DB 재연결 예외: {e}")
+            return False
+    
+    async def save_chunk_batch(self, chunks: List[str], start_index: int, filename: str, category: str,
+                               user_id: str, is_admin_learning: bool, session_id: str,
+                               embeddings: List[Optional[bytes]] = None,
+                               total_chunks: Optional[int] = None) -> Dict[str, Any]:
+        """
+        청크 묶음을 한 번의 일괄 upsert로 저장 (같은 사용자에게 이미 있는 내용/거의 같은 청크는 건너뜀)
         
-        return chunks
+        Args:
+            chunks: 저장할 청크 목록
+            start_index: 첫 청크의 문서 내 순번
+            embeddings: 미리 생성한 청크 임베딩 (없으면 여기서 배치 생성)
+            total_chunks: 문서 전체 청크 수 (스트리밍 학습에서는 None)
+            
+        Returns:
+            Dict: {"saved_ids": 저장된 메모리 ID 목록, "duplicates": 건너뛴 중복 청크 수}
+        """
+        if not chunks or not self._ensure_db():
+            return {"saved_ids": [], "duplicates": 0}
+        
+        if embeddings is None:
+            embeddings = await embed_texts(chunks)
+        
+        documents = []
+        for offset, chunk in enumerate(chunks):
+            memory_doc = self._build_memory_doc(chunk, start_index + offset, filename, category,
+                                                user_id, is_admin_learning, session_id, total_chunks)
+            if embeddings[offset] is not None:
+                memory_doc[CHUNK_EMBEDDING_FIELD] = embeddings[offset]
+            documents.append(annotate_document(memory_doc))
+        
+        outcome = await run_db(self._get_deduplicator().upsert_many, documents, skip_near_duplicates=True)
+        if outcome["failed"]:
+            logger.warning(f"⚠️ 일부 청크 저장 실패: {len(outcome['failed'])}/{len(documents)}개")
+        if outcome["inserted"]:
+            bump_memory_generation(user_scope(user_id), SHARED_SCOPE)
+        return {
+            "saved_ids": [str(documents[i]["_id"]) for i in outcome["inserted"]],
+            "duplicates": len(outcome["duplicates"]) + len(outcome["near_duplicates"])
+        }
+    
+    def _get_deduplicator(self) -> ContentDeduplicator:
+        """memories 컬렉션의 내용 해시 중복 방지기 (처음 사용할 때 인덱스 생성/백필 시작)"""
+        if self.deduplicator is None:
+            self.deduplicator = ContentDeduplicator(
+                self.db.memories,
+                scope_fields=("user_id",),
+                backfill_filter={"memory_type": "enhanced_learning"},
+                near_duplicates=True
+            )
+            self.deduplicator.start_backfill()
+        return self.deduplicator
     
     async def _save_to_database(self, chunks: List[str], filename: str, category: str, user_id: str = "admin", is_admin_learning: bool = True) -> List[str]:
         """청크를 DB에 저장"""
         logger.info(f"💾 DB 저장 시작: {len(chunks)}개 청크")
         
         saved_ids = []
-        # 보안을 위해 파일명 해싱 사용
-        import hashlib
-        filename_hash = hashlib.md5(filename.encode()).hexdigest()[:8]
-        session_id = f"enhanced_learning_{filename_hash}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        session_id = self.make_session_id(filename)
         
-        if self.db is None:
-            logger.error("❌ DB 연결이 설정되지 않음")
-            # 데이터베이스 재연결 시도
-            try:
-                from mongodb_config import get_optimized_database
-                new_db = get_optimized_database()
-                if new_db is None:
-                    logger.error("❌ DB 재연결 실패")
-                    return saved_ids
-                
-                # Database 객체인지 확인
-                if hasattr(new_db, 'list_collection_names'):
-                    self.db = new_db
-                    logger.info("✅ DB 재연결 성공")
-                else:
-                    logger.error("❌ 재연결된 객체가 Database 타입이 아님")
-                    return saved_ids
-            except Exception as e:
-                logger.error(f"❌ DB 재연결 예외: {e}")
-                return saved_ids
+        if not self._ensure_db():
+            return saved_ids
         
         try:
-            # MongoDB 컬렉션 접근 안전성 확인
-            try:
-                memories_collection = self.db.memories
-                # 컬렉션 존재 여부 확인
-                self.db.list_collection_names()
-            except Exception as collection_error:
-                logger.error(f"❌ 컬렉션 접근 실패: {collection_error}")
-                return saved_ids
+            # 청크 임베딩을 배치로 한 번에 생성
+            embeddings = await embed_texts(chunks)
+            logger.info(f"🧮 청크 임베딩 생성: {sum(1 for e in embeddings if e is not None)}/{len(chunks)}개")
             
-            for i, chunk in enumerate(chunks):
-                # 관리자 학습인 경우 공유 데이터로 저장, 아닌 경우 개인 데이터로 저장
-                if is_admin_learning:
-                    # 관리자 학습: 모든 회원이 접근 가능한 공유 데이터
-                    memory_doc = {
-                        "user_id": "admin_shared",  # 공유 데이터 식별자
-                        "session_id": session_id,
-                        "message": f"[{category} 학습자료 {i+1}/{len(chunks)}] {filename}",
-                        "response": chunk,
-                        "content": chunk,  # EORAMemorySystem 호환성을 위해 추가
-                        "timestamp": datetime.now().isoformat(),
-                        "memory_type": "enhanced_learning",
-                        "category": category,
-                        "importance": 0.9,
-                        "tags": [category, "학습자료", "강화학습", filename.split('.')[0]],
-                        "keywords": [category, "학습자료", "강화학습", filename.split('.')[0]],  # EORAMemorySystem 호환성을 위해 추가
-                        "source_file": filename,
-                        "filename": filename,  # EORAMemorySystem 호환성을 위해 추가
-                        "chunk_index": i,
-                        "chunk_size": len(chunk),
-                        "source": "enhanced_learning",  # 구분을 위한 소스 표시
-                        "admin_shared": True,  # 관리자 공유 플래그
-                        "shared_to_all": True,  # 전체 회원 공유 플래그
-                        "uploaded_by": user_id,  # 실제 업로더 정보
-                        "upload_type": "admin_document"  # 관리자 문서 타입
-                    }
-                else:
-                    # 개인 학습: 개인 전용 데이터
-                    memory_doc = {
-                        "user_id": user_id,
-                        "session_id": session_id,
-                        "message": f"[{category} 학습자료 {i+1}/{len(chunks)}] {filename}",
-                        "response": chunk,
-                        "content": chunk,  # EORAMemorySystem 호환성을 위해 추가
-                        "timestamp": datetime.now().isoformat(),
-                        "memory_type": "enhanced_learning",
-                        "category": category,
-                        "importance": 0.9,
-                        "tags": [category, "학습자료", "강화학습", filename.split('.')[0]],
-                        "keywords": [category, "학습자료", "강화학습", filename.split('.')[0]],  # EORAMemorySystem 호환성을 위해 추가
-                        "source_file": filename,
-                        "filename": filename,  # EORAMemorySystem 호환성을 위해 추가
-                        "chunk_index": i,
-                        "chunk_size": len(chunk),
-                        "source": "enhanced_learning",  # 구분을 위한 소스 표시
-                        "admin_shared": False,  # 개인 데이터
-                        "shared_to_all": False,  # 개인 전용
-                        "uploaded_by": user_id,  # 업로더 정보
-                        "upload_type": "personal_document"  # 개인 문서 타입
-                    }
-                
-                result = memories_collection.insert_one(memory_doc)
-                saved_ids.append(str(result.inserted_id))
-                
-                if (i+1) % 5 == 0:
-                    logger.info(f"💾 저장 진행: {i+1}/{len(chunks)} 완료")
+            for start in range(0, len(chunks), SAVE_BATCH_SIZE):
+                batch = await self.save_chunk_batch(
+                    chunks[start:start + SAVE_BATCH_SIZE], start, filename, category, user_id,
+                    is_admin_learning, session_id,
+                    embeddings=embeddings[start:start + SAVE_BATCH_SIZE],
+                    total_chunks=len(chunks)
+                )
+                saved_ids += batch["saved_ids"]
+                if batch["duplicates"]:
+                    logger.info(f"♻️ 이미 학습된 청크 {batch['duplicates']}개 건너뜀")
+                logger.info(f"💾 저장 진행: {min(start + SAVE_BATCH_SIZE, len(chunks))}/{len(chunks)} 완료")
             
             logger.info(f"✅ DB 저장 완료: {len(saved_ids)}개")
             return saved_ids
@@ -1,29 +1,58 @@
 """
 감정 기반 기억 회상 모듈
 - 특정 감정(label)로 저장된 기억만 불러오기
+- 감정 사전 집계(emotion_rollup)로 일치하는 감정 값과 최근 기억이 있는 기간을 먼저 찾아
+  해당 기간만 조회합니다 (집계 백필 전에는 전체 조회)
 """
 
-import sys, os
+import sys, os, re
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "aura_system")))
 from pymongo import MongoClient
+from emotion_rollup import ROLLUP_COLLECTION, EmotionRollup
+from memory_maintenance import MAINTENANCE_STATE_COLLECTION
 
 mongo_client = MongoClient("mongodb://localhost:27017")
 db = mongo_client["aura_memory"]
 collection = db["memory_atoms"]
 
+# memory_atoms 감정 사전 집계 (사용자 구분 없음, 저장 시 emotion_system_full_integrator에서 반영)
+emotion_rollup = EmotionRollup(
+    collection,
+    db[ROLLUP_COLLECTION],
+    db[MAINTENANCE_STATE_COLLECTION],
+    user_field=None,
+    dimensions={"emotion": "emotion_label"}
+)
+
 def recall_memories_by_emotion(target_emotion: str, limit=5):
     """
     특정 감정에 해당하는 기억을 최신 순으로 회상
     """
-    memories = list(
-        collection.find({"emotion_label": {"$regex": target_emotion}})
-        .sort("timestamp", -1)
-        .limit(limit)
-    )
+    if not emotion_rollup.refresh_ready():
+        memories = list(
+            collection.find({"emotion_label": {"$regex": target_emotion}})
+            .sort("timestamp", -1)
+            .limit(limit)
+        )
+        return memories
+
+    labels = [
+        label for label in emotion_rollup.values(all_users=True)
+        if isinstance(label, str) and re.search(target_emotion, label)
+    ]
+    if not labels:
+        return []
+
+    query = {"emotion_label": {"$in": labels}}
+    _, since = emotion_rollup.recent_window(labels, limit, all_users=True)
+    if since is not None:
+        # timestamp는 datetime 또는 ISO 문자열
+        query["$or"] = [{"timestamp": {"$gte": since}}, {"timestamp": {"$gte": since.isoformat()}}]
+    memories = list(collection.find(query).sort("timestamp", -1).limit(limit))
     return memories
 
 if __name__ == "__main__":
     memories = recall_memories_by_emotion("불안")
     for memory in memories:
-        print(f"🧠 [{memory['emotion_label']}] {memory['summary_prompt']}")
\ No newline at end of file
+        print(f"🧠 [{memory['emotion_label']}] {memory['summary_prompt']}")
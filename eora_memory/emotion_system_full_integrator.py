@@ -22,6 +22,7 @@ from belief_detector      import extract_belief_phrases
 from belief_reframer      import suggest_reframe
 from emotion_logic_module import estimate_emotion
 from emotion_system.memory_structurer_advanced_emotion_code import EMOTION_CODE_MAP
+from eora_memory.emotion_based_memory_recaller import emotion_rollup
 
 mongo_client = MongoClient("mongodb://localhost:27017")
 collection   = mongo_client["aura_memory"]["memory_atoms"]
@@ -57,6 +58,7 @@ def save_enhanced_memory(user_input: str, gpt_response: str, origin_type="user")
     )
 
     _id = collection.insert_one(memory).inserted_id
+    emotion_rollup.record([memory])
     print(f"✅ 메모리 저장 완료 (감정: {emo_label}, 신념: {detected_belief or '없음'})")
     return {**memory, "_id": _id}
 
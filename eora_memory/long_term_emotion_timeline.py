@@ -2,21 +2,22 @@
 장기 감정 타임라인 분석기
 - MongoDB memory_atoms에서 감정 흐름 추출
 - 주 단위/월 단위 감정 변화 분석
+- 기억 전체를 읽어 리샘플링하지 않고 감정 사전 집계(emotion_rollup)의 버킷별 개수를 사용
 """
 
 import sys, os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "aura_system")))
-from pymongo import MongoClient
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
+from eora_memory.emotion_based_memory_recaller import collection, emotion_rollup
 
-mongo_client = MongoClient("mongodb://localhost:27017")
-db = mongo_client["aura_memory"]
-collection = db["memory_atoms"]
+# pandas 리샘플 단위 -> 사전 집계 단위
+ROLLUP_UNITS_BY_TIME_UNIT = {"D": "day", "W": "week", "M": "month"}
 
 def fetch_emotion_data():
+    """집계가 준비되지 않았을 때의 기존 방식 (기억별 timestamp/감정)"""
     memories = list(collection.find({}, {"timestamp": 1, "emotion_label": 1}))
     records = []
     for mem in memories:
@@ -26,18 +27,38 @@ def fetch_emotion_data():
             records.append({"timestamp": pd.to_datetime(ts), "emotion": label})
     return pd.DataFrame(records)
 
-def plot_emotion_timeline(time_unit="W"):
+def fetch_emotion_counts(time_unit="W"):
     """
-    time_unit: 'D' (day), 'W' (week), 'M' (month) 가능
+    버킷(행) x 감정(열) 개수 표
+    처음 실행 시 기존 기억을 한 번 백필하고, 이후에는 버킷 수에 비례하여 조회합니다.
     """
+    unit = ROLLUP_UNITS_BY_TIME_UNIT.get(time_unit)
+    if unit is not None:
+        emotion_rollup.backfill()
+        if emotion_rollup.is_ready():
+            rows = emotion_rollup.timeline(unit, "emotion", all_users=True)
+            if not rows:
+                return pd.DataFrame()
+            df = pd.DataFrame(rows)
+            df["value"] = df["value"].fillna("기타")
+            return df.pivot_table(index="bucket", columns="value", values="count", aggfunc="sum").fillna(0)
+
+    # 지원하지 않는 단위이거나 다른 프로세스가 백필 중이면 기억 전체를 리샘플링
     df = fetch_emotion_data()
     if df.empty:
+        return df
+    df.set_index("timestamp", inplace=True)
+    return df.resample(time_unit).emotion.value_counts().unstack().fillna(0)
+
+def plot_emotion_timeline(time_unit="W"):
+    """
+    time_unit: 'D' (day), 'W' (week), 'M' (month) 가능
+    """
+    emotion_counts = fetch_emotion_counts(time_unit)
+    if emotion_counts.empty:
         print("⚠️ 감정 데이터가 없습니다.")
         return
 
-    df.set_index("timestamp", inplace=True)
-    emotion_counts = df.resample(time_unit).emotion.value_counts().unstack().fillna(0)
-
     plt.figure(figsize=(12,6))
     emotion_counts.plot(kind="area", stacked=True, alpha=0.7)
     plt.title(f"EORA 감정 타임라인 ({time_unit} 단위)")
@@ -48,4 +69,4 @@ def plot_emotion_timeline(time_unit="W"):
     plt.show()
 
 if __name__ == "__main__":
-    plot_emotion_timeline("W")
\ No newline at end of file
+    plot_emotion_timeline("W")
@@ -2,49 +2,45 @@
 기억 망각-강화 알고리즘
 - 오래되고 사용되지 않은 기억: 중요도 감소 (망각)
 - 자주 사용되거나 중요한 기억: 중요도 증가 (강화)
+
+전체 기억을 읽어 하나씩 갱신하지 않고, 마지막 사용 시각의 나이 버킷이 바뀐 기억만
+서버 측 업데이트 파이프라인으로 배치 갱신합니다 (memory_maintenance 참고).
 """
 
 import sys, os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "aura_system")))
 from pymongo import MongoClient
-from datetime import datetime, timedelta
+from memory_maintenance import MAINTENANCE_STATE_COLLECTION, MemoryMaintenanceJob
 
 mongo_client = MongoClient("mongodb://localhost:27017")
 db = mongo_client["aura_memory"]
 collection = db["memory_atoms"]
 
-def strengthen_or_forget_memories():
-    now = datetime.utcnow()
-
-    memories = list(collection.find({}))
-    updated = 0
-
-    for mem in memories:
-        last_used = mem.get("last_used", mem.get("timestamp"))
-        if isinstance(last_used, str):
-            last_used = datetime.fromisoformat(last_used)
-
-        days_passed = (now - last_used).days
-        importance = mem.get("importance", 5000)
+# 30일 넘게 사용되지 않으면 망각(0.95배), 7일 이내 사용 또는 공명도 85 초과면 강화(1.05배)
+maintenance_job = MemoryMaintenanceJob(
+    collection,
+    db[MAINTENANCE_STATE_COLLECTION],
+    name="memory_atoms.importance",
+    score_field="importance",
+    default_score=5000,
+    min_score=1000,
+    max_score=10000,
+    used_field="last_used",
+    fallback_field="timestamp",
+    forget_after_days=30,
+    strengthen_within_days=7,
+    decay=0.95,
+    strengthen=1.05,
+    resonance_field="resonance_score",
+    resonance_threshold=85
+)
 
-        # 오래된 기억: 점진적 중요도 감소 (망각)
-        if days_passed > 30:
-            importance *= 0.95
-
-        # 최근 사용된 기억 또는 높은 공명도: 중요도 증가 (강화)
-        elif days_passed <= 7 or mem.get("resonance_score", 0) > 85:
-            importance *= 1.05
-
-        importance = round(max(min(importance, 10000), 1000), 2)
-
-        collection.update_one(
-            {"_id": mem["_id"]},
-            {"$set": {"importance": importance}}
-        )
-        updated += 1
-
-    print(f"✅ {updated} 개 기억 강화/망각 점수 조정 완료")
+def strengthen_or_forget_memories():
+    report = maintenance_job.run()
+    print(f"✅ {report['modified']} 개 기억 강화/망각 점수 조정 완료 "
+          f"(후보 {report['candidates']}개, {report['elapsed_sec']}초, {report['docs_per_sec']}개/초)")
+    return report
 
 if __name__ == "__main__":
-    strengthen_or_forget_memories()
\ No newline at end of file
+    strengthen_or_forget_memories()
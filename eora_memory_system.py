@@ -9,10 +9,30 @@ import logging
 import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
+import numpy as np
 from pymongo import MongoClient
 from bson import ObjectId
 import re
 import hashlib
+import threading
+
+from db_executor import run_db
+from mongo_supervisor import ConnectionSupervisor
+from keyword_index import KeywordIndex, annotate_document
+from chunk_embeddings import CHUNK_EMBEDDING_FIELD, embed_text as embed_chunk, get_document_embedding
+from content_dedup import ContentDeduplicator
+from recall_cache import SHARED_SCOPE, bump_memory_generation, get_recall_cache, user_scope
+from prompt_assembler import TOKEN_COUNT_FIELD, count_text_tokens
+from stage_metrics import timed
+from memory_maintenance import MAINTENANCE_STATE_COLLECTION, MemoryMaintenanceJob
+from emotion_rollup import ROLLUP_COLLECTION, EmotionRollup
+
+# 학습 시점에 임베딩을 함께 저장하는 메모리 타입
+EMBEDDED_MEMORY_TYPES = ("document_chunk",)
+# 같은 사용자 안에서 같은 내용을 한 번만 저장하는 메모리 타입 (대화 기록은 반복 허용)
+DEDUP_MEMORY_TYPES = ("document_chunk",)
+# 역순위 융합(RRF) 상수
+RRF_K = 60
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +48,7 @@ class EORAMemorySystem:
             try:
                 import sys
                 sys.path.append('.')
-                from database import get_cached_mongodb_connection, get_mongodb_url, MONGODB_URL
+                from database import get_cached_mongodb_connection, get_mongodb_url, MONGODB_URL, connection_supervisor
                 
                 # 이미 연결된 클라이언트가 있으면 재사용
                 cached_client = get_cached_mongodb_connection()
@@ -36,6 +56,8 @@ class EORAMemorySystem:
                     try:
                         cached_client.admin.command('ping')
                         logger.info("✅ database.py의 기존 MongoDB 연결 재사용")
+                        # 연결 상태는 database.py 감시기를 공유
+                        self.supervisor = connection_supervisor
                         self.client = cached_client
                         self.db = self.client["eora_memory"]
                         self._setup_collections()
@@ -114,6 +136,7 @@ class EORAMemorySystem:
         self.client = None
         self.db = None
         self.memories = None
+        self.supervisor = ConnectionSupervisor("eora_memory")
         
         # 이미 database.py 연결을 재사용한 경우가 아니라면 새로 연결
         if self.client is None:
@@ -133,6 +156,7 @@ class EORAMemorySystem:
                     "serverSelectionTimeoutMS": 10000,  # Railway에서는 더 긴 타임아웃
                     "connectTimeoutMS": 10000,
                     "socketTimeoutMS": 20000,
+                    "event_listeners": [self.supervisor],  # 하트비트로 상태 갱신
                 }
                 
                 if is_railway:
@@ -149,6 +173,7 @@ class EORAMemorySystem:
                 # 연결 테스트
                 self.client.admin.command('ping')
                 self.db = self.client["eora_memory"]
+                self.supervisor.attach(self.client)
                 
                 # 컬렉션 설정
                 self._setup_collections()
@@ -169,6 +194,10 @@ class EORAMemorySystem:
                 self.belief_memories = None
                 self.context_memories = None
                 self.connection_index = None
+                self.supervisor.attach(None, healthy=False)
+            
+            # 백그라운드 상태 감시 및 재연결 (요청 경로에서는 ping하지 않음)
+            self.supervisor.start(reconnect=self._reconnect)
             
         # 메모리 설정
         self.max_memories_per_user = 1000
@@ -243,28 +272,15 @@ class EORAMemorySystem:
                     try:
                         # MongoDB에서 실제 데이터 검색
                         if eora_system.is_connected():
-                            # 텍스트 검색 조건
-                            search_conditions = []
-                            
-                            # 전체 문서 검색
-                            search_conditions.append({"content": {"$regex": query_lower, "$options": "i"}})
-                            
-                            # 단어별 검색
+                            # 키워드 역색인 검색 (더 많이 가져와서 점수 계산 후 필터링)
                             query_words = query_lower.split()
-                            for word in query_words:
-                                if len(word) > 2:
-                                    search_conditions.append({"content": {"$regex": word, "$options": "i"}})
-                            
-                            if search_conditions:
-                                mongodb_results = list(eora_system.memories.find({
-                                    "$or": search_conditions
-                                }).limit(limit * 2))  # 더 많이 가져와서 점수 계산 후 필터링
-                                
+                            mongodb_results = await run_db(eora_system.keyword_index.search, query, None, limit * 2)
+                            if mongodb_results:
                                 # 점수 계산
                                 scored_memories = []
                                 for doc in mongodb_results:
                                     content = doc.get("content", "").lower()
-                                    score = 0
+                                    score = doc.get("keyword_score", 0)
                                     
                                     # 정확한 매칭
                                     if query_lower in content:
@@ -331,18 +347,61 @@ class EORAMemorySystem:
             self.belief_memories = self.db["belief_memories"]
             self.context_memories = self.db["context_memories"]
             self.connection_index = self.db["connection_index"]
+            self.keyword_index = KeywordIndex(self.memories, exclude_fields=(CHUNK_EMBEDDING_FIELD,))
+            self.deduplicator = ContentDeduplicator(
+                self.memories,
+                scope_fields=("user_id",),
+                backfill_filter={"memory_type": {"$in": list(DEDUP_MEMORY_TYPES)}},
+                near_duplicates=True
+            )
+            # forgetting_score(1 = 온전) 망각/강화 + fade_score 갱신 (증분 유지보수 작업)
+            self.maintenance = MemoryMaintenanceJob(
+                self.memories,
+                self.db[MAINTENANCE_STATE_COLLECTION],
+                name="memories.forgetting_score",
+                score_field="forgetting_score",
+                default_score=1.0,
+                min_score=0.0,
+                max_score=1.0,
+                used_field="last_accessed",
+                fallback_field="timestamp",
+                resonance_field=None,
+                fade_field="fade_score",
+                precision=4,
+                clock=datetime.now
+            )
+            # (사용자, 일/주/월, 감정/주제) 개수 사전 집계 - 통계/타임라인/감정 회상용
+            self.emotion_rollup = EmotionRollup(
+                self.memories,
+                self.db[ROLLUP_COLLECTION],
+                self.db[MAINTENANCE_STATE_COLLECTION]
+            )
+            self.chunk_vectors = None
             logger.info("✅ 메모리 컬렉션 설정 완료")
     
     def is_connected(self):
-        """MongoDB 연결 상태 확인"""
-        try:
-            if self.client is not None and self.db is not None and self.memories is not None:
-                self.client.admin.command('ping')
-                return True
-            return False
-        except Exception as e:
-            logger.debug(f"연결 상태 확인 중 오류: {str(e)}")
-            return False
+        """MongoDB 연결 상태 확인 (감시기에 캐시된 상태, ping 없음)"""
+        if self.client is not None and self.db is not None and self.memories is not None:
+            return self.supervisor.is_healthy()
+        return False
+    
+    def _reconnect(self):
+        """감시기에서 호출하는 재연결 함수"""
+        client = MongoClient(
+            self.mongo_uri,
+            serverSelectionTimeoutMS=10000,
+            connectTimeoutMS=10000,
+            socketTimeoutMS=20000,
+            event_listeners=[self.supervisor]
+        )
+        client.admin.command('ping')
+        
+        self.client = client
+        self.db = self.client["eora_memory"]
+        self._setup_collections()
+        self._create_indexes()
+        self.supervisor.attach(self.client)
+        return True
         
     def _create_indexes(self):
         """데이터베이스 인덱스 생성"""
@@ -351,7 +410,9 @@ class EORAMemorySystem:
             self.memories.create_index([("user_id", 1), ("timestamp", -1)])
             self.memories.create_index([("topic", 1), ("emotion_score", -1)])
             self.memories.create_index([("connections", 1)])
-            
+            # 학습 작업 종료 시 청크 수 갱신용
+            self.memories.create_index([("metadata.ingest_job_id", 1)], sparse=True)
+
             # 감정 메모리 인덱스
             self.emotion_memories.create_index([("emotion_label", 1), ("timestamp", -1)])
             self.emotion_memories.create_index([("emotion_score", -1)])
@@ -362,10 +423,42 @@ class EORAMemorySystem:
             # 맥락 메모리 인덱스
             self.context_memories.create_index([("context_keywords", 1), ("timestamp", -1)])
             
+            # 키워드 역색인 (search_terms 인덱스 + 기존 문서 백필은 백그라운드)
+            self.keyword_index.start_backfill()
+            
+            # 내용 해시 유니크 인덱스 (기존 학습 청크 백필은 백그라운드)
+            self.deduplicator.start_backfill()
+            
+            # 감정/주제 사전 집계 (기존 메모리 백필은 백그라운드, 한 번만)
+            self.emotion_rollup.start_backfill()
+            
+            # 학습 청크 벡터 색인 (백그라운드 로드)
+            threading.Thread(target=self._load_chunk_vectors, name="chunk-vectors", daemon=True).start()
+            
             logger.info("메모리 시스템 인덱스 생성 완료")
         except Exception as e:
             logger.error(f"인덱스 생성 오류: {str(e)}")
     
+    def _load_chunk_vectors(self):
+        """임베딩이 저장된 학습 청크로 벡터 색인을 채웁니다 (백그라운드 스레드)."""
+        try:
+            from aura_system.vector_matrix import VectorMatrixIndex
+        except Exception as e:
+            logger.warning(f"⚠️ 벡터 색인 사용 불가, 키워드 회상만 사용: {e}")
+            return
+        try:
+            index = VectorMatrixIndex()
+            # 먼저 연결해 두어 로드 중 새로 저장된 청크도 반영
+            self.chunk_vectors = index
+            cursor = self.memories.find({CHUNK_EMBEDDING_FIELD: {"$exists": True}}, {CHUNK_EMBEDDING_FIELD: 1})
+            loaded = index.load(
+                (str(doc["_id"]), np.frombuffer(get_document_embedding(doc), dtype=np.float32))
+                for doc in cursor if get_document_embedding(doc)
+            )
+            logger.info(f"✅ 학습 청크 벡터 색인 로드 완료: {loaded}개")
+        except Exception as e:
+            logger.error(f"학습 청크 벡터 색인 로드 오류: {str(e)}")
+    
     async def save_memory(self, 
                          user_id: str,
                          user_input: str, 
@@ -404,10 +497,12 @@ class EORAMemorySystem:
                 "access_count": 0,
                 "forgetting_score": 1.0
             }
+            annotate_document(memory_data)
             
             # 메모리 저장
-            result = self.memories.insert_one(memory_data)
+            result = await run_db(self.memories.insert_one, memory_data)
             memory_id = str(result.inserted_id)
+            await run_db(self.emotion_rollup.record, [memory_data])
             
             # 감정 메모리 저장
             if emotion_data and emotion_data.get("score", 0) > self.emotion_threshold:
@@ -424,6 +519,9 @@ class EORAMemorySystem:
             # 연결 관계 업데이트
             await self._update_connections(memory_id, user_input, ai_response)
             
+            # 이 사용자의 회상 캐시 무효화
+            bump_memory_generation(user_scope(user_id))
+            
             logger.info(f"메모리 저장 완료 - 사용자: {user_id}, ID: {memory_id}")
             return {"memory_id": memory_id, "status": "saved"}
             
@@ -431,7 +529,50 @@ class EORAMemorySystem:
             logger.error(f"메모리 저장 오류: {str(e)}")
             return {"error": str(e)}
     
-    async def store_memory(self, content: str, memory_type: str = "general", user_id: str = None, metadata: Dict = None) -> Dict:
+    def build_memory_document(self, content: str, memory_type: str = "general", user_id: str = None, metadata: Dict = None) -> Dict:
+        """
+        memories 컬렉션에 저장할 문서를 구성합니다 (store_memory와 일괄 저장에서 공용)
+        
+        Args:
+            content (str): 저장할 내용
+            memory_type (str): 메모리 타입
+            user_id (str): 사용자 ID
+            metadata (Dict): 추가 메타데이터
+            
+        Returns:
+            Dict: 메모리 문서
+        """
+        timestamp = datetime.now()
+        metadata = metadata or {}
+        
+        # 기본 메모리 데이터 구성 (키워드 역색인 필드 포함)
+        memory_data = annotate_document({
+            "user_id": user_id or "system",
+            "timestamp": timestamp,
+            "content": content,
+            "memory_type": memory_type,
+            "metadata": metadata,
+            "source": metadata.get("source", "file_learning"),
+            "filename": metadata.get("filename", "unknown"),
+            "file_extension": metadata.get("file_extension", ""),
+            "chunk_index": metadata.get("chunk_index", 0),
+            "total_chunks": metadata.get("total_chunks", 1),
+            "importance_score": self._calculate_content_importance(content),
+            "topic": self._extract_topic(content),
+            "keywords": self._extract_keywords(content),
+            "last_accessed": None,
+            "access_count": 0,
+            "forgetting_score": 1.0,
+            "created_at": timestamp.isoformat(),
+            # 프롬프트 조립 시 다시 인코딩하지 않도록 토큰 수 저장
+            TOKEN_COUNT_FIELD: count_text_tokens(content)
+        })
+        if memory_type in DEDUP_MEMORY_TYPES:
+            self.deduplicator.annotate(memory_data)
+        return memory_data
+    
+    async def store_memory(self, content: str, memory_type: str = "general", user_id: str = None, metadata: Dict = None,
+                           embedding: Optional[bytes] = None) -> Dict:
         """
         메모리 저장 (학습된 파일 청크 전용)
         
@@ -440,6 +581,7 @@ class EORAMemorySystem:
             memory_type (str): 메모리 타입 (document_chunk, conversation, general 등)
             user_id (str): 사용자 ID
             metadata (Dict): 추가 메타데이터
+            embedding (bytes): 미리 배치로 생성한 청크 임베딩 (document_chunk, 없으면 여기서 생성)
             
         Returns:
             Dict: 저장 결과
@@ -473,46 +615,36 @@ class EORAMemorySystem:
                     "mongo_uri": self.mongo_uri
                 }
             
-            timestamp = datetime.now()
             metadata = metadata or {}
-            
-            # 기본 메모리 데이터 구성
-            memory_data = {
-                "user_id": user_id or "system",
-                "timestamp": timestamp,
-                "content": content,
-                "memory_type": memory_type,
-                "metadata": metadata,
-                "source": metadata.get("source", "file_learning"),
-                "filename": metadata.get("filename", "unknown"),
-                "file_extension": metadata.get("file_extension", ""),
-                "chunk_index": metadata.get("chunk_index", 0),
-                "total_chunks": metadata.get("total_chunks", 1),
-                "importance_score": self._calculate_content_importance(content),
-                "topic": self._extract_topic(content),
-                "keywords": self._extract_keywords(content),
-                "last_accessed": None,
-                "access_count": 0,
-                "forgetting_score": 1.0,
-                "created_at": timestamp.isoformat()
-            }
+            memory_data = self.build_memory_document(content, memory_type, user_id, metadata)
+            if memory_type in EMBEDDED_MEMORY_TYPES:
+                if embedding is None:
+                    embedding = await embed_chunk(content)
+                if embedding is not None:
+                    memory_data[CHUNK_EMBEDDING_FIELD] = embedding
             
             # MongoDB에 저장
             try:
-                result = self.memories.insert_one(memory_data)
-                memory_id = str(result.inserted_id)
-                
-                # 저장 검증: 실제로 저장되었는지 확인
-                saved_doc = self.memories.find_one({"_id": result.inserted_id})
-                if not saved_doc:
-                    logger.error(f"❌ 저장 검증 실패: 문서가 실제로 저장되지 않음")
-                    return {
-                        "success": False,
-                        "error": "저장 검증 실패: 문서가 데이터베이스에서 찾을 수 없음",
-                        "type": memory_type
-                    }
+                if memory_type in DEDUP_MEMORY_TYPES:
+                    # 내용 해시 upsert (같은 사용자에게 같은 내용이 있으면 기존 문서 ID 반환)
+                    inserted_id, inserted = await run_db(self.deduplicator.upsert_one, memory_data)
+                    memory_id = str(inserted_id)
+                    if not inserted:
+                        logger.info(f"♻️ 같은 내용이 이미 저장되어 있음 - ID: {memory_id}")
+                        return {
+                            "success": True,
+                            "memory_id": memory_id,
+                            "status": "duplicate",
+                            "duplicate": True,
+                            "type": memory_type,
+                            "content_length": len(content)
+                        }
+                else:
+                    result = await run_db(self.memories.insert_one, memory_data)
+                    memory_id = str(result.inserted_id)
+                await run_db(self.emotion_rollup.record, [memory_data])
                 
-                logger.info(f"✅ MongoDB 저장 및 검증 완료 - ID: {memory_id}")
+                logger.info(f"✅ MongoDB 저장 완료 - ID: {memory_id}")
                 
             except Exception as db_error:
                 logger.error(f"❌ MongoDB 삽입 오류: {str(db_error)}")
@@ -522,10 +654,17 @@ class EORAMemorySystem:
                     "type": memory_type
                 }
             
+            # 벡터 색인에 즉시 반영
+            if embedding is not None and self.chunk_vectors is not None:
+                self.chunk_vectors.upsert(memory_id, np.frombuffer(embedding, dtype=np.float32))
+            
+            # 회상 캐시 무효화 (학습 청크는 전체 공유)
+            bump_memory_generation(*self._generation_scopes(memory_type, memory_data["user_id"]))
+            
             # 파일 청크의 경우 추가 인덱싱
             if memory_type == "document_chunk":
                 try:
-                    self._index_document_chunk_sync(memory_id, content, metadata)
+                    await run_db(self._index_document_chunk_sync, memory_id, content, metadata)
                 except Exception as index_error:
                     logger.warning(f"⚠️ 인덱싱 오류 (저장은 성공): {str(index_error)}")
             
@@ -546,7 +685,106 @@ class EORAMemorySystem:
                 "error": str(e),
                 "type": memory_type
             }
-    
+
+    async def store_memories_batch(self, contents: List[str], memory_type: str = "document_chunk", user_id: str = None,
+                                   metadatas: List[Dict] = None, embeddings: List[Optional[bytes]] = None) -> Dict:
+        """
+        여러 메모리를 한 번의 일괄 쓰기로 저장 (문서 학습 작업용)
+        중복 방지 대상 타입은 내용 해시 upsert로 저장하여 이미 있는 청크는 건너뜁니다.
+
+        Args:
+            contents (List[str]): 저장할 내용 목록
+            memory_type (str): 메모리 타입
+            user_id (str): 사용자 ID
+            metadatas (List[Dict]): 내용별 메타데이터
+            embeddings (List[bytes]): 내용별 청크 임베딩 (없으면 None)
+
+        Returns:
+            Dict: 저장 결과 (memory_ids, saved, duplicates, failed)
+        """
+        if not self.is_connected():
+            return {"success": False, "error": "MongoDB 연결이 없습니다", "saved": 0, "duplicates": 0, "failed": len(contents)}
+
+        metadatas = metadatas or [{} for _ in contents]
+        embeddings = embeddings or [None] * len(contents)
+        documents = []
+        for content, metadata, embedding in zip(contents, metadatas, embeddings):
+            memory_data = self.build_memory_document(content, memory_type, user_id, metadata)
+            if embedding is not None:
+                memory_data[CHUNK_EMBEDDING_FIELD] = embedding
+            documents.append(memory_data)
+
+        duplicates = 0
+        if memory_type in DEDUP_MEMORY_TYPES:
+            # 내용 해시 upsert + SimHash로 거의 같은 청크(재업로드 문서)도 건너뜀
+            try:
+                outcome = await run_db(self.deduplicator.upsert_many, documents, skip_near_duplicates=True)
+            except Exception as e:
+                logger.error(f"❌ 메모리 일괄 저장 오류: {str(e)}")
+                return {"success": False, "error": str(e), "saved": 0, "duplicates": 0, "failed": len(documents)}
+            saved = [(i, documents[i]) for i in outcome["inserted"]]
+            duplicates = len(outcome["duplicates"]) + len(outcome["near_duplicates"])
+            failed_count = len(outcome["failed"])
+        else:
+            failed_indexes = set()
+            try:
+                # insert_many가 각 문서에 _id를 채움
+                await run_db(self.memories.insert_many, documents, ordered=False)
+            except Exception as e:
+                from pymongo.errors import BulkWriteError
+                if not isinstance(e, BulkWriteError):
+                    logger.error(f"❌ 메모리 일괄 저장 오류: {str(e)}")
+                    return {"success": False, "error": str(e), "saved": 0, "duplicates": 0, "failed": len(documents)}
+                failed_indexes = {error["index"] for error in e.details.get("writeErrors", [])}
+                logger.warning(f"⚠️ 메모리 일괄 저장 일부 실패: {len(failed_indexes)}/{len(documents)}건")
+            saved = [(i, doc) for i, doc in enumerate(documents) if i not in failed_indexes]
+            failed_count = len(failed_indexes)
+        memory_ids = [str(doc["_id"]) for _, doc in saved]
+        if saved:
+            await run_db(self.emotion_rollup.record, [doc for _, doc in saved])
+
+        # 벡터 색인에 즉시 반영
+        if self.chunk_vectors is not None:
+            for i, doc in saved:
+                if embeddings[i] is not None:
+                    self.chunk_vectors.upsert(str(doc["_id"]), np.frombuffer(embeddings[i], dtype=np.float32))
+
+        if saved:
+            bump_memory_generation(*self._generation_scopes(memory_type, documents[0]["user_id"]))
+
+        if memory_type == "document_chunk" and saved:
+            try:
+                await run_db(self._index_document_chunks_sync, [
+                    (str(doc["_id"]), doc["content"], doc["metadata"]) for _, doc in saved
+                ])
+            except Exception as index_error:
+                logger.warning(f"⚠️ 인덱싱 오류 (저장은 성공): {str(index_error)}")
+
+        return {
+            "success": bool(saved) or duplicates > 0,
+            "memory_ids": memory_ids,
+            "saved": len(saved),
+            "duplicates": duplicates,
+            "failed": failed_count,
+            "type": memory_type
+        }
+
+    @staticmethod
+    def _generation_scopes(memory_type: str, user_id: str) -> tuple:
+        """메모리 저장 시 세대를 올릴 회상 캐시 범위"""
+        if memory_type in EMBEDDED_MEMORY_TYPES:
+            return (user_scope(user_id), SHARED_SCOPE)
+        return (user_scope(user_id),)
+
+    async def finalize_ingestion(self, job_id: str, total_chunks: int) -> int:
+        """학습 작업이 끝난 뒤 작업으로 저장된 청크의 전체 청크 수를 기록합니다."""
+        result = await run_db(
+            self.memories.update_many,
+            {"metadata.ingest_job_id": job_id},
+            {"$set": {"total_chunks": total_chunks, "metadata.total_chunks": total_chunks}}
+        )
+        return result.modified_count
+
     def _calculate_content_importance(self, content: str) -> float:
         """내용의 중요도 계산"""
         try:
@@ -589,26 +827,30 @@ class EORAMemorySystem:
     
     def _index_document_chunk_sync(self, memory_id: str, content: str, metadata: Dict):
         """문서 청크 추가 인덱싱 (동기 버전)"""
+        self._index_document_chunks_sync([(memory_id, content, metadata)])
+
+    def _index_document_chunks_sync(self, items: List[tuple]):
+        """문서 청크 여러 개를 한 번에 인덱싱 (동기 버전, items: (memory_id, content, metadata))"""
         try:
             # 문서별 청크 인덱스 생성
-            chunk_index = {
+            chunk_indexes = [{
                 "memory_id": memory_id,
                 "filename": metadata.get("filename", ""),
                 "chunk_index": metadata.get("chunk_index", 0),
                 "content_hash": hashlib.md5(content.encode()).hexdigest(),
                 "indexed_at": datetime.now(),
                 "searchable_content": content.lower()  # 검색용
-            }
-            
+            } for memory_id, content, metadata in items]
+
             # 별도 컬렉션에 저장 (빠른 검색을 위해)
             if "document_chunks" not in self.db.list_collection_names():
                 self.db.create_collection("document_chunks")
                 self.db["document_chunks"].create_index([("filename", 1), ("chunk_index", 1)])
                 self.db["document_chunks"].create_index([("searchable_content", "text")])
-            
-            self.db["document_chunks"].insert_one(chunk_index)
-            logger.debug(f"문서 청크 인덱싱 완료: {memory_id}")
-            
+
+            self.db["document_chunks"].insert_many(chunk_indexes, ordered=False)
+            logger.debug(f"문서 청크 인덱싱 완료: {len(chunk_indexes)}개")
+
         except Exception as e:
             logger.error(f"문서 청크 인덱싱 오류: {str(e)}")
     
@@ -653,137 +895,23 @@ class EORAMemorySystem:
             if filename:
                 base_filters.append({"filename": {"$regex": filename, "$options": "i"}})
             
-            # 텍스트 검색 조건 - 통합 검색 로직 (Enhanced Learning + Document Chunk)
-            if query:
-                search_conditions = [
-                    # 텍스트 내용 검색
-                    {"content": {"$regex": query, "$options": "i"}},
-                    {"response": {"$regex": query, "$options": "i"}},
-                    {"message": {"$regex": query, "$options": "i"}},
-                    
-                    # 키워드 및 태그 검색 (배열 필드 개선)
-                    {"keywords": {"$elemMatch": {"$regex": query, "$options": "i"}}},
-                    {"tags": {"$elemMatch": {"$regex": query, "$options": "i"}}},
-                    {"keywords": {"$in": [query]}},  # 정확 일치도 포함
-                    {"tags": {"$in": [query]}},
-                    
-                    # 카테고리 및 주제 검색
-                    {"category": {"$regex": query, "$options": "i"}},
-                    {"topic": {"$regex": query, "$options": "i"}},
-                    
-                    # 파일명 검색 (Enhanced Learning + Document Chunk 호환)
-                    {"filename": {"$regex": query, "$options": "i"}},
-                    {"source_file": {"$regex": query, "$options": "i"}},
-                    {"metadata.filename": {"$regex": query, "$options": "i"}},  # Document Chunk용
-                    
-                    # 소스 및 메타데이터 검색
-                    {"source": {"$regex": query, "$options": "i"}},
-                    {"upload_type": {"$regex": query, "$options": "i"}},
-                    {"metadata.source": {"$regex": query, "$options": "i"}},  # Document Chunk용
-                    {"metadata.upload_type": {"$regex": query, "$options": "i"}},  # Document Chunk용
-                    
-                    # Document Chunk 전용 메타데이터 검색
-                    {"metadata.file_extension": {"$regex": query, "$options": "i"}},
-                    {"metadata.uploader_email": {"$regex": query, "$options": "i"}}
-                ]
-                base_filters.append({"$or": search_conditions})
-            
-            # 최종 검색 쿼리 조합
+            # 최종 필터 조합
             if base_filters:
-                search_query = {"$and": base_filters} if len(base_filters) > 1 else base_filters[0]
+                search_filter = {"$and": base_filters} if len(base_filters) > 1 else base_filters[0]
             else:
-                search_query = {}
-            
-            # MongoDB에서 통합 검색 실행
-            logger.info(f"🔍 검색 쿼리: {search_query}")
-            
-            # 통합 검색: Enhanced Learning + Document Chunk 모두 검색
-            all_results = []
-            
-            # 1단계: Enhanced Learning 데이터 검색
-            enhanced_query = search_query.copy() if search_query else {}
-            enhanced_query["memory_type"] = "enhanced_learning"
-            
-            enhanced_cursor = self.memories.find(enhanced_query).sort([
-                ("shared_to_all", -1),  # 공유 데이터 우선
-                ("timestamp", -1)       # 최신순
-            ]).limit(limit)
-            enhanced_results = list(enhanced_cursor)
-            all_results.extend(enhanced_results)
-            logger.info(f"🎯 Enhanced Learning 검색 결과: {len(enhanced_results)}개")
-            
-            # 2단계: Document Chunk 데이터 검색 (기존 API로 저장된 데이터)
-            remaining_limit = max(0, limit - len(enhanced_results))
-            if remaining_limit > 0:
-                # 기존 ID 제외
-                existing_ids = [r["_id"] for r in enhanced_results]
-                
-                document_query = search_query.copy() if search_query else {}
-                document_query["memory_type"] = "document_chunk"
-                if existing_ids:
-                    document_query["_id"] = {"$nin": existing_ids}
-                
-                document_cursor = self.memories.find(document_query).sort([
-                    ("metadata.shared_to_all", -1),  # 메타데이터의 공유 플래그
-                    ("timestamp", -1)
-                ]).limit(remaining_limit)
-                document_results = list(document_cursor)
-                all_results.extend(document_results)
-                logger.info(f"📄 Document Chunk 검색 결과: {len(document_results)}개")
-            
-            # 3단계: 여전히 부족하면 다른 타입도 검색
-            remaining_limit = max(0, limit - len(all_results))
-            if remaining_limit > 0:
-                existing_ids = [r["_id"] for r in all_results]
-                
-                other_query = search_query.copy() if search_query else {}
-                other_query["memory_type"] = {"$nin": ["enhanced_learning", "document_chunk"]}
-                if existing_ids:
-                    other_query["_id"] = {"$nin": existing_ids}
-                
-                other_cursor = self.memories.find(other_query).sort([
-                    ("timestamp", -1)
-                ]).limit(remaining_limit)
-                other_results = list(other_cursor)
-                all_results.extend(other_results)
-                logger.info(f"📚 기타 타입 검색 결과: {len(other_results)}개")
-            
-            results = all_results
-            logger.info(f"📚 총 검색 결과: {len(results)}개")
+                search_filter = {}
             
-            # 관련성 점수 계산 및 정렬
-            if query and results:
-                query_lower = query.lower()
+            if query:
+                # 키워드 역색인(BM25)으로 검색 - content/response/keywords/tags/topic/filename 등 통합
+                results = await run_db(self.keyword_index.search, query, search_filter, limit)
                 for result in results:
-                    score = 0
-                    content = result.get("content", result.get("response", "")).lower()
-                    keywords = result.get("keywords", result.get("tags", []))
-                    topic = result.get("topic", result.get("category", "")).lower()
-                    filename = result.get("filename", result.get("source_file", "")).lower()
-                    
-                    # 정확한 매치에 높은 점수
-                    if query_lower in content:
-                        score += 3
-                    if query_lower in topic:
-                        score += 2
-                    if query_lower in filename:
-                        score += 2
-                    if any(query_lower in str(kw).lower() for kw in keywords):
-                        score += 2
-                    
-                    # 부분 매치에 낮은 점수
-                    query_words = query_lower.split()
-                    for word in query_words:
-                        if word in content:
-                            score += 1
-                        if word in topic:
-                            score += 0.5
-                    
-                    result["relevance_score"] = score
-                
-                # 관련성 점수로 정렬
-                results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
-                results = results[:limit]
+                    result["relevance_score"] = result.get("keyword_score", 0)
+            else:
+                results = await run_db(list, self.memories.find(search_filter, self.keyword_index.result_projection).sort([
+                    ("shared_to_all", -1),  # 공유 데이터 우선
+                    ("timestamp", -1)       # 최신순
+                ]).limit(limit))
+            logger.info(f"📚 총 검색 결과: {len(results)}개")
             
             # ObjectId를 문자열로 변환
             for result in results:
@@ -818,7 +946,7 @@ class EORAMemorySystem:
                 {"$sort": {"latest_timestamp": -1}}
             ]
             
-            results = list(self.memories.aggregate(pipeline))
+            results = await run_db(lambda: list(self.memories.aggregate(pipeline)))
             
             # 결과 포맷팅
             file_list = []
@@ -852,19 +980,19 @@ class EORAMemorySystem:
             
         try:
             # 전체 메모리 수
-            total_memories = self.memories.count_documents({})
+            total_memories = await run_db(self.memories.count_documents, {})
             
             # 문서 청크 수
-            document_chunks = self.memories.count_documents({"memory_type": "document_chunk"})
+            document_chunks = await run_db(self.memories.count_documents, {"memory_type": "document_chunk"})
             
             # 대화 기록 수
-            conversations = self.memories.count_documents({"memory_type": "conversation"})
+            conversations = await run_db(self.memories.count_documents, {"memory_type": "conversation"})
             
             # 파일별 통계
             file_stats = await self.get_learned_files_list()
             
             # 최근 학습 활동
-            recent_learning = list(self.memories.find({}).sort("timestamp", -1).limit(10))
+            recent_learning = await run_db(list, self.memories.find({}).sort("timestamp", -1).limit(10))
             for item in recent_learning:
                 if "_id" in item:
                     item["_id"] = str(item["_id"])
@@ -906,7 +1034,7 @@ class EORAMemorySystem:
             "valence": emotion_data.get("valence", 0.0),
             "arousal": emotion_data.get("arousal", 0.0)
         }
-        self.emotion_memories.insert_one(emotion_memory)
+        await run_db(self.emotion_memories.insert_one, emotion_memory)
     
     async def _save_belief_memory(self, memory_id: str, belief_data: Dict, timestamp: datetime):
         """신념 메모리 저장"""
@@ -918,7 +1046,7 @@ class EORAMemorySystem:
             "belief_context": belief_data.get("context", ""),
             "belief_type": belief_data.get("type", "general")
         }
-        self.belief_memories.insert_one(belief_memory)
+        await run_db(self.belief_memories.insert_one, belief_memory)
     
     async def _save_context_memory(self, memory_id: str, context_data: Dict, timestamp: datetime):
         """맥락 메모리 저장"""
@@ -930,7 +1058,7 @@ class EORAMemorySystem:
             "context_importance": context_data.get("importance", 0.0),
             "context_relations": context_data.get("relations", [])
         }
-        self.context_memories.insert_one(context_memory)
+        await run_db(self.context_memories.insert_one, context_memory)
     
     async def recall_memories(self, 
                             user_id: str,
@@ -978,6 +1106,8 @@ class EORAMemorySystem:
     async def enhanced_recall(self, query: str, user_id: str, limit: int = 5) -> List[Dict]:
         """
         향상된 회상 시스템 - 학습된 내용(전체 공유) + 개인 대화 기록 결합
+        키워드(BM25) 후보, 벡터 후보, 개인 대화 후보 목록을 역순위 융합(RRF)으로 합칩니다.
+        같은 질문은 (사용자 세대, 공유 학습 세대)가 바뀌기 전까지 회상 캐시에서 반환합니다.
         
         Args:
             query (str): 검색 쿼리
@@ -990,71 +1120,86 @@ class EORAMemorySystem:
         if not self.is_connected():
             logger.warning("MongoDB 연결이 없어 메모리 회상을 건너뜁니다")
             return []
-            
+        
+        return await get_recall_cache().get_or_compute(
+            "enhanced", query,
+            lambda: self._enhanced_recall_uncached(query, user_id, limit),
+            scopes=(user_scope(user_id), SHARED_SCOPE),
+            variant=limit
+        )
+    
+    async def _enhanced_recall_uncached(self, query: str, user_id: str, limit: int) -> List[Dict]:
+        """enhanced_recall의 실제 회상 (캐시 미적중 시 실행)"""
         try:
-            all_memories = []
-            
-            # 1. 학습된 내용 회상 (모든 사용자 공유)
-            # document_chunk 타입은 관리자가 학습한 내용으로 모든 사용자가 공유
-            learned_memories = await self.recall_learned_content(
-                query=query,
-                memory_type="document_chunk",
-                limit=max(3, limit // 2)  # 전체 한도의 절반 이상을 학습 내용에 할당
+            candidates = max(3, limit)
+            
+            # 1. 학습된 내용(모든 사용자 공유) 키워드/벡터 후보 + 2. 개인 대화 기록을 동시에 회상
+            keyword_memories, vector_memories, personal_memories = await asyncio.gather(
+                timed("recall.keyword", self.recall_learned_content(query=query, memory_type="document_chunk", limit=candidates)),
+                timed("recall.vector", self._vector_recall_learned(query, candidates)),
+                timed("recall.personal", self.recall_memories(user_id=user_id, query=query, recall_type="comprehensive", limit=candidates))
             )
             
-            if learned_memories:
-                # 학습된 내용에 표시 추가
-                for memory in learned_memories:
-                    memory["recall_type"] = "learned_content"
-                    memory["is_shared"] = True
-                all_memories.extend(learned_memories)
-                logger.info(f"📚 학습된 내용 회상: {len(learned_memories)}개")
-            
-            # 2. 개인 대화 기록 회상 (사용자별)
-            personal_limit = limit - len(learned_memories)
-            if personal_limit > 0:
-                personal_memories = await self.recall_memories(
-                    user_id=user_id,
-                    query=query,
-                    recall_type="comprehensive",
-                    limit=personal_limit
-                )
-                
-                if personal_memories:
-                    # 개인 대화 내용에 표시 추가
-                    for memory in personal_memories:
-                        memory["recall_type"] = "personal_conversation"
-                        memory["is_shared"] = False
-                    all_memories.extend(personal_memories)
-                    logger.info(f"👤 개인 대화 회상: {len(personal_memories)}개")
-            
-            # 3. 결과 정렬 및 중복 제거
-            # 관련성 점수와 중요도를 기준으로 정렬
-            unique_memories = {}
-            for memory in all_memories:
-                memory_id = str(memory.get("_id", ""))
-                if memory_id not in unique_memories:
-                    unique_memories[memory_id] = memory
-            
-            final_memories = list(unique_memories.values())
-            
-            # 학습된 내용을 우선순위로 정렬
-            final_memories.sort(key=lambda x: (
-                x.get("is_shared", False),  # 학습된 내용 우선
-                x.get("importance_score", 0),  # 중요도 점수
-                x.get("relevance_score", 0)  # 관련성 점수
-            ), reverse=True)
-            
-            # 한도 적용
-            final_memories = final_memories[:limit]
-            
-            logger.info(f"✅ 통합 회상 완료 - 총 {len(final_memories)}개 (학습: {len(learned_memories)}, 개인: {len(all_memories) - len(learned_memories)})")
+            for memory in keyword_memories + vector_memories:
+                memory["recall_type"] = "learned_content"
+                memory["is_shared"] = True
+            for memory in personal_memories:
+                memory["recall_type"] = "personal_conversation"
+                memory["is_shared"] = False
+            
+            # 3. 순위 융합 및 중복 제거 (여러 목록에 함께 등장한 기억이 위로)
+            final_memories = self._fuse_ranked_lists([keyword_memories, vector_memories, personal_memories], limit)
+            
+            shared_count = sum(1 for m in final_memories if m.get("is_shared"))
+            logger.info(
+                f"✅ 통합 회상 완료 - 총 {len(final_memories)}개 (학습: {shared_count}, 개인: {len(final_memories) - shared_count}) "
+                f"| 후보 키워드 {len(keyword_memories)}, 벡터 {len(vector_memories)}, 개인 {len(personal_memories)}"
+            )
             return final_memories
             
         except Exception as e:
             logger.error(f"❌ 향상된 회상 오류: {str(e)}")
             return []
     
+    async def _vector_recall_learned(self, query: str, limit: int) -> List[Dict]:
+        """학습 청크 벡터 색인에서 쿼리와 가까운 청크를 찾습니다."""
+        if self.chunk_vectors is None or len(self.chunk_vectors) == 0:
+            return []
+        embedding = await embed_chunk(query)
+        if embedding is None:
+            return []
+        hits = await asyncio.to_thread(self.chunk_vectors.search, np.frombuffer(embedding, dtype=np.float32), limit)
+        if not hits:
+            return []
+        
+        docs = await run_db(list, self.memories.find(
+            {"_id": {"$in": [ObjectId(memory_id) for memory_id, _ in hits]}},
+            self.keyword_index.result_projection
+        ))
+        by_id = {str(doc["_id"]): doc for doc in docs}
+        results = []
+        for memory_id, score in hits:
+            doc = by_id.get(memory_id)
+            if doc is None:
+                continue
+            doc["_id"] = memory_id
+            doc["vector_score"] = round(score, 4)
+            if hasattr(doc.get("timestamp"), "isoformat"):
+                doc["timestamp"] = doc["timestamp"].isoformat()
+            results.append(doc)
+        return results
+    
+    @staticmethod
+    def _fuse_ranked_lists(ranked_lists: List[List[Dict]], limit: int) -> List[Dict]:
+        """역순위 융합(RRF): 각 목록의 순위 r에 대해 1 / (RRF_K + r)을 더해 정렬합니다."""
+        fused: Dict[str, Dict] = {}
+        for memories in ranked_lists:
+            for rank, memory in enumerate(memories, start=1):
+                memory_id = str(memory.get("_id") or id(memory))
+                entry = fused.setdefault(memory_id, memory)
+                entry["rrf_score"] = entry.get("rrf_score", 0.0) + 1.0 / (RRF_K + rank)
+        return sorted(fused.values(), key=lambda m: m["rrf_score"], reverse=True)[:limit]
+    
     async def _comprehensive_recall(self, user_id: str, query: str, limit: int) -> List[Dict]:
         """종합 회상 전략"""
         all_memories = []
@@ -1083,13 +1228,20 @@ class EORAMemorySystem:
         if not emotion_keywords:
             return []
         
+        # 사전 집계로 이 사용자에게 실제로 있는 감정만 남김 (없으면 메모리 조회 생략)
+        if self.emotion_rollup.is_ready():
+            present = set(await run_db(self.emotion_rollup.values, "emotion", user_id))
+            emotion_keywords = [keyword for keyword in emotion_keywords if keyword in present]
+            if not emotion_keywords:
+                return []
+        
         # 감정 메모리에서 검색
         emotion_query = {
             "emotion_label": {"$in": emotion_keywords},
             "user_id": user_id
         }
         
-        memories = list(self.memories.find(emotion_query)
+        memories = await run_db(list, self.memories.find(emotion_query)
                        .sort([("emotion_score", -1), ("timestamp", -1)])
                        .limit(limit))
         
@@ -1109,7 +1261,7 @@ class EORAMemorySystem:
             "user_id": user_id
         }
         
-        memories = list(self.memories.find(context_query)
+        memories = await run_db(list, self.memories.find(context_query)
                        .sort([("importance_score", -1), ("timestamp", -1)])
                        .limit(limit))
         
@@ -1129,7 +1281,7 @@ class EORAMemorySystem:
             "user_id": user_id
         }
         
-        memories = list(self.memories.find(belief_query)
+        memories = await run_db(list, self.memories.find(belief_query)
                        .sort([("importance_score", -1), ("timestamp", -1)])
                        .limit(limit))
         
@@ -1143,21 +1295,8 @@ class EORAMemorySystem:
         if not query_keywords:
             return []
         
-        # 의미적 유사성 검색
-        semantic_query = {
-            "user_id": user_id,
-            "$or": [
-                {"user_input": {"$regex": "|".join(query_keywords), "$options": "i"}},
-                {"ai_response": {"$regex": "|".join(query_keywords), "$options": "i"}},
-                {"summary": {"$regex": "|".join(query_keywords), "$options": "i"}}
-            ]
-        }
-        
-        memories = list(self.memories.find(semantic_query)
-                       .sort([("importance_score", -1), ("timestamp", -1)])
-                       .limit(limit))
-        
-        return memories
+        # 키워드 역색인 검색 (user_input/ai_response/summary 등 통합 필드)
+        return await run_db(self.keyword_index.search, " ".join(query_keywords), {"user_id": user_id}, limit)
     
     async def _keyword_recall(self, user_id: str, query: str, limit: int) -> List[Dict]:
         """키워드 기반 회상"""
@@ -1166,22 +1305,8 @@ class EORAMemorySystem:
         if not query_keywords:
             return []
         
-        # 키워드 검색
-        keyword_query = {
-            "user_id": user_id,
-            "$or": [
-                {"user_input": {"$regex": "|".join(query_keywords), "$options": "i"}},
-                {"ai_response": {"$regex": "|".join(query_keywords), "$options": "i"}},
-                {"topic": {"$regex": "|".join(query_keywords), "$options": "i"}},
-                {"sub_topic": {"$regex": "|".join(query_keywords), "$options": "i"}}
-            ]
-        }
-        
-        memories = list(self.memories.find(keyword_query)
-                       .sort([("importance_score", -1), ("timestamp", -1)])
-                       .limit(limit))
-        
-        return memories
+        # 키워드 역색인 검색 (user_input/ai_response/topic/sub_topic 등 통합 필드)
+        return await run_db(self.keyword_index.search, " ".join(query_keywords), {"user_id": user_id}, limit)
     
     def _extract_emotion_keywords(self, text: str) -> List[str]:
         """감정 키워드 추출"""
@@ -1304,7 +1429,8 @@ class EORAMemorySystem:
         
         if similar_memories:
             # 현재 메모리에 연결 정보 추가
-            self.memories.update_one(
+            await run_db(
+                self.memories.update_one,
                 {"_id": ObjectId(memory_id)},
                 {"$set": {"connections": [str(m["_id"]) for m in similar_memories]}}
             )
@@ -1317,19 +1443,8 @@ class EORAMemorySystem:
         if not keywords:
             return []
         
-        # 키워드 기반 유사 메모리 검색
-        similar_query = {
-            "$or": [
-                {"user_input": {"$regex": "|".join(keywords[:3]), "$options": "i"}},
-                {"ai_response": {"$regex": "|".join(keywords[:3]), "$options": "i"}}
-            ]
-        }
-        
-        similar_memories = list(self.memories.find(similar_query)
-                              .sort("timestamp", -1)
-                              .limit(5))
-        
-        return similar_memories
+        # 키워드 역색인 기반 유사 메모리 검색
+        return await run_db(self.keyword_index.search, " ".join(keywords[:3]), None, 5)
     
     def _clean_recall_results(self, memories: List[Dict]) -> List[Dict]:
         """회상 결과 정제"""
@@ -1389,14 +1504,17 @@ class EORAMemorySystem:
     
     async def _update_access_records(self, memory_ids: List[str]):
         """접근 기록 업데이트"""
-        for memory_id in memory_ids:
-            self.memories.update_one(
-                {"_id": ObjectId(memory_id)},
-                {
-                    "$set": {"last_accessed": datetime.now()},
-                    "$inc": {"access_count": 1}
-                }
-            )
+        def _update():
+            for memory_id in memory_ids:
+                self.memories.update_one(
+                    {"_id": ObjectId(memory_id)},
+                    {
+                        "$set": {"last_accessed": datetime.now()},
+                        "$inc": {"access_count": 1}
+                    }
+                )
+        
+        await run_db(_update)
     
     def _remove_duplicates(self, memories: List[Dict]) -> List[Dict]:
         """중복 메모리 제거"""
@@ -1414,24 +1532,32 @@ class EORAMemorySystem:
     async def get_memory_stats(self, user_id: str) -> Dict:
         """메모리 통계 조회"""
         try:
-            total_memories = self.memories.count_documents({"user_id": user_id})
-            
-            # 감정별 통계
-            emotion_stats = list(self.memories.aggregate([
-                {"$match": {"user_id": user_id}},
-                {"$group": {"_id": "$emotion_label", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}}
-            ]))
-            
-            # 주제별 통계
-            topic_stats = list(self.memories.aggregate([
-                {"$match": {"user_id": user_id}},
-                {"$group": {"_id": "$topic", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}}
-            ]))
+            if self.emotion_rollup.is_ready():
+                # 사전 집계에서 조회 (월 버킷 수에 비례)
+                emotion_stats = await run_db(self.emotion_rollup.totals, user_id, "emotion")
+                topic_stats = await run_db(self.emotion_rollup.totals, user_id, "topic")
+                total_memories = sum(item["count"] for item in emotion_stats)
+            else:
+                # 백필이 끝나기 전에는 메모리 전체를 집계
+                self.emotion_rollup.stats["fallbacks"] += 1
+                total_memories = await run_db(self.memories.count_documents, {"user_id": user_id})
+                
+                # 감정별 통계
+                emotion_stats = await run_db(lambda: list(self.memories.aggregate([
+                    {"$match": {"user_id": user_id}},
+                    {"$group": {"_id": "$emotion_label", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}}
+                ])))
+                
+                # 주제별 통계
+                topic_stats = await run_db(lambda: list(self.memories.aggregate([
+                    {"$match": {"user_id": user_id}},
+                    {"$group": {"_id": "$topic", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}}
+                ])))
             
             # 최근 메모리
-            recent_memories = list(self.memories.find({"user_id": user_id})
+            recent_memories = await run_db(list, self.memories.find({"user_id": user_id})
                                  .sort("timestamp", -1)
                                  .limit(5))
             
@@ -1446,10 +1572,21 @@ class EORAMemorySystem:
             logger.error(f"메모리 통계 조회 오류: {str(e)}")
             return {"error": str(e)}
     
+    async def get_emotion_timeline(self, user_id: str, unit: str = "week", since: datetime = None) -> Dict:
+        """감정 타임라인 - 단위(day/week/month) 버킷별 감정 개수 (사전 집계에서 조회)"""
+        try:
+            if not self.emotion_rollup.is_ready():
+                return {"ready": False, "timeline": []}
+            timeline = await run_db(self.emotion_rollup.timeline, unit, "emotion", user_id, False, since)
+            return {"ready": True, "unit": unit, "timeline": timeline}
+        except Exception as e:
+            logger.error(f"감정 타임라인 조회 오류: {str(e)}")
+            return {"error": str(e)}
+    
     # ===================== 회상 기능 메서드들 =====================
     
-    async def enhanced_recall(self, query: str, user_id: str = None, limit: int = 5):
-        """향상된 회상 기능 - RecallEngine 또는 경량 memory_manager 활용"""
+    async def engine_recall(self, query: str, user_id: str = None, limit: int = 5):
+        """RecallEngine 또는 경량 memory_manager를 활용한 회상"""
         if not self.memory_manager or not self.memory_manager.is_initialized:
             logger.warning("memory_manager가 초기화되지 않아 기본 회상 사용")
             return await self._basic_recall(query, user_id, limit)
@@ -1495,20 +1632,8 @@ class EORAMemorySystem:
             if user_id:
                 search_filter["user_id"] = user_id
             
-            # 키워드 기반 검색
-            keywords = query.lower().split()
-            search_conditions = []
-            
-            for keyword in keywords:
-                search_conditions.append({"content": {"$regex": keyword, "$options": "i"}})
-            
-            if search_conditions:
-                search_filter["$or"] = search_conditions
-            
-            # 결과 조회
-            results = list(self.memories.find(search_filter)
-                          .sort("timestamp", -1)
-                          .limit(limit))
+            # 키워드 역색인 검색
+            results = await run_db(self.keyword_index.search, query, search_filter, limit)
             
             logger.info(f"✅ 기본 회상 완료: {len(results)}개 결과")
             return results
@@ -1517,40 +1642,6 @@ class EORAMemorySystem:
             logger.error(f"기본 회상 실패: {e}")
             return []
     
-    async def recall_learned_content(self, query: str, user_id: str = None, limit: int = 5):
-        """학습된 콘텐츠 회상 (문서 기반)"""
-        try:
-            if not self.is_connected():
-                return []
-            
-            # 문서 타입 필터
-            search_filter = {"memory_type": "document_chunk"}
-            if user_id:
-                search_filter["user_id"] = user_id
-            
-            # 키워드 검색
-            keywords = query.lower().split()
-            search_conditions = []
-            
-            for keyword in keywords:
-                search_conditions.append({"content": {"$regex": keyword, "$options": "i"}})
-                search_conditions.append({"metadata.filename": {"$regex": keyword, "$options": "i"}})
-            
-            if search_conditions:
-                search_filter["$or"] = search_conditions
-            
-            # 결과 조회
-            results = list(self.memories.find(search_filter)
-                          .sort("timestamp", -1)
-                          .limit(limit))
-            
-            logger.info(f"✅ 학습된 콘텐츠 회상 완료: {len(results)}개 결과")
-            return results
-            
-        except Exception as e:
-            logger.error(f"학습된 콘텐츠 회상 실패: {e}")
-            return []
-    
     def get_memory_manager_status(self):
         """memory_manager 상태 확인"""
         if not self.memory_manager:
@@ -1562,20 +1653,47 @@ class EORAMemorySystem:
             "class": str(type(self.memory_manager).__name__)
         }
     
+    async def run_memory_maintenance(self, user_id: str = None) -> Dict:
+        """망각/강화 유지보수 실행 (나이 버킷이 바뀐 메모리만 서버 측에서 갱신)"""
+        if not self.is_connected():
+            return {"error": "no_connection"}
+        scope = {"user_id": user_id} if user_id else None
+        report = await run_db(self.maintenance.run, scope)
+        if report["modified"]:
+            bump_memory_generation(user_scope(user_id) if user_id else SHARED_SCOPE)
+        return report
+    
+    async def record_rollups(self, docs: List[Dict]):
+        """저장된 메모리를 감정/주제 집계에 반영 (write-behind 삽입 성공 후 호출)"""
+        await run_db(self.emotion_rollup.record, docs)
+    
+    def _unrecord_memories(self, memory_ids: List):
+        """삭제 직전 메모리를 감정/주제 집계에서 뺌"""
+        docs = list(self.memories.find({"_id": {"$in": memory_ids}}, self.emotion_rollup.projection))
+        self.emotion_rollup.record(docs, -1)
+    
+    async def delete_memories(self, query: Dict) -> int:
+        """조건에 맞는 메모리를 감정/주제 집계에서 뺀 뒤 배치 삭제"""
+        return await run_db(self.maintenance.purge, query, self._unrecord_memories)
+    
     async def cleanup_old_memories(self, user_id: str, days: int = 365):
-        """오래된 메모리 정리"""
+        """오래된 메모리 정리 (망각/강화 유지보수 후 배치 삭제)"""
         try:
             cutoff_date = datetime.now() - timedelta(days=days)
             
+            maintenance = await self.run_memory_maintenance(user_id)
+            
             # 오래된 메모리 삭제
-            result = self.memories.delete_many({
+            deleted_count = await run_db(self.maintenance.purge, {
                 "user_id": user_id,
                 "timestamp": {"$lt": cutoff_date},
                 "importance_score": {"$lt": 0.5}  # 중요도가 낮은 메모리만
-            })
+            }, self._unrecord_memories)
             
-            logger.info(f"오래된 메모리 정리 완료 - 사용자: {user_id}, 삭제된 메모리: {result.deleted_count}개")
-            return {"deleted_count": result.deleted_count}
+            if deleted_count:
+                bump_memory_generation(user_scope(user_id))
+            logger.info(f"오래된 메모리 정리 완료 - 사용자: {user_id}, 삭제된 메모리: {deleted_count}개")
+            return {"deleted_count": deleted_count, "maintenance": maintenance}
             
         except Exception as e:
             logger.error(f"메모리 정리 오류: {str(e)}")
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+벤치마크용 로컬 가짜 OpenAI 서버
+/v1/chat/completions(일반/스트리밍)와 /v1/embeddings를 지연 시간을 설정하여 흉내 냅니다.
+OPENAI_BASE_URL을 이 서버로 지정하면 앱의 모든 OpenAI 클라이언트가 실제 API 대신 이 서버를 호출합니다.
+
+- 임베딩은 텍스트 해시로 만든 결정적 단위 벡터 (같은 텍스트 -> 같은 벡터)
+- dimensions, encoding_format(float/base64) 파라미터 지원
+- 응답 토큰 수는 4자당 1토큰으로 계산하여 usage에 채움
+
+사용 예:
+    python fake_openai_server.py --port 8765 --chat-latency-ms 300 --embed-latency-ms 50
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python -m uvicorn app:app
+"""
+
+import json
+import math
+import time
+import uuid
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+DEFAULT_EMBEDDING_DIM = 1536
+
+REPLY_SENTENCES = [
+    "말씀하신 내용을 기억하고 있어요.",
+    "관련된 기억을 바탕으로 정리해 드릴게요.",
+    "이전에 학습한 문서에서도 비슷한 내용이 있었습니다.",
+    "조금 더 구체적으로 알려 주시면 도움이 될 것 같아요.",
+    "중요한 점은 꾸준히 기록하고 돌아보는 것입니다.",
+]
+
+
+def fake_embedding(text: str, dim: int = DEFAULT_EMBEDDING_DIM) -> List[float]:
+    """텍스트 해시로 시드를 정한 결정적 단위 벡터"""
+    seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8", "ignore"), digest_size=8).digest(), "little")
+    rng = random.Random(seed)
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeOpenAIConfig:
+    """가짜 서버 지연 설정"""
+
+    def __init__(self, chat_latency_ms: float = 300.0, token_latency_ms: float = 5.0,
+                 embed_latency_ms: float = 50.0, embed_item_latency_ms: float = 0.2,
+                 reply_chars: int = 400):
+        self.chat_latency_ms = chat_latency_ms
+        self.token_latency_ms = token_latency_ms
+        self.embed_latency_ms = embed_latency_ms
+        self.embed_item_latency_ms = embed_item_latency_ms
+        self.reply_chars = reply_chars
+        self.stats = {"chat": 0, "chat_stream": 0, "embeddings": 0, "embedded_inputs": 0}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] += amount
+
+
+def make_reply(prompt: str, reply_chars: int) -> str:
+    rng = random.Random(prompt)
+    parts = []
+    while sum(len(p) + 1 for p in parts) < reply_chars:
+        parts.append(rng.choice(REPLY_SENTENCES))
+    return " ".join(parts)
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    config: FakeOpenAIConfig = FakeOpenAIConfig()
+
+    def log_message(self, format, *args):
+        # 요청마다 로그를 찍으면 측정에 영향을 주므로 생략
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-4o", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"not found: {self.path}"}})
+
+    def do_POST(self):
+        try:
+            payload = self._read_json()
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid json"}})
+            return
+        if self.path.endswith("/chat/completions"):
+            self._chat(payload)
+        elif self.path.endswith("/embeddings"):
+            self._embeddings(payload)
+        else:
+            self._send_json(404, {"error": {"message": f"not found: {self.path}"}})
+
+    def _chat(self, payload: Dict[str, Any]):
+        config = self.config
+        messages = payload.get("messages") or []
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        reply = make_reply(prompt[-200:], config.reply_chars)
+        usage = {
+            "prompt_tokens": estimate_tokens(prompt),
+            "completion_tokens": estimate_tokens(reply),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = payload.get("model", "gpt-4o")
+
+        time.sleep(config.chat_latency_ms / 1000)
+        if not payload.get("stream"):
+            config.count("chat")
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": reply},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+            return
+
+        config.count("chat_stream")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def send_chunk(choices, chunk_usage=None):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                     "model": model, "choices": choices}
+            if chunk_usage is not None:
+                chunk["usage"] = chunk_usage
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send_chunk([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for word in reply.split(" "):
+            time.sleep(config.token_latency_ms / 1000)
+            send_chunk([{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}])
+        send_chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            send_chunk([], usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _embeddings(self, payload: Dict[str, Any]):
+        config = self.config
+        inputs = payload.get("input")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        inputs = [str(text) for text in inputs or []]
+        dim = int(payload.get("dimensions") or DEFAULT_EMBEDDING_DIM)
+
+        time.sleep((config.embed_latency_ms + config.embed_item_latency_ms * len(inputs)) / 1000)
+        config.count("embeddings")
+        config.count("embedded_inputs", len(inputs))
+
+        data = []
+        for i, text in enumerate(inputs):
+            vector = fake_embedding(text, dim)
+            if payload.get("encoding_format") == "base64":
+                embedding = base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+            else:
+                embedding = vector
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(estimate_tokens(text) for text in inputs)
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": payload.get("model", "text-embedding-3-small"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        })
+
+
+class FakeOpenAIServer:
+    """백그라운드 스레드에서 실행되는 가짜 OpenAI 서버"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[FakeOpenAIConfig] = None):
+        self.config = config or FakeOpenAIConfig()
+        handler = type("BoundFakeOpenAIHandler", (FakeOpenAIHandler,), {"config": self.config})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 가짜 OpenAI 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--chat-latency-ms", type=float, default=300.0, help="첫 토큰까지의 지연")
+    parser.add_argument("--token-latency-ms", type=float, default=5.0, help="스트리밍 조각 간 지연")
+    parser.add_argument("--embed-latency-ms", type=float, default=50.0, help="임베딩 요청당 지연")
+    parser.add_argument("--embed-item-latency-ms", type=float, default=0.2, help="임베딩 입력 1개당 추가 지연")
+    parser.add_argument("--reply-chars", type=int, default=400, help="응답 길이 (문자)")
+    args = parser.parse_args()
+
+    config = FakeOpenAIConfig(args.chat_latency_ms, args.token_latency_ms, args.embed_latency_ms,
+                              args.embed_item_latency_ms, args.reply_chars)
+    server = FakeOpenAIServer(args.host, args.port, config)
+    print(f"🧪 가짜 OpenAI 서버 실행: {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"📊 처리한 요청: {config.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+문서 학습(수집) 작업 관리자
+업로드 파일을 임시 파일로 스트리밍 저장한 뒤 즉시 작업 ID를 반환하고,
+백그라운드 작업자가 텍스트 추출 → 청크 분할 → 배치 임베딩 → insert_many 저장을
+순서대로 스트리밍 처리합니다. 진행 상황은 작업 ID로 조회합니다.
+
+- 업로드는 블록 단위로 읽으면서 크기 상한을 검사 (전체를 메모리에 올리지 않음)
+- 텍스트 파일은 블록 단위로 디코딩/분할, 그 외 형식은 작업자 스레드에서 추출
+- 동시에 실행되는 작업 수와 대기 작업 수를 제한
+- 공유 상태 모드(여러 워커)에서는 작업 상태를 공유 맵에 주기적으로 기록하여
+  다른 워커에 들어온 진행 상황 조회도 응답할 수 있게 합니다
+"""
+
+import os
+import time
+import uuid
+import codecs
+import asyncio
+import logging
+import tempfile
+from collections import deque
+from itertools import islice
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from chunk_embeddings import embed_texts
+from db_executor import run_db
+
+logger = logging.getLogger(__name__)
+
+# 업로드 파일 최대 크기 (MB)
+INGEST_MAX_UPLOAD_MB = int(os.getenv("EORA_INGEST_MAX_UPLOAD_MB", "100"))
+# 동시에 실행되는 학습 작업 수
+INGEST_WORKERS = int(os.getenv("EORA_INGEST_WORKERS", "2"))
+# 실행 대기 중인 작업 수 상한 (초과 시 업로드 거부)
+INGEST_MAX_PENDING = int(os.getenv("EORA_INGEST_MAX_PENDING", "20"))
+# 한 번에 임베딩/저장하는 청크 수
+INGEST_BATCH_SIZE = int(os.getenv("EORA_INGEST_BATCH_SIZE", "100"))
+# 업로드 임시 파일 디렉터리 (비어 있으면 시스템 임시 디렉터리)
+INGEST_SPOOL_DIR = os.getenv("EORA_INGEST_SPOOL_DIR", "") or None
+# 완료된 작업 정보를 보관하는 시간 (초)
+INGEST_JOB_TTL = float(os.getenv("EORA_INGEST_JOB_TTL", "86400"))
+# 작업별로 보관하는 최근 로그 수
+INGEST_LOG_LIMIT = int(os.getenv("EORA_INGEST_LOG_LIMIT", "50"))
+# 공유 상태 모드에서 실행 중인 작업의 진행 상황을 기록하는 주기 (초)
+INGEST_SHARE_INTERVAL = float(os.getenv("EORA_INGEST_SHARE_INTERVAL", "2"))
+
+# 업로드/파일 읽기 블록 크기
+READ_BLOCK_SIZE = 1024 * 1024
+# 업로드 요청 본문 중 파일 외 multipart 경계/헤더/필드에 허용하는 여유 (바이트)
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+UPLOAD_TOO_LARGE_MESSAGE = f"파일 크기가 너무 큽니다. (최대 {INGEST_MAX_UPLOAD_MB}MB)"
+# 블록 단위로 디코딩할 수 있는 텍스트 형식
+STREAMABLE_EXTENSIONS = (".txt", ".md", ".py")
+
+FINISHED_STATUSES = ("completed", "failed")
+
+
+class UploadTooLarge(ValueError):
+    """업로드 파일이 크기 상한을 넘었을 때 발생"""
+
+
+class IngestionJob:
+    """학습 작업 하나의 상태와 진행률"""
+
+    def __init__(self, kind: str, filename: str, owner: str, file_size: int):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.filename = filename
+        self.owner = owner
+        self.file_size = file_size
+        self.status = "queued"
+        self.stage = "queued"
+        self.bytes_read = 0
+        self.text_length = 0
+        self.chunks_embedded = 0
+        self.chunks_saved = 0
+        self.chunks_duplicate = 0
+        self.chunks_failed = 0
+        self.batches = 0
+        self.error: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.logs: Deque[str] = deque(maxlen=max(1, INGEST_LOG_LIMIT))
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def log(self, message: str):
+        """로그를 콘솔과 작업의 최근 로그에 함께 남깁니다."""
+        print(message)
+        self.logs.append(message)
+
+    def set_stage(self, stage: str):
+        self.stage = stage
+
+    def to_dict(self, include_logs: bool = True) -> Dict[str, Any]:
+        elapsed_end = self.finished_at or time.time()
+        data = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "filename": self.filename,
+            "owner": self.owner,
+            "status": self.status,
+            "stage": self.stage,
+            "file_size": self.file_size,
+            "bytes_read": self.bytes_read,
+            "read_percent": round(self.bytes_read / self.file_size * 100, 1) if self.file_size else 0.0,
+            "text_length": self.text_length,
+            "chunks_embedded": self.chunks_embedded,
+            "chunks_saved": self.chunks_saved,
+            "chunks_duplicate": self.chunks_duplicate,
+            "chunks_failed": self.chunks_failed,
+            "batches": self.batches,
+            "error": self.error,
+            "result": self.result,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_sec": round(elapsed_end - self.started_at, 2) if self.started_at else 0.0
+        }
+        if include_logs:
+            data["logs"] = list(self.logs)
+        return data
+
+
+JobHandler = Callable[[IngestionJob, str], Awaitable[Dict[str, Any]]]
+
+
+class IngestionJobManager:
+    """업로드 스풀링, 작업 실행, 진행 상황 조회를 담당하는 관리자"""
+
+    def __init__(self, max_workers: int = INGEST_WORKERS,
+                 max_pending: int = INGEST_MAX_PENDING,
+                 job_ttl: float = INGEST_JOB_TTL):
+        """
+        초기화
+
+        Args:
+            max_workers: 동시에 실행되는 작업 수
+            max_pending: 대기 중인 작업 수 상한
+            job_ttl: 완료된 작업 정보 보관 시간 (초)
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.job_ttl = job_ttl
+        self.max_upload_bytes = INGEST_MAX_UPLOAD_MB * 1024 * 1024
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # 다른 워커와 작업 상태를 공유하는 맵 (공유 상태 모드의 SharedStateMap)
+        self._shared = None
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "chunks_saved": 0,
+            "bytes_ingested": 0
+        }
+
+    # ==================== 업로드 ====================
+
+    def upload_too_large(self, content_length: Optional[str]) -> bool:
+        """요청의 Content-Length만으로 크기 상한 초과가 확실한지 (본문을 받기 전에 거절, 없으면 False)"""
+        try:
+            return int(content_length) > self.max_upload_bytes + UPLOAD_FORM_OVERHEAD
+        except (TypeError, ValueError):
+            return False
+
+    async def spool_upload(self, upload, suffix: str = "") -> Dict[str, Any]:
+        """
+        업로드 파일을 블록 단위로 임시 파일에 저장합니다.
+        (요청 본문 크기는 UploadSizeLimitMiddleware가 Content-Length로 먼저 확인하고,
+        여기서는 Content-Length가 없는 요청까지 막는 상한으로 다시 확인)
+
+        Args:
+            upload: FastAPI UploadFile
+            suffix: 임시 파일 확장자
+
+        Returns:
+            Dict: {"path": 임시 파일 경로, "size": 바이트 수}
+
+        Raises:
+            UploadTooLarge: 크기 상한 초과 (임시 파일은 삭제됨)
+        """
+        fd, path = tempfile.mkstemp(prefix="eora_ingest_", suffix=suffix, dir=INGEST_SPOOL_DIR)
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    block = await upload.read(READ_BLOCK_SIZE)
+                    if not block:
+                        break
+                    size += len(block)
+                    if size > self.max_upload_bytes:
+                        raise UploadTooLarge(UPLOAD_TOO_LARGE_MESSAGE)
+                    await asyncio.to_thread(out.write, block)
+        except BaseException:
+            self._remove_file(path)
+            raise
+        return {"path": path, "size": size}
+
+    def can_accept(self) -> bool:
+        """대기 작업 수가 상한 미만인지 확인합니다."""
+        pending = sum(1 for job in self._jobs.values() if job.status == "queued")
+        return pending < self.max_pending
+
+    # ==================== 작업 실행 ====================
+
+    def submit(self, kind: str, filename: str, owner: str, path: str, file_size: int,
+               handler: JobHandler) -> IngestionJob:
+        """
+        스풀된 파일로 학습 작업을 등록하고 백그라운드에서 실행합니다.
+
+        Args:
+            kind: 작업 종류 (learn_file, enhanced_learn_file 등)
+            filename: 원본 파일명
+            owner: 요청자 이메일
+            path: 스풀된 임시 파일 경로 (작업 종료 시 삭제)
+            file_size: 파일 크기
+            handler: (job, path)를 받아 결과 dict를 반환하는 코루틴 함수
+
+        Returns:
+            IngestionJob: 등록된 작업
+        """
+        self._prune()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        job = IngestionJob(kind, filename, owner, file_size)
+        self._jobs[job.job_id] = job
+        self._stats["submitted"] += 1
+        self._tasks[job.job_id] = asyncio.ensure_future(self._run(job, path, handler))
+        return job
+
+    def reject(self):
+        self._stats["rejected"] += 1
+
+    async def _run(self, job: IngestionJob, path: str, handler: JobHandler):
+        progress_task = None
+        try:
+            await self._share(job)
+            async with self._semaphore:
+                job.status = "running"
+                job.started_at = time.time()
+                job.log(f"📚 학습 작업 시작: {job.filename} ({job.file_size:,} bytes)")
+                if self._shared is not None:
+                    progress_task = asyncio.ensure_future(self._share_progress(job))
+                result = await handler(job, path)
+                job.result = result
+                if result and result.get("success"):
+                    job.status = "completed"
+                    self._stats["completed"] += 1
+                else:
+                    job.status = "failed"
+                    job.error = (result or {}).get("message", "학습 실패")
+                    self._stats["failed"] += 1
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "작업이 취소되었습니다"
+            self._stats["failed"] += 1
+            raise
+        except Exception as e:
+            logger.error(f"❌ 학습 작업 오류 ({job.job_id}, {job.filename}): {e}")
+            job.status = "failed"
+            job.error = str(e)
+            job.log(f"❌ 학습 작업 오류: {e}")
+            self._stats["failed"] += 1
+        finally:
+            job.stage = "done"
+            job.finished_at = time.time()
+            self._stats["chunks_saved"] += job.chunks_saved
+            self._stats["bytes_ingested"] += job.bytes_read
+            self._tasks.pop(job.job_id, None)
+            self._remove_file(path)
+            if progress_task is not None:
+                progress_task.cancel()
+            try:
+                await self._share(job)
+            except asyncio.CancelledError:
+                pass
+
+    # ==================== 워커 간 공유 ====================
+
+    def share_with(self, shared_map):
+        """공유 상태 맵에 작업 상태를 기록하여 다른 워커에서도 조회할 수 있게 합니다."""
+        self._shared = shared_map
+
+    async def _share(self, job: IngestionJob):
+        """작업 상태를 공유 맵에 기록합니다 (백엔드 쓰기는 DB 실행기에서)."""
+        if self._shared is None:
+            return
+        self._shared[job.job_id] = job.to_dict()
+        try:
+            await run_db(self._shared.persist, job.job_id)
+        except Exception as e:
+            logger.warning(f"학습 작업 상태 공유 실패 ({job.job_id}): {e}")
+
+    async def _share_progress(self, job: IngestionJob):
+        while True:
+            await asyncio.sleep(INGEST_SHARE_INTERVAL)
+            await self._share(job)
+
+    def _unshare(self, job_id: str):
+        self._shared.pop(job_id, None)
+        asyncio.ensure_future(run_db(self._shared.persist, job_id))
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _prune(self):
+        """보관 시간이 지난 완료 작업을 정리합니다."""
+        cutoff = time.time() - self.job_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in FINISHED_STATUSES and (job.finished_at or 0) < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            if self._shared is not None:
+                self._unshare(job_id)
+        if self._shared is not None:
+            # 종료된 워커가 남긴 작업도 보관 시간이 지나면 정리
+            for job_id, data in list(self._shared.items()):
+                if data.get("status") in FINISHED_STATUSES and (data.get("finished_at") or 0) < cutoff:
+                    self._unshare(job_id)
+
+    # ==================== 조회/종료 ====================
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    async def describe(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태를 반환합니다 (다른 워커에서 실행 중인 작업은 공유 맵에서 조회)."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self._shared is None:
+            return None
+        # 실행 중인 워커가 계속 갱신하므로 매번 다시 읽음
+        self._shared.evict(job_id)
+        await self._shared.prefetch(job_id)
+        return self._shared.get(job_id)
+
+    async def list_jobs(self, owner: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """최근 작업 목록을 반환합니다 (로그 제외, 공유 상태 모드에서는 모든 워커의 작업)."""
+        self._prune()
+        jobs = {job_id: job.to_dict(include_logs=False) for job_id, job in self._jobs.items()}
+        if self._shared is not None:
+            remote = await run_db(self._shared.state.backend.load_all, self._shared.namespace)
+            for job_id, data in remote.items():
+                if job_id not in jobs:
+                    jobs[job_id] = {key: value for key, value in data.items() if key != "logs"}
+        listed = [data for data in jobs.values() if owner is None or data.get("owner") == owner]
+        listed.sort(key=lambda data: data.get("created_at") or 0, reverse=True)
+        return listed[:limit]
+
+    async def stop(self, timeout: float = 10.0):
+        """실행 중인 작업을 취소하고 종료를 기다립니다."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        by_status: Dict[str, int] = {}
+        for job in self._jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "max_upload_mb": INGEST_MAX_UPLOAD_MB,
+            "batch_size": INGEST_BATCH_SIZE,
+            "jobs": by_status,
+            **self._stats
+        }
+
+
+# ==================== 스트리밍 추출/분할 ====================
+
+def _detect_encoding(sample: bytes) -> str:
+    """앞부분 샘플로 인코딩을 고릅니다 (utf-8 → cp949 → latin-1)."""
+    for encoding in ("utf-8", "cp949"):
+        try:
+            # 블록 경계에서 잘린 멀티바이트 문자는 허용
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def iter_file_text(path: str, file_extension: str, filename: str,
+                   extract_bytes: Callable[[bytes, str, str], str],
+                   job: Optional[IngestionJob] = None) -> Iterator[str]:
+    """
+    스풀된 파일의 텍스트를 블록 단위로 반환합니다 (작업자 스레드에서 실행).
+
+    텍스트 형식은 블록 단위로 디코딩하고, 그 외 형식(docx/xlsx 등)은
+    파일 전체를 extract_bytes로 추출합니다.
+    """
+    with open(path, "rb") as f:
+        if file_extension not in STREAMABLE_EXTENSIONS:
+            content = f.read()
+            if job is not None:
+                job.bytes_read = len(content)
+            text = extract_bytes(content, file_extension, filename)
+            if job is not None:
+                job.text_length = len(text)
+            yield text
+            return
+
+        first = f.read(READ_BLOCK_SIZE)
+        encoding = _detect_encoding(first)
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        block = first
+        while block:
+            text = decoder.decode(block)
+            if job is not None:
+                job.bytes_read += len(block)
+                job.text_length += len(text)
+            if text:
+                yield text
+            block = f.read(READ_BLOCK_SIZE)
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            if job is not None:
+                job.text_length += len(tail)
+            yield tail
+
+
+def iter_text_chunks(blocks: Iterable[str], chunk_size: int = 1000, overlap: int = 200) -> Iterator[str]:
+    """
+    텍스트 블록을 받아 split_text_into_chunks와 같은 규칙으로 청크를 생성합니다.
+
+    현재 청크 이후로 chunk_size보다 많은 텍스트가 버퍼에 있을 때만 청크를 확정하므로
+    전체 텍스트를 한 번에 분할한 결과와 같습니다.
+    """
+    buffer = ""
+    start = 0
+
+    def next_end(text: str, start: int) -> int:
+        end = start + chunk_size
+        if end < len(text):
+            # 문장 끝 찾기
+            for boundary in ['. ', '.\n', '? ', '! ', '.\t']:
+                boundary_pos = text.rfind(boundary, start, end)
+                if boundary_pos > start:
+                    return boundary_pos + len(boundary)
+            # 단어 경계 찾기
+            space_pos = text.rfind(' ', start, end)
+            if space_pos > start:
+                return space_pos
+        return end
+
+    for block in blocks:
+        buffer += block
+        while len(buffer) - start > chunk_size:
+            end = next_end(buffer, start)
+            chunk = buffer[start:end].strip()
+            if chunk:
+                yield chunk
+            start = max(start + 1, end - overlap)
+        # 이미 처리한 앞부분은 버림
+        buffer = buffer[start:]
+        start = 0
+
+    while start < len(buffer):
+        end = next_end(buffer, start)
+        chunk = buffer[start:end].strip()
+        if chunk:
+            yield chunk
+        start = max(start + 1, end - overlap)
+
+
+def _take(iterator: Iterator[str], count: int) -> List[str]:
+    return list(islice(iterator, count))
+
+
+StoreBatch = Callable[[int, List[str], List[Optional[bytes]]], Awaitable[int]]
+
+
+async def run_chunk_pipeline(job: IngestionJob, chunks: Iterator[str], store_batch: StoreBatch,
+                             batch_size: int = INGEST_BATCH_SIZE) -> int:
+    """
+    청크를 배치 단위로 임베딩하고 저장합니다.
+
+    청크 생성(파일 읽기/추출/분할)은 작업자 스레드에서 실행하여 이벤트 루프를 막지 않습니다.
+
+    Args:
+        job: 진행 상황을 기록할 작업
+        chunks: 청크 이터레이터
+        store_batch: (시작 인덱스, 청크 목록, 임베딩 목록)을 받아 저장된 수를 반환하는 코루틴 함수
+            (이미 있는 내용이라 건너뛴 청크는 job.chunks_duplicate에 더함)
+        batch_size: 배치 크기
+
+    Returns:
+        int: 전체 청크 수
+    """
+    total = 0
+    batch_size = max(1, batch_size)
+    while True:
+        job.set_stage("extracting")
+        batch = await asyncio.to_thread(_take, chunks, batch_size)
+        if not batch:
+            break
+
+        job.set_stage("embedding")
+        embeddings = await embed_texts(batch)
+        job.chunks_embedded += sum(1 for e in embeddings if e is not None)
+
+        job.set_stage("writing")
+        duplicates_before = job.chunks_duplicate
+        try:
+            saved = await store_batch(total, batch, embeddings)
+        except Exception as e:
+            logger.error(f"❌ 학습 청크 배치 저장 오류 ({job.job_id}): {e}")
+            saved = 0
+        duplicates = job.chunks_duplicate - duplicates_before
+        job.chunks_saved += saved
+        job.chunks_failed += len(batch) - saved - duplicates
+        job.batches += 1
+        total += len(batch)
+        job.log(f"   💾 배치 {job.batches}: 청크 {total - len(batch) + 1}~{total} "
+                f"저장 {saved}/{len(batch)}" + (f" (중복 {duplicates})" if duplicates else ""))
+    return total
+
+
+# 전역 관리자
+_manager: Optional[IngestionJobManager] = None
+
+
+def get_ingestion_job_manager() -> IngestionJobManager:
+    """공유 학습 작업 관리자를 반환합니다."""
+    global _manager
+    if _manager is None:
+        _manager = IngestionJobManager()
+    return _manager
+
+
+def get_ingestion_stats() -> Dict[str, Any]:
+    return get_ingestion_job_manager().get_stats()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 저널 저장소
+users/sessions/messages/points JSON 파일을 변경분 단위(append-only)로 기록합니다.
+
+- 스냅샷: 기존 JSON 파일 (압축본, 주기적으로 재작성)
+- 저널: <파일명>.journal (한 줄에 한 개의 변경 레코드, JSON Lines)
+- 시작 시: 스냅샷 로드 후 저널을 재생하여 메모리 상태를 복원
+- 저널 레코드마다 순번(seq)을 붙이고 스냅샷에 마지막으로 반영한 순번을 저장합니다.
+  스냅샷 교체 후 저널 삭제 전에 종료되어도, 재생 시 순번 이하 레코드를 건너뛰어
+  append 레코드가 중복 적용되지 않습니다.
+"""
+
+import os
+import json
+import threading
+from typing import Any, Dict, Optional
+
+# 저널 레코드가 이 개수를 넘으면 스냅샷으로 압축
+DEFAULT_COMPACT_EVERY = int(os.getenv("EORA_JOURNAL_COMPACT_EVERY", "1000"))
+
+JOURNAL_SUFFIX = ".journal"
+# 스냅샷에 반영된 마지막 저널 순번 (로드 시 데이터에서 제거)
+JOURNAL_SEQ_KEY = "__journal_seq__"
+
+
+class JournalStore:
+    """단일 JSON 파일에 대한 저널 기반 저장소"""
+
+    def __init__(self, file_path: str, compact_every: int = DEFAULT_COMPACT_EVERY):
+        """
+        초기화
+
+        Args:
+            file_path: 스냅샷 JSON 파일 경로
+            compact_every: 스냅샷 압축 주기 (저널 레코드 수)
+        """
+        self.file_path = file_path
+        self.journal_path = file_path + JOURNAL_SUFFIX
+        self.compact_every = max(1, compact_every)
+        self.data: Optional[Dict[str, Any]] = None
+        self.pending_records = 0
+        self.seq = 0
+        self._lock = threading.RLock()
+
+    # ==================== 로드 ====================
+
+    def load(self, default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        스냅샷과 저널을 읽어 메모리 상태를 복원합니다.
+
+        Args:
+            default: 스냅샷이 없을 때 사용할 기본값
+
+        Returns:
+            복원된 데이터 딕셔너리
+        """
+        with self._lock:
+            data = default if default is not None else {}
+
+            if os.path.exists(self.file_path):
+                try:
+                    with open(self.file_path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except Exception as e:
+                    print(f"⚠️ {self.file_path} 스냅샷 로드 오류: {e}")
+
+            snapshot_seq = data.pop(JOURNAL_SEQ_KEY, 0) if isinstance(data, dict) else 0
+            self.seq = snapshot_seq
+            replayed = self._replay(data, snapshot_seq)
+            if replayed:
+                print(f"📜 {self.journal_path} 저널 재생: {replayed}개 레코드")
+
+            self.data = data
+            self.pending_records = replayed
+            return data
+
+    def _replay(self, data: Dict[str, Any], snapshot_seq: int = 0) -> int:
+        """저널 파일의 레코드를 순서대로 적용합니다 (스냅샷에 이미 반영된 순번은 건너뜀)."""
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        count = 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 비정상 종료로 잘린 마지막 줄은 건너뜀
+                    print(f"⚠️ {self.journal_path}:{line_no} 손상된 저널 레코드 무시")
+                    continue
+                seq = record.get("seq")
+                if seq is not None:
+                    if seq <= snapshot_seq:
+                        continue
+                    self.seq = max(self.seq, seq)
+                self._apply(data, record)
+                count += 1
+        return count
+
+    @staticmethod
+    def _apply(data: Dict[str, Any], record: Dict[str, Any]):
+        """단일 저널 레코드를 데이터에 적용합니다."""
+        op = record.get("op")
+        key = record.get("key")
+
+        if op == "set":
+            data[key] = record.get("value")
+        elif op == "append":
+            items = data.get(key)
+            if not isinstance(items, list):
+                items = []
+                data[key] = items
+            items.append(record.get("value"))
+        elif op == "delete":
+            data.pop(key, None)
+
+    # ==================== 기록 ====================
+
+    def set(self, data: Dict[str, Any], key: str) -> bool:
+        """data[key]의 현재 값을 기록합니다."""
+        return self._write(data, {"op": "set", "key": key, "value": data.get(key)})
+
+    def append(self, data: Dict[str, Any], key: str, item: Any) -> bool:
+        """data[key] 리스트에 추가된 항목 하나를 기록합니다."""
+        return self._write(data, {"op": "append", "key": key, "value": item})
+
+    def delete(self, data: Dict[str, Any], key: str) -> bool:
+        """data에서 key가 삭제되었음을 기록합니다."""
+        return self._write(data, {"op": "delete", "key": key})
+
+    def _write(self, data: Dict[str, Any], record: Dict[str, Any]) -> bool:
+        """저널에 레코드 한 줄을 추가하고 필요 시 압축합니다."""
+        with self._lock:
+            try:
+                directory = os.path.dirname(self.journal_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                record["seq"] = self.seq + 1
+                line = json.dumps(record, ensure_ascii=False, default=str)
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except Exception as e:
+                print(f"❌ {self.journal_path} 저널 기록 오류: {e}")
+                return False
+
+            self.seq = record["seq"]
+            self.data = data
+            self.pending_records += 1
+            if self.pending_records >= self.compact_every:
+                self.snapshot(data)
+            return True
+
+    # ==================== 스냅샷 ====================
+
+    def snapshot(self, data: Dict[str, Any]) -> bool:
+        """
+        전체 데이터를 스냅샷으로 저장하고 저널을 비웁니다.
+        임시 파일에 쓴 뒤 교체하므로 중간에 종료되어도 이전 스냅샷이 유지됩니다.
+        """
+        with self._lock:
+            try:
+                directory = os.path.dirname(self.file_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+
+                tmp_path = self.file_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({**data, JOURNAL_SEQ_KEY: self.seq}, f,
+                              ensure_ascii=False, separators=(",", ":"), default=str)
+                os.replace(tmp_path, self.file_path)
+
+                # 스냅샷에 반영된 저널 제거
+                if os.path.exists(self.journal_path):
+                    os.remove(self.journal_path)
+
+                self.data = data
+                self.pending_records = 0
+                return True
+            except Exception as e:
+                print(f"❌ {self.file_path} 스냅샷 저장 오류: {e}")
+                return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """저장소 상태를 반환합니다."""
+        journal_size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+        return {
+            "file_path": self.file_path,
+            "pending_records": self.pending_records,
+            "compact_every": self.compact_every,
+            "journal_bytes": journal_size
+        }
+
+
+# 파일 경로별 저장소 인스턴스
+_journal_stores: Dict[str, JournalStore] = {}
+
+
+def get_journal_store(file_path: str) -> JournalStore:
+    """파일 경로에 해당하는 저널 저장소 인스턴스를 반환합니다."""
+    store = _journal_stores.get(file_path)
+    if store is None:
+        store = JournalStore(file_path)
+        _journal_stores[file_path] = store
+    return store
+
+
+def compact_all() -> int:
+    """보류 중인 저널이 있는 모든 저장소를 스냅샷으로 압축합니다."""
+    compacted = 0
+    for store in _journal_stores.values():
+        if store.data is not None and store.pending_records > 0:
+            if store.snapshot(store.data):
+                compacted += 1
+    return compacted
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+키워드 역색인 검색 (BM25)
+다중 필드 $regex 검색(컬렉션 전체 스캔)을 대신하는 한국어 인식 키워드 색인입니다.
+
+- 저장 시 문서의 텍스트 필드를 토큰화하여 search_terms(고유 용어 목록),
+  search_tf(2회 이상 등장한 용어의 빈도), search_len(전체 토큰 수)을 함께 기록합니다.
+- search_terms에 멀티키 인덱스를 두어 MongoDB 인덱스가 역색인(posting list) 역할을 합니다.
+- 한국어는 조사를 떼어낸 어간과, 3글자 이상 단어의 2-gram을 용어로 사용합니다.
+- 검색 시 희귀한 용어(점수 기여가 큰 용어)부터 용어별 한도 안에서 후보를 모은 뒤
+  BM25 점수로 정렬하고 상위 문서만 전체 조회합니다. 한도를 넘는 흔한 용어는
+  다른 질의 용어도 함께 가진 문서부터 채웁니다.
+- 문서 빈도(df)와 문서 수는 검색 필터(사용자 등) 범위 안에서 셉니다 (상한까지만 세는 근사치).
+"""
+
+import os
+import re
+import math
+import time
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 문서당 최대 고유 용어 수
+KEYWORD_MAX_TERMS = int(os.getenv("EORA_KEYWORD_MAX_TERMS", "300"))
+# BM25 점수를 계산할 최대 후보 문서 수
+KEYWORD_CANDIDATE_LIMIT = int(os.getenv("EORA_KEYWORD_CANDIDATE_LIMIT", "2000"))
+# 문서 빈도(df)/평균 길이 캐시 유지 시간 (초)
+KEYWORD_STATS_TTL = float(os.getenv("EORA_KEYWORD_STATS_TTL", "300"))
+# 용어별 문서 빈도를 셀 때의 상한 (이보다 흔한 용어는 상한 값으로 근사)
+KEYWORD_DF_COUNT_LIMIT = int(os.getenv("EORA_KEYWORD_DF_COUNT_LIMIT", "20000"))
+# 역색인 필드를 채우는 백필 배치 크기
+KEYWORD_BACKFILL_BATCH = 500
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 색인 대상 필드 (점 표기 = 하위 문서 필드)
+DEFAULT_FIELDS = (
+    "content", "response", "message", "user_input", "ai_response", "summary",
+    "topic", "sub_topic", "category", "keywords", "tags",
+    "filename", "source_file", "metadata.filename"
+)
+
+# 어간 뒤에 붙는 조사/어미 (긴 것부터 비교)
+JOSA = sorted([
+    "에서는", "으로는", "에게서", "이라는", "이라고", "에서", "으로", "에게", "께서", "부터",
+    "까지", "처럼", "보다", "라는", "이나", "하고", "은", "는", "이", "가", "을", "를",
+    "의", "에", "와", "과", "도", "만", "로", "나",
+    "했습니다", "합니다", "습니다", "입니다", "했다", "한다", "하다", "하는", "해요", "이다"
+], key=len, reverse=True)
+
+STOP_WORDS = {"이", "가", "을", "를", "의", "에", "에서", "로", "으로", "와", "과", "도", "만",
+              "은", "는", "그", "저", "우리", "너", "나", "입니다", "합니다", "the", "a", "an", "of", "to", "and", "is"}
+
+_TOKEN_RE = re.compile(r"[가-힣]+|[^\W_가-힣]+")
+
+
+def _strip_josa(word: str) -> str:
+    for josa in JOSA:
+        if word.endswith(josa) and len(word) - len(josa) >= 2:
+            return word[:-len(josa)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """텍스트를 검색 용어 목록으로 변환합니다 (중복 포함, 등장 순서 유지)."""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFC", str(text)).lower()
+    terms = []
+    for token in _TOKEN_RE.findall(text):
+        if "가" <= token[0] <= "힣":
+            stem = _strip_josa(token)
+            if len(stem) < 2 or stem in STOP_WORDS:
+                continue
+            terms.append(stem)
+            if len(stem) >= 3:
+                # 띄어쓰기 없는 복합어도 부분 일치하도록 2-gram 추가
+                terms.extend(stem[i:i + 2] for i in range(len(stem) - 1))
+        elif len(token) >= 2 and token not in STOP_WORDS:
+            terms.append(token)
+    return terms
+
+
+def _field_values(doc: Dict[str, Any], field: str) -> Iterable[str]:
+    value: Any = doc
+    for part in field.split("."):
+        if not isinstance(value, dict):
+            return []
+        value = value.get(part)
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value if isinstance(v, (str, int, float))]
+    return [str(value)] if isinstance(value, (str, int, float)) else []
+
+
+def build_search_fields(doc: Dict[str, Any], fields: Iterable[str] = DEFAULT_FIELDS) -> Dict[str, Any]:
+    """문서에 저장할 역색인 필드(search_terms/search_tf/search_len)를 계산합니다."""
+    terms: List[str] = []
+    for field in fields:
+        for value in _field_values(doc, field):
+            terms.extend(tokenize(value))
+    counts = Counter(terms)
+    top = [term for term, _ in counts.most_common(KEYWORD_MAX_TERMS)]
+    return {
+        "search_terms": top,
+        "search_tf": {term: counts[term] for term in top if counts[term] > 1},
+        "search_len": len(terms)
+    }
+
+
+def annotate_document(doc: Dict[str, Any], fields: Iterable[str] = DEFAULT_FIELDS) -> Dict[str, Any]:
+    """저장 직전 문서에 역색인 필드를 채웁니다 (insert와 함께 인덱스가 갱신됨)."""
+    doc.update(build_search_fields(doc, fields))
+    return doc
+
+
+class KeywordIndex:
+    """MongoDB 컬렉션 위의 BM25 키워드 역색인"""
+
+    def __init__(self, collection, fields: Iterable[str] = DEFAULT_FIELDS,
+                 candidate_limit: int = KEYWORD_CANDIDATE_LIMIT,
+                 exclude_fields: Iterable[str] = ()):
+        """
+        초기화
+
+        Args:
+            collection: pymongo 컬렉션
+            fields: 색인할 텍스트 필드
+            candidate_limit: BM25 점수를 계산할 최대 후보 수
+            exclude_fields: 검색 결과에서 뺄 추가 필드 (임베딩 등 큰 필드)
+        """
+        self.collection = collection
+        self.fields = tuple(fields)
+        # 검색 결과 기본 projection: 역색인 필드와 지정 필드 제외
+        self.result_projection = {field: 0 for field in ("search_terms", "search_tf", *exclude_fields)}
+        self.candidate_limit = max(1, candidate_limit)
+        self._df_cache: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._corpus: Optional[Tuple[float, int, float]] = None
+        self._scope_totals: Dict[str, Tuple[float, int]] = {}
+        self._backfill_thread: Optional[threading.Thread] = None
+        self.stats = {"searches": 0, "candidates": 0, "backfilled": 0, "total_search_ms": 0.0}
+
+    # ==================== 색인 ====================
+
+    def build_fields(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """문서에 저장할 역색인 필드를 계산합니다."""
+        return build_search_fields(doc, self.fields)
+
+    def annotate(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """저장 직전 문서에 역색인 필드를 채웁니다."""
+        return annotate_document(doc, self.fields)
+
+    def ensure_indexes(self):
+        """search_terms 멀티키 인덱스를 생성합니다."""
+        try:
+            self.collection.create_index([("search_terms", 1)])
+        except Exception as e:
+            logger.error(f"키워드 색인 생성 오류: {e}")
+
+    def backfill(self, batch_size: int = KEYWORD_BACKFILL_BATCH) -> int:
+        """역색인 필드가 없는 기존 문서를 채웁니다."""
+        from pymongo import UpdateOne
+
+        projection = {field: 1 for field in self.fields}
+        total = 0
+        while True:
+            docs = list(self.collection.find({"search_terms": {"$exists": False}}, projection).limit(batch_size))
+            if not docs:
+                break
+            requests = [UpdateOne({"_id": doc["_id"]}, {"$set": self.build_fields(doc)}) for doc in docs]
+            self.collection.bulk_write(requests, ordered=False)
+            total += len(requests)
+            self.stats["backfilled"] += len(requests)
+        if total:
+            logger.info(f"키워드 색인 백필 완료 ({self.collection.name}): {total}건")
+        return total
+
+    def start_backfill(self):
+        """백그라운드 스레드에서 색인 생성과 백필을 실행합니다."""
+        if self._backfill_thread and self._backfill_thread.is_alive():
+            return
+
+        def _run():
+            try:
+                self.ensure_indexes()
+                self.backfill()
+            except Exception as e:
+                logger.error(f"키워드 색인 백필 오류 ({self.collection.name}): {e}")
+
+        self._backfill_thread = threading.Thread(target=_run, name="keyword-backfill", daemon=True)
+        self._backfill_thread.start()
+
+    # ==================== 통계 ====================
+
+    @staticmethod
+    def _scoped(filter: Optional[Dict[str, Any]], match: Dict[str, Any]) -> Dict[str, Any]:
+        return {"$and": [filter, match]} if filter else match
+
+    def _document_frequencies(self, terms: List[str], filter: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+        """필터 범위 안의 용어별 문서 빈도 (KEYWORD_DF_COUNT_LIMIT까지만 셈)"""
+        now = time.monotonic()
+        scope = repr(filter) if filter else ""
+        result = {}
+        for term in terms:
+            cached = self._df_cache.get((scope, term))
+            if cached and now - cached[0] < KEYWORD_STATS_TTL:
+                result[term] = cached[1]
+                continue
+            # 멀티키 인덱스를 타는 카운트 (흔한 용어는 상한에서 멈춤)
+            df = self.collection.count_documents(
+                self._scoped(filter, {"search_terms": term}), limit=KEYWORD_DF_COUNT_LIMIT
+            )
+            if len(self._df_cache) >= 50000:
+                self._df_cache.clear()
+            self._df_cache[(scope, term)] = (now, df)
+            result[term] = df
+        return result
+
+    def _scope_total(self, filter: Dict[str, Any], total: int) -> int:
+        """필터 범위 안의 문서 수 (캐시, 전체 문서 수를 넘지 않음)"""
+        now = time.monotonic()
+        scope = repr(filter)
+        cached = self._scope_totals.get(scope)
+        if cached and now - cached[0] < KEYWORD_STATS_TTL:
+            return cached[1]
+        count = self.collection.count_documents(filter, limit=max(total, 1))
+        if len(self._scope_totals) >= 10000:
+            self._scope_totals.clear()
+        self._scope_totals[scope] = (now, count)
+        return count
+
+    def _corpus_stats(self) -> Tuple[int, float]:
+        """전체 문서 수와 평균 문서 길이(표본 추정)를 반환합니다."""
+        now = time.monotonic()
+        if self._corpus and now - self._corpus[0] < KEYWORD_STATS_TTL:
+            return self._corpus[1], self._corpus[2]
+        total = self.collection.estimated_document_count()
+        sample = list(self.collection.aggregate([
+            {"$sample": {"size": 1000}},
+            {"$group": {"_id": None, "avg": {"$avg": "$search_len"}}}
+        ]))
+        avg_len = (sample[0].get("avg") if sample else None) or 1.0
+        self._corpus = (now, total, avg_len)
+        return total, avg_len
+
+    # ==================== 검색 ====================
+
+    def search(self, query: str, filter: Dict[str, Any] = None, limit: int = 5,
+               projection: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        BM25 점수 상위 문서를 반환합니다 (각 문서에 keyword_score 포함).
+
+        Args:
+            query: 검색어
+            filter: 추가 MongoDB 필터 (사용자/타입 등)
+            limit: 최대 결과 수
+            projection: 결과 문서 필드 지정 (None이면 역색인 필드를 뺀 전체)
+        """
+        started = time.perf_counter()
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms or limit <= 0:
+            return []
+
+        df = self._document_frequencies(query_terms, filter)
+        total, avg_len = self._corpus_stats()
+        if filter:
+            total = self._scope_total(filter, total)
+
+        # 희귀한 용어(점수 기여가 큰 용어)부터 후보 수집
+        ordered = sorted((t for t in query_terms if df[t] > 0), key=lambda t: df[t])
+        if not ordered:
+            return []
+        candidates = self._collect_candidates(ordered, df, filter)
+
+        idf = {t: _idf(total, df[t]) for t in ordered}
+        scored = []
+        for doc in candidates.values():
+            doc_terms = set(doc.get("search_terms") or [])
+            tf_map = doc.get("search_tf") or {}
+            length = doc.get("search_len") or avg_len
+            score = 0.0
+            for term in ordered:
+                if term not in doc_terms:
+                    continue
+                tf = tf_map.get(term, 1)
+                score += idf[term] * tf * (BM25_K1 + 1) / (
+                    tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+            scored.append((score, doc["_id"]))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        top = scored[:limit]
+
+        results = []
+        if top:
+            scores = {doc_id: score for score, doc_id in top}
+            projection = projection or self.result_projection
+            docs = {doc["_id"]: doc for doc in self.collection.find({"_id": {"$in": list(scores)}}, projection)}
+            for score, doc_id in top:
+                doc = docs.get(doc_id)
+                if doc is not None:
+                    doc["keyword_score"] = round(score, 4)
+                    results.append(doc)
+
+        self.stats["searches"] += 1
+        self.stats["candidates"] += len(candidates)
+        self.stats["total_search_ms"] += (time.perf_counter() - started) * 1000
+        return results
+
+    def _collect_candidates(self, ordered: List[str], df: Dict[str, int],
+                            filter: Optional[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        """
+        점수 기여가 큰 용어 순서로 용어별 한도 안에서 후보 문서를 모읍니다.
+        남은 한도를 남은 용어 수로 나눠 쓰므로, 희귀한 용어가 쓰고 남긴 한도는 흔한 용어로 넘어가고
+        흔한 용어만 가진 문서도 후보에 들어갑니다.
+        """
+        fields = {"search_terms": 1, "search_tf": 1, "search_len": 1}
+        candidates: Dict[Any, Dict[str, Any]] = {}
+        remaining = self.candidate_limit
+        for i, term in enumerate(ordered):
+            if remaining <= 0:
+                break
+            cap = max(1, remaining // (len(ordered) - i))
+            matches = [{"search_terms": term}]
+            others = [t for t in ordered if t != term]
+            if df[term] > cap and others:
+                # 한도를 넘는 용어는 다른 질의 용어도 함께 가진 문서(점수가 높은 문서)부터
+                matches.insert(0, {"search_terms": {"$all": [term], "$in": others}})
+            taken = 0
+            for match in matches:
+                if taken >= cap:
+                    break
+                if candidates:
+                    match = {"$and": [match, {"_id": {"$nin": list(candidates)}}]}
+                for doc in self.collection.find(self._scoped(filter, match), fields).limit(cap - taken):
+                    candidates[doc["_id"]] = doc
+                    taken += 1
+            remaining -= taken
+        return candidates
+
+    def get_stats(self) -> Dict[str, Any]:
+        searches = self.stats["searches"]
+        return {
+            "collection": self.collection.name,
+            "searches": searches,
+            "avg_candidates": round(self.stats["candidates"] / searches, 1) if searches else 0.0,
+            "avg_search_ms": round(self.stats["total_search_ms"] / searches, 2) if searches else 0.0,
+            "backfilled": self.stats["backfilled"],
+            "cached_terms": len(self._df_cache)
+        }
+
+
+def _idf(total: int, df: int) -> float:
+    return math.log(1 + (max(total, df) - df + 0.5) / (df + 0.5))
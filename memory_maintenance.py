@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+기억 망각/강화 유지보수 작업 (증분 + 서버 측 갱신)
+모든 기억을 파이썬으로 읽어 문서마다 update_one 하던 방식 대신,
+마지막 사용 시각의 "나이 버킷"이 바뀐 기억만 골라 MongoDB 업데이트 파이프라인으로 갱신합니다.
+
+- 나이 버킷: (지금 - 마지막 사용 시각) // EORA_MAINTENANCE_BUCKET_DAYS
+- 문서에 maintenance.bucket(마지막으로 반영한 버킷)과 maintenance.due_at(다음 버킷 경계)을 기록하고,
+  다음 실행에서는 아래 후보만 조회합니다 (_id만, 배치 단위).
+  · due_at이 지난 기억 / 아직 처리된 적 없는 기억 (due_at 없음)
+  · 지난 실행 이후 다시 사용된 기억 (사용 시각 > 지난 실행 시각)
+- 점수 변경은 지난 처리 이후 새로 지나간 버킷마다 한 단계씩 한 번에 적용합니다
+  (decay ** 망각 단계 × strengthen ** 강화 단계). 버킷 단위로 세므로 실행 주기와 무관하게
+  같은 나이에는 같은 점수가 되고, 같은 버킷이면 다시 실행해도 점수가 바뀌지 않습니다.
+  · 새로 지나간 버킷: (지난 버킷, 현재 버킷] - 처음 처리하거나 다시 사용되어 버킷이 줄면 [0, 현재 버킷]
+  · 망각 단계: 그중 forget_after_days // bucket_days 보다 뒤의 버킷 수
+  · 강화 단계: 그중 강화 구간 버킷 수 - 최근 사용 구간(ceil(strengthen_within_days / bucket_days)개 버킷),
+    공명도가 높으면 망각 전까지의 모든 버킷
+- 실행 결과(후보 수, 갱신 수, 처리량)는 상태 컬렉션에 작업 이름별로 기록합니다.
+"""
+
+import os
+import math
+import time
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 나이 버킷 크기 (일)
+MAINTENANCE_BUCKET_DAYS = int(os.getenv("EORA_MAINTENANCE_BUCKET_DAYS", "7"))
+# 한 번의 업데이트 명령으로 갱신할 문서 수
+MAINTENANCE_BATCH_SIZE = int(os.getenv("EORA_MAINTENANCE_BATCH_SIZE", "1000"))
+
+MAINTENANCE_FIELD = "maintenance"
+MAINTENANCE_STATE_COLLECTION = "maintenance_runs"
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class MemoryMaintenanceJob:
+    """컬렉션 하나에 대한 망각/강화 증분 유지보수 작업"""
+
+    def __init__(self, collection, state_collection, name: str,
+                 score_field: str = "importance",
+                 default_score: float = 5000,
+                 min_score: float = 1000,
+                 max_score: float = 10000,
+                 used_field: str = "last_used",
+                 fallback_field: str = "timestamp",
+                 forget_after_days: float = 30,
+                 strengthen_within_days: float = 7,
+                 decay: float = 0.95,
+                 strengthen: float = 1.05,
+                 resonance_field: Optional[str] = "resonance_score",
+                 resonance_threshold: float = 85,
+                 fade_field: Optional[str] = None,
+                 precision: int = 2,
+                 bucket_days: int = MAINTENANCE_BUCKET_DAYS,
+                 batch_size: int = MAINTENANCE_BATCH_SIZE,
+                 clock: Callable[[], datetime] = datetime.utcnow):
+        self.collection = collection
+        self.state_collection = state_collection
+        self.name = name
+        self.score_field = score_field
+        self.default_score = default_score
+        self.min_score = min_score
+        self.max_score = max_score
+        self.used_field = used_field
+        self.fallback_field = fallback_field
+        self.forget_after_days = forget_after_days
+        self.strengthen_within_days = strengthen_within_days
+        self.decay = decay
+        self.strengthen = strengthen
+        self.resonance_field = resonance_field
+        self.resonance_threshold = resonance_threshold
+        self.fade_field = fade_field
+        self.precision = precision
+        self.bucket_days = bucket_days
+        self.batch_size = batch_size
+        self.clock = clock
+        self._indexes_ready = False
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    def ensure_indexes(self):
+        """후보 조회용 인덱스 (다음 버킷 경계, 마지막 사용 시각)"""
+        if self._indexes_ready:
+            return
+        self.collection.create_index([(f"{MAINTENANCE_FIELD}.due_at", 1)])
+        self.collection.create_index([(self.used_field, 1)])
+        self._indexes_ready = True
+
+    # ----- 후보 조회 -----
+
+    def _last_run_at(self) -> Optional[datetime]:
+        state = self.state_collection.find_one({"_id": self.name}, {"last_run_at": 1})
+        return state.get("last_run_at") if state else None
+
+    def candidate_filter(self, now: datetime, last_run_at: Optional[datetime],
+                         scope: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """버킷이 바뀌었을 수 있는 기억만 고르는 조건 (인덱스 사용)"""
+        due_field = f"{MAINTENANCE_FIELD}.due_at"
+        clauses: List[Dict[str, Any]] = [
+            {due_field: {"$lte": now}},
+            {due_field: None},
+        ]
+        if last_run_at is not None:
+            # 사용 시각은 datetime 또는 ISO 문자열로 저장되어 있음
+            clauses.append({self.used_field: {"$gt": last_run_at}})
+            clauses.append({self.used_field: {"$gt": last_run_at.isoformat()}})
+        query: Dict[str, Any] = {"$or": clauses}
+        if scope:
+            query = {"$and": [scope, query]}
+        return query
+
+    # ----- 업데이트 파이프라인 -----
+
+    def update_pipeline(self, now: datetime) -> List[Dict[str, Any]]:
+        """문서마다 버킷/단계 수/점수를 서버에서 계산하는 업데이트 파이프라인"""
+        m = MAINTENANCE_FIELD
+        bucket_ms = self.bucket_days * DAY_MS
+        used = {"$ifNull": [f"${self.used_field}", f"${self.fallback_field}"]}
+        # ISO 문자열은 마이크로초를 잘라 밀리초 정밀도로 변환 (변환 실패 시 지금으로 취급)
+        used_date = {"$convert": {
+            "input": {"$cond": [{"$eq": [{"$type": used}, "string"]}, {"$substrCP": [used, 0, 23]}, used]},
+            "to": "date",
+            "onError": now,
+            "onNull": now
+        }}
+        # 망각은 이 버킷보다 뒤, 강화는 최근 사용 구간 버킷(공명도가 높으면 망각 전까지)
+        forget_bucket = math.floor(self.forget_after_days / self.bucket_days)
+        strengthen_last = math.ceil(self.strengthen_within_days / self.bucket_days) - 1
+        if self.resonance_field:
+            resonant = {"$gt": [{"$ifNull": [f"${self.resonance_field}", 0]}, self.resonance_threshold]}
+            strengthen_until = {"$cond": [resonant, max(forget_bucket, strengthen_last), strengthen_last]}
+        else:
+            strengthen_until = strengthen_last
+        score = {"$round": [
+            {"$min": [self.max_score, {"$max": [self.min_score, {"$multiply": [
+                {"$ifNull": [f"${self.score_field}", self.default_score]},
+                {"$pow": [self.decay, f"${m}._decay_steps"]},
+                {"$pow": [self.strengthen, f"${m}._strengthen_steps"]}
+            ]}]}]},
+            self.precision
+        ]}
+
+        result_fields: Dict[str, Any] = {
+            self.score_field: score,
+            f"{m}.bucket": f"${m}._bucket",
+            f"{m}.due_at": {"$add": [f"${m}._used", {"$multiply": [{"$add": [f"${m}._bucket", 1]}, bucket_ms]}]},
+            f"{m}.updated_at": now,
+        }
+        pipeline = [
+            {"$set": {f"{m}._used": used_date}},
+            {"$set": {
+                f"{m}._bucket": {"$floor": {"$divide": [
+                    {"$max": [0, {"$subtract": [now, f"${m}._used"]}]}, bucket_ms
+                ]}},
+            }},
+            {"$set": {
+                # 새로 지나간 버킷은 (_start, _bucket] - 처음 처리하거나 다시 사용되어 버킷이 줄면 0번 버킷부터
+                f"{m}._start": {"$cond": [
+                    {"$or": [
+                        {"$eq": [{"$ifNull": [f"${m}.bucket", None]}, None]},
+                        {"$lt": [f"${m}._bucket", f"${m}.bucket"]}
+                    ]},
+                    -1,
+                    f"${m}.bucket"
+                ]},
+            }},
+            {"$set": {
+                f"{m}._decay_steps": {"$max": [0, {"$subtract": [
+                    f"${m}._bucket", {"$max": [f"${m}._start", forget_bucket]}
+                ]}]},
+                f"{m}._strengthen_steps": {"$max": [0, {"$subtract": [
+                    {"$min": [f"${m}._bucket", strengthen_until]}, f"${m}._start"
+                ]}]},
+            }},
+            {"$set": result_fields},
+        ]
+        if self.fade_field:
+            # 망각 정도 (0 = 온전, 1 = 완전히 잊힘)
+            pipeline.append({"$set": {self.fade_field: {"$round": [
+                {"$subtract": [1, {"$divide": [
+                    {"$subtract": [f"${self.score_field}", self.min_score]}, self.max_score - self.min_score
+                ]}]}, 4
+            ]}}})
+        pipeline.append({"$unset": [
+            f"{m}._used", f"{m}._bucket", f"{m}._start", f"{m}._decay_steps", f"{m}._strengthen_steps"
+        ]})
+        return pipeline
+
+    # ----- 실행 -----
+
+    def _iter_batches(self, query: Dict[str, Any]):
+        """후보 _id를 배치 단위로 조회 (_id 순서로 이어서 조회, 문서 본문은 읽지 않음)"""
+        last_id = None
+        while True:
+            page_query = query if last_id is None else {"$and": [query, {"_id": {"$gt": last_id}}]}
+            ids = [doc["_id"] for doc in
+                   self.collection.find(page_query, {"_id": 1}).sort("_id", 1).limit(self.batch_size)]
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
+
+    def run(self, scope: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        유지보수 1회 실행 (동기 - 비동기 코드에서는 run_db로 호출)
+
+        Args:
+            scope: 대상 범위 조건 (예: {"user_id": ...}). 범위 실행은 지난 실행 시각을 갱신하지 않습니다.
+
+        Returns:
+            후보/갱신 수와 처리량
+        """
+        self.ensure_indexes()
+        started = time.perf_counter()
+        now = self.clock()
+        last_run_at = self._last_run_at()
+        query = self.candidate_filter(now, last_run_at, scope)
+        pipeline = self.update_pipeline(now)
+
+        candidates = modified = batches = 0
+        for ids in self._iter_batches(query):
+            result = self.collection.update_many({"_id": {"$in": ids}}, pipeline)
+            candidates += len(ids)
+            modified += result.modified_count
+            batches += 1
+
+        elapsed = time.perf_counter() - started
+        report = {
+            "job": self.name,
+            "scope": scope or "all",
+            "incremental": last_run_at is not None,
+            "candidates": candidates,
+            "modified": modified,
+            "batches": batches,
+            "elapsed_sec": round(elapsed, 3),
+            "docs_per_sec": round(candidates / elapsed, 1) if elapsed > 0 else 0.0,
+            "finished_at": now
+        }
+        if not scope:
+            self.state_collection.update_one(
+                {"_id": self.name},
+                {"$set": {"last_run_at": now, "last_report": report}},
+                upsert=True
+            )
+        self.last_report = report
+        logger.info(f"기억 유지보수 완료 [{self.name}] - 후보 {candidates}개, 갱신 {modified}개, "
+                    f"{report['docs_per_sec']}개/초")
+        return report
+
+    def purge(self, query: Dict[str, Any], before_delete: Optional[Callable[[List[Any]], None]] = None) -> int:
+        """조건에 맞는 기억을 배치 단위로 삭제 (긴 단일 삭제 명령 대신, before_delete는 배치별 _id 목록을 받음)"""
+        deleted = 0
+        for ids in self._iter_batches(query):
+            if before_delete is not None:
+                before_delete(ids)
+            deleted += self.collection.delete_many({"_id": {"$in": ids}}).deleted_count
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "job": self.name,
+            "bucket_days": self.bucket_days,
+            "batch_size": self.batch_size,
+            "last_report": self.last_report
+        }
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MongoDB 연결 상태 감시기
+드라이버 하트비트 이벤트와 백그라운드 프로브로 연결 상태를 캐시하여
+요청 경로에서는 ping 없이 is_healthy()만으로 상태를 확인합니다.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from pymongo.monitoring import ServerHeartbeatListener
+
+logger = logging.getLogger(__name__)
+
+# 백그라운드 프로브 주기 (초)
+PROBE_INTERVAL = float(os.getenv("EORA_MONGO_PROBE_INTERVAL", "15"))
+# 재연결 백오프 (초)
+RECONNECT_BACKOFF_MIN = 1.0
+RECONNECT_BACKOFF_MAX = float(os.getenv("EORA_MONGO_RECONNECT_BACKOFF_MAX", "60"))
+
+
+class ConnectionSupervisor(ServerHeartbeatListener):
+    """MongoDB 연결 상태 감시 및 재연결 관리"""
+
+    def __init__(self, name: str, probe_interval: float = PROBE_INTERVAL):
+        """
+        초기화
+
+        Args:
+            name: 로그에 표시할 감시 대상 이름
+            probe_interval: 백그라운드 프로브 주기 (초)
+        """
+        self.name = name
+        self.probe_interval = probe_interval
+        self.client = None
+        self._healthy = False
+        self._server_states: Dict[str, bool] = {}
+        self._last_success = 0.0
+        self._last_failure = 0.0
+        self._last_error: Optional[str] = None
+        self._reconnect: Optional[Callable[[], Any]] = None
+        self._reconnect_attempts = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    # ==================== 드라이버 하트비트 ====================
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._mark_server(str(event.connection_id), True)
+
+    def failed(self, event):
+        self._mark_server(str(event.connection_id), False, str(event.reply))
+
+    def _mark_server(self, server: str, ok: bool, error: str = None):
+        with self._lock:
+            self._server_states[server] = ok
+            self._set_healthy(any(self._server_states.values()), error)
+
+    def _set_healthy(self, healthy: bool, error: str = None):
+        now = time.time()
+        if healthy:
+            self._last_success = now
+            self._reconnect_attempts = 0
+        else:
+            self._last_failure = now
+            self._last_error = error
+
+        if healthy != self._healthy:
+            if healthy:
+                logger.info(f"✅ [{self.name}] MongoDB 연결 정상")
+            else:
+                logger.warning(f"⚠️ [{self.name}] MongoDB 연결 끊김: {error}")
+        self._healthy = healthy
+
+    # ==================== 상태 조회 ====================
+
+    def attach(self, client, healthy: bool = True):
+        """감시할 클라이언트를 등록합니다 (연결 직후 ping 결과를 초기 상태로 사용)."""
+        with self._lock:
+            self.client = client
+            self._server_states.clear()
+            self._set_healthy(healthy and client is not None)
+
+    def is_healthy(self) -> bool:
+        """캐시된 연결 상태 (네트워크 호출 없음)"""
+        return self.client is not None and self._healthy
+
+    def probe(self) -> bool:
+        """실제 ping으로 상태를 갱신합니다 (백그라운드/진단용)."""
+        client = self.client
+        if client is None:
+            self._set_healthy(False, "클라이언트 없음")
+            return False
+        try:
+            client.admin.command('ping')
+            self._set_healthy(True)
+            return True
+        except Exception as e:
+            self._set_healthy(False, str(e))
+            return False
+
+    def get_status(self) -> Dict[str, Any]:
+        """감시 상태 정보를 반환합니다."""
+        return {
+            "name": self.name,
+            "healthy": self.is_healthy(),
+            "last_success": self._last_success or None,
+            "last_failure": self._last_failure or None,
+            "last_error": self._last_error,
+            "reconnect_attempts": self._reconnect_attempts,
+            "servers": dict(self._server_states)
+        }
+
+    # ==================== 백그라운드 감시 ====================
+
+    def start(self, reconnect: Callable[[], Any] = None):
+        """
+        백그라운드 감시 스레드를 시작합니다.
+
+        Args:
+            reconnect: 연결이 없을 때 호출할 재연결 함수 (성공 시 True 반환)
+        """
+        if reconnect is not None:
+            self._reconnect = reconnect
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"mongo-supervisor-{self.name}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """백그라운드 감시 스레드를 중지합니다."""
+        self._stop.set()
+
+    def _run(self):
+        backoff = RECONNECT_BACKOFF_MIN
+        while not self._stop.is_set():
+            if self.client is None and self._reconnect is not None:
+                # 클라이언트가 없으면 지수 백오프로 재연결
+                self._reconnect_attempts += 1
+                try:
+                    ok = self._reconnect()
+                except Exception as e:
+                    ok = False
+                    self._last_error = str(e)
+                if ok:
+                    backoff = RECONNECT_BACKOFF_MIN
+                    logger.info(f"🔄 [{self.name}] MongoDB 재연결 성공 ({self._reconnect_attempts}회 시도)")
+                    wait = self.probe_interval
+                else:
+                    wait = backoff
+                    backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+            else:
+                # 하트비트가 오래 오지 않았거나 비정상이면 직접 확인
+                stale = time.time() - self._last_success > self.probe_interval * 2
+                if self.client is not None and (not self._healthy or stale):
+                    self.probe()
+                wait = self.probe_interval
+            self._stop.wait(wait)
@@ -15,6 +15,8 @@ from datetime import datetime, timedelta
 import json
 import hashlib
 
+from stage_metrics import get_stage_summary, observe_request
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,7 +32,6 @@ class PerformanceOptimizer:
         self.performance_stats = {
             'total_requests': 0,
             'cache_hits': 0,
-            'avg_response_time': 0.0,
             'slow_requests': 0
         }
         
@@ -69,31 +70,21 @@ class PerformanceOptimizer:
 
 
 def performance_monitor(func):
-    """성능 모니터링 데코레이터"""
+    """성능 모니터링 데코레이터 (핸들러별 요청 시간 히스토그램에 기록)"""
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             result = await func(*args, **kwargs)
             return result
         finally:
-            end_time = time.time()
-            response_time = end_time - start_time
-            
-            # 성능 통계 업데이트
+            response_time = time.perf_counter() - start_time
+            observe_request(func.__name__, response_time)
             optimizer.performance_stats['total_requests'] += 1
-            current_avg = optimizer.performance_stats['avg_response_time']
-            total_requests = optimizer.performance_stats['total_requests']
-            
-            optimizer.performance_stats['avg_response_time'] = (
-                (current_avg * (total_requests - 1) + response_time) / total_requests
-            )
             
             if response_time > 2.0:  # 2초 이상이면 느린 요청
                 optimizer.performance_stats['slow_requests'] += 1
                 logger.warning(f"⚠️ 느린 응답 감지: {func.__name__} - {response_time:.2f}초")
-            
-            logger.info(f"⚡ {func.__name__}: {response_time:.3f}초")
     
     return wrapper
 
@@ -325,9 +316,15 @@ async def optimize_chat_response(original_func):
 
 
 def get_performance_stats() -> Dict[str, Any]:
-    """성능 통계 반환"""
+    """성능 통계 반환 (평균/분위수는 핸들러별 히스토그램에서 계산)"""
     stats = optimizer.performance_stats.copy()
+    handlers = get_stage_summary()["requests"]
+    total_count = sum(h["count"] for h in handlers.values())
+    stats['avg_response_time'] = (
+        sum(h["avg_ms"] * h["count"] for h in handlers.values()) / total_count / 1000 if total_count else 0.0
+    )
     stats.update({
+        'handlers': handlers,
         'cache_size': len(optimizer.response_cache),
         'cache_hit_rate': (
             stats['cache_hits'] / max(stats['total_requests'], 1) * 100
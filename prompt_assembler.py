@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+토큰 예산 기반 프롬프트 조립기
+모델별 프롬프트 토큰 예산 안에서 시스템 프롬프트, 회상 기억, 최근 대화를
+우선순위대로 채워 OpenAI 메시지 목록을 만듭니다.
+
+- 우선순위: 시스템 프롬프트 > 현재 메시지 > 회상 기억(순위순) > 최근 대화(최신순)
+- 회상 기억은 남은 예산의 일정 비율까지, 항목별 최대 토큰 수로 잘라서 넣고
+  나머지 예산을 최근 대화가 사용합니다.
+- 토큰 수는 저장된 메모리/메시지의 token_count 필드를 우선 사용하고,
+  없으면 한 번 계산해 해당 dict와 LRU 캐시에 기록하여 다시 인코딩하지 않습니다.
+"""
+
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from token_calculator import get_token_calculator
+    TOKEN_CALCULATOR_AVAILABLE = True
+except ImportError:
+    TOKEN_CALCULATOR_AVAILABLE = False
+
+# 토큰 수 캐시 필드 (메모리 문서, 세션 메시지 공용)
+TOKEN_COUNT_FIELD = "token_count"
+
+# 모델별 컨텍스트 창 크기 (토큰)
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# 지연 시간/비용을 위한 프롬프트 토큰 상한 (컨텍스트 창보다 작으면 이 값이 예산)
+PROMPT_TOKEN_BUDGET = int(os.getenv("EORA_PROMPT_TOKEN_BUDGET", "6000"))
+# 회상 기억이 사용할 수 있는 비율 (시스템 프롬프트/현재 메시지를 뺀 나머지 기준)
+PROMPT_MEMORY_SHARE = float(os.getenv("EORA_PROMPT_MEMORY_SHARE", "0.4"))
+# 회상 기억 최대 개수와 항목별 최대 토큰 수
+PROMPT_MEMORY_LIMIT = int(os.getenv("EORA_PROMPT_MEMORY_LIMIT", "5"))
+PROMPT_MEMORY_ITEM_TOKENS = int(os.getenv("EORA_PROMPT_MEMORY_ITEM_TOKENS", "400"))
+# 최근 대화 최대 메시지 수
+PROMPT_HISTORY_LIMIT = int(os.getenv("EORA_PROMPT_HISTORY_LIMIT", "20"))
+# 텍스트 -> 토큰 수 LRU 캐시 크기
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv("EORA_TOKEN_COUNT_CACHE_SIZE", "10000"))
+
+# 메시지 1개당 role/구분자 오버헤드 (TokenCalculator.count_messages_tokens와 동일)
+MESSAGE_OVERHEAD = 4
+# 회상 유형별 태그 (기존 프롬프트 형식 유지)
+RECALL_TYPE_TAGS = ("keyword", "embedding", "emotion", "belief", "context", "temporal", "association", "pattern")
+
+
+class TokenCounter:
+    """텍스트 토큰 수 계산 + 해시 키 LRU 캐시"""
+
+    def __init__(self, model_name: str = "gpt-4o", max_entries: int = TOKEN_COUNT_CACHE_SIZE):
+        self.model_name = model_name
+        self.max_entries = max(1, max_entries)
+        self._calculator = get_token_calculator(model_name) if TOKEN_CALCULATOR_AVAILABLE else None
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self.stats = {"hits": 0, "encoded": 0, "field_hits": 0}
+
+    def _encode(self, text: str) -> List[int]:
+        return self._calculator.encoding.encode(text)
+
+    def count(self, text: str) -> int:
+        """텍스트 토큰 수 (같은 텍스트는 한 번만 인코딩)"""
+        if not text:
+            return 0
+        key = hashlib.blake2b(text.encode("utf-8", "ignore"), digest_size=16).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return cached
+
+        if self._calculator is not None:
+            tokens = self._calculator.count_tokens(text)
+        else:
+            # 대략적인 계산 (4자당 1토큰)
+            tokens = max(1, len(text) // 4)
+        self.stats["encoded"] += 1
+        self._cache[key] = tokens
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return tokens
+
+    def count_item(self, item: Dict[str, Any], field: str = "content") -> int:
+        """메모리/메시지 dict의 토큰 수 (token_count 필드를 캐시로 사용)"""
+        cached = item.get(TOKEN_COUNT_FIELD)
+        if isinstance(cached, int) and cached >= 0:
+            self.stats["field_hits"] += 1
+            return cached
+        tokens = self.count(str(item.get(field) or ""))
+        item[TOKEN_COUNT_FIELD] = tokens
+        return tokens
+
+    def truncate(self, text: str, max_tokens: int) -> Tuple[str, int]:
+        """텍스트를 최대 토큰 수로 자릅니다 (잘린 텍스트, 토큰 수)"""
+        if self._calculator is None:
+            cut = text[:max_tokens * 4]
+            return cut, self.count(cut)
+        tokens = self._encode(text)[:max_tokens]
+        return self._calculator.encoding.decode(tokens), len(tokens)
+
+
+class PromptAssembler:
+    """모델별 토큰 예산으로 채팅 메시지 목록을 조립하는 클래스"""
+
+    def __init__(self, model_name: str = "gpt-4o", completion_tokens: int = 2048,
+                 budget: int = PROMPT_TOKEN_BUDGET):
+        """
+        초기화
+
+        Args:
+            model_name: OpenAI 모델 이름
+            completion_tokens: 응답용으로 남겨 둘 토큰 수 (max_tokens)
+            budget: 프롬프트 토큰 상한
+        """
+        self.model_name = model_name
+        context_window = MODEL_CONTEXT_WINDOWS.get(model_name, DEFAULT_CONTEXT_WINDOW)
+        self.budget = max(256, min(budget, context_window - completion_tokens))
+        self.counter = TokenCounter(model_name)
+        self.stats = {
+            "assembled": 0,
+            "prompt_tokens": 0,
+            "over_budget": 0,
+            "memories_used": 0,
+            "memories_dropped": 0,
+            "memories_truncated": 0,
+            "history_used": 0,
+            "history_dropped": 0
+        }
+
+    def _memory_block(self, memory: Dict[str, Any], rank: int) -> Tuple[str, int]:
+        """회상 기억 1개를 태그가 붙은 텍스트로 (항목별 최대 토큰 수로 자름)"""
+        content = str(memory.get("content") or "")
+        recall_type = memory.get("recall_type", "일반")
+        tokens = self.counter.count_item(memory)
+        if tokens > PROMPT_MEMORY_ITEM_TOKENS:
+            content, tokens = self.counter.truncate(content, PROMPT_MEMORY_ITEM_TOKENS)
+            content += "..."
+            self.stats["memories_truncated"] += 1
+
+        if recall_type == "eora_enhancement":
+            label = "🧠 EORA 고급 기능:"
+        elif recall_type in RECALL_TYPE_TAGS:
+            label = f"🔍 {recall_type} 회상 #{rank}:"
+        else:
+            label = f"💭 관련 기억 #{rank}:"
+        # 태그 + 줄바꿈/구분자
+        return f"{label}\n{content}", tokens + self.counter.count(label) + 2
+
+    def assemble(self, system_prompt: str, message: str, history: List[Dict],
+                 memories: Optional[List[Dict]] = None) -> Tuple[List[Dict], Dict[str, int]]:
+        """
+        예산 안에서 메시지 목록을 조립합니다.
+
+        Args:
+            system_prompt: 시스템 프롬프트 (항상 포함)
+            message: 현재 사용자 메시지 (항상 포함)
+            history: 세션 메시지 목록 (마지막이 현재 메시지면 중복 제외)
+            memories: 회상된 기억 (순위순)
+
+        Returns:
+            (OpenAI 메시지 목록, 토큰 사용 요약)
+        """
+        used = 2 + MESSAGE_OVERHEAD * 2 + self.counter.count(system_prompt) + self.counter.count(message)
+        if used > self.budget:
+            self.stats["over_budget"] += 1
+            logger.warning(f"⚠️ 시스템 프롬프트와 현재 메시지만으로 예산 초과: {used}/{self.budget} 토큰")
+
+        # 1. 회상 기억 (남은 예산의 PROMPT_MEMORY_SHARE까지)
+        memory_budget = int(max(0, self.budget - used) * PROMPT_MEMORY_SHARE)
+        memory_blocks = []
+        memory_tokens = 0
+        candidates = (memories or [])[:PROMPT_MEMORY_LIMIT]
+        for memory in candidates:
+            block, tokens = self._memory_block(memory, len(memory_blocks) + 1)
+            if memory_tokens + tokens > memory_budget:
+                continue
+            memory_blocks.append(block)
+            memory_tokens += tokens
+        self.stats["memories_dropped"] += len(candidates) - len(memory_blocks)
+
+        memory_message = None
+        if memory_blocks:
+            header = f"관련 기억 및 맥락 (총 {len(memory_blocks)}개):\n\n"
+            memory_message = {"role": "system", "content": header + "\n\n".join(memory_blocks)}
+            used += MESSAGE_OVERHEAD + self.counter.count(header) + memory_tokens
+
+        # 2. 최근 대화 (최신순으로 남은 예산까지, 시간순으로 다시 정렬)
+        turns = [msg for msg in history[-(PROMPT_HISTORY_LIMIT + 1):] if msg.get("role") in ("user", "assistant")]
+        if turns and turns[-1].get("role") == "user" and turns[-1].get("content") == message:
+            turns.pop()
+        selected = []
+        for msg in reversed(turns[-PROMPT_HISTORY_LIMIT:]):
+            tokens = MESSAGE_OVERHEAD + self.counter.count_item(msg)
+            if used + tokens > self.budget:
+                break
+            selected.append({"role": msg["role"], "content": msg["content"]})
+            used += tokens
+        selected.reverse()
+
+        messages = [{"role": "system", "content": system_prompt}]
+        if memory_message:
+            messages.append(memory_message)
+        messages.extend(selected)
+        messages.append({"role": "user", "content": message})
+
+        self.stats["assembled"] += 1
+        self.stats["prompt_tokens"] += used
+        self.stats["memories_used"] += len(memory_blocks)
+        self.stats["history_used"] += len(selected)
+        self.stats["history_dropped"] += len(turns) - len(selected)
+        return messages, {
+            "prompt_tokens": used,
+            "budget": self.budget,
+            "memory_tokens": memory_tokens,
+            "memories": len(memory_blocks),
+            "history": len(selected)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        assembled = self.stats["assembled"]
+        return {
+            "model": self.model_name,
+            "budget": self.budget,
+            "avg_prompt_tokens": round(self.stats["prompt_tokens"] / assembled, 1) if assembled else 0.0,
+            "token_cache": {"entries": len(self.counter._cache), **self.counter.stats},
+            **self.stats
+        }
+
+
+# 모델별 공유 조립기
+_assemblers: Dict[str, PromptAssembler] = {}
+
+
+def get_prompt_assembler(model_name: str = "gpt-4o", completion_tokens: int = 2048) -> PromptAssembler:
+    """모델별 프롬프트 조립기를 반환합니다."""
+    key = f"{model_name}:{completion_tokens}"
+    if key not in _assemblers:
+        _assemblers[key] = PromptAssembler(model_name, completion_tokens)
+    return _assemblers[key]
+
+
+def count_text_tokens(text: str, model_name: str = "gpt-4o") -> int:
+    """저장 시점에 token_count 필드를 채울 때 사용하는 토큰 수 계산"""
+    return get_prompt_assembler(model_name).counter.count(text)
+
+
+def get_prompt_assembler_stats() -> Dict[str, Any]:
+    return {key: assembler.get_stats() for key, assembler in _assemblers.items()}
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+회상 결과 캐시 (세대 기반 무효화)
+같은/거의 같은 질문(인사말, 학습 문서 FAQ 등)마다 회상 파이프라인 전체를 다시 실행하지 않도록
+(정규화된 질문, 사용자, 메모리 세대)를 키로 회상 결과를 메모리에 보관합니다.
+
+- 세대(generation): 범위별 카운터. 메모리를 저장/삭제할 때 해당 범위의 세대를 올리면
+  이전 세대로 만든 캐시 항목은 더 이상 조회되지 않고 LRU/TTL로 정리됩니다.
+  · user:{user_id} - 개인 대화/메모리
+  · shared         - 전체 공유 학습 자료 (문서 학습)
+  · aura           - aura_system 메모리 (사용자 구분 없음)
+- 항목 수, 추정 비용(바이트), TTL로 크기를 제한합니다.
+- 같은 키의 동시 요청은 한 번만 계산하고 결과를 공유합니다.
+- 여러 워커로 실행할 때는 세대 변경 리스너(add_generation_listener)로 다른 워커에 알리고,
+  받은 쪽은 apply_remote_generation_bump로 다시 알리지 않고 세대만 올립니다.
+"""
+
+import os
+import re
+import copy
+import time
+import asyncio
+import logging
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 최대 항목 수
+RECALL_CACHE_SIZE = int(os.getenv("EORA_RECALL_CACHE_SIZE", "2000"))
+# 최대 추정 비용 (MB)
+RECALL_CACHE_MAX_MB = float(os.getenv("EORA_RECALL_CACHE_MAX_MB", "32"))
+# 항목 유지 시간 (초)
+RECALL_CACHE_TTL = float(os.getenv("EORA_RECALL_CACHE_TTL", "300"))
+
+SHARED_SCOPE = "shared"
+AURA_SCOPE = "aura"
+
+_SPACE_RE = re.compile(r"\s+")
+# 끝에 붙는 문장 부호/이모티콘성 기호는 같은 질문으로 취급
+_EDGE_PUNCT = " \t\n?!.~,;:…！？。"
+
+
+def user_scope(user_id: Optional[str]) -> str:
+    return f"user:{user_id or 'anonymous'}"
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 질문 정규화 (NFC, 대소문자, 공백, 앞뒤 문장 부호)"""
+    text = unicodedata.normalize("NFC", str(query or ""))
+    return _SPACE_RE.sub(" ", text).strip(_EDGE_PUNCT).casefold()
+
+
+def _estimate_cost(value: Any, depth: int = 0) -> int:
+    """결과의 대략적인 메모리 비용 (바이트)"""
+    if isinstance(value, (str, bytes, bytearray)):
+        return 48 + len(value)
+    if depth > 4:
+        return 64
+    if isinstance(value, dict):
+        return 64 + sum(_estimate_cost(k, depth + 1) + _estimate_cost(v, depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return 56 + sum(_estimate_cost(v, depth + 1) for v in value)
+    return 32
+
+
+class MemoryGenerations:
+    """범위별 메모리 세대 카운터"""
+
+    def __init__(self):
+        self._generations: Dict[str, int] = {}
+        self.bumps = 0
+
+    def get(self, scope: str) -> int:
+        return self._generations.get(scope, 0)
+
+    def bump(self, *scopes: str):
+        for scope in scopes:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+            self.bumps += 1
+
+    def snapshot(self, scopes: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self.get(scope) for scope in scopes)
+
+
+class RecallCache:
+    """세대 기반 무효화를 사용하는 회상 결과 LRU 캐시"""
+
+    def __init__(self, max_entries: int = RECALL_CACHE_SIZE,
+                 max_mb: float = RECALL_CACHE_MAX_MB,
+                 ttl: float = RECALL_CACHE_TTL,
+                 generations: Optional[MemoryGenerations] = None):
+        """
+        초기화
+
+        Args:
+            max_entries: 최대 항목 수
+            max_mb: 최대 추정 비용 (MB)
+            ttl: 항목 유지 시간 (초)
+            generations: 세대 카운터 (기본: 모듈 공유 카운터)
+        """
+        self.max_entries = max(1, max_entries)
+        self.max_cost = int(max_mb * 1024 * 1024)
+        self.ttl = ttl
+        self.generations = generations or _generations
+        # key -> (만료 시각, 비용, 값)
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._cost = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "expired": 0,
+            "evictions": 0,
+            "skipped": 0
+        }
+
+    def make_key(self, namespace: str, query: str, scopes: Iterable[str], variant: Hashable = None) -> Hashable:
+        """(이름공간, 정규화된 질문, 범위, 범위별 세대, 부가 조건) 캐시 키"""
+        scopes = tuple(scopes)
+        return (namespace, normalize_query(query), scopes, self.generations.snapshot(scopes), variant)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, cost, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        # 호출자가 결과를 수정해도 캐시가 바뀌지 않도록 복사본 반환
+        return copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Any):
+        cost = _estimate_cost(value)
+        if cost > self.max_cost:
+            self.stats["skipped"] += 1
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, cost, copy.deepcopy(value))
+        self._cost += cost
+        while len(self._entries) > self.max_entries or self._cost > self.max_cost:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: Hashable):
+        _, cost, _ = self._entries.pop(key)
+        self._cost -= cost
+
+    async def get_or_compute(self, namespace: str, query: str, compute: Callable[[], Awaitable[Any]],
+                             scopes: Iterable[str], variant: Hashable = None) -> Any:
+        """
+        캐시된 회상 결과를 반환하거나, 없으면 계산하여 저장합니다.
+
+        Args:
+            namespace: 회상 종류 (enhanced, engine 등)
+            query: 질문
+            compute: 결과를 계산하는 코루틴 함수
+            scopes: 결과가 의존하는 메모리 범위 (세대가 바뀌면 캐시 무효)
+            variant: limit 등 결과에 영향을 주는 부가 조건
+
+        Returns:
+            회상 결과 (빈 결과는 캐시하지 않음)
+        """
+        key = self.make_key(namespace, query, scopes, variant)
+        cached = self.get(key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return copy.deepcopy(await asyncio.shield(future))
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+            # 계산 도중 세대가 바뀌었으면 (새 메모리 저장) 결과를 캐시하지 않음
+            if result and self.make_key(namespace, query, scopes, variant) == key:
+                self.set(key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # 기다리는 요청이 없으면 "예외가 처리되지 않음" 경고가 나지 않도록 소비
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._cost = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "cost_mb": round(self._cost / (1024 * 1024), 3),
+            "max_mb": round(self.max_cost / (1024 * 1024), 3),
+            "ttl": self.ttl,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "generation_bumps": self.generations.bumps,
+            **self.stats
+        }
+
+
+# 모듈 공유 세대 카운터와 캐시
+_generations = MemoryGenerations()
+_cache: Optional[RecallCache] = None
+_generation_listeners: List[Callable[[str], None]] = []
+
+
+def get_recall_cache() -> RecallCache:
+    """공유 회상 캐시를 반환합니다."""
+    global _cache
+    if _cache is None:
+        _cache = RecallCache()
+    return _cache
+
+
+def bump_memory_generation(*scopes: str):
+    """메모리가 바뀐 범위의 세대를 올려 관련 캐시 항목을 무효화합니다."""
+    _generations.bump(*scopes)
+    for listener in _generation_listeners:
+        for scope in scopes:
+            try:
+                listener(scope)
+            except Exception as e:
+                logger.warning(f"세대 변경 알림 실패: {scope} - {e}")
+
+
+def add_generation_listener(listener: Callable[[str], None]):
+    """세대가 올라갈 때 범위별로 호출할 함수 등록 (다른 워커에 알리는 용도)"""
+    _generation_listeners.append(listener)
+
+
+def apply_remote_generation_bump(*scopes: str):
+    """다른 워커에서 받은 세대 변경 적용 (리스너를 다시 호출하지 않음)"""
+    _generations.bump(*scopes)
+
+
+def get_recall_cache_stats() -> Dict[str, Any]:
+    return get_recall_cache().get_stats()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+세션/사용자 메모리 색인
+sessions_db, users_db 같은 메모리 딕셔너리 전체를 요청마다 훑지 않도록
+그룹(사용자)별 정렬 키 색인을 유지하고 커서 기반 페이지 조회를 제공합니다.
+
+- SortedGroupIndex: 그룹 -> (정렬 키, 레코드 키) 정렬 목록 (bisect)
+  페이지 조회는 O(log n + 페이지 크기)
+- IndexedDict: 값을 넣고/지울 때 등록된 색인을 함께 갱신하는 dict
+  (json_journal 저장은 일반 dict와 동일하게 동작)
+- 정렬 키 필드(created_at 등)를 제자리에서 바꾼 경우 reindex(key)를 호출해야 합니다.
+"""
+
+import json
+import base64
+import bisect
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# 페이지 크기 기본값/최대값
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+ALL_GROUP = "__all__"
+# 포인트 정렬 키 오프셋 (문자열 비교가 숫자 순서가 되도록 음수 포인트도 0 이상으로 옮겨 0으로 채움)
+POINTS_SORT_OFFSET = 10 ** 15
+
+
+def encode_cursor(entry: Tuple[Any, ...]) -> str:
+    """(정렬 키, 레코드 키)를 URL에 쓸 수 있는 커서 문자열로"""
+    return base64.urlsafe_b64encode(json.dumps(entry, ensure_ascii=False).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ...]:
+    """커서 문자열을 (정렬 키, 레코드 키)로 (잘못된 커서는 ValueError)"""
+    try:
+        entry = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except Exception as e:
+        raise ValueError(f"잘못된 커서: {cursor}") from e
+    if not isinstance(entry, list) or len(entry) != 2:
+        raise ValueError(f"잘못된 커서: {cursor}")
+    return tuple(entry)
+
+
+def page_size(value: Any, default: int = DEFAULT_PAGE_SIZE) -> int:
+    """쿼리 파라미터 limit을 1..MAX_PAGE_SIZE로 제한"""
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return default
+
+
+class SortedGroupIndex:
+    """그룹별로 레코드 키를 정렬 키 순서로 유지하는 색인"""
+
+    def __init__(self, group_of: Callable[[Any], Optional[Hashable]],
+                 sort_key_of: Callable[[Any], str]):
+        """
+        초기화
+
+        Args:
+            group_of: 값 -> 그룹 (None이면 색인하지 않음)
+            sort_key_of: 값 -> 정렬 키 (문자열, 예: ISO 시각)
+        """
+        self.group_of = group_of
+        self.sort_key_of = sort_key_of
+        self._groups: Dict[Hashable, List[Tuple[str, str]]] = {}
+        self._entries: Dict[str, Tuple[Hashable, Tuple[str, str]]] = {}
+
+    def add(self, key: str, value: Any):
+        self.remove(key)
+        if not isinstance(value, dict):
+            return
+        group = self.group_of(value)
+        if group is None:
+            return
+        entry = (str(self.sort_key_of(value) or ""), str(key))
+        bisect.insort(self._groups.setdefault(group, []), entry)
+        self._entries[key] = (group, entry)
+
+    def remove(self, key: str):
+        indexed = self._entries.pop(key, None)
+        if indexed is None:
+            return
+        group, entry = indexed
+        entries = self._groups.get(group, [])
+        position = bisect.bisect_left(entries, entry)
+        if position < len(entries) and entries[position] == entry:
+            del entries[position]
+        if not entries:
+            self._groups.pop(group, None)
+
+    def clear(self):
+        self._groups.clear()
+        self._entries.clear()
+
+    def count(self, group: Hashable) -> int:
+        return len(self._groups.get(group, ()))
+
+    def keys(self, group: Hashable) -> List[str]:
+        """그룹의 모든 레코드 키 (최신순)"""
+        return [key for _, key in reversed(self._groups.get(group, []))]
+
+    def cursor_of(self, key: str) -> Optional[str]:
+        """이 레코드 다음 항목부터 이어서 조회하는 page() 커서 (색인에 없으면 None)"""
+        indexed = self._entries.get(key)
+        return encode_cursor(indexed[1]) if indexed else None
+
+    def page(self, group: Hashable, limit: int = DEFAULT_PAGE_SIZE,
+             cursor: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+        """
+        그룹의 레코드 키를 정렬 키 역순(최신순)으로 한 페이지 조회합니다.
+
+        Args:
+            group: 그룹
+            limit: 페이지 크기
+            cursor: 이전 페이지의 next_cursor (이 항목보다 앞선 항목부터)
+
+        Returns:
+            (레코드 키 목록, 다음 페이지 커서 또는 None)
+        """
+        entries = self._groups.get(group, [])
+        end = len(entries)
+        if cursor:
+            end = bisect.bisect_left(entries, decode_cursor(cursor))
+        start = max(0, end - limit)
+        keys = [key for _, key in reversed(entries[start:end])]
+        next_cursor = encode_cursor(entries[start]) if start > 0 and keys else None
+        return keys, next_cursor
+
+
+class IndexedDict(dict):
+    """항목을 넣고 지울 때 등록된 SortedGroupIndex를 함께 갱신하는 dict"""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None,
+                 indexes: Iterable[SortedGroupIndex] = ()):
+        super().__init__()
+        self.indexes = list(indexes)
+        for key, value in (data or {}).items():
+            self[key] = value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        for index in self.indexes:
+            index.add(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        for index in self.indexes:
+            index.remove(key)
+
+    def pop(self, key, *default):
+        if key in self:
+            for index in self.indexes:
+                index.remove(key)
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        for index in self.indexes:
+            index.remove(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        super().clear()
+        for index in self.indexes:
+            index.clear()
+
+    def reindex(self, key):
+        """값의 그룹/정렬 키 필드를 제자리에서 바꾼 뒤 호출"""
+        if key in self:
+            for index in self.indexes:
+                index.add(key, self[key])
+
+
+def session_owner(session: Dict[str, Any]) -> Optional[str]:
+    return session.get("user_email")
+
+
+def session_sort_key(session: Dict[str, Any]) -> str:
+    return session.get("created_at", "")
+
+
+def points_sort_key(points_info: Dict[str, Any]) -> str:
+    try:
+        points = int(points_info.get("current_points") or 0)
+    except (TypeError, ValueError):
+        points = 0
+    return f"{max(0, points + POINTS_SORT_OFFSET):016d}"
@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+공유 상태 모드 (여러 uvicorn 워커/레플리카)
+users_db, sessions_db, messages_db, points_db 같은 메모리 딕셔너리를 MongoDB 또는 Redis에 두고,
+워커마다 읽기 캐시(로컬 복제본)를 유지하며 변경 알림(pub/sub)으로 캐시를 무효화합니다.
+
+EORA_SHARED_STATE:
+    (비어 있음)  기존 방식 - 워커 1개, JSON 저널 파일에 저장
+    mongo        MongoDB shared_state 컬렉션 + capped 컬렉션 tailable 커서로 변경 알림
+    redis        Redis 키(JSON 값) + PUBLISH/SUBSCRIBE로 변경 알림
+
+- 읽기: 로컬에 없으면 백엔드에서 읽어 채웁니다 (다른 워커에서 방금 가입한 사용자도 로그인 가능).
+  백엔드에도 없던 키는 EORA_SHARED_STATE_MISS_TTL초 동안 없는 것으로 기억하고(알림이 오면 즉시 해제),
+  요청 경로에서는 prefetch()로 스레드 풀에서 미리 읽어 이벤트 루프가 백엔드를 기다리지 않게 합니다.
+- 쓰기: save_json_data/append_json_data가 호출하는 persist*()가 백엔드에 즉시 기록하고 알림을 보냅니다.
+  (여러 워커가 같은 저널 파일을 쓰지 않도록 공유 상태 모드에서는 JSON 파일 저장을 하지 않습니다)
+- 알림을 받은 워커는
+  · 색인이 있는 맵(sessions_db, users_db)은 알림 스레드에서 값을 다시 읽어 이벤트 루프에서 교체하고
+  · 나머지 맵(messages_db 등)은 로컬 항목만 지워 다음 접근 때 다시 읽습니다.
+- 알림이 빠져도 오래된 값이 계속 남지 않도록 EORA_SHARED_STATE_REFRESH초마다
+  색인이 있는 맵은 전체를, 나머지 맵은 그보다 오래전에 읽은 항목을 백엔드에서 다시 읽습니다.
+  알림 수신이 끊겼다가 다시 시작되면(또는 capped 컬렉션에서 마지막 위치가 밀려나면) 즉시 전체를 다시 읽습니다.
+- 같은 항목을 여러 워커가 동시에 통째로 저장하면 마지막 저장이 남습니다 (목록 추가는 원자적).
+- 백엔드 호출은 동기 방식이며 요청 경로에서는 항목 1건 단위로만 수행합니다 (읽기는 prefetch로 run_db에서).
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from db_executor import run_db
+from session_index import IndexedDict, SortedGroupIndex
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# 공유 상태 백엔드 (mongo/redis, 비어 있으면 사용 안 함)
+SHARED_STATE_BACKEND = os.getenv("EORA_SHARED_STATE", "").strip().lower()
+# Redis 키/채널 접두사
+SHARED_STATE_PREFIX = os.getenv("EORA_SHARED_STATE_PREFIX", "eora:state")
+SHARED_STATE_REDIS_URL = os.getenv("EORA_REDIS_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# MongoDB 컬렉션 (database.py의 DATABASE_NAME DB)
+SHARED_STATE_COLLECTION = "shared_state"
+SHARED_STATE_EVENTS_COLLECTION = "shared_state_events"
+SHARED_STATE_EVENTS_BYTES = int(os.getenv("EORA_SHARED_STATE_EVENTS_MB", "16")) * 1024 * 1024
+# 백엔드에 없던 키를 없는 것으로 기억하는 시간 (초, 변경 알림이 오면 즉시 해제)
+SHARED_STATE_MISS_TTL = float(os.getenv("EORA_SHARED_STATE_MISS_TTL", "5"))
+# 맵당 기억하는 없는 키 수 상한
+SHARED_STATE_MISS_MAX = 10000
+# 로컬 항목을 백엔드에서 다시 읽는 주기 (초, 빠진 알림으로 남은 오래된 값의 최대 수명)
+SHARED_STATE_REFRESH_SECONDS = float(os.getenv("EORA_SHARED_STATE_REFRESH", "120"))
+
+# persist_all() 알림의 키 (맵 전체 다시 읽기)
+ALL_KEYS = "*"
+# 워커 식별자 (자기 알림 무시용)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+_MISSING = object()
+_LOAD_BATCH = 500
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class RedisStateBackend:
+    """항목 하나 = Redis 키 하나 (JSON), 네임스페이스별 키 집합, PUBLISH 알림"""
+
+    name = "redis"
+
+    def __init__(self, url: str = SHARED_STATE_REDIS_URL, prefix: str = SHARED_STATE_PREFIX):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("EORA_SHARED_STATE=redis 에는 redis 패키지가 필요합니다")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.client.ping()
+        self.prefix = prefix
+        self.channel = f"{prefix}:invalidate"
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def _members(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:__keys__"
+
+    def load_all(self, namespace: str) -> Dict[str, Any]:
+        keys = sorted(self.client.smembers(self._members(namespace)))
+        data = {}
+        for start in range(0, len(keys), _LOAD_BATCH):
+            chunk = keys[start:start + _LOAD_BATCH]
+            for key, raw in zip(chunk, self.client.mget([self._key(namespace, k) for k in chunk])):
+                if raw is not None:
+                    data[key] = json.loads(raw)
+        return data
+
+    def get(self, namespace: str, key: str) -> Any:
+        raw = self.client.get(self._key(namespace, key))
+        return _MISSING if raw is None else json.loads(raw)
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
+        raws = self.client.mget([self._key(namespace, key) for key in keys])
+        return {key: json.loads(raw) for key, raw in zip(keys, raws) if raw is not None}
+
+    def put_many(self, namespace: str, items: Dict[str, Any]):
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(self._key(namespace, key), _dumps(value))
+            pipe.sadd(self._members(namespace), key)
+        pipe.execute()
+
+    def delete(self, namespace: str, key: str):
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(namespace, key))
+        pipe.srem(self._members(namespace), key)
+        pipe.execute()
+
+    def append(self, namespace: str, key: str, item: Any):
+        """목록 값에 항목 추가 (WATCH/MULTI로 다른 워커의 동시 추가와 충돌 없이)"""
+        entry = self._key(namespace, key)
+
+        def update(pipe):
+            raw = pipe.get(entry)
+            items = json.loads(raw) if raw else []
+            items.append(item)
+            pipe.multi()
+            pipe.set(entry, _dumps(items))
+            pipe.sadd(self._members(namespace), key)
+
+        self.client.transaction(update, entry)
+
+    def publish(self, message: Dict[str, str]):
+        self.client.publish(self.channel, json.dumps(message, ensure_ascii=False))
+
+    def listen(self, on_message: Callable[[Dict[str, str]], None], stop: threading.Event,
+               on_gap: Callable[[], None], resync: bool = False):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        try:
+            if resync:
+                on_gap()
+            while not stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    on_message(json.loads(message["data"]))
+        finally:
+            pubsub.close()
+
+
+class MongoStateBackend:
+    """항목 하나 = shared_state 문서 하나, capped 컬렉션 + tailable 커서 알림"""
+
+    name = "mongo"
+
+    def __init__(self, uri: Optional[str] = None, db_name: Optional[str] = None):
+        from pymongo import MongoClient
+        from database import DATABASE_NAME, get_mongodb_url
+
+        self.client = MongoClient(uri or get_mongodb_url(), serverSelectionTimeoutMS=5000)
+        db = self.client[db_name or DATABASE_NAME]
+        self.collection = db[SHARED_STATE_COLLECTION]
+        self.collection.create_index("ns")
+        if SHARED_STATE_EVENTS_COLLECTION not in db.list_collection_names():
+            try:
+                db.create_collection(SHARED_STATE_EVENTS_COLLECTION, capped=True, size=SHARED_STATE_EVENTS_BYTES)
+            except Exception:
+                pass  # 다른 워커가 먼저 생성
+        self.events = db[SHARED_STATE_EVENTS_COLLECTION]
+
+    @staticmethod
+    def _id(namespace: str, key: str) -> str:
+        return f"{namespace}:{key}"
+
+    def load_all(self, namespace: str) -> Dict[str, Any]:
+        return {doc["key"]: doc.get("value") for doc in self.collection.find({"ns": namespace}, {"key": 1, "value": 1})}
+
+    def get(self, namespace: str, key: str) -> Any:
+        doc = self.collection.find_one({"_id": self._id(namespace, key)}, {"value": 1})
+        return _MISSING if doc is None else doc.get("value")
+
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
+        ids = [self._id(namespace, key) for key in keys]
+        return {doc["key"]: doc.get("value") for doc in self.collection.find({"_id": {"$in": ids}}, {"key": 1, "value": 1})}
+
+    def put_many(self, namespace: str, items: Dict[str, Any]):
+        from pymongo import ReplaceOne
+
+        operations = [
+            ReplaceOne({"_id": self._id(namespace, key)},
+                       {"ns": namespace, "key": key, "value": json.loads(_dumps(value))}, upsert=True)
+            for key, value in items.items()
+        ]
+        for start in range(0, len(operations), _LOAD_BATCH):
+            self.collection.bulk_write(operations[start:start + _LOAD_BATCH], ordered=False)
+
+    def delete(self, namespace: str, key: str):
+        self.collection.delete_one({"_id": self._id(namespace, key)})
+
+    def append(self, namespace: str, key: str, item: Any):
+        self.collection.update_one(
+            {"_id": self._id(namespace, key)},
+            {"$push": {"value": json.loads(_dumps(item))}, "$setOnInsert": {"ns": namespace, "key": key}},
+            upsert=True
+        )
+
+    def publish(self, message: Dict[str, str]):
+        self.events.insert_one(dict(message))
+
+    def listen(self, on_message: Callable[[Dict[str, str]], None], stop: threading.Event,
+               on_gap: Callable[[], None], resync: bool = False):
+        from pymongo import CursorType
+
+        # 빈 capped 컬렉션에서는 tailable 커서가 바로 닫히므로 시작 표시를 남기고 그 뒤부터 읽음
+        last_id = self.events.insert_one({"w": WORKER_ID, "ns": "__listen__", "k": ""}).inserted_id
+        if resync:
+            on_gap()
+        while not stop.is_set():
+            # _id(ObjectId)는 워커마다 클라이언트에서 만들어 기록 순서와 다를 수 있으므로
+            # 필터 없이 기록 순서($natural)로 읽으며 마지막으로 처리한 알림 다음부터 적용
+            cursor = self.events.find({}, cursor_type=CursorType.TAILABLE_AWAIT,
+                                      max_await_time_ms=1000).sort("$natural", 1)
+            resumed = False
+            while cursor.alive and not stop.is_set():
+                for doc in cursor:
+                    if not resumed:
+                        resumed = doc["_id"] == last_id
+                        continue
+                    last_id = doc["_id"]
+                    on_message({"w": doc.get("w"), "ns": doc.get("ns"), "k": doc.get("k")})
+                    if stop.is_set():
+                        break
+                if not resumed and cursor.alive:
+                    # 마지막 위치가 capped 컬렉션에서 밀려남 - 빠진 알림이 있을 수 있으므로 전체 다시 읽기
+                    resumed = True
+                    on_gap()
+            cursor.close()
+
+
+class SharedStateMap(IndexedDict):
+    """백엔드를 원본으로 하는 읽기 캐시 dict (IndexedDict이므로 색인/JSON 직렬화는 그대로 동작)"""
+
+    def __init__(self, state: "SharedState", namespace: str,
+                 indexes: Iterable[SortedGroupIndex] = (), eager: Optional[bool] = None):
+        super().__init__(None, indexes)
+        self.state = state
+        self.namespace = namespace
+        # 색인이 있는 맵은 알림 시 값을 다시 읽어 색인을 최신으로 유지
+        self.eager = bool(self.indexes) if eager is None else eager
+        self._write_seq: Dict[str, int] = {}
+        # 키 -> 마지막으로 백엔드에서 읽거나 기록한 시각 (주기적 다시 읽기 대상 선정)
+        self._loaded_at: Dict[str, float] = {}
+        # 백엔드에 없던 키 -> 만료 시각 (매 요청 백엔드를 다시 읽지 않도록)
+        self._misses: Dict[str, float] = {}
+        # 로컬 교체/무효화 횟수 (prefetch 도중 들어온 알림을 덮어쓰지 않도록)
+        self._generation = 0
+
+    def _set_local(self, key: str, value: Any):
+        self._misses.pop(key, None)
+        self._loaded_at[key] = time.monotonic()
+        IndexedDict.__setitem__(self, key, value)
+
+    def _remove_local(self, key: str):
+        self._loaded_at.pop(key, None)
+        if dict.__contains__(self, key):
+            IndexedDict.__delitem__(self, key)
+
+    def replace_local(self, data: Dict[str, Any]):
+        self._generation += 1
+        self._misses.clear()
+        self._loaded_at.clear()
+        IndexedDict.clear(self)
+        for key, value in data.items():
+            self._set_local(key, value)
+
+    def stale_keys(self, max_age: Optional[float] = None) -> List[str]:
+        """max_age초보다 오래전에 읽은 로컬 키 (None이면 전체, 알림 스레드에서 호출)"""
+        loaded = list(self._loaded_at.items())
+        if max_age is None:
+            return [key for key, _ in loaded]
+        cutoff = time.monotonic() - max_age
+        return [key for key, loaded_at in loaded if loaded_at <= cutoff]
+
+    def refresh_local(self, data: Dict[str, Any], seqs: Dict[str, int], keys: Optional[List[str]] = None):
+        """
+        다시 읽은 값 적용 (keys가 None이면 맵 전체, 읽는 동안 이 워커가 쓴 항목은 그대로 둠)
+        """
+        self._generation += 1
+        self._misses.clear()
+        if keys is None:
+            keys = set(dict.keys(self)) | set(data)
+        for key in keys:
+            if self._write_seq.get(key, 0) != seqs.get(key, 0):
+                continue
+            if key in data:
+                self._set_local(key, data[key])
+            else:
+                self._remove_local(key)
+
+    # ----- 읽기 (로컬에 없으면 백엔드에서) -----
+
+    def _known_missing(self, key: str) -> bool:
+        expires = self._misses.get(key)
+        if expires is None:
+            return False
+        if time.monotonic() < expires:
+            return True
+        del self._misses[key]
+        return False
+
+    def _remember_missing(self, key: str):
+        if len(self._misses) >= SHARED_STATE_MISS_MAX:
+            self._misses.clear()
+        self._misses[key] = time.monotonic() + SHARED_STATE_MISS_TTL
+
+    def _fetch(self, key: str) -> Any:
+        if self._known_missing(key):
+            return _MISSING
+        value = self.state.read(self.namespace, key)
+        if value is _MISSING:
+            self._remember_missing(key)
+        else:
+            self._set_local(key, value)
+        return value
+
+    async def prefetch(self, key: str):
+        """로컬에 없는 항목을 DB 실행기에서 미리 읽어 둡니다 (이후 동기 조회는 백엔드를 읽지 않음)."""
+        if not key or dict.__contains__(self, key) or self._known_missing(key):
+            return
+        generation, seq = self._generation, self.write_seq(key)
+        value = await run_db(self.state.read, self.namespace, key)
+        # 기다리는 동안 이 워커가 쓰거나 알림으로 무효화되었으면 읽은 값은 버림
+        if generation != self._generation or seq != self.write_seq(key) or dict.__contains__(self, key):
+            return
+        if value is _MISSING:
+            self._remember_missing(key)
+        else:
+            self._set_local(key, value)
+
+    def __missing__(self, key):
+        value = self._fetch(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return dict.__contains__(self, key) or self._fetch(key) is not _MISSING
+
+    def get(self, key, default=None):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        value = self._fetch(key)
+        return default if value is _MISSING else value
+
+    # ----- 쓰기 (save_json_data/append_json_data에서 호출) -----
+
+    def _touch(self, key: str):
+        self._write_seq[key] = self._write_seq.get(key, 0) + 1
+        self._loaded_at[key] = time.monotonic()
+
+    def persist(self, key: str):
+        """로컬 값을 백엔드에 기록 (로컬에 없으면 삭제)"""
+        self._touch(key)
+        if dict.__contains__(self, key):
+            self.state.backend.put_many(self.namespace, {key: dict.__getitem__(self, key)})
+        else:
+            self.state.backend.delete(self.namespace, key)
+        self.state.publish(self.namespace, key)
+
+    def persist_append(self, key: str, item: Any):
+        """로컬 목록에 이미 추가된 항목 하나를 백엔드 목록에도 추가"""
+        self._touch(key)
+        self.state.backend.append(self.namespace, key, item)
+        self.state.publish(self.namespace, key)
+
+    def persist_all(self):
+        self.state.backend.put_many(self.namespace, dict(self))
+        self.state.publish(self.namespace, ALL_KEYS)
+
+    # ----- 다른 워커의 변경 적용 (이벤트 루프 스레드) -----
+
+    def write_seq(self, key: str) -> int:
+        return self._write_seq.get(key, 0)
+
+    def write_seqs(self) -> Dict[str, int]:
+        return dict(self._write_seq)
+
+    def apply_remote(self, key: str, value: Any, seq: int):
+        """알림 스레드가 읽은 값 적용 (그 사이 이 워커가 같은 항목을 썼으면 무시)"""
+        self._generation += 1
+        self._misses.pop(key, None)
+        if self._write_seq.get(key, 0) != seq:
+            return
+        if value is _MISSING:
+            self._remove_local(key)
+        else:
+            self._set_local(key, value)
+
+    def evict(self, key: str):
+        self._generation += 1
+        self._misses.pop(key, None)
+        self._remove_local(key)
+
+
+class SharedState:
+    """공유 상태 맵 관리 + 변경 알림 송수신"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.maps: Dict[str, SharedStateMap] = {}
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = {}
+        self._loop = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._refresh_thread: Optional[threading.Thread] = None
+        self.stats = {"published": 0, "received": 0, "remote_reads": 0, "publish_errors": 0, "listen_errors": 0,
+                      "refreshes": 0, "refresh_errors": 0, "gaps": 0}
+
+    def open_map(self, namespace: str, seed: Callable[[], Dict[str, Any]],
+                 indexes: Iterable[SortedGroupIndex] = ()) -> SharedStateMap:
+        """
+        공유 맵을 엽니다. 백엔드가 비어 있으면 seed()(기존 JSON 데이터)로 채웁니다.
+        """
+        shared_map = SharedStateMap(self, namespace, indexes)
+        data = self.backend.load_all(namespace)
+        if not data:
+            data = seed() or {}
+            if data:
+                self.backend.put_many(namespace, data)
+                print(f"🌐 공유 상태 초기화: {namespace} {len(data)}건 ({self.backend.name})")
+        shared_map.replace_local(data)
+        self.maps[namespace] = shared_map
+        return shared_map
+
+    def read(self, namespace: str, key: str) -> Any:
+        self.stats["remote_reads"] += 1
+        try:
+            return self.backend.get(namespace, key)
+        except Exception as e:
+            logger.warning(f"공유 상태 읽기 실패: {namespace}/{key} - {e}")
+            return _MISSING
+
+    def publish(self, namespace: str, key: str):
+        try:
+            self.backend.publish({"w": WORKER_ID, "ns": namespace, "k": key})
+            self.stats["published"] += 1
+        except Exception as e:
+            # 알림이 빠져도 값은 기록되었으므로 다른 워커는 다음 다시 읽기 때 반영
+            self.stats["publish_errors"] += 1
+            logger.warning(f"공유 상태 알림 실패: {namespace}/{key} - {e}")
+
+    def subscribe(self, namespace: str, callback: Callable[[str], None]):
+        """맵이 아닌 네임스페이스(예: 회상 캐시 세대)의 알림을 받을 함수 등록"""
+        self._subscribers.setdefault(namespace, []).append(callback)
+
+    # ----- 알림 수신 -----
+
+    def _call_in_loop(self, func: Callable, *args):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(func, *args)
+        else:
+            func(*args)
+
+    def _on_message(self, message: Dict[str, str]):
+        """알림 스레드에서 호출됨"""
+        if message.get("w") == WORKER_ID:
+            return
+        namespace, key = message.get("ns"), message.get("k")
+        self.stats["received"] += 1
+
+        shared_map = self.maps.get(namespace)
+        if shared_map is not None:
+            if key == ALL_KEYS:
+                self._call_in_loop(shared_map.replace_local, self.backend.load_all(namespace))
+            elif shared_map.eager:
+                seq = shared_map.write_seq(key)
+                self._call_in_loop(shared_map.apply_remote, key, self.read(namespace, key), seq)
+            else:
+                self._call_in_loop(shared_map.evict, key)
+        for callback in self._subscribers.get(namespace, ()):
+            self._call_in_loop(callback, key)
+
+    def _on_gap(self):
+        """알림이 빠졌을 수 있을 때 (알림 스레드) - 로컬 항목 전체를 다시 읽음"""
+        self.stats["gaps"] += 1
+        self._refresh_safely(full=True)
+
+    def _listen_forever(self):
+        delay = 1.0
+        resync = False
+        while not self._stop.is_set():
+            try:
+                # 다시 연결하면 끊긴 동안의 알림은 받을 수 없으므로 수신 위치를 잡은 뒤 전체 다시 읽기
+                self.backend.listen(self._on_message, self._stop, self._on_gap, resync)
+                delay = 1.0
+            except Exception as e:
+                self.stats["listen_errors"] += 1
+                logger.warning(f"공유 상태 알림 수신 오류: {e} - {delay:.0f}초 후 재시도")
+                self._stop.wait(delay)
+                delay = min(delay * 2, 30.0)
+            resync = True
+
+    # ----- 주기적 다시 읽기 -----
+
+    def refresh(self, full: bool = False):
+        """
+        색인이 있는 맵은 전체를, 나머지 맵은 EORA_SHARED_STATE_REFRESH초보다 오래전에 읽은 항목을
+        (full이면 전체 로컬 항목을) 백엔드에서 다시 읽어 이벤트 루프에서 적용합니다.
+        """
+        for namespace, shared_map in list(self.maps.items()):
+            seqs = shared_map.write_seqs()
+            if shared_map.eager:
+                keys = None
+                data = self.backend.load_all(namespace)
+            else:
+                keys = shared_map.stale_keys(None if full else SHARED_STATE_REFRESH_SECONDS)
+                if not keys:
+                    continue
+                data = {}
+                for start in range(0, len(keys), _LOAD_BATCH):
+                    data.update(self.backend.get_many(namespace, keys[start:start + _LOAD_BATCH]))
+            self._call_in_loop(shared_map.refresh_local, data, seqs, keys)
+        self.stats["refreshes"] += 1
+
+    def _refresh_safely(self, full: bool = False):
+        try:
+            self.refresh(full)
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            logger.warning(f"공유 상태 다시 읽기 실패: {e}")
+
+    def _refresh_forever(self):
+        while not self._stop.wait(SHARED_STATE_REFRESH_SECONDS):
+            self._refresh_safely()
+
+    def start(self, loop=None):
+        """알림 수신 스레드 시작 (loop가 있으면 적용은 이벤트 루프에서)"""
+        if self._thread is not None:
+            return
+        self._loop = loop
+        self._thread = threading.Thread(target=self._listen_forever, name="shared-state-listener", daemon=True)
+        self._thread.start()
+        self._refresh_thread = threading.Thread(target=self._refresh_forever, name="shared-state-refresh", daemon=True)
+        self._refresh_thread.start()
+        print(f"🌐 공유 상태 알림 수신 시작: {self.backend.name} (워커 {WORKER_ID})")
+
+    def stop(self):
+        self._stop.set()
+        for thread in (self._thread, self._refresh_thread):
+            if thread is not None:
+                thread.join(timeout=5)
+        self._thread = None
+        self._refresh_thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "worker": WORKER_ID,
+            "listening": bool(self._thread and self._thread.is_alive()),
+            "maps": {name: len(shared_map) for name, shared_map in self.maps.items()},
+            **self.stats
+        }
+
+
+_state: Optional[SharedState] = None
+
+
+def shared_state_enabled() -> bool:
+    return SHARED_STATE_BACKEND in ("mongo", "redis")
+
+
+def get_shared_state() -> Optional[SharedState]:
+    """공유 상태 관리자 (EORA_SHARED_STATE가 없으면 None)"""
+    global _state
+    if _state is None and shared_state_enabled():
+        started = time.perf_counter()
+        backend = RedisStateBackend() if SHARED_STATE_BACKEND == "redis" else MongoStateBackend()
+        _state = SharedState(backend)
+        print(f"🌐 공유 상태 모드: {backend.name} ({(time.perf_counter() - started) * 1000:.0f}ms)")
+    return _state
+
+
+def get_shared_state_stats() -> Dict[str, Any]:
+    return _state.get_stats() if _state is not None else {"backend": None}
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+단계별 지연 시간 히스토그램과 /metrics 노출
+채팅 경로의 단계(인증, 포인트 확인, 회상 전략별, 프롬프트 구성, LLM 호출, 포인트 차감, 저장,
+마크다운 처리)를 계측하여 Prometheus 텍스트 형식으로 노출합니다.
+
+- 히스토그램: 고정 버킷 누적 카운트 + 합계 (관측 1회 = bisect 1회 + 정수 증가)
+- 카운터: 이름 + 라벨별 누적 값
+- 요청별 단계 분해(trace): contextvars로 현재 요청에 연결되며, 관리자가 요청하거나
+  샘플링 비율(EORA_TIMING_SAMPLE_RATE)에 걸린 요청만 기록합니다.
+"""
+
+import os
+import time
+import random
+import bisect
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Tuple
+
+# 히스토그램 버킷 상한 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 요청별 단계 분해를 기록할 비율 (관리자 요청은 항상 기록)
+TIMING_SAMPLE_RATE = float(os.getenv("EORA_TIMING_SAMPLE_RATE", "0.01"))
+# 최근 기록된 요청 분해 보관 수
+RECENT_TRACE_LIMIT = int(os.getenv("EORA_RECENT_TRACE_LIMIT", "100"))
+
+STAGE_METRIC = "eora_stage_duration_seconds"
+REQUEST_METRIC = "eora_request_duration_seconds"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (Prometheus histogram과 같은 누적 형식으로 출력)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """버킷 경계 기준 근사 분위수 (관리자 요약용)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """히스토그램/카운터 저장소"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._help: Dict[str, str] = {
+            STAGE_METRIC: "채팅 경로 단계별 소요 시간",
+            REQUEST_METRIC: "핸들러별 전체 요청 소요 시간",
+            "eora_recall_strategy_total": "회상 전략별 결과 (hit/empty/timeout/error)",
+        }
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        return self._histograms.get(name, {}).get(_label_key(labels))
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식 (version 0.0.4)"""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', repr(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self, name: str = STAGE_METRIC) -> Dict[str, Dict[str, Any]]:
+        """관리자 화면용 요약 (라벨별 횟수, 평균, 근사 p50/p95/p99, ms)"""
+        result = {}
+        with self._lock:
+            for labels, histogram in self._histograms.get(name, {}).items():
+                label = ",".join(value for _, value in labels) or name
+                result[label] = {
+                    "count": histogram.count,
+                    "avg_ms": round(histogram.sum / histogram.count * 1000, 2) if histogram.count else 0.0,
+                    "p50_ms": histogram.quantile(0.5) * 1000,
+                    "p95_ms": histogram.quantile(0.95) * 1000,
+                    "p99_ms": histogram.quantile(0.99) * 1000,
+                }
+        return result
+
+
+class RequestTrace:
+    """요청 하나의 단계별 소요 시간 기록"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+
+    def add(self, stage: str, seconds: float):
+        self.stages.append((stage, seconds))
+
+    def to_dict(self) -> Dict[str, Any]:
+        stages: Dict[str, float] = {}
+        for stage, seconds in self.stages:
+            stages[stage] = round(stages.get(stage, 0.0) + seconds * 1000, 2)
+        return {
+            "request": self.name,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "stages_ms": stages
+        }
+
+
+_registry = MetricsRegistry()
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("eora_request_trace", default=None)
+_recent_traces: deque = deque(maxlen=RECENT_TRACE_LIMIT)
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+def record_stage(name: str, seconds: float):
+    """단계 소요 시간을 히스토그램과 현재 요청 분해(있으면)에 기록합니다."""
+    _registry.observe(STAGE_METRIC, seconds, stage=name)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """with stage("recall"): ... 블록의 소요 시간을 기록 (예외가 나도 기록)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+async def timed(name: str, awaitable: Awaitable[Any]) -> Any:
+    """코루틴 하나의 소요 시간을 기록 (asyncio.gather 안의 전략별 계측용)"""
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def begin_request_trace(name: str, force: bool = False) -> Optional[RequestTrace]:
+    """요청 분해 기록 시작 (force이거나 샘플링에 걸린 경우만)"""
+    if not force and (TIMING_SAMPLE_RATE <= 0 or random.random() >= TIMING_SAMPLE_RATE):
+        return None
+    trace = RequestTrace(name)
+    _current_trace.set(trace)
+    return trace
+
+
+def end_request_trace(trace: Optional[RequestTrace]) -> Optional[Dict[str, Any]]:
+    """요청 분해 기록 종료 - 최근 기록에 보관하고 dict로 반환"""
+    if trace is None:
+        return None
+    _current_trace.set(None)
+    breakdown = trace.to_dict()
+    _recent_traces.append(breakdown)
+    return breakdown
+
+
+def observe_request(handler: str, seconds: float):
+    _registry.observe(REQUEST_METRIC, seconds, handler=handler)
+
+
+def render_metrics() -> str:
+    return _registry.render_prometheus()
+
+
+def get_recent_traces(limit: int = 20) -> List[Dict[str, Any]]:
+    return list(_recent_traces)[-limit:][::-1]
+
+
+def get_stage_summary() -> Dict[str, Any]:
+    return {
+        "stages": _registry.summary(STAGE_METRIC),
+        "requests": _registry.summary(REQUEST_METRIC),
+        "sample_rate": TIMING_SAMPLE_RATE
+    }
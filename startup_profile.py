@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+서버 시작 프로파일 및 하위 시스템 준비 상태
+app.py 임포트와 초기화 단계별 소요 시간을 기록하고,
+백그라운드에서 시작되는 하위 시스템(메모리 시스템, 회상 엔진 등)의 상태를 추적합니다.
+
+- step(name): with 블록의 소요 시간과 성공/실패를 기록
+- set_state(name, state): 하위 시스템 상태 (pending -> starting -> ready/failed/disabled)
+- /ready 는 모든 하위 시스템이 시작을 마쳤는지(ready/failed/disabled)로 판단하고,
+  /health 는 지금처럼 프로세스 생존만 확인합니다.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# 하위 시스템 상태
+PENDING = "pending"
+STARTING = "starting"
+READY = "ready"
+FAILED = "failed"
+DISABLED = "disabled"
+
+SETTLED_STATES = (READY, FAILED, DISABLED)
+
+
+class StartupProfile:
+    """시작 단계별 소요 시간과 하위 시스템 상태 기록"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+        self._steps: List[Dict[str, Any]] = []
+        self._subsystems: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """with startup_profile.step("import database"): ... (예외는 기록 후 그대로 전달)"""
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            with self._lock:
+                self._steps.append({
+                    "name": name,
+                    "offset_ms": round((started - self.started) * 1000, 1),
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "thread": threading.current_thread().name,
+                    "error": error
+                })
+
+    def set_state(self, name: str, state: str, detail: Optional[str] = None):
+        with self._lock:
+            entry = self._subsystems.setdefault(name, {"state": PENDING, "since": time.time()})
+            entry["state"] = state
+            entry["since"] = time.time()
+            if detail is not None:
+                entry["detail"] = detail
+
+    def state(self, name: str) -> str:
+        return self._subsystems.get(name, {}).get("state", PENDING)
+
+    def is_ready(self) -> bool:
+        """등록된 하위 시스템이 모두 시작을 마쳤는지"""
+        with self._lock:
+            return all(entry["state"] in SETTLED_STATES for entry in self._subsystems.values())
+
+    def mark_finished(self):
+        self.finished = time.perf_counter()
+
+    def report(self, slowest: int = 10) -> Dict[str, Any]:
+        """단계 목록(시간순), 가장 느린 단계, 하위 시스템 상태"""
+        with self._lock:
+            steps = list(self._steps)
+            subsystems = {name: dict(entry) for name, entry in self._subsystems.items()}
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return {
+            "total_ms": round((end - self.started) * 1000, 1),
+            "finished": self.finished is not None,
+            "steps": sorted(steps, key=lambda s: s["offset_ms"]),
+            "slowest": sorted(steps, key=lambda s: s["duration_ms"], reverse=True)[:slowest],
+            "subsystems": subsystems
+        }
+
+    def print_summary(self, slowest: int = 5):
+        report = self.report(slowest)
+        print(f"⏱️ 시작 프로파일: 총 {report['total_ms']:.0f}ms")
+        for item in report["slowest"]:
+            status = "❌" if item["error"] else "✅"
+            print(f"   {status} {item['name']}: {item['duration_ms']:.0f}ms")
+
+
+_profile = StartupProfile()
+
+
+def get_startup_profile() -> StartupProfile:
+    return _profile
@@ -81,10 +81,20 @@ function setupEventListeners() {
 async function loadSessions() {
     try {
         console.log('📋 세션 목록 로드 시작');
-        const response = await fetch('/api/sessions');
+        const response = await fetch('/api/sessions?limit=200');
 
         if (response.ok) {
-            sessions = await response.json();
+            const data = await response.json();
+            sessions = data.sessions || [];
+            // 세션 목록은 페이지 단위로 오므로 next_cursor를 따라 나머지 페이지도 가져옴
+            let nextCursor = data.next_cursor;
+            while (nextCursor) {
+                const pageResponse = await fetch(`/api/sessions?limit=200&cursor=${encodeURIComponent(nextCursor)}`);
+                if (!pageResponse.ok) break;
+                const pageData = await pageResponse.json();
+                sessions = sessions.concat(pageData.sessions || []);
+                nextCursor = pageData.next_cursor;
+            }
             console.log(`✅ 세션 목록 로드 성공: ${sessions.length}개`);
             updateSessionList();
         } else {
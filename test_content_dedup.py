@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+학습 내용 중복 제거 회귀 테스트
+정규화 해시(완전 중복)와 SimHash(유사 중복) 판정을 확인합니다.
+
+실행: python -m pytest -q test_content_dedup.py  또는  python test_content_dedup.py
+"""
+
+import os
+import sys
+import unicodedata
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from content_dedup import (
+    NEAR_DUP_MAX_DISTANCE, SIMHASH_BANDS, _from_int64, _to_int64,
+    content_hash, hamming_distance, normalize_content, simhash, simhash_bands,
+)
+
+DOCUMENT = " ".join([
+    "금강 아카데미 정보보호 교육 자료입니다.",
+    "첫째, 인공지능 서비스는 수집 목적에 필요한 최소한의 개인정보만 처리합니다.",
+    "둘째, 접근 권한은 업무 담당자에게만 부여하고 분기마다 권한 현황을 점검합니다.",
+    "셋째, 접속 기록과 처리 로그는 최소 일 년 동안 안전하게 보관합니다.",
+    "넷째, 비밀번호와 주민등록번호 같은 고유 식별 정보는 암호화하여 저장합니다.",
+    "다섯째, 외부 위탁 업체는 계약 전에 보안 수준을 평가하고 매년 현장 점검을 실시합니다.",
+    "여섯째, 침해 사고가 발생하면 즉시 책임자에게 보고하고 대응 절차에 따라 피해를 최소화합니다.",
+    "일곱째, 모든 임직원은 연 이회 정보보호 교육을 이수하고 이수 현황을 인사팀에 제출합니다.",
+    "여덟째, 백업 데이터는 별도 장소에 보관하며 복구 훈련을 반기마다 진행합니다.",
+    "아홉째, 신규 시스템을 도입할 때에는 개인정보 영향 평가를 먼저 수행합니다.",
+    "열째, 이 지침은 관련 법령이 바뀌면 지체 없이 개정하여 공지합니다.",
+])
+OTHER_DOCUMENT = (
+    "오늘은 김치찌개 레시피를 정리합니다. 돼지고기와 묵은지를 볶고 물을 부어 끓인 뒤 두부와 대파를 넣습니다. "
+    "간은 국간장과 소금으로 맞추고 고춧가루를 더해 얼큰하게 완성합니다."
+)
+
+
+def test_content_hash_ignores_spacing_and_case():
+    """공백/대소문자/유니코드 정규화만 다른 내용은 같은 해시여야 함"""
+    assert normalize_content("  Hello\n\tWORLD  ") == "hello world"
+    assert content_hash("Hello  World") == content_hash("hello world\n")
+    # NFD로 분해된 한글도 같은 해시
+    assert content_hash("한글") == content_hash("한글")
+    assert content_hash("hello world") != content_hash("hello, world")
+
+
+def test_simhash_detects_near_duplicates():
+    """한 단어만 바뀐 문서는 가깝고, 다른 문서는 멀어야 함"""
+    original = simhash(DOCUMENT)
+    edited = simhash(DOCUMENT.replace("즉시", "곧바로"))
+    other = simhash(OTHER_DOCUMENT)
+    assert original is not None and edited is not None and other is not None
+    assert hamming_distance(original, edited) <= NEAR_DUP_MAX_DISTANCE
+    assert hamming_distance(original, other) > NEAR_DUP_MAX_DISTANCE
+    # 특징이 너무 적으면 유사 판정하지 않음
+    assert simhash("짧은 문장") is None
+
+
+def test_bands_and_int64_round_trip():
+    """가까운 해시는 적어도 한 밴드가 같고, int64 변환은 되돌릴 수 있어야 함"""
+    original = simhash(DOCUMENT)
+    edited = simhash(DOCUMENT.replace("즉시", "곧바로"))
+    bands = simhash_bands(original)
+    assert len(bands) == SIMHASH_BANDS
+    assert set(bands) & set(simhash_bands(edited))
+
+    for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1, original):
+        stored = _to_int64(value)
+        assert -(1 << 63) <= stored < (1 << 63)
+        assert _from_int64(stored) == value
+
+
+if __name__ == "__main__":
+    for test in (test_content_hash_ignores_spacing_and_case, test_simhash_detects_near_duplicates,
+                 test_bands_and_int64_round_trip):
+        test()
+        print(f"✅ {test.__name__}")
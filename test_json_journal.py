@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 저널 저장소 회귀 테스트
+스냅샷 이후 저널 재생, 압축(스냅샷 교체 후 저널 삭제 전 종료) 중단 시 중복 적용 여부를 확인합니다.
+
+실행: python -m pytest -q test_json_journal.py  또는  python test_json_journal.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from json_journal import JOURNAL_SEQ_KEY, JournalStore
+
+
+def _store(directory: str, compact_every: int = 1000) -> JournalStore:
+    return JournalStore(os.path.join(directory, "messages.json"), compact_every=compact_every)
+
+
+def test_replay_after_snapshot():
+    """스냅샷 이후에 기록한 변경만 저널에서 재생되어야 함"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        data = store.load({})
+        data["s1"] = []
+        store.set(data, "s1")
+        for i in range(3):
+            data["s1"].append({"n": i})
+            store.append(data, "s1", {"n": i})
+        assert store.snapshot(data)
+        assert not os.path.exists(store.journal_path)
+
+        data["s1"].append({"n": 3})
+        store.append(data, "s1", {"n": 3})
+        data["s2"] = {"name": "두 번째"}
+        store.set(data, "s2")
+        del data["s2"]
+        store.delete(data, "s2")
+
+        reloaded = _store(directory).load({})
+        assert reloaded == {"s1": [{"n": 0}, {"n": 1}, {"n": 2}, {"n": 3}]}
+        assert JOURNAL_SEQ_KEY not in reloaded
+
+
+def test_interrupted_compaction_does_not_duplicate_appends():
+    """스냅샷 교체 후 저널 삭제 전에 종료되어도 append 레코드가 두 번 적용되지 않아야 함"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        data = store.load({})
+        data["s1"] = []
+        store.set(data, "s1")
+        for i in range(3):
+            data["s1"].append(i)
+            store.append(data, "s1", i)
+
+        # 스냅샷 교체까지 끝나고 저널 삭제 직전에 종료된 상태를 재현
+        leftover = os.path.join(directory, "leftover.journal")
+        shutil.copy(store.journal_path, leftover)
+        assert store.snapshot(data)
+        shutil.copy(leftover, store.journal_path)
+
+        restarted = _store(directory)
+        data = restarted.load({})
+        assert data == {"s1": [0, 1, 2]}
+
+        # 남은 저널 뒤에 이어서 기록한 레코드는 다음 재시작에서 적용되어야 함
+        data["s1"].append(3)
+        restarted.append(data, "s1", 3)
+        assert _store(directory).load({}) == {"s1": [0, 1, 2, 3]}
+
+
+def test_torn_last_line_is_skipped():
+    """비정상 종료로 잘린 마지막 저널 줄은 무시하고 나머지를 재생해야 함"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        data = store.load({})
+        data["u1"] = {"points": 10}
+        store.set(data, "u1")
+        with open(store.journal_path, "a", encoding="utf-8") as f:
+            f.write('{"op": "set", "key": "u2", "val')
+
+        assert _store(directory).load({}) == {"u1": {"points": 10}}
+
+
+def test_compaction_keeps_sequence_across_restarts():
+    """compact_every마다 압축되고, 재시작 후 순번이 이어져 새 레코드가 건너뛰어지지 않아야 함"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory, compact_every=3)
+        data = store.load({})
+        for i in range(7):
+            data[f"k{i}"] = i
+            store.set(data, f"k{i}")
+        assert store.pending_records == 1
+
+        with open(store.file_path, "r", encoding="utf-8") as f:
+            assert json.load(f)[JOURNAL_SEQ_KEY] == 6
+
+        restarted = _store(directory, compact_every=3)
+        data = restarted.load({})
+        assert restarted.seq == 7
+        data["k7"] = 7
+        restarted.set(data, "k7")
+        assert _store(directory).load({}) == {f"k{i}": i for i in range(8)}
+
+
+if __name__ == "__main__":
+    for test in (test_replay_after_snapshot, test_interrupted_compaction_does_not_duplicate_appends,
+                 test_torn_last_line_is_skipped, test_compaction_keeps_sequence_across_restarts):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BM25 키워드 색인 회귀 테스트
+한국어 토큰화(조사 제거, 2-gram), 저장 문서의 역색인 필드, IDF 계산을 확인합니다.
+
+실행: python -m pytest -q test_keyword_index.py  또는  python test_keyword_index.py
+"""
+
+import os
+import sys
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from keyword_index import _idf, annotate_document, build_search_fields, tokenize
+
+
+def test_tokenize_strips_josa_and_adds_bigrams():
+    """조사/불용어를 제거하고, 3글자 이상 한국어 어간에는 2-gram을 추가해야 함"""
+    assert tokenize("학교에서") == ["학교"]
+    assert tokenize("인공지능은 the AI") == ["인공지능", "인공", "공지", "지능", "ai"]
+    assert tokenize("그 우리 a") == []
+    assert tokenize("") == [] and tokenize(None) == []
+
+
+def test_search_fields_count_nested_and_list_fields():
+    """점 표기 하위 필드와 목록 필드도 색인하고, 2회 이상 등장한 용어만 tf에 기록해야 함"""
+    doc = {
+        "content": "파이썬 파이썬 학습",
+        "tags": ["파이썬", 3],
+        "metadata": {"filename": "guide.pdf"},
+        "ignored": "무시되는 필드"
+    }
+    fields = build_search_fields(doc)
+    assert set(fields["search_terms"]) == {"파이썬", "파이", "이썬", "학습", "guide", "pdf"}
+    assert fields["search_tf"]["파이썬"] == 3
+    assert "학습" not in fields["search_tf"]
+    assert fields["search_len"] == 12
+
+    annotated = annotate_document(dict(doc))
+    assert annotated["search_terms"] == fields["search_terms"]
+    assert annotated["content"] == doc["content"]
+
+
+def test_idf_prefers_rare_terms():
+    """드문 용어일수록 IDF가 크고, df가 total보다 커도 0 이상이어야 함"""
+    assert _idf(1000, 1) > _idf(1000, 100) > _idf(1000, 1000) > 0
+    assert _idf(10, 50) > 0
+
+
+if __name__ == "__main__":
+    for test in (test_tokenize_strips_josa_and_adds_bigrams, test_search_fields_count_nested_and_list_fields,
+                 test_idf_prefers_rare_terms):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+토큰 예산 기반 프롬프트 조립기 회귀 테스트
+예산 준수, 우선순위(시스템 프롬프트 > 현재 메시지 > 회상 기억 > 최근 대화), token_count 캐시를 확인합니다.
+
+실행: python -m pytest -q test_prompt_assembler.py  또는  python test_prompt_assembler.py
+"""
+
+import os
+import sys
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from prompt_assembler import PROMPT_MEMORY_ITEM_TOKENS, TOKEN_COUNT_FIELD, PromptAssembler, TokenCounter
+
+
+def _history(turns: int):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"{i}번째 질문입니다. " * 20})
+        history.append({"role": "assistant", "content": f"{i}번째 답변입니다. " * 20})
+    return history
+
+
+def test_token_counter_caches_counts():
+    """같은 텍스트는 한 번만 계산하고, dict에는 token_count 필드로 기록해야 함"""
+    counter = TokenCounter()
+    first = counter.count("토큰 수를 계산할 문장입니다.")
+    assert counter.count("토큰 수를 계산할 문장입니다.") == first
+    assert counter.stats == {"hits": 1, "encoded": 1, "field_hits": 0}
+    assert counter.count("") == 0
+
+    item = {"content": "저장된 메모리 내용"}
+    tokens = counter.count_item(item)
+    assert item[TOKEN_COUNT_FIELD] == tokens
+    assert counter.count_item(item) == tokens
+    assert counter.stats["field_hits"] == 1
+
+
+def test_assemble_keeps_budget_and_newest_history():
+    """예산을 넘지 않고, 최근 대화는 최신 턴부터 채워 시간순으로 넣어야 함"""
+    assembler = PromptAssembler(budget=600)
+    history = _history(30)
+    history.append({"role": "user", "content": "현재 질문"})
+    messages, usage = assembler.assemble("시스템 프롬프트", "현재 질문", history)
+
+    assert usage["prompt_tokens"] <= assembler.budget
+    assert messages[0] == {"role": "system", "content": "시스템 프롬프트"}
+    assert messages[-1] == {"role": "user", "content": "현재 질문"}
+    # 현재 메시지는 history에 있어도 한 번만 들어감
+    assert [m["content"] for m in messages].count("현재 질문") == 1
+
+    kept = messages[1:-1]
+    assert 0 < len(kept) == usage["history"] < len(history) - 1
+    assert kept == [{"role": m["role"], "content": m["content"]} for m in history[-1 - len(kept):-1]]
+
+
+def test_memories_ranked_truncated_and_limited():
+    """회상 기억은 순위순으로 넣고, 긴 항목은 잘라서 넣고, 기억 몫을 넘으면 건너뛰어야 함"""
+    assembler = PromptAssembler(budget=4000)
+    long_memory = {"content": "아주 긴 기억 " * (PROMPT_MEMORY_ITEM_TOKENS * 2), "recall_type": "keyword"}
+    memories = [
+        {"content": "첫 번째 기억", "recall_type": "embedding"},
+        long_memory,
+        {"content": "세 번째 기억"},
+    ]
+    messages, usage = assembler.assemble("시스템", "질문", [], memories)
+    memory_message = messages[1]["content"]
+
+    assert usage["memories"] == 3
+    assert memory_message.index("첫 번째 기억") < memory_message.index("아주 긴 기억") < memory_message.index("세 번째 기억")
+    assert "🔍 embedding 회상 #1:" in memory_message and "💭 관련 기억 #3:" in memory_message
+    assert assembler.stats["memories_truncated"] == 1
+    assert len(memory_message) < len(long_memory["content"])
+
+    # 예산이 작으면 기억은 일부만 들어가고 현재 메시지는 항상 포함
+    small = PromptAssembler(budget=256)
+    messages, usage = small.assemble("시스템", "질문", [], [dict(m) for m in memories])
+    assert usage["memories"] < 3
+    assert usage["memory_tokens"] <= small.budget
+    assert messages[-1] == {"role": "user", "content": "질문"}
+
+
+if __name__ == "__main__":
+    for test in (test_token_counter_caches_counts, test_assemble_keeps_budget_and_newest_history,
+                 test_memories_ranked_truncated_and_limited):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+회상 결과 캐시 회귀 테스트
+세대(generation) 변경에 따른 무효화, 계산 중 세대 변경, 동시 요청 병합, 워커 간 세대 전파를 확인합니다.
+
+실행: python -m pytest -q test_recall_cache.py  또는  python test_recall_cache.py
+"""
+
+import os
+import sys
+import asyncio
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+import recall_cache
+from recall_cache import (
+    SHARED_SCOPE, MemoryGenerations, RecallCache, add_generation_listener,
+    apply_remote_generation_bump, bump_memory_generation, user_scope,
+)
+
+
+class Counter:
+    """호출 횟수를 세는 회상 계산 함수"""
+
+    def __init__(self, result=None, delay: float = 0.0):
+        self.calls = 0
+        self.result = result
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.result if self.result is not None else [{"content": f"회상 {self.calls}"}]
+
+
+def _cache() -> RecallCache:
+    return RecallCache(max_entries=100, max_mb=1, ttl=60, generations=MemoryGenerations())
+
+
+def test_generation_bump_invalidates_only_its_scope():
+    """해당 범위의 세대가 오르면 다시 계산하고, 다른 범위는 캐시를 유지해야 함"""
+    async def scenario():
+        cache = _cache()
+        alice, bob = Counter(), Counter()
+        alice_scopes = (user_scope("alice"), SHARED_SCOPE)
+        bob_scopes = (user_scope("bob"), SHARED_SCOPE)
+
+        first = await cache.get_or_compute("enhanced", "안녕하세요?", alice, alice_scopes)
+        # 정규화된 같은 질문은 캐시 적중
+        assert await cache.get_or_compute("enhanced", "  안녕하세요 ", alice, alice_scopes) == first
+        await cache.get_or_compute("enhanced", "안녕하세요", bob, bob_scopes)
+        assert (alice.calls, bob.calls) == (1, 1)
+
+        cache.generations.bump(user_scope("alice"))
+        assert await cache.get_or_compute("enhanced", "안녕하세요", alice, alice_scopes) != first
+        await cache.get_or_compute("enhanced", "안녕하세요", bob, bob_scopes)
+        assert (alice.calls, bob.calls) == (2, 1)
+
+        # 공유 범위가 바뀌면 모두 무효
+        cache.generations.bump(SHARED_SCOPE)
+        await cache.get_or_compute("enhanced", "안녕하세요", alice, alice_scopes)
+        await cache.get_or_compute("enhanced", "안녕하세요", bob, bob_scopes)
+        assert (alice.calls, bob.calls) == (3, 2)
+        assert cache.stats["hits"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_bump_during_compute_is_not_cached():
+    """계산 도중 세대가 오르면 그 결과는 캐시하지 않아야 함 (새 메모리 누락 방지)"""
+    async def scenario():
+        cache = _cache()
+        scopes = (user_scope("alice"),)
+
+        async def compute_while_saving():
+            cache.generations.bump(user_scope("alice"))
+            return [{"content": "저장 전 결과"}]
+
+        await cache.get_or_compute("enhanced", "질문", compute_while_saving, scopes)
+        assert cache.get_stats()["entries"] == 0
+
+        # 빈 결과도 캐시하지 않음
+        empty = Counter(result=[])
+        await cache.get_or_compute("enhanced", "질문", empty, scopes)
+        await cache.get_or_compute("enhanced", "질문", empty, scopes)
+        assert empty.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_requests_are_coalesced_and_copied():
+    """같은 키의 동시 요청은 한 번만 계산하고, 호출자 수정이 캐시에 반영되지 않아야 함"""
+    async def scenario():
+        cache = _cache()
+        compute = Counter(delay=0.05)
+        scopes = (user_scope("alice"),)
+        results = await asyncio.gather(*[
+            cache.get_or_compute("enhanced", "질문", compute, scopes) for _ in range(5)
+        ])
+        assert compute.calls == 1
+        assert cache.stats["coalesced"] == 4
+        assert all(result == results[0] for result in results)
+
+        results[0][0]["content"] = "수정됨"
+        cached = await cache.get_or_compute("enhanced", "질문", compute, scopes)
+        assert cached[0]["content"] == "회상 1"
+
+        # 부가 조건(variant)이 다르면 별도 항목
+        await cache.get_or_compute("enhanced", "질문", compute, scopes, variant=10)
+        assert compute.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_remote_bump_does_not_notify_listeners():
+    """로컬 세대 변경은 리스너로 전파하고, 원격에서 받은 변경은 다시 전파하지 않아야 함"""
+    notified = []
+    add_generation_listener(notified.append)
+    try:
+        scope = user_scope("listener-test")
+        before = recall_cache._generations.get(scope)
+        bump_memory_generation(scope)
+        assert notified == [scope]
+        apply_remote_generation_bump(scope)
+        assert notified == [scope]
+        assert recall_cache._generations.get(scope) == before + 2
+    finally:
+        recall_cache._generation_listeners.remove(notified.append)
+
+
+if __name__ == "__main__":
+    for test in (test_generation_bump_invalidates_only_its_scope, test_bump_during_compute_is_not_cached,
+                 test_concurrent_requests_are_coalesced_and_copied, test_remote_bump_does_not_notify_listeners):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+세션/포인트 정렬 색인 회귀 테스트
+그룹별 최신순 정렬, 커서 페이지네이션(같은 정렬 키 포함), 색인 갱신을 확인합니다.
+
+실행: python -m pytest -q test_session_index.py  또는  python test_session_index.py
+"""
+
+import os
+import sys
+
+# 현재 디렉토리를 Python 경로에 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from session_index import (
+    ALL_GROUP, MAX_PAGE_SIZE, IndexedDict, SortedGroupIndex, decode_cursor,
+    encode_cursor, page_size, points_sort_key, session_owner, session_sort_key,
+)
+
+
+def _session_index() -> SortedGroupIndex:
+    return SortedGroupIndex(session_owner, session_sort_key)
+
+
+def _sessions() -> IndexedDict:
+    index = _session_index()
+    sessions = IndexedDict(indexes=[index])
+    for i in range(10):
+        # 같은 created_at이 둘씩 있어 레코드 키로 순서가 갈려야 함
+        sessions[f"s{i}"] = {"user_email": "a@test.com", "created_at": f"2024-01-0{i // 2 + 1}T00:00:00"}
+    sessions["other"] = {"user_email": "b@test.com", "created_at": "2024-02-01T00:00:00"}
+    sessions["orphan"] = {"created_at": "2024-03-01T00:00:00"}
+    return sessions
+
+
+def _walk(index: SortedGroupIndex, group, limit: int):
+    keys, cursor, pages = [], None, 0
+    while True:
+        page, cursor = index.page(group, limit, cursor)
+        keys.extend(page)
+        pages += 1
+        if cursor is None:
+            return keys, pages
+
+
+def test_index_orders_newest_first():
+    """그룹별로 정렬 키 역순, 같은 키는 레코드 키 역순이어야 함"""
+    sessions = _sessions()
+    index = sessions.indexes[0]
+    assert index.keys("a@test.com") == ["s9", "s8", "s7", "s6", "s5", "s4", "s3", "s2", "s1", "s0"]
+    assert index.keys("b@test.com") == ["other"]
+    assert index.count("a@test.com") == 10
+    # 소유자가 없는 세션은 색인하지 않음
+    assert "orphan" not in index._entries
+
+
+def test_cursor_pagination_covers_group_once():
+    """어떤 페이지 크기로 넘겨도 누락/중복 없이 전체를 한 번씩 돌아야 함"""
+    index = _sessions().indexes[0]
+    expected = index.keys("a@test.com")
+    for limit in range(1, 12):
+        keys, pages = _walk(index, "a@test.com", limit)
+        assert keys == expected, limit
+        assert pages == max(1, -(-len(expected) // limit)), limit
+
+
+def test_cursor_survives_removal_and_reindex():
+    """커서 발급 후 항목이 지워지거나 정렬 키가 바뀌어도 이어서 조회되어야 함"""
+    sessions = _sessions()
+    index = sessions.indexes[0]
+    first, cursor = index.page("a@test.com", 3)
+    assert first == ["s9", "s8", "s7"]
+
+    # 커서 위치 항목 삭제, 뒤쪽 항목 pop
+    del sessions["s7"]
+    sessions.pop("s2")
+    # 제자리 수정 후 reindex: s0이 가장 최신으로 이동
+    sessions["s0"]["created_at"] = "2024-12-31T00:00:00"
+    sessions.reindex("s0")
+
+    rest, _ = index.page("a@test.com", 100, cursor)
+    assert rest == ["s6", "s5", "s4", "s3", "s1"]
+    assert index.keys("a@test.com")[0] == "s0"
+    assert index.count("a@test.com") == 8
+
+    sessions.update({"s0": {"user_email": "b@test.com", "created_at": "2024-01-01T00:00:00"}})
+    assert index.keys("b@test.com") == ["other", "s0"]
+    sessions.clear()
+    assert index.count("a@test.com") == 0 and index.count("b@test.com") == 0
+
+
+def test_cursor_of_resumes_after_key():
+    """cursor_of(key)로 조회하면 그 레코드 다음 항목부터 나와야 함"""
+    index = _sessions().indexes[0]
+    keys, _ = index.page("a@test.com", 3, index.cursor_of("s5"))
+    assert keys == ["s4", "s3", "s2"]
+    assert index.cursor_of("missing") is None
+
+
+def test_invalid_cursor_and_page_size():
+    """잘못된 커서는 ValueError, limit은 1..MAX_PAGE_SIZE로 제한"""
+    assert decode_cursor(encode_cursor(("2024-01-01", "s1"))) == ("2024-01-01", "s1")
+    for bad in ("not-a-cursor", encode_cursor(["only-one"])):
+        try:
+            _session_index().page("a@test.com", 10, bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"커서가 거부되지 않음: {bad}")
+
+    assert page_size("20") == 20
+    assert page_size(0) == 1
+    assert page_size(10 ** 6) == MAX_PAGE_SIZE
+    assert page_size("abc") == 50
+    assert page_size(None, default=7) == 7
+
+
+def test_points_sort_key_orders_numerically():
+    """포인트 정렬 키의 문자열 순서가 숫자 순서와 같아야 함 (음수/잘못된 값 포함)"""
+    values = [-5, 0, 9, 10, 100, 2500, 10 ** 9]
+    keys = [points_sort_key({"current_points": value}) for value in values]
+    assert keys == sorted(keys)
+    assert len(set(map(len, keys))) == 1
+    assert points_sort_key({"current_points": "x"}) == points_sort_key({})
+
+    points = IndexedDict(indexes=[SortedGroupIndex(lambda info: ALL_GROUP, points_sort_key)])
+    for email, value in (("a", 5), ("b", 100), ("c", 20), ("d", 100)):
+        points[email] = {"current_points": value}
+    assert points.indexes[0].keys(ALL_GROUP) == ["d", "b", "c", "a"]
+
+
+if __name__ == "__main__":
+    for test in (test_index_orders_newest_first, test_cursor_pagination_covers_group_once,
+                 test_cursor_survives_removal_and_reindex, test_cursor_of_resumes_after_key,
+                 test_invalid_cursor_and_page_size, test_points_sort_key_orders_numerically):
+        test()
+        print(f"✅ {test.__name__}")
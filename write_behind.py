@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Write-behind 저장 큐
+채팅 응답 이후의 MongoDB 저장 작업을 제한된 크기의 큐에 넣고
+백그라운드 작업자가 컬렉션별로 묶어 insert_many/bulk_write로 기록합니다.
+
+- 큐가 가득 차면 put()이 대기하여 생산자에게 역압(backpressure)을 겁니다.
+- insert(..., on_inserted)의 콜백은 배치 기록 후 실제로 삽입된 문서 목록으로 한 번 호출됩니다
+  (중복 키 등으로 실패한 문서는 제외).
+- 종료 시 flush()로 남은 작업을 모두 기록합니다.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from db_executor import run_db
+
+logger = logging.getLogger(__name__)
+
+# 큐에 보관할 최대 작업 수
+WRITE_BEHIND_MAX_QUEUE = int(os.getenv("EORA_WRITE_BEHIND_MAX_QUEUE", "1000"))
+# 한 번에 기록할 최대 작업 수
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("EORA_WRITE_BEHIND_BATCH_SIZE", "100"))
+# 배치를 모으기 위해 기다리는 최대 시간 (초)
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("EORA_WRITE_BEHIND_FLUSH_INTERVAL", "0.5"))
+
+
+class WriteBehindQueue:
+    """MongoDB 쓰기 작업을 모아서 일괄 기록하는 백그라운드 큐"""
+
+    def __init__(self, max_queue: int = WRITE_BEHIND_MAX_QUEUE,
+                 batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+                 flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL):
+        """
+        초기화
+
+        Args:
+            max_queue: 큐 최대 크기 (초과 시 put 대기)
+            batch_size: 배치당 최대 작업 수
+            flush_interval: 배치 수집 대기 시간 (초)
+        """
+        self.max_queue = max(1, max_queue)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "errors": 0,
+            "max_depth": 0,
+            "last_lag_ms": 0.0,
+            "max_lag_ms": 0.0,
+            "total_lag_ms": 0.0,
+            "last_flush": None
+        }
+
+    # ==================== 작업 등록 ====================
+
+    async def insert(self, collection, document: Dict[str, Any],
+                     on_inserted: Optional[Callable[[List[Dict[str, Any]]], Any]] = None):
+        """
+        컬렉션에 문서 삽입 작업을 등록합니다 (insert_many로 묶임).
+
+        Args:
+            collection: 대상 컬렉션
+            document: 삽입할 문서
+            on_inserted: 삽입에 성공했을 때 호출할 함수(동기/코루틴) - 같은 함수끼리 삽입된 문서 목록으로 한 번 호출
+        """
+        await self._put({"kind": "insert", "collection": collection, "document": document, "on_inserted": on_inserted})
+
+    async def update(self, collection, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        """컬렉션 업데이트 작업을 등록합니다 (bulk_write로 묶임)."""
+        await self._put({
+            "kind": "update",
+            "collection": collection,
+            "filter": filter,
+            "update": update,
+            "upsert": upsert
+        })
+
+    async def call(self, func: Callable, *args, **kwargs):
+        """배치 기록 이후 실행할 함수(동기/코루틴)를 등록합니다."""
+        await self._put({"kind": "call", "func": func, "args": args, "kwargs": kwargs})
+
+    async def _put(self, op: Dict[str, Any]):
+        self._ensure_started()
+        op["enqueued_at"] = time.perf_counter()
+        await self._queue.put(op)
+        self._stats["enqueued"] += 1
+        self._stats["max_depth"] = max(self._stats["max_depth"], self._queue.qsize())
+
+    def _ensure_started(self):
+        """현재 이벤트 루프에서 작업자를 시작합니다 (지연 시작)."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._run())
+
+    # ==================== 백그라운드 작업자 ====================
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.perf_counter() + self.flush_interval
+            # 짧은 시간 동안 추가 작업을 모아 한 번에 기록
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]):
+        """배치를 컬렉션별로 묶어 기록합니다."""
+        inserts: "OrderedDict[int, tuple]" = OrderedDict()
+        updates: "OrderedDict[int, tuple]" = OrderedDict()
+        calls = []
+
+        for op in batch:
+            kind = op["kind"]
+            if kind == "insert":
+                inserts.setdefault(id(op["collection"]), (op["collection"], []))[1].append(op)
+            elif kind == "update":
+                updates.setdefault(id(op["collection"]), (op["collection"], []))[1].append(op)
+            else:
+                calls.append(op)
+
+        inserted: Dict[Callable, List[Dict[str, Any]]] = {}
+        for collection, ops in inserts.values():
+            documents = [op["document"] for op in ops]
+            failed = set()
+            try:
+                await run_db(collection.insert_many, documents, ordered=False)
+            except Exception as e:
+                # ordered=False의 BulkWriteError는 실패한 문서 위치를 알려줌 (그 외 오류는 전체 실패로 봄)
+                write_errors = (getattr(e, "details", None) or {}).get("writeErrors")
+                failed = {error["index"] for error in write_errors} if write_errors is not None else set(range(len(ops)))
+                self._stats["errors"] += 1
+                logger.error(f"❌ write-behind insert_many 오류 ({collection.name}, {len(failed)}/{len(documents)}건): {e}")
+            self._stats["written"] += len(documents) - len(failed)
+            for position, op in enumerate(ops):
+                if op["on_inserted"] is not None and position not in failed:
+                    inserted.setdefault(op["on_inserted"], []).append(op["document"])
+
+        for callback, documents in inserted.items():
+            try:
+                result = callback(documents)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"❌ write-behind 삽입 후 작업 오류 ({len(documents)}건): {e}")
+
+        if updates:
+            from pymongo import UpdateOne
+            for collection, ops in updates.values():
+                requests = [UpdateOne(op["filter"], op["update"], upsert=op["upsert"]) for op in ops]
+                try:
+                    await run_db(collection.bulk_write, requests, ordered=True)
+                    self._stats["written"] += len(requests)
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    logger.error(f"❌ write-behind bulk_write 오류 ({collection.name}, {len(requests)}건): {e}")
+
+        for op in calls:
+            try:
+                result = op["func"](*op["args"], **op["kwargs"])
+                if asyncio.iscoroutine(result):
+                    await result
+                self._stats["written"] += 1
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"❌ write-behind 작업 오류: {e}")
+
+        now = time.perf_counter()
+        lag_ms = (now - min(op["enqueued_at"] for op in batch)) * 1000
+        self._stats["batches"] += 1
+        self._stats["last_lag_ms"] = lag_ms
+        self._stats["max_lag_ms"] = max(self._stats["max_lag_ms"], lag_ms)
+        self._stats["total_lag_ms"] += lag_ms
+        self._stats["last_flush"] = time.time()
+
+    # ==================== 종료/상태 ====================
+
+    async def flush(self, timeout: float = 30.0) -> bool:
+        """큐에 남은 작업이 모두 기록될 때까지 기다립니다."""
+        if self._queue is None:
+            return True
+        if not self._queue.empty():
+            self._ensure_started()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ write-behind flush 시간 초과: {self._queue.qsize()}건 남음")
+            return False
+
+    async def stop(self, timeout: float = 30.0) -> bool:
+        """남은 작업을 기록한 뒤 작업자를 중지합니다."""
+        flushed = await self.flush(timeout)
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        return flushed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """큐 깊이와 지연(lag) 통계를 반환합니다."""
+        depth = self._queue.qsize() if self._queue is not None else 0
+        oldest_ms = 0.0
+        if depth:
+            # asyncio.Queue 내부 deque의 첫 항목이 가장 오래된 작업
+            oldest_ms = (time.perf_counter() - self._queue._queue[0]["enqueued_at"]) * 1000
+        batches = self._stats["batches"]
+        return {
+            "depth": depth,
+            "max_queue": self.max_queue,
+            "max_depth": self._stats["max_depth"],
+            "oldest_pending_ms": round(oldest_ms, 2),
+            "enqueued": self._stats["enqueued"],
+            "written": self._stats["written"],
+            "batches": batches,
+            "errors": self._stats["errors"],
+            "last_lag_ms": round(self._stats["last_lag_ms"], 2),
+            "max_lag_ms": round(self._stats["max_lag_ms"], 2),
+            "avg_lag_ms": round(self._stats["total_lag_ms"] / batches, 2) if batches else 0.0,
+            "last_flush": self._stats["last_flush"],
+            "running": self._worker is not None and not self._worker.done()
+        }
+
+
+# 전역 write-behind 큐 인스턴스
+_write_behind_queue: Optional[WriteBehindQueue] = None
+
+
+def get_write_behind_queue() -> WriteBehindQueue:
+    """write-behind 큐 인스턴스를 반환합니다."""
+    global _write_behind_queue
+    if _write_behind_queue is None:
+        _write_behind_queue = WriteBehindQueue()
+    return _write_behind_queue
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket 연결 관리
+세션/사용자별로 연결을 찾을 수 있도록 dict로 관리하고, 연결마다 크기가 제한된 전송 큐와
+전송 태스크를 두어 느린 클라이언트가 다른 연결이나 응답 생성을 막지 않도록 합니다.
+
+- 등록/해제: 연결 id -> 연결, 세션/사용자 -> 연결 id 집합 (O(1))
+- 전송: 메시지는 한 번만 JSON 직렬화하여 각 연결 큐에 넣고, 연결별 전송 태스크가 동시에 보냄
+  · send(): 큐가 가득 차면 최대 EORA_WS_SEND_TIMEOUT초 기다림 (스트리밍 응답의 역압)
+  · offer(): 기다리지 않음 - 가득 차면 느린 클라이언트로 보고 연결을 닫음 (브로드캐스트용)
+- 하트비트: EORA_WS_HEARTBEAT_SECONDS마다 {"type": "ping"}을 보내고,
+  pong을 보낸 적 있는 클라이언트가 EORA_WS_IDLE_TIMEOUT초 동안 아무것도 보내지 않으면 연결을 닫음
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# 연결당 전송 큐 크기 (메시지 수)
+WS_SEND_QUEUE_SIZE = int(os.getenv("EORA_WS_SEND_QUEUE_SIZE", "256"))
+# 큐가 가득 찼을 때 send()가 기다리는 최대 시간 (초)
+WS_SEND_TIMEOUT = float(os.getenv("EORA_WS_SEND_TIMEOUT", "10"))
+# 하트비트 주기와 무응답 연결 종료 기준 (초)
+WS_HEARTBEAT_SECONDS = float(os.getenv("EORA_WS_HEARTBEAT_SECONDS", "20"))
+WS_IDLE_TIMEOUT = float(os.getenv("EORA_WS_IDLE_TIMEOUT", "60"))
+
+# 종료 코드
+CLOSE_NORMAL = 1000
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+def encode_message(data: Dict[str, Any]) -> str:
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class WebSocketConnection:
+    """WebSocket 연결 하나 + 전송 큐/태스크"""
+
+    def __init__(self, websocket: WebSocket, session_id: str, user_email: Optional[str],
+                 queue_size: int = WS_SEND_QUEUE_SIZE):
+        self.id = uuid.uuid4().hex
+        self.websocket = websocket
+        self.session_id = session_id
+        self.user_email = user_email
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.connected_at = time.time()
+        self.last_seen = time.monotonic()
+        self.heartbeat_aware = False  # pong을 한 번이라도 보낸 클라이언트만 무응답 종료 대상
+        self.closed = False
+        self.sent = 0
+        self._sender: Optional[asyncio.Task] = None
+
+    def touch(self, pong: bool = False):
+        self.last_seen = time.monotonic()
+        if pong:
+            self.heartbeat_aware = True
+
+    def start(self, on_close):
+        self._sender = asyncio.ensure_future(self._send_loop(on_close))
+
+    async def _send_loop(self, on_close):
+        try:
+            while True:
+                text = await self.queue.get()
+                await self.websocket.send_text(text)
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.info(f"WebSocket 전송 종료: {self.session_id} - {e}")
+        finally:
+            self.closed = True
+            await on_close(self)
+
+    async def send(self, data: Dict[str, Any], timeout: float = WS_SEND_TIMEOUT) -> bool:
+        """큐에 넣기 (가득 차면 timeout까지 대기, 실패하면 False)"""
+        return await self.send_text(encode_message(data), timeout)
+
+    async def send_text(self, text: str, timeout: float = WS_SEND_TIMEOUT) -> bool:
+        if self.closed:
+            return False
+        try:
+            await asyncio.wait_for(self.queue.put(text), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def offer(self, text: str) -> bool:
+        """기다리지 않고 큐에 넣기 (가득 차면 False)"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def close(self, code: int = CLOSE_NORMAL, reason: str = ""):
+        if self._sender is not None and not self._sender.done():
+            self._sender.cancel()
+        if not self.closed:
+            self.closed = True
+            try:
+                await self.websocket.close(code=code, reason=reason)
+            except Exception:
+                pass
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "session_id": self.session_id,
+            "user_email": self.user_email,
+            "connected_at": self.connected_at,
+            "idle_sec": round(time.monotonic() - self.last_seen, 1),
+            "queued": self.queue.qsize(),
+            "sent": self.sent
+        }
+
+
+class ConnectionManager:
+    """세션/사용자별 WebSocket 연결 관리"""
+
+    def __init__(self, heartbeat_seconds: float = WS_HEARTBEAT_SECONDS, idle_timeout: float = WS_IDLE_TIMEOUT):
+        self.connections: Dict[str, WebSocketConnection] = {}
+        self.by_session: Dict[str, Set[str]] = {}
+        self.by_user: Dict[str, Set[str]] = {}
+        self.heartbeat_seconds = heartbeat_seconds
+        self.idle_timeout = idle_timeout
+        self._heartbeat: Optional[asyncio.Task] = None
+        self.stats = {"connected": 0, "disconnected": 0, "slow_closed": 0, "idle_closed": 0, "dropped": 0}
+
+    async def connect(self, websocket: WebSocket, session_id: str, user_email: Optional[str]) -> WebSocketConnection:
+        await websocket.accept()
+        connection = WebSocketConnection(websocket, session_id, user_email)
+        self.connections[connection.id] = connection
+        self.by_session.setdefault(session_id, set()).add(connection.id)
+        if user_email:
+            self.by_user.setdefault(user_email, set()).add(connection.id)
+        connection.start(self._on_sender_closed)
+        self.stats["connected"] += 1
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.ensure_future(self._heartbeat_loop())
+        return connection
+
+    def _unregister(self, connection: WebSocketConnection) -> bool:
+        if self.connections.pop(connection.id, None) is None:
+            return False
+        for index, key in ((self.by_session, connection.session_id), (self.by_user, connection.user_email)):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(connection.id)
+                if not ids:
+                    del index[key]
+        self.stats["disconnected"] += 1
+        return True
+
+    async def _on_sender_closed(self, connection: WebSocketConnection):
+        self._unregister(connection)
+
+    async def disconnect(self, connection: WebSocketConnection, code: int = CLOSE_NORMAL, reason: str = ""):
+        self._unregister(connection)
+        await connection.close(code, reason)
+
+    # ----- 전송 -----
+
+    def _targets(self, ids: Iterable[str]) -> List[WebSocketConnection]:
+        return [self.connections[i] for i in list(ids) if i in self.connections]
+
+    async def _fan_out(self, targets: List[WebSocketConnection], data: Dict[str, Any]) -> int:
+        """한 번 직렬화하여 각 연결 큐에 넣음 (가득 찬 연결은 느린 클라이언트로 보고 닫음)"""
+        text = encode_message(data)
+        delivered = 0
+        slow = []
+        for connection in targets:
+            if connection.offer(text):
+                delivered += 1
+            else:
+                slow.append(connection)
+        if slow:
+            self.stats["slow_closed"] += len(slow)
+            await asyncio.gather(*(self.disconnect(c, CLOSE_TRY_AGAIN_LATER, "send queue full") for c in slow))
+        return delivered
+
+    async def send_to_session(self, session_id: str, data: Dict[str, Any]) -> int:
+        return await self._fan_out(self._targets(self.by_session.get(session_id, ())), data)
+
+    async def send_to_user(self, user_email: str, data: Dict[str, Any]) -> int:
+        return await self._fan_out(self._targets(self.by_user.get(user_email, ())), data)
+
+    async def broadcast(self, data: Dict[str, Any]) -> int:
+        return await self._fan_out(list(self.connections.values()), data)
+
+    # ----- 하트비트 -----
+
+    async def _heartbeat_loop(self):
+        ping = encode_message({"type": "ping"})
+        while self.connections:
+            await asyncio.sleep(self.heartbeat_seconds)
+            now = time.monotonic()
+            idle = [c for c in self.connections.values()
+                    if c.heartbeat_aware and now - c.last_seen > self.idle_timeout]
+            if idle:
+                self.stats["idle_closed"] += len(idle)
+                await asyncio.gather(*(self.disconnect(c, CLOSE_NORMAL, "heartbeat timeout") for c in idle))
+            for connection in list(self.connections.values()):
+                if not connection.offer(ping):
+                    self.stats["dropped"] += 1
+
+    async def close_all(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+        await asyncio.gather(*(self.disconnect(c, CLOSE_NORMAL, "server shutdown")
+                               for c in list(self.connections.values())))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "active": len(self.connections),
+            "sessions": len(self.by_session),
+            "users": len(self.by_user),
+            "queued": sum(c.queue.qsize() for c in self.connections.values()),
+            **self.stats
+        }